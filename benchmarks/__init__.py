@@ -0,0 +1 @@
+"""Benchmarks of the recon engine, run from the repository root with ``python3 -m benchmarks.<name>``."""
@@ -0,0 +1,138 @@
+"""External sort/dedupe against ``sort -u`` on synthetic subdomain corpora.
+
+Generates ``--lines`` names per size (a share of them duplicates, spread
+over a few roots like a multi-target run) and times every method on the
+same file as its own process, reaped with ``wait4`` (the peak RSS is that of
+the largest process of the method, run-generation workers included):
+
+* ``sort``: ``LC_ALL=C sort -u`` with the same memory cap and core count,
+* ``extsort``: ``python3 -m recon.extsort``,
+* ``set``: the previous in-memory set + ``sorted`` merge (needs the whole
+  corpus in memory, leave it out at 50M names on small machines).
+
+Outputs are compared byte for byte with the first method's.  Generated
+corpora are kept in ``--work-dir`` and reused.
+
+Usage::
+
+    python3 -m benchmarks.extsort --lines 10000000 50000000 --memory-mb 1024 --workers 8
+    python3 -m benchmarks.extsort --lines 1000000 --methods extsort set
+"""
+
+from __future__ import annotations
+
+import argparse
+import filecmp
+import os
+import random
+import shutil
+import string
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List, Optional, Sequence
+
+from recon.extsort import DEFAULT_MEMORY_MB
+
+ROOTS = ("example.com", "example.net", "corp.example.org", "shop.example.io", "cdn.example.co.uk")
+LABEL_CHARS = string.ascii_lowercase + string.digits + "-"
+
+# Previous merge_shards: every line in a set, then sorted
+SET_SORT = (
+    "import sys\n"
+    "lines = set()\n"
+    "for path in sys.argv[2:]:\n"
+    "    with open(path, 'rb') as handle:\n"
+    "        lines.update(line.strip() for line in handle if line.strip())\n"
+    "with open(sys.argv[1], 'wb') as out:\n"
+    "    out.writelines(line + b'\\n' for line in sorted(lines))\n"
+)
+
+
+def generate(path: str, lines: int, duplicates: float, seed: int = 1) -> None:
+    """``lines`` names, ``duplicates`` of them repeating an earlier one, under ``ROOTS``."""
+    rng = random.Random(seed)
+    recent: List[str] = []
+    with open(f"{path}.tmp", "w", encoding="ascii") as out:
+        for _ in range(lines):
+            if recent and rng.random() < duplicates:
+                name = rng.choice(recent)
+            else:
+                depth = rng.choice((1, 1, 1, 2, 2, 3))
+                labels = ["".join(rng.choices(LABEL_CHARS[:-1], k=rng.randint(2, 14))) for _ in range(depth)]
+                name = ".".join((*labels, rng.choice(ROOTS)))
+                if len(recent) < 100000:
+                    recent.append(name)
+                else:
+                    recent[rng.randrange(len(recent))] = name
+            out.write(name + "\n")
+    os.replace(f"{path}.tmp", path)
+
+
+def measure(argv: Sequence[str], env: Optional[Dict[str, str]] = None) -> Dict[str, float]:
+    started = time.monotonic()
+    process = subprocess.Popen(list(argv), env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    _, status, usage = os.wait4(process.pid, 0)
+    process.returncode = os.waitstatus_to_exitcode(status)
+    return {
+        "wall": time.monotonic() - started,
+        "cpu": usage.ru_utime + usage.ru_stime,
+        "rss_mb": usage.ru_maxrss / 1024,
+        "returncode": process.returncode,
+    }
+
+
+def command(method: str, corpus: str, output: str, memory_mb: float, workers: int, tmp_dir: str) -> List[str]:
+    if method == "sort":
+        return ["sort", "-u", "-S", f"{int(memory_mb)}M", f"--parallel={workers}", "-T", tmp_dir,
+                "-o", output, corpus]
+    if method == "extsort":
+        return [sys.executable, "-m", "recon.extsort", "--memory-mb", f"{memory_mb:g}", "--workers", str(workers),
+                "--tmp-dir", tmp_dir, "--output", output, corpus]
+    return [sys.executable, "-c", SET_SORT, output, corpus]
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python3 -m benchmarks.extsort", description=__doc__.split("\n")[0])
+    parser.add_argument("--lines", type=int, nargs="+", default=[10_000_000, 50_000_000], help="corpus sizes")
+    parser.add_argument("--duplicates", type=float, default=0.3, help="share of repeated names (default 0.3)")
+    parser.add_argument("--memory-mb", type=float, default=DEFAULT_MEMORY_MB, help="memory cap of the sorts")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="cores of the sorts")
+    parser.add_argument("--methods", nargs="+", choices=("sort", "extsort", "set"), default=["sort", "extsort"])
+    parser.add_argument("--work-dir", default=os.path.join(tempfile.gettempdir(), "recon-bench"),
+                        help="corpora and outputs")
+    args = parser.parse_args(argv)
+
+    methods = [method for method in args.methods if method != "sort" or shutil.which("sort")]
+    os.makedirs(args.work_dir, exist_ok=True)
+    env = dict(os.environ, LC_ALL="C")
+    print(f"{'lines':>11} {'method':<8} {'unique':>11} {'wall s':>8} {'cpu s':>8} {'peak MB':>8}  output")
+    for lines in args.lines:
+        corpus = os.path.join(args.work_dir, f"names_{lines}_{args.duplicates:g}.txt")
+        if not os.path.isfile(corpus):
+            started = time.monotonic()
+            generate(corpus, lines, args.duplicates)
+            print(f"# generated {corpus} in {time.monotonic() - started:.1f}s", file=sys.stderr)
+        reference = None
+        for method in methods:
+            output = os.path.join(args.work_dir, f"sorted_{lines}_{method}.txt")
+            result = measure(command(method, corpus, output, args.memory_mb, args.workers, args.work_dir), env)
+            if result["returncode"]:
+                verdict = f"exit {result['returncode']:g}"
+            elif reference is None:
+                reference, verdict = output, "reference"
+            else:
+                verdict = "same" if filecmp.cmp(reference, output, shallow=False) else "DIFFERENT"
+            unique = sum(1 for _ in open(output, "rb")) if not result["returncode"] else 0
+            print(f"{lines:>11} {method:<8} {unique:>11} {result['wall']:>8.1f} {result['cpu']:>8.1f} "
+                  f"{result['rss_mb']:>8.0f}  {verdict}", flush=True)
+        for method in methods:
+            output = os.path.join(args.work_dir, f"sorted_{lines}_{method}.txt")
+            if os.path.exists(output):
+                os.unlink(output)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,116 @@
+"""Deterministic UDP DNS server for the pipeline benchmark.
+
+Answers the queries of the resolver, brute-force and reverse sweep engines
+without touching the network:
+
+* ``A``: names one level under a target whose label is one the fake tools
+  report (``h<n>``, ``www``) resolve to a ``127.x.y.z`` address for ``--hit``
+  percent of them; every other name is ``NXDOMAIN``, so wildcard probes find
+  no wildcard and the recursive brute force stops after one level,
+* ``AAAA``: no data,
+* ``PTR``: every ``in-addr.arpa`` name answers ``ptr-a-b-c-d.example.net``.
+
+``--latency`` delays every answer.
+
+Command line usage::
+
+    python3 -m benchmarks.fake_dns --port 5399 --hit 60 --latency 0.002
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import re
+import struct
+import sys
+import zlib
+from typing import Optional, Sequence, Tuple
+
+TYPE_A = 1
+TYPE_PTR = 12
+
+_KNOWN_LABEL = re.compile(r"^(?:h[0-9]+|www)$")
+
+
+def _question(data: bytes) -> Tuple[str, int, int]:
+    """Name, type and end offset of the first question."""
+    labels = []
+    offset = 12
+    while data[offset]:
+        length = data[offset]
+        labels.append(data[offset + 1:offset + 1 + length].decode("ascii", "replace"))
+        offset += 1 + length
+    qtype = struct.unpack("!H", data[offset + 1:offset + 3])[0]
+    return ".".join(labels).lower(), qtype, offset + 5
+
+
+def _encode(name: str) -> bytes:
+    return b"".join(bytes([len(label)]) + label.encode("ascii") for label in name.split(".")) + b"\x00"
+
+
+def answer(data: bytes, hit: int) -> bytes:
+    qid = struct.unpack("!H", data[:2])[0]
+    name, qtype, end = _question(data)
+    question = data[12:end]
+    records = []
+    exists = True
+    if name.endswith(".in-addr.arpa"):
+        if qtype == TYPE_PTR:
+            octets = name.split(".")[:4][::-1]
+            target = _encode(f"ptr-{'-'.join(octets)}.example.net")
+            records.append(b"\xc0\x0c" + struct.pack("!HHIH", TYPE_PTR, 1, 300, len(target)) + target)
+    else:
+        value = zlib.crc32(name.encode())
+        labels = name.split(".")
+        # Only one level under a target, so the recursive brute force does not find names forever
+        exists = (len(labels) > 2 and bool(_KNOWN_LABEL.match(labels[0])) and not _KNOWN_LABEL.match(labels[1])
+                  and value % 100 < hit)
+        if exists and qtype == TYPE_A:
+            address = bytes((127, value >> 8 & 255, value >> 16 & 255, value >> 24 & 255 or 1))
+            records.append(b"\xc0\x0c" + struct.pack("!HHIH", TYPE_A, 1, 300, 4) + address)
+    flags = 0x8180 | (0 if exists else 3)
+    return struct.pack("!HHHHHH", qid, flags, 1, len(records), 0, 0) + question + b"".join(records)
+
+
+class FakeDNS(asyncio.DatagramProtocol):
+    def __init__(self, hit: int, latency: float):
+        self.hit = hit
+        self.latency = latency
+        self.transport = None
+
+    def connection_made(self, transport) -> None:
+        self.transport = transport
+
+    def datagram_received(self, data: bytes, addr) -> None:
+        try:
+            reply = answer(data, self.hit)
+        except (IndexError, struct.error):
+            return
+        if self.latency:
+            asyncio.get_running_loop().call_later(self.latency, self.transport.sendto, reply, addr)
+        else:
+            self.transport.sendto(reply, addr)
+
+
+async def serve(port: int, hit: int, latency: float) -> None:
+    loop = asyncio.get_running_loop()
+    await loop.create_datagram_endpoint(lambda: FakeDNS(hit, latency), local_addr=("127.0.0.1", port))
+    await asyncio.Event().wait()
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python3 -m benchmarks.fake_dns", description=__doc__.split("\n")[0])
+    parser.add_argument("--port", type=int, default=5399)
+    parser.add_argument("--hit", type=int, default=60, help="percent of the known names that resolve")
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds before every answer")
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(serve(args.port, args.hit, args.latency))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,158 @@
+"""Deterministic stand-ins for the external tools of the pipeline.
+
+:func:`install` writes one wrapper per tool name into a directory that the
+benchmark puts first on ``PATH``; every wrapper runs this module with its
+own name, so the engine drives the fakes with the argument templates of
+the real tools (see :mod:`recon.sources`).  A fake sleeps, writes names
+where the real tool would (stdout, ``-o`` file, bbot's NDJSON scan
+directory, sudomy's result directory, ffuf's JSON report) and exits.
+
+The names a tool reports for a domain depend only on the tool, the domain
+and the settings, and overlap between tools like real sources do, so runs
+are comparable.  Settings, from the environment:
+
+``FAKE_LATENCY``
+    seconds every invocation sleeps (default 0.5),
+``FAKE_LATENCY_PER_TARGET``
+    extra seconds per target of a list-input tool (default 0.01),
+``FAKE_NAMES``
+    names per domain and tool (default 20),
+``FAKE_FAIL``
+    tool names that exit with status 1.
+
+The ``amass intel`` passes report ASNs and /28 ranges under ``10.0.0.0/8``
+and ``whois`` the matching RADb routes, answered by the fake DNS server of
+:mod:`benchmarks.fake_dns` in the reverse sweep.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import stat
+import sys
+import time
+import zlib
+from typing import Iterator, List, Optional, Sequence
+
+TOOLS = ("subfinder", "assetfinder", "amass", "bbot", "ffuf", "subdog", "sudomy", "dnscan", "whois",
+         "httpx", "nuclei", "anew", "jq")
+
+# Directory holding the benchmarks and recon packages
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+WRAPPER = """#!/bin/sh
+PYTHONPATH="{root}${{PYTHONPATH:+:$PYTHONPATH}}" exec "{python}" -m benchmarks.fake_tools "{tool}" "$@"
+"""
+
+
+def _hash(*parts: str) -> int:
+    return zlib.crc32(":".join(parts).encode())
+
+
+def names(tool: str, domain: str, count: int) -> Iterator[str]:
+    """``count`` names under ``domain``, half of them shared with other tools on average."""
+    seen = set()
+    for index in range(count):
+        label = f"h{_hash(tool, domain, str(index)) % (count * 2)}"
+        if label not in seen:
+            seen.add(label)
+            yield f"{label}.{domain}"
+    yield f"www.{domain}"
+
+
+def asns(org: str) -> List[str]:
+    return [f"AS{64512 + _hash(org, str(index)) % 1000}" for index in range(2)]
+
+
+def cidr(asn: str) -> str:
+    value = _hash(asn)
+    return f"10.{value % 256}.{(value >> 8) % 256}.{(value >> 16) % 16 * 16}/28"
+
+
+def _option(argv: Sequence[str], *flags: str) -> Optional[str]:
+    for index, arg in enumerate(argv[:-1]):
+        if arg in flags:
+            return argv[index + 1]
+    return None
+
+
+def _read(path: Optional[str]) -> List[str]:
+    if not path:
+        return []
+    with open(path, encoding="utf-8") as handle:
+        return [line.strip() for line in handle if line.strip()]
+
+
+def _write(lines: Iterator[str], output: Optional[str]) -> None:
+    if output:
+        os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+        with open(output, "w", encoding="utf-8") as out:
+            out.writelines(f"{line}\n" for line in lines)
+    else:
+        sys.stdout.writelines(f"{line}\n" for line in lines)
+
+
+def run(tool: str, argv: Sequence[str]) -> int:
+    if tool in os.environ.get("FAKE_FAIL", "").split():
+        return 1
+    count = int(os.environ.get("FAKE_NAMES", "20"))
+    output = _option(argv, "-o")
+    targets = _read(_option(argv, "-dL", "-df", "-l"))
+    if tool == "subdog":
+        targets = [line.strip() for line in sys.stdin if line.strip()]
+    domain = _option(argv, "-d", "--subs-only", "-t")
+    url = _option(argv, "-u")
+    if url:
+        domain = url.split("FUZZ.", 1)[-1]
+    if domain:
+        targets.append(domain)
+    time.sleep(float(os.environ.get("FAKE_LATENCY", "0.5"))
+               + float(os.environ.get("FAKE_LATENCY_PER_TARGET", "0.01")) * len(targets))
+
+    def found() -> Iterator[str]:
+        for target in targets:
+            yield from names(tool, target, count)
+
+    if tool == "amass" and "intel" in argv:
+        org, asn, network = _option(argv, "-org"), _option(argv, "-asn"), _option(argv, "-cidr")
+        if org:
+            _write((f"{number}, {org.upper()}-NET" for number in asns(org)), output)
+        elif asn:
+            _write(iter([cidr(asn), *names("amass-asn", f"{asn.lower()}.example", count // 4)]), output)
+        elif network:
+            _write(names("amass-cidr", f"net{_hash(network) % 1000}.example", count // 4), output)
+    elif tool == "whois":
+        query = argv[-1]
+        _write(iter([f"route:      {cidr(query.split()[-1])}", f"origin:     {query.split()[-1]}"]), None)
+    elif tool == "bbot":
+        scan = os.path.join(output or ".", "scan_fake")
+        os.makedirs(scan, exist_ok=True)
+        with open(os.path.join(scan, "output.json"), "w", encoding="utf-8") as out:
+            for name in found():
+                out.write(json.dumps({"type": "DNS_NAME", "data": name, "host": name, "scope_distance": 0,
+                                      "resolved_hosts": [f"10.9.{_hash(name) % 256}.1"], "module": "fake"}) + "\n")
+    elif tool == "sudomy":
+        _write(found(), os.path.join(output or ".", "subdomain.txt"))
+    elif tool == "ffuf":
+        results = [{"url": f"https://{name}/", "host": name, "status": 200} for name in found()]
+        with open(output, "w", encoding="utf-8") as out:
+            json.dump({"commandline": " ".join(argv), "results": results}, out)
+    elif tool in ("subfinder", "assetfinder", "amass", "subdog", "dnscan"):
+        _write(found(), output)
+    return 0
+
+
+def install(directory: str) -> str:
+    """Write the wrappers of :data:`TOOLS` into ``directory`` and return it."""
+    os.makedirs(directory, exist_ok=True)
+    for tool in TOOLS:
+        path = os.path.join(directory, tool)
+        with open(path, "w", encoding="utf-8") as out:
+            out.write(WRAPPER.format(root=ROOT, python=sys.executable, tool=tool))
+        os.chmod(path, os.stat(path).st_mode | stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH)
+    return directory
+
+
+if __name__ == "__main__":
+    sys.exit(run(sys.argv[1], sys.argv[2:]))
@@ -0,0 +1,148 @@
+"""Throughput of the indexed technology matcher against running every pattern on every response.
+
+Generates ``--responses`` synthetic responses of about ``--body-kb`` KB of
+HTML each, with the markup, script URLs, headers and cookies of a few
+technologies planted at random, and times:
+
+* ``indexed``: :meth:`recon.fingerprint.RuleSet.match`, header and cookie
+  patterns by name, body patterns behind the anchor scan,
+* ``naive``: the same rules with every body pattern run on every body.
+
+Both must find the same technologies in every response; a mismatch is
+reported as ``WRONG``.  Building the index and loading it from the cache
+are timed as well.
+
+Usage::
+
+    python3 -m benchmarks.fingerprint --responses 5000 --body-kb 16
+    python3 -m benchmarks.fingerprint --responses 5000 --body-kb 64 --rules technologies.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import shutil
+import sys
+import tempfile
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from recon.fingerprint import DEFAULT_RULES, RuleSet
+
+Response = Tuple[List[Tuple[str, str]], str]
+
+FILLER = (
+    '<div class="row"><div class="col-md-{n}"><p>Lorem ipsum dolor sit amet, {word} consectetur adipiscing.</p>'
+    '<a href="/{word}/{n}.html" title="{word}">{word}</a></div></div>\n',
+    '<li class="nav-item"><a class="nav-link" href="/{word}?page={n}">{word}</a></li>\n',
+    '<img src="/static/img/{word}-{n}.png" alt="{word}" width="{n}" height="{n}">\n',
+    '<span data-id="{n}" class="{word}">{word} {n}</span><br/>\n',
+    '<link rel="preload" href="/static/{word}.woff2" as="font">\n',
+    '<script>window.dataLayer = window.dataLayer || []; var {word} = {n};</script>\n',
+)
+WORDS = ("account", "search", "product", "contact", "about", "news", "help", "login", "blog", "careers")
+
+PLANTED = {
+    "head": (
+        '<meta name="generator" content="WordPress 6.4.2">',
+        '<link rel="stylesheet" href="/wp-content/themes/twenty/style.css?ver=6.4">',
+        '<script src="/wp-includes/js/jquery/jquery.min.js?ver=3.7.1"></script>',
+        '<script src="https://code.jquery.com/jquery-3.6.0.min.js"></script>',
+        '<link rel="stylesheet" href="https://cdn.jsdelivr.net/npm/bootstrap@5.3.0/dist/css/bootstrap.min.css">',
+        '<script async src="https://www.googletagmanager.com/gtag/js?id=G-XXXX"></script>',
+        '<link href="https://fonts.googleapis.com/css2?family=Roboto" rel="stylesheet">',
+        '<script src="/_next/static/chunks/main-abc.js"></script>',
+        '<meta name="csrf-param" content="authenticity_token">',
+        '<title>Grafana</title>',
+    ),
+    "body": (
+        '<div id="__nuxt"></div>',
+        '<div data-reactroot="">',
+        '<span class="jenkins_ver">Jenkins ver. 2.414</span>',
+        '<div id="ember123" class="ember-view"></div>',
+        '<input type="hidden" name="__VIEWSTATE" value="x">',
+        '<div class="card svelte-1x2y3z">',
+    ),
+}
+HEADERS = (
+    ("server", "nginx/1.18.0"), ("server", "Apache/2.4.57 (Debian)"), ("server", "cloudflare"),
+    ("x-powered-by", "PHP/8.1.2"), ("x-powered-by", "Express"), ("x-jenkins", "2.414"), ("via", "1.1 varnish"),
+    ("set-cookie", "PHPSESSID=abc; path=/"), ("set-cookie", "JSESSIONID=1; Path=/; HttpOnly"),
+    ("set-cookie", "_ga=GA1.2.3; Max-Age=63072000"), ("x-aspnet-version", "4.0.30319"),
+)
+
+
+def generate(responses: int, body_kb: float, seed: int = 1) -> List[Response]:
+    rng = random.Random(seed)
+    generated = []
+    for _ in range(responses):
+        head = rng.sample(PLANTED["head"], rng.randrange(4))
+        body = rng.sample(PLANTED["body"], rng.randrange(2))
+        parts = ["<!DOCTYPE html><html><head><meta charset=\"utf-8\">", *head, "</head><body>"]
+        size = sum(map(len, parts))
+        while size < body_kb * 1024:
+            part = rng.choice(FILLER).format(n=rng.randrange(1, 13), word=rng.choice(WORDS))
+            if body and rng.random() < 0.01:
+                part += body.pop()
+            parts.append(part)
+            size += len(part)
+        parts += [*body, "</body></html>"]
+        headers = [("content-type", "text/html; charset=UTF-8"), ("cache-control", "no-cache"),
+                   *rng.sample(HEADERS, rng.randrange(4))]
+        generated.append((headers, "".join(parts)))
+    return generated
+
+
+def naive(rules: RuleSet) -> RuleSet:
+    """``rules`` without the anchor scan: every body pattern runs on every body."""
+    keyed = {number for index in (rules.headers, rules.cookies) for numbers in index.values() for number in numbers}
+    body = [number for number in range(len(rules.patterns)) if number not in keyed]
+    return RuleSet(dict(rules.index, anchors={}, unanchored=body, scanner="(?!)"))
+
+
+def run(rules: RuleSet, responses: Sequence[Response]) -> Tuple[float, List[Dict[str, str]]]:
+    started = time.process_time()
+    found = [rules.match(headers, body) for headers, body in responses]
+    return time.process_time() - started, found
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python3 -m benchmarks.fingerprint", description=__doc__.split("\n")[0])
+    parser.add_argument("--responses", type=int, default=5_000)
+    parser.add_argument("--body-kb", type=float, default=16.0, help="approximate body size in KB")
+    parser.add_argument("--rules", action="append", default=[],
+                        help="rule file added to the built-in rules (repeatable), e.g. Wappalyzer's")
+    args = parser.parse_args(argv)
+
+    paths = [DEFAULT_RULES, *args.rules]
+    cache_dir = tempfile.mkdtemp(prefix="recon-bench-fingerprint-")
+    try:
+        started = time.monotonic()
+        RuleSet.load(paths, cache_dir)
+        built = time.monotonic() - started
+        started = time.monotonic()
+        rules = RuleSet.load(paths, cache_dir)
+        loaded = time.monotonic() - started
+    finally:
+        shutil.rmtree(cache_dir, ignore_errors=True)
+    print(f"rules: {len(rules.technologies)} technologies, {len(rules.patterns)} patterns, "
+          f"{len(rules.anchors)} anchors, {len(rules.unanchored)} unanchored; "
+          f"index built in {built:.3f}s, loaded from cache in {loaded:.3f}s")
+
+    responses = generate(args.responses, args.body_kb)
+    megabytes = sum(len(body) for _, body in responses) / (1 << 20)
+    print(f"{'method':<8} {'responses':>9} {'MB':>7} {'cpu s':>7} {'responses/min':>14} {'MB/s':>7}  technologies")
+    expected = None
+    for method, matcher in (("indexed", rules), ("naive", naive(rules))):
+        cpu, found = run(matcher, responses)
+        expected = found if expected is None else expected
+        hits = sum(map(len, found))
+        verdict = "ok" if found == expected else "WRONG"
+        print(f"{method:<8} {len(responses):>9} {megabytes:>7.1f} {cpu:>7.2f} {len(responses) / cpu * 60:>14.0f} "
+              f"{megabytes / cpu:>7.1f}  {hits} {verdict}", flush=True)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
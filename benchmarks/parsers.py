@@ -0,0 +1,135 @@
+"""Throughput of the bbot, sudomy and ffuf readers against the shell pipelines they replaced.
+
+Generates synthetic outputs in ``--work-dir`` (``--records`` findings per
+tool, spread over ``--files`` files or scan directories) and times:
+
+* ``native``: the reader of :mod:`recon.parsers`, findings counted in process,
+* ``shell``: the bash scripts' pipeline over the same output, when its tools
+  are installed (``find -exec cat {} \\; | grep`` for bbot's subdomain lists
+  and sudomy's result files, ``jq | sed`` per ffuf report).
+
+Every reader must find the names the generator wrote; a mismatch is
+reported as ``WRONG``.
+
+Usage::
+
+    python3 -m benchmarks.parsers --records 1000000 --files 100
+    python3 -m benchmarks.parsers --records 100000 --tools ffuf
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Optional, Sequence, Set
+
+from recon.parsers import READERS
+
+DOMAIN = "example.com"
+BBOT_MODULES = ("crt", "anubisdb", "certspotter", "dnsbrute", "httpx", "wayback")
+SUDOMY_FILES = ("subdomain", "ip_resolver", "httprobe_subdomain", "Passive_Collect/crtsh", "Passive_Collect/shodan")
+
+SHELL = {
+    "bbot": "find {path} -name '*.txt' -exec cat {{}} \\; | grep -E '^[a-zA-Z0-9.-]+\\.[a-zA-Z]{{2,}}$' | sort -u",
+    "sudomy": "find {path} -name '*.txt' -exec cat {{}} \\; | grep -oE '[a-zA-Z0-9.-]+\\.example\\.com' | sort -u",
+    "ffuf": "for f in {path}/*.json; do jq -r '.results[].url' \"$f\" | sed -E 's#^https?://##; s#/.*##'; done | sort -u",
+}
+
+
+def _name(rng: random.Random, number: int) -> str:
+    return f"h{number}-{rng.randrange(1 << 20):x}.{DOMAIN}"
+
+
+def generate(tool: str, directory: str, records: int, files: int, seed: int = 1) -> Set[str]:
+    """Write a synthetic output of ``tool`` under ``directory``; returns the names in it."""
+    rng = random.Random(seed)
+    names: Set[str] = set()
+    per_file = max(1, records // files)
+    os.makedirs(directory, exist_ok=True)
+    for index in range(files):
+        batch = [_name(rng, index * per_file + number) for number in range(per_file)]
+        names.update(batch)
+        if tool == "bbot":
+            scan = os.path.join(directory, f"scan_{index}")
+            os.makedirs(scan, exist_ok=True)
+            with open(os.path.join(scan, "output.json"), "w", encoding="utf-8") as out:
+                for name in batch:
+                    address = f"10.{rng.randrange(256)}.{rng.randrange(256)}.{rng.randrange(256)}"
+                    out.write(json.dumps({"type": "DNS_NAME", "data": name, "host": name, "scope_distance": 0,
+                                          "resolved_hosts": [address], "module": rng.choice(BBOT_MODULES),
+                                          "tags": ["a-record", "in-scope"]}) + "\n")
+            with open(os.path.join(scan, "subdomains.txt"), "w", encoding="utf-8") as out:
+                out.writelines(f"{name}\n" for name in batch)
+        elif tool == "sudomy":
+            listing = os.path.join(directory, "Sudomy-Output", str(index),
+                                   f"{SUDOMY_FILES[index % len(SUDOMY_FILES)]}.txt")
+            os.makedirs(os.path.dirname(listing), exist_ok=True)
+            with open(listing, "w", encoding="utf-8") as out:
+                for name in batch:
+                    out.write(rng.choice((f"{name}\n", f"{name} 10.0.{rng.randrange(256)}.1\n",
+                                          f"https://{name}/ 200\n")))
+        else:
+            results = [{"input": {"FUZZ": name.split(".")[0]}, "position": number, "status": 200,
+                        "length": rng.randrange(5000), "words": 10, "lines": 2, "content-type": "text/html",
+                        "redirectlocation": "", "url": f"https://{name}/", "host": name}
+                       for number, name in enumerate(batch)]
+            with open(os.path.join(directory, f"ffuf_{index}.json"), "w", encoding="utf-8") as out:
+                json.dump({"commandline": "ffuf -w words.txt -u https://FUZZ.example.com", "time": "now",
+                           "results": results, "config": {"method": "GET"}}, out)
+    return names
+
+
+def _size(directory: str) -> int:
+    return sum(os.path.getsize(os.path.join(root, name)) for root, _, files in os.walk(directory) for name in files)
+
+
+def native(tool: str, directory: str) -> Set[str]:
+    reader = READERS[tool]
+    if tool == "ffuf":
+        return {finding.host for path in sorted(os.listdir(directory))
+                for finding in reader(os.path.join(directory, path), DOMAIN) if finding.host}
+    return {finding.host for finding in reader(directory, DOMAIN) if finding.host}
+
+
+def shell(tool: str, directory: str) -> Set[str]:
+    output = subprocess.run(["bash", "-c", SHELL[tool].format(path=directory)], capture_output=True, text=True)
+    return set(output.stdout.split())
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python3 -m benchmarks.parsers", description=__doc__.split("\n")[0])
+    parser.add_argument("--records", type=int, default=1_000_000, help="findings per tool")
+    parser.add_argument("--files", type=int, default=100, help="files (bbot: scan directories) per tool")
+    parser.add_argument("--tools", nargs="+", choices=sorted(READERS), default=sorted(READERS))
+    parser.add_argument("--work-dir", default=os.path.join(tempfile.gettempdir(), "recon-bench-parsers"))
+    args = parser.parse_args(argv)
+
+    print(f"{'tool':<7} {'method':<7} {'records':>9} {'MB':>7} {'wall s':>7} {'records/s':>11} {'MB/s':>7}  names")
+    for tool in args.tools:
+        directory = os.path.join(args.work_dir, f"{tool}_{args.records}_{args.files}")
+        shutil.rmtree(directory, ignore_errors=True)
+        expected = generate(tool, directory, args.records, args.files)
+        size = _size(directory) / (1 << 20)
+        methods = {"native": native}
+        if all(shutil.which(binary) for binary in (("jq", "sed") if tool == "ffuf" else ("find", "grep"))):
+            methods["shell"] = shell
+        for method, run in methods.items():
+            started = time.monotonic()
+            found = run(tool, directory)
+            wall = time.monotonic() - started
+            verdict = "ok" if found == expected else f"WRONG ({len(found)} of {len(expected)})"
+            print(f"{tool:<7} {method:<7} {len(expected):>9} {size:>7.1f} {wall:>7.2f} "
+                  f"{len(expected) / wall:>11.0f} {size / wall:>7.1f}  {verdict}", flush=True)
+        shutil.rmtree(directory, ignore_errors=True)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
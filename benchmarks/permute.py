@@ -0,0 +1,122 @@
+"""Learning and candidate generation of the permutation engine on synthetic name sets.
+
+Generates ``--names`` names spread over a few hundred roots with the
+patterns of real programs (``dev-api``, ``api-staging``, ``qa.shop``,
+``web07``, random labels), hides ``--hidden`` percent of them and gives the
+rest to :mod:`recon.permute`.  Reports:
+
+* the time to learn the rules and their number,
+* the time and peak memory (``tracemalloc``) to stream ``--max-candidates``
+  candidates out of :func:`recon.permute.candidates` (``ranked``), against
+  materialising every permutation first and deduplicating the list
+  (``--eager``; about 9M names at 100k input names, close to 1 GB),
+* how many hidden names the candidates found, with the rules ranked and
+  with the same rules in random order (``shuffled``).
+
+Every run checks that the cap holds and that no candidate is a duplicate
+or a known name; a failed check is reported as ``WRONG``.
+
+Usage::
+
+    python3 -m benchmarks.permute --names 100000 --max-candidates 200000
+    python3 -m benchmarks.permute --names 100000 --max-candidates 1000000 --eager
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import time
+import tracemalloc
+from typing import Callable, List, Optional, Sequence, Set, Tuple
+
+from recon.index import SubdomainIndex
+from recon.permute import KnownNames, PatternModel, candidates, permutations, split
+
+SERVICES = ("api", "shop", "mail", "vpn", "auth", "admin", "portal", "cdn", "app", "git", "jira", "grafana",
+            "status", "docs", "login", "m", "static", "payments", "search", "support")
+ENVIRONMENTS = ("dev", "staging", "prod", "qa", "uat", "test", "stage", "preprod", "sandbox", "demo")
+PATTERNS = ("{env}-{service}", "{service}-{env}", "{env}.{service}", "{service}{number:02d}", "{service}",
+            "{service}-{number}", "{env}-{service}-{number:02d}", "{random}", "{random}.{service}")
+
+
+def generate(names: int, seed: int = 1) -> Tuple[List[str], Set[str]]:
+    """``names`` distinct names and their roots."""
+    rng = random.Random(seed)
+    roots = [f"target{number}.{rng.choice(('com', 'net', 'io', 'org'))}" for number in range(max(1, names // 300))]
+    generated = set()
+    while len(generated) < names:
+        label = rng.choice(PATTERNS).format(
+            env=rng.choice(ENVIRONMENTS), service=rng.choice(SERVICES), number=rng.randrange(1, 12),
+            random="".join(rng.choice("abcdefghijklmnopqrstuvwxyz") for _ in range(rng.randrange(4, 10))),
+        )
+        generated.add(f"{label}.{rng.choice(roots)}")
+    return sorted(generated), set(roots)
+
+
+def measured(function: Callable[[], List[str]]) -> Tuple[List[str], float, float]:
+    """Result, seconds and peak traced MB of ``function``."""
+    tracemalloc.start()
+    started = time.process_time()
+    result = function()
+    seconds = time.process_time() - started
+    peak = tracemalloc.get_traced_memory()[1] / (1 << 20)
+    tracemalloc.stop()
+    return result, seconds, peak
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python3 -m benchmarks.permute", description=__doc__.split("\n")[0])
+    parser.add_argument("--names", type=int, default=100_000)
+    parser.add_argument("--hidden", type=float, default=10.0, help="percent of the names held back")
+    parser.add_argument("--max-candidates", type=int, default=200_000)
+    parser.add_argument("--min-count", type=int, default=2)
+    parser.add_argument("--eager", action="store_true", help="also materialise and dedupe every permutation")
+    args = parser.parse_args(argv)
+
+    names, roots = generate(args.names)
+    rng = random.Random(2)
+    hidden = set(rng.sample(names, int(len(names) * args.hidden / 100)))
+    visible = [name for name in names if name not in hidden]
+    bases = [base for base in (split(name, roots) for name in visible) if base is not None]
+
+    started = time.process_time()
+    model = PatternModel()
+    model.update(bases)
+    rules = model.rules(args.min_count)
+    learned = time.process_time() - started
+    started = time.process_time()
+    known = KnownNames(SubdomainIndex.from_names(visible))
+    indexed = time.process_time() - started
+    kinds = {kind: sum(1 for rule in rules if rule.kind == kind) for kind in ("swap", "prefix", "suffix", "label",
+                                                                              "step")}
+    print(f"names: {len(visible)} known on {len(roots)} roots, {len(hidden)} hidden; {len(rules)} rules "
+          f"({', '.join(f'{count} {kind}' for kind, count in kinds.items())}) learned in {learned:.2f}s, "
+          f"known-name index built in {indexed:.2f}s")
+
+    shuffled = random.Random(3).sample(rules, len(rules))
+    methods = [("ranked", lambda: list(candidates(rules, bases, known, args.max_candidates))),
+               ("shuffled", lambda: list(candidates(shuffled, bases, known, args.max_candidates)))]
+    if args.eager:
+        def eager() -> List[str]:
+            every = list(permutations(rules, bases))
+            unique = [name for name in dict.fromkeys(every) if name not in known]
+            return unique[:args.max_candidates]
+        methods.append(("eager", eager))
+
+    print(f"{'method':<8} {'candidates':>10} {'cpu s':>7} {'candidates/s':>12} {'peak MB':>8} {'hidden found':>12} "
+          f"{'hit %':>6}")
+    for method, function in methods:
+        generated, seconds, peak = measured(function)
+        found = sum(1 for name in generated if name in hidden)
+        valid = (len(generated) <= args.max_candidates and len(set(generated)) == len(generated)
+                 and not any(name in known for name in generated))
+        print(f"{method:<8} {len(generated):>10} {seconds:>7.2f} {len(generated) / max(seconds, 1e-9):>12.0f} "
+              f"{peak:>8.1f} {found:>12} {found / max(1, len(generated)) * 100:>6.2f}  {'ok' if valid else 'WRONG'}",
+              flush=True)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,214 @@
+"""End-to-end throughput of the advanced and simple flows against fake tools.
+
+For every ``--profiles`` x ``--targets`` pair the harness runs
+``python3 -m recon --profile P targets.txt`` in a fresh directory of
+``--work-dir``, offline and reproducibly:
+
+* the enumeration tools (and ``whois``, ``httpx``, ``nuclei``, ``anew``,
+  ``jq``) are the deterministic fakes of :mod:`benchmarks.fake_tools`,
+  first on ``PATH``; ``--latency`` and ``--names`` set how long each call
+  takes and how much it prints,
+* ``dig`` and ``prips`` are gone from the pipeline (:mod:`recon.dns` resolves
+  and sweeps natively), so DNS goes to the fake server of
+  :mod:`benchmarks.fake_dns` through ``DNS_RESOLVERS``,
+* the HTTP probe, certificate harvest and port scan are off: the fake
+  server answers with loopback addresses, so they would reach whatever
+  services listen on the benchmark host,
+* the cache and the state database are new for every run, so nothing is
+  served from a previous one.
+
+The run is reaped with ``wait4`` for its total, and the per-stage wall, CPU
+and peak RSS come from its ``reports/profile.jsonl`` (see
+:mod:`recon.profile`).  ``--json`` saves the results; ``--compare`` checks
+them against a saved baseline and exits 1 when a stage got slower by more
+than ``--threshold`` (and ``--min-seconds``), so a scheduler change can be
+measured against the tree before it.
+
+Usage::
+
+    python3 -m benchmarks.pipeline --targets 1 10 100 1000 --json baseline.json
+    python3 -m benchmarks.pipeline --profiles simple --targets 100 --compare baseline.json
+    MAX_PARALLEL_JOBS=16 python3 -m benchmarks.pipeline --targets 100 --latency 2 --names 200
+"""
+
+from __future__ import annotations
+
+import argparse
+import glob
+import json
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List, Optional, Sequence
+
+from recon.profile import count_lines, load_records
+
+from . import fake_tools
+
+
+def _free_port() -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as probe:
+        probe.bind(("127.0.0.1", 0))
+        return probe.getsockname()[1]
+
+
+def write_inputs(directory: str, targets: int, names: int) -> Dict[str, str]:
+    """Targets file and a brute-force wordlist (half of it labels the fakes report)."""
+    os.makedirs(directory, exist_ok=True)
+    paths = {"targets": os.path.join(directory, f"targets_{targets}.txt"),
+             "wordlist": os.path.join(directory, "words.txt")}
+    with open(paths["targets"], "w", encoding="utf-8") as out:
+        out.writelines(f"target{index}.bench.example\n" for index in range(targets))
+    with open(paths["wordlist"], "w", encoding="utf-8") as out:
+        out.writelines(f"h{index}\n" for index in range(names))
+        out.writelines(f"miss{index}\n" for index in range(names))
+    return paths
+
+
+def run_flow(profile: str, targets: int, args: argparse.Namespace, bin_dir: str, dns_port: int) -> Dict:
+    run_dir = os.path.join(args.work_dir, f"{profile}_{targets}")
+    shutil.rmtree(run_dir, ignore_errors=True)
+    inputs = write_inputs(run_dir, targets, args.names)
+    env = dict(
+        os.environ,
+        PATH=os.pathsep.join((bin_dir, "/usr/local/bin", "/usr/bin", "/bin")),
+        CACHE_DIR=os.path.join(run_dir, "cache"),
+        STATE_DB=os.path.join(run_dir, "state.db"),
+        DNS_RESOLVERS=f"127.0.0.1:{dns_port}",
+        HTTP_PROBE="false",
+        CERT_HARVEST="false",
+        PORT_SCAN="false",
+        WORDLIST=inputs["wordlist"],
+        FAKE_LATENCY=str(args.latency),
+        FAKE_LATENCY_PER_TARGET=str(args.latency_per_target),
+        FAKE_NAMES=str(args.names),
+        PYTHONPATH=os.pathsep.join(filter(None, (fake_tools.ROOT, os.environ.get("PYTHONPATH")))),
+    )
+    argv = [sys.executable, "-m", "recon", "--profile", profile, "--no-banner", inputs["targets"]]
+    started = time.monotonic()
+    with open(os.path.join(run_dir, "recon.log"), "wb") as log:
+        process = subprocess.Popen(argv, cwd=run_dir, env=env, stdout=log, stderr=subprocess.STDOUT)
+        _, status, usage = os.wait4(process.pid, 0)
+    process.returncode = os.waitstatus_to_exitcode(status)
+    wall = time.monotonic() - started
+
+    outputs = sorted(glob.glob(os.path.join(run_dir, "recon_*")))
+    stages: Dict[str, Dict[str, float]] = {}
+    found = resolved = 0
+    if outputs:
+        output = outputs[-1]
+        profile_file = os.path.join(output, "reports", "profile.jsonl")
+        for record in load_records(profile_file) if os.path.isfile(profile_file) else ():
+            if record.target:
+                continue
+            stages[record.stage] = {"wall": round(record.wall, 3),
+                                    "cpu": round(record.cpu_user + record.cpu_system, 3),
+                                    "rss_mb": round(record.max_rss_kb / 1024, 1),
+                                    "returncode": record.returncode}
+        found = count_lines([os.path.join(output, "final_subdomains.txt")])
+        resolved = count_lines([os.path.join(output, "resolved_subdomains.txt")])
+    return {
+        "profile": profile,
+        "targets": targets,
+        "total": {"wall": round(wall, 3), "cpu": round(usage.ru_utime + usage.ru_stime, 3),
+                  "rss_mb": round(usage.ru_maxrss / 1024, 1), "returncode": process.returncode},
+        "names": found,
+        "resolved": resolved,
+        "stages": stages,
+    }
+
+
+def print_run(result: Dict) -> None:
+    total = result["total"]
+    print(f"\n== {result['profile']} / {result['targets']} targets: {total['wall']:.1f}s wall, "
+          f"{total['cpu']:.1f}s CPU, {total['rss_mb']:.0f} MB peak, exit {total['returncode']}, "
+          f"{result['names']} names, {result['resolved']} resolved")
+    print(f"{'stage':<28} {'wall s':>8} {'cpu s':>8} {'peak MB':>8} {'exit':>5}")
+    for stage, usage in sorted(result["stages"].items(), key=lambda item: -item[1]["wall"]):
+        print(f"{stage:<28} {usage['wall']:>8.2f} {usage['cpu']:>8.2f} {usage['rss_mb']:>8.0f} "
+              f"{usage['returncode']:>5}")
+
+
+def compare(results: Sequence[Dict], baseline: Sequence[Dict], threshold: float, min_seconds: float) -> List[str]:
+    """Stages (and totals) whose wall time grew past the threshold, as report lines."""
+    previous = {(run["profile"], run["targets"]): run for run in baseline}
+    regressions = []
+    for result in results:
+        before = previous.get((result["profile"], result["targets"]))
+        if before is None:
+            continue
+        pairs = [("TOTAL", result["total"], before["total"])]
+        pairs.extend((stage, usage, before["stages"][stage])
+                     for stage, usage in result["stages"].items() if stage in before["stages"])
+        for stage, now, then in pairs:
+            grown = now["wall"] - then["wall"]
+            if grown > min_seconds and now["wall"] > then["wall"] * (1 + threshold):
+                share = f"+{grown / then['wall']:.0%}" if then["wall"] else "new"
+                regressions.append(f"{result['profile']:<9} {result['targets']:>5} {stage:<28} "
+                                   f"{then['wall']:>8.2f} -> {now['wall']:>8.2f}s ({share})")
+    return regressions
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python3 -m benchmarks.pipeline", description=__doc__.split("\n")[0])
+    parser.add_argument("--profiles", nargs="+", choices=("advanced", "simple"), default=["advanced", "simple"])
+    parser.add_argument("--targets", type=int, nargs="+", default=[1, 10, 100, 1000], help="target counts")
+    parser.add_argument("--latency", type=float, default=0.5, help="seconds every fake tool call takes")
+    parser.add_argument("--latency-per-target", type=float, default=0.01,
+                        help="extra seconds per target of a list-input call")
+    parser.add_argument("--names", type=int, default=20, help="names per target and fake tool")
+    parser.add_argument("--dns-latency", type=float, default=0.0, help="seconds the fake DNS server waits per answer")
+    parser.add_argument("--dns-hit", type=int, default=60, help="percent of the reported names that resolve")
+    parser.add_argument("--work-dir", default=os.path.join(tempfile.gettempdir(), "recon-bench-pipeline"))
+    parser.add_argument("--json", metavar="FILE", help="save the results")
+    parser.add_argument("--compare", metavar="FILE", help="results of a previous --json to check against")
+    parser.add_argument("--threshold", type=float, default=0.2, help="allowed slowdown (default 0.2 = 20%%)")
+    parser.add_argument("--min-seconds", type=float, default=1.0, help="ignore slowdowns smaller than this")
+    args = parser.parse_args(argv)
+
+    args.work_dir = os.path.abspath(args.work_dir)
+    bin_dir = fake_tools.install(os.path.join(args.work_dir, "bin"))
+    dns_port = _free_port()
+    dns = subprocess.Popen([sys.executable, "-m", "benchmarks.fake_dns", "--port", str(dns_port),
+                            "--hit", str(args.dns_hit), "--latency", str(args.dns_latency)],
+                           env=dict(os.environ, PYTHONPATH=fake_tools.ROOT))
+    results = []
+    try:
+        time.sleep(0.5)
+        for profile in args.profiles:
+            for targets in args.targets:
+                result = run_flow(profile, targets, args, bin_dir, dns_port)
+                results.append(result)
+                print_run(result)
+                sys.stdout.flush()
+    finally:
+        dns.terminate()
+        dns.wait()
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as out:
+            json.dump({"settings": {key: getattr(args, key) for key in
+                                    ("latency", "latency_per_target", "names", "dns_latency", "dns_hit")},
+                       "runs": results}, out, indent=2)
+    failed = [result for result in results if result["total"]["returncode"]]
+    for result in failed:
+        log = os.path.join(args.work_dir, f"{result['profile']}_{result['targets']}", "recon.log")
+        print(f"\n{result['profile']} / {result['targets']} targets exited {result['total']['returncode']}, see {log}")
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as handle:
+            baseline = json.load(handle)["runs"]
+        regressions = compare(results, baseline, args.threshold, args.min_seconds)
+        print(f"\n{len(regressions)} regression(s) against {args.compare}")
+        for line in regressions:
+            print(f"  {line}")
+        if regressions:
+            return 1
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
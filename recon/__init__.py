@@ -0,0 +1,10 @@
+"""Python engine of the Advanced Reconnaissance Automation Suite.
+
+``python3 -m recon --profile advanced|simple`` runs the whole pipeline
+(:mod:`recon.engine`); the generated ``advanced_recon_multi.sh`` and
+``simple_recon_multi.sh`` scripts are launchers for it.  The DNS, aggregation,
+cache, manifest, budget and state modules keep their own command line
+(``python3 -m recon.<module>``) and run as the engine's subprocesses.
+"""
+
+__version__ = "2.5"
@@ -0,0 +1,7 @@
+"""``python3 -m recon``: run the reconnaissance pipeline (see :mod:`recon.cli`)."""
+
+import sys
+
+from .cli import main
+
+sys.exit(main())
@@ -0,0 +1,214 @@
+"""Streaming subdomain aggregator.
+
+Instead of waiting for every tool and then running ``cat | sort -u | grep |
+grep | sort -u`` over all outputs, the aggregator tails the tool output files
+while the tools are still writing them.  Every line is normalised once
+(see :func:`recon.names.normalize_name`), de-duplicated against an in-memory
+hash set and appended to ``final_subdomains.txt`` immediately, so later stages
+can start consuming names before the slowest tool has finished.  The sorted
+``--clean`` list is written from that file by the external sort
+(:mod:`recon.extsort`), within ``--sort-memory-mb``.
+
+In ``--follow`` mode the aggregator keeps tailing until its stdin reaches EOF;
+the scheduler closes stdin once every upstream tool has finished.  Without
+``--follow`` it makes a single pass over the inputs.  With ``--events`` the
+new names taken from each input are published to the run's event log (see
+:mod:`recon.events`), which credits them to the tool that wrote the input.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import threading
+import time
+from typing import Dict, IO, Iterable, List, Optional, Sequence
+
+from .console import print_status
+from .events import EventLog
+from .extsort import DEFAULT_MEMORY_MB, external_sort
+from .names import normalize_name
+
+
+class FileFollower:
+    """Incrementally read complete lines from files that are still growing.
+
+    Missing files are picked up once they appear and a file that shrinks
+    (rewritten by its tool) is read again from the start; the aggregator's
+    de-duplication absorbs the repeated lines.
+    """
+
+    def __init__(self, paths: Iterable[str]):
+        self.paths = list(paths)
+        self.offsets: Dict[str, int] = {path: 0 for path in self.paths}
+        self.partial: Dict[str, bytes] = {path: b"" for path in self.paths}
+
+    def poll(self, final: bool = False) -> List[str]:
+        """Return lines appended since the last poll.
+
+        With ``final`` an unterminated last line is returned as well.
+        """
+        return [line for lines in self.poll_files(final).values() for line in lines]
+
+    def poll_files(self, final: bool = False) -> Dict[str, List[str]]:
+        """Like :meth:`poll`, with the lines of every file that grew under its path."""
+        found: Dict[str, List[str]] = {}
+        for path in self.paths:
+            lines: List[str] = []
+            try:
+                size = os.path.getsize(path)
+            except OSError:
+                continue
+            if size < self.offsets[path]:
+                self.offsets[path] = 0
+                self.partial[path] = b""
+            if size > self.offsets[path]:
+                with open(path, "rb") as handle:
+                    handle.seek(self.offsets[path])
+                    chunk = handle.read(size - self.offsets[path])
+                self.offsets[path] += len(chunk)
+                data = self.partial[path] + chunk
+                complete, _, rest = data.rpartition(b"\n")
+                self.partial[path] = rest
+                if complete:
+                    lines.extend(complete.decode("utf-8", "replace").split("\n"))
+            if final and self.partial[path]:
+                lines.append(self.partial[path].decode("utf-8", "replace"))
+                self.partial[path] = b""
+            if lines:
+                found[path] = lines
+        return found
+
+
+class Aggregator:
+    """De-duplicate normalised names and stream new ones to an output file."""
+
+    def __init__(self, output: Optional[IO[str]] = None, raw: Optional[IO[str]] = None):
+        self.output = output
+        self.raw = raw
+        self.names = set()
+        self.lines_seen = 0
+
+    def add(self, line: str) -> Optional[str]:
+        """Add one raw line; return the normalised name if it is new."""
+        self.lines_seen += 1
+        if self.raw is not None and line.strip():
+            self.raw.write(line.rstrip("\n") + "\n")
+        name = normalize_name(line)
+        if name is None or name in self.names:
+            return None
+        self.names.add(name)
+        if self.output is not None:
+            self.output.write(name + "\n")
+        return name
+
+    def add_lines(self, lines: Iterable[str]) -> int:
+        added = sum(1 for line in lines if self.add(line) is not None)
+        self.flush()
+        return added
+
+    def flush(self) -> None:
+        for stream in (self.output, self.raw):
+            if stream is not None:
+                stream.flush()
+
+
+def stdin_closed_event() -> threading.Event:
+    """Event that is set once stdin reaches EOF (upstream stages finished)."""
+    event = threading.Event()
+
+    def wait_for_eof() -> None:
+        try:
+            while sys.stdin.buffer.read(65536):
+                pass
+        finally:
+            event.set()
+
+    threading.Thread(target=wait_for_eof, daemon=True).start()
+    return event
+
+
+def _add_polled(aggregator: Aggregator, polled: Dict[str, List[str]], events: Optional[EventLog]) -> int:
+    """Add the lines of every grown input; with ``events`` each input's new names are published."""
+    added = 0
+    for path, lines in polled.items():
+        new = aggregator.add_lines(lines)
+        added += new
+        if events is not None and new:
+            events.publish("names", path=path, new=new, total=len(aggregator.names))
+    return added
+
+
+def aggregate(
+    inputs: Sequence[str],
+    output_path: str,
+    raw_path: Optional[str] = None,
+    clean_path: Optional[str] = None,
+    follow: bool = False,
+    interval: float = 0.5,
+    sort_memory_mb: float = DEFAULT_MEMORY_MB,
+    sort_workers: int = 0,
+    events: Optional[EventLog] = None,
+) -> Aggregator:
+    follower = FileFollower(inputs)
+    done = stdin_closed_event() if follow else None
+
+    with open(output_path, "w", encoding="utf-8") as output, \
+            open(raw_path or os.devnull, "w", encoding="utf-8") as raw:
+        aggregator = Aggregator(output, raw if raw_path else None)
+        if done is not None:
+            while not done.is_set():
+                added = _add_polled(aggregator, follower.poll_files(), events)
+                if added:
+                    print_status("INFO", f"Aggregator: +{added} new names ({len(aggregator.names)} total)")
+                done.wait(interval)
+        _add_polled(aggregator, follower.poll_files(final=True), events)
+
+    if clean_path:
+        external_sort([output_path], clean_path, sort_memory_mb, sort_workers)
+    return aggregator
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python3 -m recon.aggregate",
+        description="Normalise and de-duplicate subdomains from tool output files.",
+    )
+    parser.add_argument("inputs", nargs="+", help="tool output files (may not exist yet)")
+    parser.add_argument("--output", required=True, help="incrementally updated unique name list")
+    parser.add_argument("--raw", help="copy of every non-empty input line")
+    parser.add_argument("--clean", help="sorted unique name list written at the end")
+    parser.add_argument("--follow", action="store_true",
+                        help="keep tailing the inputs until stdin is closed")
+    parser.add_argument("--interval", type=float, default=0.5, help="poll interval in seconds")
+    parser.add_argument("--events", help="run event log to publish the new names of every input to")
+    parser.add_argument("--sort-memory-mb", type=float, default=DEFAULT_MEMORY_MB,
+                        help=f"memory cap of the --clean sort in MB (default {DEFAULT_MEMORY_MB})")
+    parser.add_argument("--sort-workers", type=int, default=0,
+                        help="processes of the --clean sort (default: one per core)")
+    args = parser.parse_args(argv)
+
+    follow = args.follow
+    if follow and sys.stdin.isatty():
+        print_status("WARNING", "--follow needs stdin from the scheduler, making a single pass instead")
+        follow = False
+
+    started = time.monotonic()
+    events = EventLog(args.events) if args.events else None
+    try:
+        aggregator = aggregate(args.inputs, args.output, args.raw, args.clean, follow, args.interval,
+                               args.sort_memory_mb, args.sort_workers, events)
+    finally:
+        if events is not None:
+            events.close()
+    print_status(
+        "INFO",
+        f"Aggregator: {aggregator.lines_seen} lines -> {len(aggregator.names)} unique names "
+        f"in {time.monotonic() - started:.1f}s",
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,364 @@
+"""Task queue between the coordinator and the workers of a distributed run.
+
+In distributed mode (``QUEUE``/``--queue``) the engine does not run the
+enumeration sources itself: it splits the targets of every source stage
+into tasks of ``SHARD_SIZE`` domains, puts them on a queue and appends the
+names the workers stream back to the stage's result file, which the
+aggregator tails as usual.  Workers (:mod:`recon.worker`) claim a task
+on a lease they renew while the source runs; a task whose worker died is
+handed to another worker once its lease expires, and a task that failed
+``MAX_ATTEMPTS`` times is given up.
+
+Two backends share the :class:`TaskQueue` interface:
+
+* :class:`SQLiteQueue` (``sqlite:///path/queue.db`` or a plain path), the
+  default: one database file in WAL mode, for workers on the same machine
+  or on a shared filesystem,
+* :class:`RedisQueue` (``redis://host:6379/0``) for workers on other
+  machines; it needs the optional ``redis`` package.
+
+Task ids are derived from the run, source and shard, so a resumed run finds
+its finished tasks and replays their results instead of queueing them again.
+
+Command line usage::
+
+    python3 -m recon.broker --queue out/queue.db show [--summary]
+    python3 -m recon.broker --queue redis://broker:6379/0 purge --run recon_multi_target_20250101_120000
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import time
+from collections import Counter
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from .console import print_status
+from .manifest import DONE, FAILED, PENDING, RUNNING, STATUSES
+
+MAX_ATTEMPTS = 3
+DEFAULT_LEASE = 120.0
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    id TEXT PRIMARY KEY,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    worker TEXT NOT NULL DEFAULT '',
+    expires REAL NOT NULL DEFAULT 0,
+    error TEXT NOT NULL DEFAULT '',
+    created REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS tasks_status ON tasks (status, created);
+CREATE TABLE IF NOT EXISTS results (
+    id INTEGER PRIMARY KEY,
+    task TEXT NOT NULL,
+    name TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS results_task ON results (task, id);
+"""
+
+Task = Tuple[str, Dict[str, Any], int]
+
+
+class TaskQueue:
+    """Tasks with a JSON payload, their state, and the names their workers streamed back."""
+
+    def enqueue(self, task_id: str, payload: Dict[str, Any]) -> None:
+        """Queue a task; a known task is only queued again if it is neither done nor running."""
+        raise NotImplementedError
+
+    def claim(self, worker: str, lease: float = DEFAULT_LEASE) -> Optional[Task]:
+        """The oldest pending task as ``(id, payload, attempt)``, leased to ``worker``."""
+        raise NotImplementedError
+
+    def heartbeat(self, task_id: str, worker: str, lease: float = DEFAULT_LEASE) -> None:
+        raise NotImplementedError
+
+    def push(self, task_id: str, names: Sequence[str]) -> None:
+        raise NotImplementedError
+
+    def complete(self, task_id: str, worker: str, ok: bool, error: str = "") -> None:
+        """Finish a claimed task; a failed one is retried until it has had ``MAX_ATTEMPTS``."""
+        raise NotImplementedError
+
+    def results(self, task_ids: Sequence[str], cursor: Any = None) -> Tuple[Any, List[str]]:
+        """Names pushed for ``task_ids`` since ``cursor``, and the cursor to pass next time."""
+        raise NotImplementedError
+
+    def status(self, task_ids: Sequence[str]) -> Dict[str, Tuple[str, str]]:
+        """``(status, error)`` of each task."""
+        raise NotImplementedError
+
+    def tasks(self, prefix: str = "") -> List[Dict[str, Any]]:
+        """Every task whose id starts with ``prefix``."""
+        raise NotImplementedError
+
+    def purge(self, prefix: str) -> int:
+        """Drop the tasks (and results) whose id starts with ``prefix``."""
+        raise NotImplementedError
+
+    def close(self) -> None:
+        pass
+
+
+class SQLiteQueue(TaskQueue):
+    def __init__(self, path: str):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self.db = sqlite3.connect(path, timeout=60, isolation_level=None)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.executescript(SCHEMA)
+
+    def close(self) -> None:
+        self.db.close()
+
+    def enqueue(self, task_id: str, payload: Dict[str, Any]) -> None:
+        self.db.execute(
+            """INSERT INTO tasks (id, payload, status, created) VALUES (?, ?, ?, ?)
+               ON CONFLICT (id) DO UPDATE SET status = excluded.status, attempts = 0, error = ''
+               WHERE tasks.status = ?""",
+            (task_id, json.dumps(payload, sort_keys=True), PENDING, time.time(), FAILED),
+        )
+
+    def claim(self, worker: str, lease: float = DEFAULT_LEASE) -> Optional[Task]:
+        now = time.time()
+        self.db.execute("BEGIN IMMEDIATE")
+        try:
+            # Leases of dead workers run out: hand the task to someone else, or give up on it
+            self.db.execute(
+                """UPDATE tasks SET status = CASE WHEN attempts >= ? THEN ? ELSE ? END,
+                       error = 'lease of ' || worker || ' expired'
+                   WHERE status = ? AND expires < ?""",
+                (MAX_ATTEMPTS, FAILED, PENDING, RUNNING, now),
+            )
+            row = self.db.execute(
+                "SELECT id, payload, attempts FROM tasks WHERE status = ? ORDER BY created, rowid LIMIT 1", (PENDING,)
+            ).fetchone()
+            if row is not None:
+                self.db.execute(
+                    "UPDATE tasks SET status = ?, attempts = attempts + 1, worker = ?, expires = ? WHERE id = ?",
+                    (RUNNING, worker, now + lease, row[0]),
+                )
+            self.db.execute("COMMIT")
+        except BaseException:
+            self.db.execute("ROLLBACK")
+            raise
+        if row is None:
+            return None
+        return row[0], json.loads(row[1]), row[2] + 1
+
+    def heartbeat(self, task_id: str, worker: str, lease: float = DEFAULT_LEASE) -> None:
+        self.db.execute("UPDATE tasks SET expires = ? WHERE id = ? AND worker = ? AND status = ?",
+                        (time.time() + lease, task_id, worker, RUNNING))
+
+    def push(self, task_id: str, names: Sequence[str]) -> None:
+        if names:
+            self.db.execute("BEGIN IMMEDIATE")
+            self.db.executemany("INSERT INTO results (task, name) VALUES (?, ?)", [(task_id, name) for name in names])
+            self.db.execute("COMMIT")
+
+    def complete(self, task_id: str, worker: str, ok: bool, error: str = "") -> None:
+        self.db.execute(
+            """UPDATE tasks SET status = CASE WHEN ? THEN ? WHEN attempts >= ? THEN ? ELSE ? END, error = ?
+               WHERE id = ? AND worker = ? AND status = ?""",
+            (ok, DONE, MAX_ATTEMPTS, FAILED, PENDING, error, task_id, worker, RUNNING),
+        )
+
+    def results(self, task_ids: Sequence[str], cursor: Any = None) -> Tuple[Any, List[str]]:
+        last = cursor or 0
+        marks = ",".join("?" * len(task_ids))
+        rows = self.db.execute(f"SELECT id, name FROM results WHERE id > ? AND task IN ({marks}) ORDER BY id",
+                               (last, *task_ids)).fetchall()
+        return (rows[-1][0] if rows else last), [name for _, name in rows]
+
+    def status(self, task_ids: Sequence[str]) -> Dict[str, Tuple[str, str]]:
+        marks = ",".join("?" * len(task_ids))
+        rows = self.db.execute(f"SELECT id, status, error FROM tasks WHERE id IN ({marks})", tuple(task_ids))
+        return {task_id: (status, error) for task_id, status, error in rows}
+
+    def tasks(self, prefix: str = "") -> List[Dict[str, Any]]:
+        rows = self.db.execute(
+            "SELECT id, status, attempts, worker, error FROM tasks WHERE substr(id, 1, ?) = ? ORDER BY created, rowid",
+            (len(prefix), prefix),
+        ).fetchall()
+        return [dict(zip(("id", "status", "attempts", "worker", "error"), row)) for row in rows]
+
+    def purge(self, prefix: str) -> int:
+        self.db.execute("DELETE FROM results WHERE substr(task, 1, ?) = ?", (len(prefix), prefix))
+        return self.db.execute("DELETE FROM tasks WHERE substr(id, 1, ?) = ?", (len(prefix), prefix)).rowcount
+
+
+class RedisQueue(TaskQueue):
+    """The same queue on Redis: a hash per task, a pending list, a lease sorted set and a result list per task."""
+
+    def __init__(self, url: str, prefix: str = "recon"):
+        try:
+            import redis
+        except ImportError as exc:
+            raise RuntimeError("the redis queue needs the redis package (pip install redis)") from exc
+        self.db = redis.Redis.from_url(url, decode_responses=True)
+        self.prefix = prefix
+
+    def _key(self, *parts: str) -> str:
+        return ":".join((self.prefix, *parts))
+
+    def close(self) -> None:
+        self.db.close()
+
+    def enqueue(self, task_id: str, payload: Dict[str, Any]) -> None:
+        key = self._key("task", task_id)
+        status = self.db.hget(key, "status")
+        if status in (DONE, RUNNING, PENDING):
+            return
+        self.db.hset(key, mapping={"payload": json.dumps(payload, sort_keys=True), "status": PENDING,
+                                   "attempts": 0, "worker": "", "error": "", "created": time.time()})
+        self.db.rpush(self._key("pending"), task_id)
+
+    def _expire_leases(self) -> None:
+        for task_id in self.db.zrangebyscore(self._key("leases"), 0, time.time()):
+            key = self._key("task", task_id)
+            self.db.zrem(self._key("leases"), task_id)
+            if self.db.hget(key, "status") != RUNNING:
+                continue
+            worker = self.db.hget(key, "worker")
+            self.db.hset(key, "error", f"lease of {worker} expired")
+            self._retry(task_id)
+
+    def _retry(self, task_id: str) -> None:
+        key = self._key("task", task_id)
+        if int(self.db.hget(key, "attempts") or 0) >= MAX_ATTEMPTS:
+            self.db.hset(key, "status", FAILED)
+        else:
+            self.db.hset(key, "status", PENDING)
+            self.db.rpush(self._key("pending"), task_id)
+
+    def claim(self, worker: str, lease: float = DEFAULT_LEASE) -> Optional[Task]:
+        self._expire_leases()
+        while True:
+            task_id = self.db.lpop(self._key("pending"))
+            if task_id is None:
+                return None
+            key = self._key("task", task_id)
+            if self.db.hget(key, "status") == PENDING:
+                break
+        attempt = self.db.hincrby(key, "attempts", 1)
+        self.db.hset(key, mapping={"status": RUNNING, "worker": worker})
+        self.db.zadd(self._key("leases"), {task_id: time.time() + lease})
+        return task_id, json.loads(self.db.hget(key, "payload")), attempt
+
+    def heartbeat(self, task_id: str, worker: str, lease: float = DEFAULT_LEASE) -> None:
+        if self.db.hget(self._key("task", task_id), "worker") == worker:
+            self.db.zadd(self._key("leases"), {task_id: time.time() + lease})
+
+    def push(self, task_id: str, names: Sequence[str]) -> None:
+        if names:
+            self.db.rpush(self._key("results", task_id), *names)
+
+    def complete(self, task_id: str, worker: str, ok: bool, error: str = "") -> None:
+        key = self._key("task", task_id)
+        if self.db.hget(key, "worker") != worker or self.db.hget(key, "status") != RUNNING:
+            return
+        self.db.zrem(self._key("leases"), task_id)
+        self.db.hset(key, "error", error)
+        if ok:
+            self.db.hset(key, "status", DONE)
+        else:
+            self._retry(task_id)
+
+    def results(self, task_ids: Sequence[str], cursor: Any = None) -> Tuple[Any, List[str]]:
+        offsets = dict(cursor or {})
+        names: List[str] = []
+        for task_id in task_ids:
+            new = self.db.lrange(self._key("results", task_id), offsets.get(task_id, 0), -1)
+            offsets[task_id] = offsets.get(task_id, 0) + len(new)
+            names.extend(new)
+        return offsets, names
+
+    def status(self, task_ids: Sequence[str]) -> Dict[str, Tuple[str, str]]:
+        found = {}
+        for task_id in task_ids:
+            status, error = self.db.hmget(self._key("task", task_id), "status", "error")
+            if status is not None:
+                found[task_id] = (status, error or "")
+        return found
+
+    def tasks(self, prefix: str = "") -> List[Dict[str, Any]]:
+        found = []
+        for key in self.db.scan_iter(match=self._key("task", f"{prefix}*")):
+            fields = self.db.hgetall(key)
+            found.append({"id": key[len(self._key("task", "")):], "status": fields.get("status", ""),
+                          "attempts": int(fields.get("attempts") or 0), "worker": fields.get("worker", ""),
+                          "error": fields.get("error", ""), "created": float(fields.get("created") or 0)})
+        found.sort(key=lambda task: task.pop("created"))
+        return found
+
+    def purge(self, prefix: str) -> int:
+        removed = 0
+        for task in self.tasks(prefix):
+            self.db.delete(self._key("task", task["id"]), self._key("results", task["id"]))
+            self.db.lrem(self._key("pending"), 0, task["id"])
+            self.db.zrem(self._key("leases"), task["id"])
+            removed += 1
+        return removed
+
+
+def open_queue(url: str) -> TaskQueue:
+    """The queue behind ``url``: ``redis://...``, ``sqlite:///path`` or a plain database path."""
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        return RedisQueue(url)
+    if url.startswith("sqlite://"):
+        url = url[len("sqlite://"):]
+    return SQLiteQueue(url)
+
+
+def task_summary(tasks: Sequence[Dict[str, Any]]) -> str:
+    counts = Counter(task["status"] for task in tasks)
+    return ", ".join(f"{counts[status]} {status}" for status in STATUSES)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python3 -m recon.broker",
+        description="Inspect the task queue of distributed runs.",
+    )
+    parser.add_argument("--queue", default=os.environ.get("QUEUE", ""), required=not os.environ.get("QUEUE"),
+                        help="queue URL: sqlite:///path/queue.db, a database path or redis://host:port/db")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    show_parser = sub.add_parser("show", help="list tasks and their states")
+    show_parser.add_argument("--run", default="", help="only the tasks of this run")
+    show_parser.add_argument("--summary", action="store_true", help="only count tasks per status")
+
+    purge_parser = sub.add_parser("purge", help="drop the tasks and results of a run")
+    purge_parser.add_argument("--run", required=True, help="run id (the output directory name)")
+    args = parser.parse_args(argv)
+
+    try:
+        queue = open_queue(args.queue)
+    except RuntimeError as exc:
+        print_status("ERROR", str(exc))
+        return 1
+    try:
+        if args.command == "purge":
+            print_status("INFO", f"Dropped {queue.purge(f'{args.run}:')} tasks of {args.run}")
+            return 0
+        tasks = queue.tasks(f"{args.run}:" if args.run else "")
+        if args.summary:
+            print(task_summary(tasks))
+            return 0
+        for task in tasks:
+            print(f"{task['status']:<8} {task['id']:<56} {task['attempts']:>2} {task['worker'] or '-':<28} "
+                  f"{task['error']}")
+    finally:
+        queue.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,214 @@
+"""Native DNS brute-forcer.
+
+Replaces the two wordlist passes of the former bash pipelines (ffuf requesting
+``https://FUZZ.<domain>`` and dnscan resolving the same words again) with a
+single pass of A queries through the shared :class:`recon.dns.ResolverPool`.
+
+* The wordlist is memory-mapped and candidates are generated lazily, word by
+  word across all targets, so a million-word list costs no memory and no
+  single zone's nameservers take a burst of queries.
+* Names already reported by other tools (``--known``, tailed while the run
+  is in progress) are not queried again.
+* Every brute-forced zone is probed for wildcard records first; hits whose
+  answers match the wildcard are dropped, and below the targets themselves
+  wildcard zones are not brute-forced at all.
+* Names found at one level become the zones of the next, up to ``--depth``.
+  Like ``dnscan -r``, only names the brute-force resolved itself are
+  recursed into: the known names can number in the tens of thousands and
+  each zone costs a full pass of the wordlist.
+
+Command line usage (as called from the engine)::
+
+    python3 -m recon.bruteforce --targets targets.txt \\
+        --wordlist subdomains-top1million-5000.txt --depth 3 \\
+        --known out/final_subdomains.txt \\
+        --output out/subdomains/bruteforce/bruteforce.txt \\
+        --resolver 1.1.1.1 --rate 200 --concurrency 1000
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import mmap
+import re
+import sys
+import time
+from dataclasses import dataclass
+from typing import Iterator, List, Optional, Sequence, Set, TextIO
+
+from .aggregate import FileFollower
+from .console import print_status
+from .dns import TYPE_A, DNSError, ResolverPool, add_resolver_arguments, pool_options
+from .names import normalize_name
+from .pool import read_targets
+from .resolve import WildcardDetector, resolve_name
+
+_LABEL = re.compile(rb"^[a-z0-9]([a-z0-9-]{0,61}[a-z0-9])?$")
+
+
+class Wordlist:
+    """Re-iterable view of the valid DNS labels in a memory-mapped wordlist."""
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def __iter__(self) -> Iterator[str]:
+        with open(self.path, "rb") as handle:
+            try:
+                data = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:  # empty file
+                return
+            with data:
+                for line in iter(data.readline, b""):
+                    word = line.strip().lower()
+                    if _LABEL.match(word):
+                        yield word.decode("ascii")
+
+
+def candidates(words: Wordlist, zones: Sequence[str]) -> Iterator[str]:
+    """``word.zone`` for every word and zone, interleaving zones per word."""
+    for word in words:
+        for zone in zones:
+            yield f"{word}.{zone}"
+
+
+@dataclass
+class BruteforceStats:
+    queried: int = 0
+    skipped: int = 0
+    found: int = 0
+    wildcard: int = 0
+    failed: int = 0
+
+
+class Bruteforcer:
+    def __init__(
+        self,
+        pool: ResolverPool,
+        words: Wordlist,
+        output: TextIO,
+        known: Optional[FileFollower] = None,
+        workers: int = 500,
+    ):
+        self.pool = pool
+        self.words = words
+        self.output = output
+        self.known_follower = known
+        self.known: Set[str] = set()
+        self.workers = max(1, workers)
+        self.detector = WildcardDetector(pool)
+        self.stats = BruteforceStats()
+
+    def refresh_known(self) -> None:
+        if self.known_follower is not None:
+            for line in self.known_follower.poll():
+                name = normalize_name(line)
+                if name:
+                    self.known.add(name)
+
+    async def _watch_known(self, interval: float = 1.0) -> None:
+        while True:
+            self.refresh_known()
+            await asyncio.sleep(interval)
+
+    async def level(self, zones: Sequence[str], skip_wildcard: bool = False) -> List[str]:
+        """Brute-force one level below ``zones`` and return the names found there."""
+        wildcard = await asyncio.gather(*(self.detector.answers(zone) for zone in zones))
+        if skip_wildcard:
+            zones = [zone for zone, answers in zip(zones, wildcard) if not answers]
+        else:
+            for zone, answers in zip(zones, wildcard):
+                if answers:
+                    print_status("WARNING", f"Wildcard DNS under {zone}, filtering matching answers")
+
+        found: List[str] = []
+        stream = candidates(self.words, zones)
+
+        async def worker() -> None:
+            for name in stream:  # shared iterator: each candidate is taken once
+                if name in self.known:
+                    self.stats.skipped += 1
+                    continue
+                self.stats.queried += 1
+                try:
+                    resolution = await resolve_name(self.pool, name, (TYPE_A,))
+                except DNSError:
+                    self.stats.failed += 1
+                    continue
+                if resolution is None:
+                    continue
+                if await self.detector.is_wildcard_hit(resolution):
+                    self.stats.wildcard += 1
+                    continue
+                self.known.add(name)
+                found.append(name)
+                self.stats.found += 1
+                self.output.write(f"{name}\n")
+                self.output.flush()
+
+        await asyncio.gather(*(worker() for _ in range(self.workers)))
+        return found
+
+    async def run(self, roots: Sequence[str], depth: int) -> BruteforceStats:
+        watcher = asyncio.ensure_future(self._watch_known())
+        try:
+            zones = list(roots)
+            for current in range(1, depth + 1):
+                if not zones:
+                    break
+                print_status("INFO", f"DNS brute-force depth {current}: {len(zones)} zones")
+                zones = await self.level(zones, skip_wildcard=current > 1)
+        finally:
+            watcher.cancel()
+        return self.stats
+
+
+async def bruteforce(
+    roots: Sequence[str],
+    wordlist: str,
+    output_path: str,
+    known_paths: Sequence[str],
+    depth: int,
+    options: dict,
+) -> BruteforceStats:
+    async with ResolverPool(**options) as pool:
+        with open(output_path, "w", encoding="utf-8") as output:
+            engine = Bruteforcer(
+                pool,
+                Wordlist(wordlist),
+                output,
+                FileFollower(known_paths) if known_paths else None,
+                workers=options.get("concurrency", 1000),
+            )
+            return await engine.run(roots, depth)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python3 -m recon.bruteforce",
+        description="Brute-force subdomains of every target through a shared resolver pool.",
+    )
+    parser.add_argument("--targets", required=True, help="root domains, one per line")
+    parser.add_argument("--wordlist", required=True, help="one label per line")
+    parser.add_argument("--output", required=True, help="names found, streamed")
+    parser.add_argument("--known", action="append", default=[],
+                        help="names already found elsewhere, tailed during the run (repeatable)")
+    parser.add_argument("--depth", type=int, default=1, help="recursion depth below each target")
+    add_resolver_arguments(parser)
+    args = parser.parse_args(argv)
+
+    roots = [root for root in (normalize_name(target) for target in read_targets(args.targets)) if root]
+    started = time.monotonic()
+    stats = asyncio.run(bruteforce(roots, args.wordlist, args.output, args.known, args.depth, pool_options(args)))
+    print_status(
+        "SUCCESS",
+        f"DNS brute-force: {stats.found} names from {stats.queried} queries "
+        f"({stats.skipped} already known, {stats.wildcard} wildcard, {stats.failed} failed) "
+        f"in {time.monotonic() - started:.1f}s",
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
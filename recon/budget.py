@@ -0,0 +1,208 @@
+"""Shared, adaptive network budget for the external tools.
+
+Subfinder, ffuf, dnscan, bbot and amass know nothing about each other; run
+side by side at their default speeds they saturate egress and trigger
+upstream throttling.  This module keeps one budget of requests per second
+for the whole run (and one per target) in a small SQLite database that every
+stage and worker-pool task shares:
+
+* Before a tool starts, the engine *leases* a share of the budget for it
+  (:meth:`recon.engine.Engine.run_tool`): the run rate split evenly between
+  the tools holding leases, capped by the share of the target's own rate.
+  The share becomes the tool's rate and concurrency flags (``-rl``/``-t``
+  for subfinder, ``-rate``/``-t`` for ffuf, ...).  While the budget is so
+  busy that a share would fall below ``NET_MIN_RATE``, further leases wait.
+* When the tool exits the lease is released with its exit status, which
+  adapts the run and target rates AIMD-style: a success adds a tenth of the
+  configured rate back, a failure or timeout halves it (never below
+  ``NET_MIN_RATE``).
+
+Leases of processes that died without releasing are dropped, so a crashed
+run or worker does not keep its share.
+
+Command line usage (to inspect a run)::
+
+    python3 -m recon.budget --db out/budget.db show
+"""
+
+from __future__ import annotations
+
+import argparse
+import math
+import sqlite3
+import sys
+import threading
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from .cache import pid_alive
+from .ratelimit import AIMD
+
+DEFAULT_RATE = 300.0
+DEFAULT_MIN_RATE = 10.0
+DEFAULT_TARGET_RATE = 100.0
+REQUESTS_PER_CONNECTION = 5.0
+RUN = ""
+
+# Flags through which each tool takes its share; tools without any only take part in admission
+TOOL_FLAGS: Dict[str, Tuple[str, ...]] = {
+    "subfinder": ("-rl", "{rate}", "-t", "{concurrency}"),
+    "ffuf": ("-rate", "{rate}", "-t", "{concurrency}"),
+    "dnscan": ("-t", "{concurrency}"),
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS scopes (
+    scope TEXT PRIMARY KEY,
+    rate REAL NOT NULL,
+    ceiling REAL NOT NULL,
+    floor REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS leases (
+    id INTEGER PRIMARY KEY,
+    tool TEXT NOT NULL,
+    target TEXT NOT NULL,
+    pid INTEGER NOT NULL,
+    rate REAL NOT NULL,
+    started REAL NOT NULL
+);
+"""
+
+
+def tool_flags(tool: str, rate: float) -> List[str]:
+    """Command line flags that hold ``tool`` to ``rate`` requests per second."""
+    values = {
+        "{rate}": str(max(1, int(rate))),
+        "{concurrency}": str(max(1, math.ceil(rate / REQUESTS_PER_CONNECTION))),
+    }
+    return [values.get(part, part) for part in TOOL_FLAGS.get(tool, ())]
+
+
+class NetworkBudget:
+    """Run and per-target rates plus the leases currently holding shares of them.
+
+    The ``""`` scope is the whole run; every other scope is a target, created
+    on first use with the default target rate.  The engine calls
+    :meth:`lease` and :meth:`release` from worker threads, so the
+    connection is shared between threads and every method holds ``lock``.
+    """
+
+    def __init__(self, path: str):
+        self.lock = threading.Lock()
+        self.db = sqlite3.connect(path, timeout=60, isolation_level=None, check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.executescript(SCHEMA)
+
+    def close(self) -> None:
+        self.db.close()
+
+    def configure(
+        self,
+        rate: float,
+        floor: float,
+        target_rate: float,
+        target_rates: Optional[Dict[str, float]] = None,
+    ) -> None:
+        """(Re)set the configured rates; ``"*"`` holds the default of unlisted targets."""
+        with self.lock:
+            scopes = {RUN: rate, "*": target_rate, **(target_rates or {})}
+            for scope, ceiling in scopes.items():
+                self.db.execute(
+                    "INSERT OR REPLACE INTO scopes (scope, rate, ceiling, floor) VALUES (?, ?, ?, ?)",
+                    (scope, ceiling, ceiling, min(floor, ceiling)),
+                )
+
+    def _scope(self, scope: str) -> Tuple[float, AIMD]:
+        row = self.db.execute("SELECT rate, ceiling, floor FROM scopes WHERE scope = ?", (scope,)).fetchone()
+        if row is None:
+            default = self.db.execute("SELECT ceiling, floor FROM scopes WHERE scope = '*'").fetchone()
+            ceiling, floor = default if default else (DEFAULT_TARGET_RATE, DEFAULT_MIN_RATE)
+            self.db.execute(
+                "INSERT INTO scopes (scope, rate, ceiling, floor) VALUES (?, ?, ?, ?)",
+                (scope, ceiling, ceiling, floor),
+            )
+            row = (ceiling, ceiling, floor)
+        return row[0], AIMD(ceiling=row[1], floor=row[2])
+
+    def _holders(self, target: Optional[str] = None) -> int:
+        """Live leases on the run (or on ``target``), dropping those of dead processes."""
+        for lease_id, pid in self.db.execute("SELECT id, pid FROM leases").fetchall():
+            if not pid_alive(pid):
+                self.db.execute("DELETE FROM leases WHERE id = ?", (lease_id,))
+        if target is None:
+            return self.db.execute("SELECT COUNT(*) FROM leases").fetchone()[0]
+        return self.db.execute("SELECT COUNT(*) FROM leases WHERE target = ?", (target,)).fetchone()[0]
+
+    def lease(self, tool: str, pid: int, target: str = "") -> Optional[float]:
+        """Take a share for ``tool``; ``None`` while the budget has no share of at least the floor left."""
+        with self.lock:
+            self.db.execute("BEGIN IMMEDIATE")
+            try:
+                run_rate, run_aimd = self._scope(RUN)
+                holders = self._holders()
+                share = run_rate / (holders + 1)
+                floor = run_aimd.floor
+                if target:
+                    target_rate, target_aimd = self._scope(target)
+                    share = min(share, target_rate / (self._holders(target) + 1))
+                    floor = min(floor, target_aimd.floor)
+                if holders and share < floor:
+                    return None
+                self.db.execute(
+                    "INSERT INTO leases (tool, target, pid, rate, started) VALUES (?, ?, ?, ?, ?)",
+                    (tool, target, pid, share, time.time()),
+                )
+                return share
+            finally:
+                self.db.execute("COMMIT")
+
+    def release(self, tool: str, pid: int, target: str = "", ok: bool = True) -> None:
+        """Return the lease and adapt the run and target rates to its outcome."""
+        with self.lock:
+            self.db.execute("BEGIN IMMEDIATE")
+            try:
+                self.db.execute(
+                    "DELETE FROM leases WHERE id = (SELECT id FROM leases WHERE tool = ? AND target = ? AND pid = ? LIMIT 1)",
+                    (tool, target, pid),
+                )
+                for scope in (RUN, target) if target else (RUN,):
+                    rate, aimd = self._scope(scope)
+                    rate = aimd.increase(rate) if ok else aimd.decrease(rate)
+                    self.db.execute("UPDATE scopes SET rate = ? WHERE scope = ?", (rate, scope))
+            finally:
+                self.db.execute("COMMIT")
+
+    def rates(self) -> List[Tuple[str, float, float]]:
+        """``(scope, current rate, configured rate)`` of the run and every target seen."""
+        with self.lock:
+            return self.db.execute(
+                "SELECT scope, rate, ceiling FROM scopes WHERE scope != '*' ORDER BY scope != '', scope"
+            ).fetchall()
+
+
+def format_rates(rates: Sequence[Tuple[str, float, float]]) -> List[str]:
+    return [f"{scope or 'run':<32} {rate:>8.0f}/s of {ceiling:.0f}/s" for scope, rate, ceiling in rates]
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python3 -m recon.budget",
+        description="Show the shared network budget of a run.",
+    )
+    parser.add_argument("--db", required=True, help="budget database, e.g. out/budget.db")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    sub.add_parser("show", help="print the current and configured rates")
+    args = parser.parse_args(argv)
+
+    budget = NetworkBudget(args.db)
+    try:
+        for line in format_rates(budget.rates()):
+            print(line)
+    finally:
+        budget.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,238 @@
+"""Content-addressed cache of external tool results.
+
+A tool invocation is identified by a key derived from the tool name, its
+arguments, the target and the SHA-256 of every input file (targets list,
+wordlist, ...).  The normalised output of the invocation (stripped,
+non-empty, de-duplicated lines) is stored once per distinct content under
+``objects/`` and an SQLite index maps keys to objects, so re-runs after a
+crash and overlapping scopes skip external calls whose result is still fresh.
+
+Entries older than ``CACHE_TTL_HOURS`` are ignored and pruned, and the least
+recently used entries are evicted once the objects exceed
+``CACHE_MAX_SIZE_MB``.  ``CACHE_NOT_BEFORE`` ignores entries created before a
+given time, which is how ``--no-cache`` runs refresh every result while still
+sharing results between identical invocations of the same run (e.g. two
+targets with the same ``amass intel -org`` name).
+
+While a key is being computed it is claimed by the calling process; a second
+lookup of the same key waits for the first to store its result (or for the
+claiming process to exit) instead of running the tool twice.  The engine
+looks results up and stores them in :meth:`recon.engine.Engine.cached`.
+Empty results are not stored, so an invocation that failed or timed out is
+retried by the next run.
+
+Command line usage (to trim the cache between runs)::
+
+    python3 -m recon.cache --dir ~/.recon/cache prune --ttl-hours 24 --max-size-mb 512
+"""
+
+from __future__ import annotations
+
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+from typing import Iterable, List, Optional, Sequence
+
+from .console import print_status
+
+DEFAULT_DIR = os.path.join(os.path.expanduser("~"), ".recon", "cache")
+DEFAULT_TTL_HOURS = 24.0
+DEFAULT_MAX_SIZE_MB = 512.0
+CLAIM_TIMEOUT = 4 * 3600.0
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY,
+    tool TEXT NOT NULL,
+    target TEXT NOT NULL,
+    object TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    created REAL NOT NULL,
+    last_used REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS claims (
+    key TEXT PRIMARY KEY,
+    pid INTEGER NOT NULL,
+    claimed REAL NOT NULL
+);
+"""
+
+
+def file_digest(path: str) -> str:
+    digest = hashlib.sha256()
+    try:
+        with open(path, "rb") as handle:
+            for chunk in iter(lambda: handle.read(1 << 20), b""):
+                digest.update(chunk)
+    except OSError:
+        return "missing"
+    return digest.hexdigest()
+
+
+def cache_key(tool: str, target: str = "", args: Sequence[str] = (), inputs: Sequence[str] = ()) -> str:
+    """Key of one invocation; input files contribute their content, not their path."""
+    material = {
+        "tool": tool,
+        "target": target.strip().lower(),
+        "args": list(args),
+        "inputs": [file_digest(path) for path in inputs],
+    }
+    return hashlib.sha256(json.dumps(material, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def normalize_output(lines: Iterable[str]) -> bytes:
+    seen = set()
+    kept: List[str] = []
+    for line in lines:
+        line = line.strip()
+        if line and line not in seen:
+            seen.add(line)
+            kept.append(line)
+    return "".join(f"{line}\n" for line in kept).encode("utf-8")
+
+
+def pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class ResultCache:
+    """Index and object store of cached tool results.
+
+    The engine calls it from worker threads, so the connection is shared
+    between threads and every method holds ``lock``.
+    """
+
+    def __init__(self, root: str = DEFAULT_DIR):
+        self.root = root
+        self.lock = threading.Lock()
+        os.makedirs(os.path.join(root, "objects"), exist_ok=True)
+        self.db = sqlite3.connect(os.path.join(root, "index.db"), timeout=60, isolation_level=None,
+                                  check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.executescript(SCHEMA)
+
+    def close(self) -> None:
+        self.db.close()
+
+    def _object_path(self, digest: str) -> str:
+        return os.path.join(self.root, "objects", digest[:2], f"{digest}.gz")
+
+    # -- lookups -------------------------------------------------------------
+
+    def get(self, key: str, ttl: float, not_before: float = 0.0) -> Optional[bytes]:
+        with self.lock:
+            now = time.time()
+            row = self.db.execute("SELECT object, created FROM entries WHERE key = ?", (key,)).fetchone()
+            if row is None or row[1] < now - ttl or row[1] < not_before:
+                return None
+            try:
+                with gzip.open(self._object_path(row[0]), "rb") as handle:
+                    content = handle.read()
+            except OSError:
+                self.db.execute("DELETE FROM entries WHERE key = ?", (key,))
+                return None
+            self.db.execute("UPDATE entries SET last_used = ? WHERE key = ?", (now, key))
+            return content
+
+    def put(self, key: str, tool: str, target: str, content: bytes) -> str:
+        with self.lock:
+            digest = hashlib.sha256(content).hexdigest()
+            path = self._object_path(digest)
+            if not os.path.exists(path):
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                partial = f"{path}.{os.getpid()}.tmp"
+                with gzip.open(partial, "wb") as handle:
+                    handle.write(content)
+                os.replace(partial, path)
+            now = time.time()
+            self.db.execute(
+                """INSERT INTO entries (key, tool, target, object, size, created, last_used)
+                   VALUES (?, ?, ?, ?, ?, ?, ?)
+                   ON CONFLICT (key) DO UPDATE SET object = excluded.object, size = excluded.size,
+                       created = excluded.created, last_used = excluded.last_used""",
+                (key, tool, target, digest, os.path.getsize(path), now, now),
+            )
+            return digest
+
+    # -- claims --------------------------------------------------------------
+
+    def claim(self, key: str, pid: int) -> Optional[int]:
+        """Claim ``key`` for ``pid``; return the pid of a live holder otherwise."""
+        with self.lock:
+            self.db.execute("BEGIN IMMEDIATE")
+            try:
+                row = self.db.execute("SELECT pid, claimed FROM claims WHERE key = ?", (key,)).fetchone()
+                if row and row[0] != pid and pid_alive(row[0]) and row[1] > time.time() - CLAIM_TIMEOUT:
+                    return row[0]
+                self.db.execute(
+                    "INSERT OR REPLACE INTO claims (key, pid, claimed) VALUES (?, ?, ?)", (key, pid, time.time())
+                )
+                return None
+            finally:
+                self.db.execute("COMMIT")
+
+    def release(self, key: str) -> None:
+        with self.lock:
+            self.db.execute("DELETE FROM claims WHERE key = ?", (key,))
+
+    # -- eviction ------------------------------------------------------------
+
+    def prune(self, ttl: float, max_bytes: float) -> int:
+        """Drop expired entries, then least recently used ones above ``max_bytes``."""
+        with self.lock:
+            removed = self.db.execute("DELETE FROM entries WHERE created < ?", (time.time() - ttl,)).rowcount
+            objects = self.db.execute(
+                "SELECT object, MAX(size), MAX(last_used) FROM entries GROUP BY object ORDER BY MAX(last_used)"
+            ).fetchall()
+            total = sum(size for _, size, _ in objects)
+            for digest, size, _ in objects:
+                if total <= max_bytes:
+                    break
+                removed += self.db.execute("DELETE FROM entries WHERE object = ?", (digest,)).rowcount
+                total -= size
+
+            referenced = {row[0] for row in self.db.execute("SELECT DISTINCT object FROM entries")}
+            objects_dir = os.path.join(self.root, "objects")
+            for shard in os.listdir(objects_dir):
+                for filename in os.listdir(os.path.join(objects_dir, shard)):
+                    if filename.endswith(".gz") and filename[:-3] not in referenced:
+                        os.remove(os.path.join(objects_dir, shard, filename))
+            return removed
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python3 -m recon.cache",
+        description="Content-addressed cache of external tool results.",
+    )
+    parser.add_argument("--dir", default=os.environ.get("CACHE_DIR", DEFAULT_DIR), help="cache directory")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    prune_parser = sub.add_parser("prune", help="evict expired and least recently used entries")
+    prune_parser.add_argument("--ttl-hours", type=float, default=DEFAULT_TTL_HOURS)
+    prune_parser.add_argument("--max-size-mb", type=float, default=DEFAULT_MAX_SIZE_MB)
+    args = parser.parse_args(argv)
+
+    cache = ResultCache(args.dir)
+    try:
+        removed = cache.prune(args.ttl_hours * 3600, args.max_size_mb * 1024 * 1024)
+        print_status("INFO", f"Cache: pruned {removed} entries")
+        return 0
+    finally:
+        cache.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,404 @@
+"""TLS certificate harvesting of the resolved subdomains.
+
+Every resolved name gets a TLS handshake on each of ``--ports`` at its
+resolved address, with the name as SNI, and nothing else: no HTTP request
+is sent, the peer certificate is taken and the connection closed.  A
+certificate is parsed once per SHA-256 fingerprint however many hosts serve
+it (the DER parser below reads only the issuer, subject, validity and
+subject alternative names), and written once to ``--output``; ``--tls-hosts``
+maps every host and port to the fingerprint it served.
+
+The DNS names of the certificates that fall under one of the ``--scope``
+targets go to ``--names``.  With ``--known`` (``final_subdomains.txt``) the
+harvest feeds discovery back: once the input is complete, the in-scope
+names that are not known yet are appended to ``--new`` and ``--known``,
+resolved with wildcard filtering like :mod:`recon.resolve`, appended to
+``--resolved`` and to the input, and handshaken in turn, for up to
+``--rounds`` rounds.
+
+In ``--follow`` mode the input is tailed while the resolver writes it,
+until stdin reaches EOF.
+
+Command line usage (as called from the engine)::
+
+    python3 -m recon.certs --follow --input out/subdomains/resolved_hosts.txt --scope out/targets.txt \\
+        --output out/enumeration/certificates/certificates.jsonl \\
+        --tls-hosts out/enumeration/certificates/tls_hosts.jsonl \\
+        --names out/enumeration/certificates/san_subdomains.txt \\
+        --new out/enumeration/certificates/new_subdomains.txt \\
+        --known out/final_subdomains.txt --resolved out/resolved_subdomains.txt \\
+        --wildcards out/subdomains/wildcard_subdomains.txt \\
+        --handshakes 100 --resolver 1.1.1.1 --rate 200
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import hashlib
+import ipaddress
+import json
+import ssl
+import sys
+import time
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Optional, Sequence, TextIO, Tuple
+
+from .aggregate import FileFollower, stdin_closed_event
+from .console import print_status
+from .dns import ResolverPool, add_resolver_arguments, pool_options
+from .names import normalize_name, root_of
+from .pool import read_targets
+from .probe import PROBE_ERRORS, parse_host
+from .resolve import Resolution, ResolveStats, resolve_stream, resolver_workers
+
+# DER tags and the object identifiers the parser looks for
+_SEQUENCE = 0x30
+_EXTENSIONS = 0xA3
+_DNS_NAME = 0x82
+_IP_ADDRESS = 0x87
+_SUBJECT_ALT_NAME = bytes((0x55, 0x1D, 0x11))
+_ATTRIBUTES = {bytes((0x55, 0x04, 0x03)): "CN", bytes((0x55, 0x04, 0x0A)): "O",
+               bytes((0x55, 0x04, 0x0B)): "OU", bytes((0x55, 0x04, 0x06)): "C"}
+
+
+class CertificateError(ValueError):
+    """The DER data is not an X.509 certificate the parser understands."""
+
+
+def _element(data: bytes, offset: int) -> Tuple[int, int, int]:
+    """Tag, content start and content end of the DER element at ``offset``."""
+    if offset + 2 > len(data):
+        raise CertificateError("truncated element")
+    tag, length = data[offset], data[offset + 1]
+    start = offset + 2
+    if length & 0x80:
+        size = length & 0x7F
+        if not 0 < size <= 4 or start + size > len(data):
+            raise CertificateError("bad length")
+        length = int.from_bytes(data[start:start + size], "big")
+        start += size
+    if start + length > len(data):
+        raise CertificateError("truncated element")
+    return tag, start, start + length
+
+
+def _children(data: bytes, start: int, end: int) -> Iterator[Tuple[int, int, int]]:
+    offset = start
+    while offset < end:
+        tag, child_start, child_end = _element(data, offset)
+        yield tag, child_start, child_end
+        offset = child_end
+
+
+def _name(data: bytes, start: int, end: int) -> str:
+    """``CN=..., O=...`` of an X.501 Name (the attributes the report needs)."""
+    parts = []
+    for _, set_start, set_end in _children(data, start, end):
+        for _, pair_start, pair_end in _children(data, set_start, set_end):
+            (_, oid_start, oid_end), (_, value_start, value_end) = list(_children(data, pair_start, pair_end))[:2]
+            label = _ATTRIBUTES.get(data[oid_start:oid_end])
+            if label:
+                parts.append(f"{label}={data[value_start:value_end].decode('utf-8', 'replace')}")
+    return ", ".join(parts)
+
+
+def _time(data: bytes, tag: int, start: int, end: int) -> str:
+    """UTCTime or GeneralizedTime as ``YYYY-MM-DDTHH:MM:SSZ``."""
+    text = data[start:end].decode("ascii", "replace").rstrip("Z")
+    if tag == 0x17:  # UTCTime: two-digit years, 50-99 are 19xx
+        text = ("19" if text[:2] >= "50" else "20") + text
+    return f"{text[0:4]}-{text[4:6]}-{text[6:8]}T{text[8:10]}:{text[10:12]}:{text[12:14] or '00'}Z"
+
+
+@dataclass
+class Certificate:
+    fingerprint: str
+    subject: str = ""
+    issuer: str = ""
+    not_before: str = ""
+    not_after: str = ""
+    names: List[str] = field(default_factory=list)
+    addresses: List[str] = field(default_factory=list)
+
+    @property
+    def self_signed(self) -> bool:
+        return self.subject == self.issuer
+
+    def expired(self, now: Optional[float] = None) -> bool:
+        return self.not_after < time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(now))
+
+    def record(self) -> dict:
+        return {"fingerprint": self.fingerprint, "subject": self.subject, "issuer": self.issuer,
+                "not_before": self.not_before, "not_after": self.not_after, "expired": self.expired(),
+                "self_signed": self.self_signed, "names": self.names, "addresses": self.addresses}
+
+
+def parse_certificate(der: bytes) -> Certificate:
+    """Issuer, subject, validity and subject alternative names of a DER certificate."""
+    certificate = Certificate(hashlib.sha256(der).hexdigest())
+    _, cert_start, cert_end = _element(der, 0)
+    tag, tbs_start, tbs_end = _element(der, cert_start)
+    if tag != _SEQUENCE:
+        raise CertificateError("no TBSCertificate")
+    fields = list(_children(der, tbs_start, tbs_end))
+    if fields and fields[0][0] == 0xA0:  # explicit version
+        fields = fields[1:]
+    if len(fields) < 6:
+        raise CertificateError("short TBSCertificate")
+    # serialNumber, signature, issuer, validity, subject, subjectPublicKeyInfo, [extensions]
+    certificate.issuer = _name(der, fields[2][1], fields[2][2])
+    times = list(_children(der, fields[3][1], fields[3][2]))
+    if len(times) == 2:
+        certificate.not_before = _time(der, *times[0])
+        certificate.not_after = _time(der, *times[1])
+    certificate.subject = _name(der, fields[4][1], fields[4][2])
+
+    for tag, start, end in fields[6:]:
+        if tag != _EXTENSIONS:
+            continue
+        _, list_start, list_end = _element(der, start)
+        for _, ext_start, ext_end in _children(der, list_start, list_end):
+            parts = list(_children(der, ext_start, ext_end))
+            if der[parts[0][1]:parts[0][2]] != _SUBJECT_ALT_NAME:
+                continue
+            _, value_start, _ = parts[-1]  # OCTET STRING wrapping the GeneralNames
+            _, names_start, names_end = _element(der, value_start)
+            for name_tag, name_start, name_end in _children(der, names_start, names_end):
+                value = der[name_start:name_end]
+                if name_tag == _DNS_NAME:
+                    certificate.names.append(value.decode("ascii", "replace").lower())
+                elif name_tag == _IP_ADDRESS and len(value) in (4, 16):
+                    certificate.addresses.append(str(ipaddress.ip_address(value)))
+    if not certificate.names and certificate.subject.startswith("CN="):
+        # Old certificates carry the name in the subject only
+        certificate.names.append(certificate.subject.split(",")[0][3:].lower())
+    return certificate
+
+
+class Harvester:
+    """Handshake, parse each certificate once and keep the in-scope names."""
+
+    def __init__(self, roots: Sequence[str], output: TextIO, tls_hosts: TextIO, names: TextIO,
+                 handshakes: int = 100, timeout: float = 5.0):
+        self.roots = {root for root in (normalize_name(target) for target in roots) if root}
+        self.output = output
+        self.tls_hosts = tls_hosts
+        self.names = names
+        self.handshakes = max(1, handshakes)
+        self.semaphore = asyncio.Semaphore(self.handshakes)
+        self.timeout = timeout
+        self.context = ssl.SSLContext(ssl.PROTOCOL_TLS_CLIENT)
+        self.context.check_hostname = False
+        self.context.verify_mode = ssl.CERT_NONE
+        self.certificates: Dict[str, Optional[Certificate]] = {}
+        self.in_scope: Dict[str, None] = {}
+        self.stats = {"handshakes": 0, "failed": 0}
+
+    async def grab(self, name: str, address: str, port: int) -> Optional[bytes]:
+        """The DER peer certificate of ``address:port`` for SNI ``name``, ``None`` if there is none."""
+        async with self.semaphore:
+            try:
+                _, writer = await asyncio.wait_for(asyncio.open_connection(
+                    address, port, ssl=self.context, server_hostname=name), self.timeout)
+            except PROBE_ERRORS + (ssl.SSLError,):
+                self.stats["failed"] += 1
+                return None
+            try:
+                return writer.get_extra_info("ssl_object").getpeercert(binary_form=True)
+            finally:
+                writer.close()
+
+    async def harvest(self, name: str, address: Optional[str], port: int) -> None:
+        der = await self.grab(name, address or name, port)
+        if der is None:
+            return
+        self.stats["handshakes"] += 1
+        fingerprint = hashlib.sha256(der).hexdigest()
+        if fingerprint not in self.certificates:
+            # Shared certificates (a CDN's, a wildcard) are parsed and written once
+            try:
+                certificate: Optional[Certificate] = parse_certificate(der)
+            except (CertificateError, IndexError, ValueError) as exc:
+                print_status("WARNING", f"Certificate of {name}:{port} not parsed: {exc}")
+                certificate = None
+            self.certificates[fingerprint] = certificate
+            if certificate is not None:
+                self.output.write(json.dumps(certificate.record()) + "\n")
+                self.output.flush()
+                self._add_names(certificate)
+        self.tls_hosts.write(json.dumps({"host": name, "address": address or name, "port": port,
+                                         "fingerprint": fingerprint}) + "\n")
+        self.tls_hosts.flush()
+
+    def _add_names(self, certificate: Certificate) -> None:
+        for raw in certificate.names:
+            name = normalize_name(raw)
+            if name and name not in self.in_scope and root_of(name, self.roots):
+                self.in_scope[name] = None
+                self.names.write(f"{name}\n")
+        self.names.flush()
+
+
+async def _drain(harvester: Harvester, queue: "asyncio.Queue[Optional[Tuple[str, Optional[str], int]]]",
+                 workers: int) -> None:
+    async def worker() -> None:
+        while True:
+            item = await queue.get()
+            if item is None:
+                return
+            await harvester.harvest(*item)
+
+    await asyncio.gather(*(worker() for _ in range(workers)))
+
+
+@dataclass
+class FeedBack:
+    """Files of the discovery round: names found, all known names, resolutions."""
+
+    new: str
+    known: str
+    resolved: str
+    hosts: str
+    wildcards: str
+    rounds: int = 2
+
+
+async def harvest_file(
+    input_path: str,
+    harvester: Harvester,
+    ports: Sequence[int],
+    feedback: Optional[FeedBack],
+    resolver_options: dict,
+    follow: bool = False,
+    interval: float = 0.5,
+) -> Tuple[int, int]:
+    """Harvest every host of ``input_path``, then run the feedback rounds; returns hosts and new names."""
+    workers = harvester.handshakes
+    follower = FileFollower([input_path])
+    done = stdin_closed_event() if follow else None
+    seen: Dict[str, None] = {}
+
+    async def handshake(hosts: List[Tuple[str, Optional[str]]]) -> None:
+        queue: "asyncio.Queue[Optional[Tuple[str, Optional[str], int]]]" = asyncio.Queue(maxsize=workers * 4)
+
+        async def feed() -> None:
+            for name, address in hosts:
+                for port in ports:
+                    await queue.put((name, address, port))
+            for _ in range(workers):
+                await queue.put(None)
+
+        await asyncio.gather(feed(), _drain(harvester, queue, workers))
+
+    queue: "asyncio.Queue[Optional[Tuple[str, Optional[str], int]]]" = asyncio.Queue(maxsize=workers * 4)
+
+    async def feed() -> None:
+        while True:
+            finished = done is None or done.is_set()
+            for line in follower.poll(final=finished):
+                name, address = parse_host(line)
+                if name and name not in seen:
+                    seen[name] = None
+                    for port in ports:
+                        await queue.put((name, address, port))
+            if finished:
+                break
+            await asyncio.sleep(interval)
+        for _ in range(workers):
+            await queue.put(None)
+
+    await asyncio.gather(feed(), _drain(harvester, queue, workers))
+
+    added = 0
+    if feedback is None:
+        return len(seen), added
+    with open(feedback.known, encoding="utf-8", errors="replace") as handle:
+        known = {normalize_name(line) for line in handle}
+    for round_number in range(1, feedback.rounds + 1):
+        names = [name for name in harvester.in_scope if name not in known]
+        if not names:
+            break
+        known.update(names)
+        added += len(names)
+        print_status("INFO", f"Certificates: round {round_number}, resolving {len(names)} new names")
+        with open(feedback.new, "a", encoding="utf-8") as new, open(feedback.known, "a", encoding="utf-8") as out:
+            new.writelines(f"{name}\n" for name in names)
+            out.writelines(f"{name}\n" for name in names)
+
+        found: List[Resolution] = []
+        resolve_queue: "asyncio.Queue[Optional[str]]" = asyncio.Queue()
+        for name in names:
+            resolve_queue.put_nowait(name)
+        resolvers = max(1, min(len(names), resolver_workers(resolver_options)))
+        for _ in range(resolvers):
+            resolve_queue.put_nowait(None)
+        async with ResolverPool(**resolver_options) as pool:
+            with open(feedback.resolved, "a", encoding="utf-8") as output, \
+                    open(feedback.hosts, "a", encoding="utf-8") as hosts, \
+                    open(feedback.wildcards, "a", encoding="utf-8") as wildcards:
+                await resolve_stream(pool, resolve_queue, resolvers, output, hosts, wildcards, ResolveStats(),
+                                     found.append)
+        hosts_found = [(resolution.name, resolution.addresses[0] if resolution.addresses else None)
+                       for resolution in found if resolution.name not in seen]
+        seen.update(dict.fromkeys(name for name, _ in hosts_found))
+        await handshake(hosts_found)
+    return len(seen), added
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python3 -m recon.certs",
+        description="Harvest the TLS certificates of the resolved subdomains and feed their names back.",
+    )
+    parser.add_argument("--input", required=True, help="resolved_hosts.txt of recon.resolve, or a name list")
+    parser.add_argument("--scope", required=True, help="targets file; names under a target are in scope")
+    parser.add_argument("--output", required=True, help="JSON line per certificate (one per fingerprint)")
+    parser.add_argument("--tls-hosts", required=True, help="JSON line per host and port with its fingerprint")
+    parser.add_argument("--names", required=True, help="in-scope DNS names of the certificates")
+    parser.add_argument("--ports", default="443", help="comma-separated TLS ports (default 443)")
+    parser.add_argument("--handshakes", type=int, default=100, help="handshakes in flight")
+    parser.add_argument("--handshake-timeout", type=float, default=5.0, help="seconds per handshake")
+    parser.add_argument("--known", help="known names (final_subdomains.txt); enables the feedback rounds")
+    parser.add_argument("--new", help="names the certificates added to --known")
+    parser.add_argument("--resolved", help="resolved name list the feedback rounds append to")
+    parser.add_argument("--wildcards", help="wildcard answers list the feedback rounds append to")
+    parser.add_argument("--rounds", type=int, default=2, help="feedback rounds (default 2)")
+    parser.add_argument("--follow", action="store_true",
+                        help="keep tailing the input until stdin is closed")
+    parser.add_argument("--interval", type=float, default=0.5, help="poll interval in seconds")
+    add_resolver_arguments(parser)
+    args = parser.parse_args(argv)
+
+    feedback = None
+    if args.known:
+        if not (args.new and args.resolved and args.wildcards):
+            parser.error("--known needs --new, --resolved and --wildcards")
+        feedback = FeedBack(args.new, args.known, args.resolved, args.input, args.wildcards, args.rounds)
+        open(args.new, "w", encoding="utf-8").close()
+
+    follow = args.follow
+    if follow and sys.stdin.isatty():
+        print_status("WARNING", "--follow needs stdin from the scheduler, making a single pass instead")
+        follow = False
+
+    started = time.monotonic()
+    ports = [int(port) for port in args.ports.split(",") if port.strip()]
+    with open(args.output, "w", encoding="utf-8") as output, \
+            open(args.tls_hosts, "w", encoding="utf-8") as tls_hosts, \
+            open(args.names, "w", encoding="utf-8") as names:
+        harvester = Harvester(read_targets(args.scope), output, tls_hosts, names, args.handshakes,
+                              args.handshake_timeout)
+        hosts, added = asyncio.run(harvest_file(args.input, harvester, ports, feedback, pool_options(args),
+                                                follow, args.interval))
+    unique = sum(1 for certificate in harvester.certificates.values() if certificate is not None)
+    print_status(
+        "SUCCESS",
+        f"Certificates: {harvester.stats['handshakes']} handshakes on {hosts} hosts, {unique} unique certificates, "
+        f"{len(harvester.in_scope)} in-scope names ({added} new) in {time.monotonic() - started:.1f}s",
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,337 @@
+"""Command line entry point of the reconnaissance engine.
+
+``wolf_recon_advanced.sh`` and ``wolf_recon_simple.sh`` launch this with
+their profile; it validates the input, prepares the output directory and run
+manifest, runs :class:`~recon.engine.Engine` and writes the report.
+
+Command line usage (as called from the launcher scripts, or directly)::
+
+    python3 -m recon --profile advanced example.com
+    python3 -m recon --profile simple --no-cache targets.txt
+    python3 -m recon --profile advanced --incremental targets.txt
+    python3 -m recon --resume recon_multi_target_20250101_120000
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import re
+import shutil
+import sys
+import time
+from typing import List, Optional, Sequence, Tuple
+
+from .cache import pid_alive
+from .config import PROFILES, SETTINGS, RunConfig
+from .console import CYAN, NC, print_status
+from .engine import Engine, setup_directories
+from .manifest import Manifest, status_summary
+from .profile import count_lines
+from .report import write_report, write_summary
+from .sources import SOURCES, enabled, load_plugins
+
+WHITE = "\033[1;37m"
+BOLD = "\033[1m"
+
+DOMAIN = re.compile(r"^[a-zA-Z0-9][a-zA-Z0-9.-]*[a-zA-Z0-9]\.[a-zA-Z]{2,}$")
+
+LOGO = """\
+████████████████████████████████████████████████████████████████████████████████
+█                                                                              █
+█  ╔═══╗ ╔═══╗ ╔═══╗ ╔═══╗ ╔══╗  ╔═══╗        ╔═══╗ ╔═══╗ ╔═══╗ ╔══╗ ╔═══╗  █
+█  ║ ╔═╝ ║ ╔═╝ ║ ╔═╝ ║ ╔═╝ ║ ╔╗║ ║ ╔═╝        ║ ╔═╝ ║ ╔═╝ ║ ╔═╝ ║ ╔╗║ ║ ╔═╝  █
+█  ║ ╚═╗ ║ ╚═╗ ║ ║   ║ ║   ║ ║║║ ║ ╚═╗        ║ ║   ║ ║   ║ ║   ║ ║║║ ║ ║    █
+█  ║ ╔═╝ ║ ╔═╝ ║ ║   ║ ║   ║ ║║║ ║ ╔═╝        ║ ║   ║ ║   ║ ║   ║ ║║║ ║ ║    █
+█  ║ ║   ║ ╚═╗ ║ ╚═╗ ║ ╚═╗ ║ ╚╝║ ║ ╚═╗        ║ ╚═╗ ║ ╚═╗ ║ ╚═╗ ║ ╚╝║ ║ ╚═╗  █
+█  ╚═╝   ╚═══╝ ╚═══╝ ╚═══╝ ╚══╝  ╚═══╝        ╚═══╝ ╚═══╝ ╚═══╝ ╚══╝  ╚═══╝  █
+█                                                                              █
+████████████████████████████████████████████████████████████████████████████████"""
+
+FEATURES = {
+    "advanced": [
+        "    🎯 Single Target Support    📋 Multi-Target Support    ⚡ Parallel Execution",
+        "    🔍 8+ Recon Tools          📊 Intelligence Gathering   📈 Professional Reports",
+    ],
+    "simple": [
+        "    🎯 Single & Multi-Target    🔍 8+ Recon Tools    📊 Quick Results",
+    ],
+}
+
+
+def print_banner(config: RunConfig) -> None:
+    color = sys.stdout.isatty()
+    print(f"{CYAN}{BOLD}" if color else "")
+    print(LOGO)
+    print(f"{WHITE}{BOLD}" if color else "")
+    print(config.title.center(80).rstrip())
+    print(f"Multi-Target Edition v{config.version}".center(80).rstrip())
+    print(f"Coded by: {config.author}".center(80).rstrip())
+    print("")
+    for line in FEATURES.get(config.profile, []):
+        print(line)
+    print(NC if color else "")
+
+
+def print_summary_box(target_count: int, found: int, resolved: int, duration: int, output_dir: str) -> None:
+    color = sys.stdout.isatty()
+    print(f"{CYAN}{BOLD}" if color else "")
+    print("┌─────────────────────────────────────────┐")
+    print("│            SCAN SUMMARY                 │")
+    print("├─────────────────────────────────────────┤")
+    print(f"│ Targets Scanned: {target_count:<18} │")
+    print(f"│ Subdomains Found: {found:<17} │")
+    print(f"│ Subdomains Resolved: {resolved:<14} │")
+    print(f"│ Duration: {f'{duration}s':<26} │")
+    print(f"│ Output Directory: {os.path.basename(output_dir):<18} │")
+    print("└─────────────────────────────────────────┘")
+    print(NC if color else "")
+
+
+def input_type(value: str) -> str:
+    if os.path.isfile(value):
+        return "file"
+    if DOMAIN.match(value):
+        return "domain"
+    return "invalid"
+
+
+def validate_domain_file(path: str) -> None:
+    valid = total = 0
+    with open(path, encoding="utf-8", errors="replace") as handle:
+        for line in handle:
+            line = line.strip()
+            if not line:
+                continue
+            total += 1
+            if DOMAIN.match(line):
+                valid += 1
+            else:
+                print_status("WARNING", f"Invalid domain format: {line}")
+    print_status("INFO", f"Found {valid} valid domains out of {total} entries")
+
+
+def check_dependencies(config: RunConfig) -> bool:
+    """Whether the run may start; with ``skip_missing_tools`` missing tools only skip their stages."""
+    print_status("INFO", "Checking tool dependencies...")
+    # In distributed mode the sources run on the workers, which check their own binaries
+    sources = [] if config.queue or config.workers else enabled(config)
+    tools = dict.fromkeys([*config.required_tools, *(source.binary for source in sources)])
+    missing = [tool for tool in tools if shutil.which(tool) is None]
+    if missing and not config.skip_missing_tools:
+        for tool in missing:
+            print_status("ERROR", f"Command '{tool}' not found. Please install it first.")
+        print_status("ERROR", f"Missing tools: {' '.join(missing)}")
+        print_status("INFO", "Please install missing tools before running the script.")
+        return False
+    if missing:
+        print_status("WARNING", f"Missing tools: {' '.join(missing)}")
+        print_status("INFO", "The stages that need them will be skipped")
+        return True
+    print_status("SUCCESS", "All required tools are available.")
+    return True
+
+
+def new_run(config: RunConfig, target: str, start_time: int) -> Optional[Tuple[str, str]]:
+    """Create the output directory, targets file and manifest of a fresh run."""
+    kind = input_type(target)
+    if kind == "invalid":
+        print_status("ERROR", f"Invalid input: {target}")
+        print_status("INFO", "Please provide a valid domain or file path")
+        return None
+    if kind == "domain":
+        print_status("INFO", f"Single domain mode: {target}")
+        target_info = re.sub(r"[.:]", "_", target)
+    else:
+        print_status("INFO", f"Multi-target mode: {target}")
+        validate_domain_file(target)
+        target_info = "multi_target"
+
+    if not check_dependencies(config):
+        return None
+
+    output_dir = setup_directories(f"recon_{target_info}_{time.strftime('%Y%m%d_%H%M%S')}")
+    print_status("INFO", f"Output directory: {output_dir}")
+    targets_file = os.path.join(output_dir, "targets.txt")
+    if kind == "domain":
+        with open(targets_file, "w", encoding="utf-8") as out:
+            out.write(f"{target}\n")
+    else:
+        shutil.copyfile(target, targets_file)
+    print_status("INFO", f"Targets file: {targets_file}")
+
+    # Stage and per-target task states, plus what --resume needs to restart
+    manifest = Manifest(os.path.join(output_dir, "manifest.db"))
+    try:
+        for key, value in (("start_time", start_time), ("incremental", str(config.incremental).lower()),
+                           ("input", target), ("profile", config.profile), ("pid", os.getpid())):
+            manifest.set_meta(key, str(value))
+    finally:
+        manifest.close()
+    return output_dir, targets_file
+
+
+def resume_run(config: RunConfig, resume_dir: str) -> Optional[Tuple[RunConfig, str, int]]:
+    """Reopen an interrupted run; the engine skips the work its manifest marks as done."""
+    manifest_db = os.path.join(resume_dir, "manifest.db")
+    if not os.path.isfile(manifest_db) or not os.path.isfile(os.path.join(resume_dir, "targets.txt")):
+        print_status("ERROR", f"No resumable run in: {resume_dir}")
+        return None
+    manifest = Manifest(manifest_db)
+    try:
+        previous_pid = manifest.get_meta("pid")
+        if previous_pid and previous_pid.isdigit() and pid_alive(int(previous_pid)):
+            print_status("ERROR", f"Run in {resume_dir} is still in progress (pid {previous_pid})")
+            return None
+        manifest.set_meta("pid", str(os.getpid()))
+        profile = manifest.get_meta("profile") or config.profile
+        if profile != config.profile:
+            overrides = config
+            try:
+                config = RunConfig.from_env(profile)
+            except ValueError as exc:
+                print_status("ERROR", f"Invalid setting {exc}")
+                return None
+            config.cache_not_before = overrides.cache_not_before
+            config.skip_missing_tools = overrides.skip_missing_tools
+            config.author = overrides.author
+            config.queue, config.workers = overrides.queue, overrides.workers
+        config.incremental = manifest.get_meta("incremental") == "true"
+        start_time = int(float(manifest.get_meta("start_time") or time.time()))
+        print_status("INFO", f"Resuming run in: {resume_dir} ({status_summary(manifest.entries())})")
+    finally:
+        manifest.close()
+    if not check_dependencies(config):
+        return None
+    return config, os.path.join(resume_dir, "targets.txt"), start_time
+
+
+def list_sources(config: RunConfig) -> None:
+    """One line per registered source: whether this run uses it, its binary, input and timeout."""
+    used = {source.name for source in enabled(config)}
+    for source in SOURCES.values():
+        state = "on" if source.name in used else "off"
+        installed = "" if shutil.which(source.binary) else " (not installed)"
+        timeout = f"{source.timeout}s" if source.timeout else "-"
+        print(f"{state:<4} {source.name:<16} {source.binary + installed:<28} {source.input:<7} "
+              f"{timeout:>6}  {','.join(source.resources)}")
+
+
+def usage(prog: str) -> List[str]:
+    return [
+        f"Usage: {prog} [--incremental] [--no-cache] <domain|targets_file>",
+        f"       {prog} --resume <output_dir>",
+        "Examples:",
+        f"  {prog} example.com                    # Single domain",
+        f"  {prog} targets.txt                    # Multiple domains from file",
+        f"  {prog} --incremental targets.txt      # Only report new/vanished names, reuse fresh cached results",
+        f"  {prog} --no-cache example.com         # Re-run every tool instead of reusing cached tool results",
+        f"  {prog} --resume recon_multi_target_20250101_120000  # Finish an interrupted run",
+    ]
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python3 -m recon",
+        description="Run the reconnaissance pipeline against a domain or a file of domains.",
+        epilog=SETTINGS,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("target", nargs="?", help="domain, or file with one domain per line")
+    parser.add_argument("--profile", choices=sorted(PROFILES), default="advanced",
+                        help="preset to run (default: advanced)")
+    parser.add_argument("--incremental", action="store_true",
+                        help="only report new/vanished names, reuse fresh cached results")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="re-run every tool instead of reusing cached tool results of earlier runs")
+    parser.add_argument("--resume", metavar="OUTPUT_DIR", help="finish an interrupted run")
+    parser.add_argument("--skip-missing-tools", action="store_true",
+                        help="skip the stages of tools that are not installed instead of aborting")
+    parser.add_argument("--queue", metavar="URL",
+                        help="distributed mode: queue the source tasks on URL (sqlite:///path, redis://host:port/db)")
+    parser.add_argument("--workers", type=int, metavar="N",
+                        help="start N local workers (queue defaults to <output dir>/queue.db)")
+    parser.add_argument("--list-sources", action="store_true",
+                        help="list the enumeration sources, plugins included, and exit")
+    parser.add_argument("--no-banner", action="store_true", help="do not print the banner")
+    parser.add_argument("--author", help="name credited in the banner and reports")
+    parser.add_argument("--prog", default="python3 -m recon", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    try:
+        config = RunConfig.from_env(args.profile)
+        if load_plugins(config.plugin_path):
+            # Per-domain plugin sources read their <NAME>_CONCURRENCY too
+            config = RunConfig.from_env(args.profile)
+    except ValueError as exc:
+        print_status("ERROR", f"Invalid setting {exc}")
+        return 1
+    if args.list_sources:
+        list_sources(config)
+        return 0
+
+    if not args.target and not args.resume:
+        for line in usage(args.prog):
+            print(line)
+        return 1
+
+    config.incremental = args.incremental
+    config.queue = args.queue or config.queue
+    config.workers = config.workers if args.workers is None else args.workers
+    config.author = args.author or config.author
+    config.skip_missing_tools = config.skip_missing_tools or args.skip_missing_tools
+    if args.no_cache:
+        # Results produced during this run are still shared
+        config.cache_not_before = time.time()
+
+    if not args.no_banner:
+        print_banner(config)
+    start_time = int(time.time())
+
+    if args.resume:
+        output_dir = args.resume.rstrip("/") or args.resume
+        resumed = resume_run(config, output_dir)
+        if resumed is None:
+            return 1
+        config, targets_file, start_time = resumed
+    else:
+        created = new_run(config, args.target, start_time)
+        if created is None:
+            return 1
+        output_dir, targets_file = created
+
+    if config.workers and not config.queue:
+        config.queue = os.path.abspath(os.path.join(output_dir, "queue.db"))
+    try:
+        engine = Engine(config, output_dir, targets_file)
+    except RuntimeError as exc:
+        print_status("ERROR", str(exc))
+        return 1
+    try:
+        # Shared network budget of this run, with per-target caps from NET_TARGET_RATES
+        engine.budget.configure(config.net_rate, config.net_min_rate, config.net_target_rate,
+                                config.net_target_rates)
+        asyncio.run(engine.run())
+        end_time = int(time.time())
+
+        print_status("PHASE", "Generating reconnaissance report...")
+        report_file = write_report(engine, start_time, end_time)
+        summary_file = write_summary(engine)
+        print_status("SUCCESS", f"Report generated: {report_file}")
+    finally:
+        engine.close()
+
+    print_status("SUCCESS", "Reconnaissance completed!")
+    print_status("INFO", f"Results saved in: {output_dir}")
+    print_status("INFO", f"Final subdomain list: {engine.out('final_subdomains.txt')}")
+    print_status("INFO", f"Full report: {report_file}")
+    print_status("INFO", f"Summary: {summary_file}")
+
+    print_summary_box(count_lines([targets_file]), count_lines([engine.out("final_subdomains.txt")]),
+                      count_lines([engine.out("resolved_subdomains.txt")]), end_time - start_time, output_dir)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,349 @@
+"""Run configuration and the advanced/simple presets of the engine.
+
+The advanced and simple suites used to be two generated bash scripts with
+their own copies of every tool invocation.  They are now two presets of one
+:class:`RunConfig` that the engine (:mod:`recon.engine`) runs: the simple
+preset runs the same tools one at a time with lower DNS rates and caps the
+intelligence passes, the advanced one runs them as a concurrent stage graph.
+
+Every setting can be overridden through the environment variable the bash
+scripts read (``DNS_RATE_PER_RESOLVER``, ``SUDOMY_CONCURRENCY``,
+``WORDLIST_TOOLS``, ...), see :meth:`RunConfig.from_env`.
+"""
+
+from __future__ import annotations
+
+import os
+from dataclasses import dataclass, field, replace
+from typing import Dict, List, Mapping, Optional, Set, Tuple
+
+from . import __version__
+from .budget import DEFAULT_MIN_RATE, DEFAULT_RATE, DEFAULT_TARGET_RATE
+from .cache import DEFAULT_DIR as DEFAULT_CACHE_DIR
+from .cache import DEFAULT_MAX_SIZE_MB, DEFAULT_TTL_HOURS
+from .extsort import DEFAULT_MEMORY_MB as DEFAULT_SORT_MEMORY_MB
+from .state import DEFAULT_DB as DEFAULT_STATE_DB
+
+WORDLISTS = (
+    "/usr/share/wordlists/seclists/Discovery/DNS/subdomains-top1million-5000.txt",
+    "/usr/share/wordlists/dirb/common.txt",
+)
+
+# Tools the dependency check insists on besides the binaries of the enabled sources
+ADVANCED_TOOLS = ("amass", "whois", "python3")
+
+# The environment variables of RunConfig.from_env, for the --help of the command line
+SETTINGS = """\
+settings are read from the environment, e.g.
+  MAX_PARALLEL_JOBS, CPU_BUDGET, NETWORK_BUDGET, DNS_BUDGET, DISK_BUDGET       stage graph
+  ASSETFINDER_CONCURRENCY, FFUF_CONCURRENCY, SUDOMY_CONCURRENCY,
+  AMASS_INTEL_CONCURRENCY                                                     per-domain pools
+  DNS_RESOLVERS, RESOLVERS_FILE, DNS_RATE_PER_RESOLVER, DNS_CONCURRENCY,
+  DNS_TIMEOUT, DNS_RETRIES                                                    DNS engines
+  WORDLIST_TOOLS=true, BRUTEFORCE_DEPTH, WORDLIST                             brute force
+  NET_RATE, NET_MIN_RATE, NET_TARGET_RATE, NET_TARGET_RATES="example.com=20"  network budget
+  CACHE_DIR, CACHE_TTL_HOURS, CACHE_MAX_SIZE_MB, STATE_DB, STATE_TTL_HOURS    cache and state
+  SORT_MEMORY_MB, SORT_WORKERS                                                sort/dedupe of merged lists
+  HTTP_PROBE=false, PROBE_CONCURRENCY, PROBE_PER_HOST, PROBE_TIMEOUT, PROBE_PORTS
+                                                                              HTTP probe
+  TECH_FINGERPRINT=false, TECH_RULES                                          technology fingerprinting
+  PORT_SCAN=false, PORT_SCAN_CONCURRENCY, PORT_SCAN_TOP, PORT_SCAN_PORTS,
+  PORT_SCAN_PER_HOST, PORT_SCAN_TIMEOUT                                       TCP connect scan
+  CERT_HARVEST=false, CERT_CONCURRENCY, CERT_PORTS, CERT_TIMEOUT, CERT_ROUNDS TLS certificate harvest
+  PERMUTATIONS=false, PERMUTE_MAX, PERMUTE_ROUNDS, PERMUTE_MIN_COUNT          learned permutations
+  CIDR_INTEL=true, WHOIS_RANGES=true, REVERSE_DNS=false                       intelligence passes
+  PROGRESS_INTERVAL, EVENTS_LISTEN (127.0.0.1:8765 or unix:/path)             progress table, event feed
+  PLUGIN_PATH, SOURCES="subfinder bbot ..."                                   enumeration sources
+  QUEUE (sqlite:///path or redis://host:port/db), SHARD_SIZE, WORKERS         distributed mode
+"""
+
+# Worker pools sized by <NAME>_CONCURRENCY besides those of the presets: every per-domain source, plugins
+# included, adds its name when it is registered (see recon.sources.register)
+POOLS: Set[str] = set()
+
+
+@dataclass
+class RunConfig:
+    """Everything that differs between two runs of the engine apart from the targets."""
+
+    profile: str = "advanced"
+    title: str = "Advanced Reconnaissance Automation Suite"
+    author: str = "Youssef Hamdi"
+
+    # Stage graph: global job cap and slots per resource class
+    max_jobs: Optional[int] = 10
+    budgets: Dict[str, int] = field(default_factory=lambda: {
+        "cpu": os.cpu_count() or 2, "network": 6, "dns": 2, "disk": 2,
+    })
+
+    # Worker pool sizes of the tools that run once per domain (default_concurrency for the others)
+    concurrency: Dict[str, int] = field(default_factory=lambda: {
+        "assetfinder": 8, "ffuf": 4, "sudomy": 4, "amass_intel": 3, "probe": 200, "cert": 100,
+        "port_scan": 500,
+    })
+    default_concurrency: int = 4
+
+    # Enumeration sources (see recon.sources): names to run (empty = the defaults), plugin directories
+    sources: List[str] = field(default_factory=list)
+    plugin_path: List[str] = field(default_factory=list)
+
+    # DNS engines (resolve, brute-force, reverse sweep)
+    dns_resolvers: List[str] = field(default_factory=list)
+    resolvers_file: str = ""
+    dns_rate: float = 200.0
+    dns_concurrency: int = 1000
+    dns_timeout: float = 2.0
+    dns_retries: int = 3
+
+    # Wordlist brute-force: the native DNS engine, or ffuf + dnscan
+    wordlist_tools: bool = False
+    bruteforce_depth: int = 3
+    wordlist: Optional[str] = None
+
+    # HTTP probing of the resolved names (requests in flight: concurrency["probe"]): per address, timeout, ports
+    http_probe: bool = True
+    probe_per_host: int = 4
+    probe_timeout: float = 10.0
+    probe_ports: str = "https:443,http:80"
+
+    # TLS certificate harvest (handshakes in flight: concurrency["cert"]): ports, timeout, rounds of SAN names fed back
+    cert_harvest: bool = True
+    cert_ports: str = "443"
+    cert_timeout: float = 5.0
+    cert_rounds: int = 2
+
+    # Permutations of the resolved names, learned from their labels: candidates queried at most, rounds, observations
+    # a rule needs
+    permutations: bool = True
+    permute_max: int = 200_000
+    permute_rounds: int = 2
+    permute_min_count: int = 2
+
+    # TCP connect scan of the resolved addresses (most connects in flight: concurrency["port_scan"]):
+    # top-N ports or an explicit list, per address, longest connect timeout
+    port_scan: bool = True
+    port_scan_top: int = 100
+    port_scan_ports: str = ""
+    port_scan_per_host: int = 32
+    port_scan_timeout: float = 1.5
+
+    # Technology fingerprinting of the probed responses: extra Wappalyzer-format rule files
+    tech_fingerprint: bool = True
+    tech_rules: List[str] = field(default_factory=list)
+
+    # Intelligence: amass intel on every range found, RADb WHOIS routes of every ASN, reverse DNS sweep
+    cidr_intel: bool = False
+    whois_ranges: bool = False
+    reverse_dns: bool = True
+
+    # External sort/dedupe of the merged name lists: memory cap in MB, run-generation processes (0 = one per core)
+    sort_memory_mb: float = DEFAULT_SORT_MEMORY_MB
+    sort_workers: int = 0
+
+    # Shared network budget in requests per second
+    net_rate: float = DEFAULT_RATE
+    net_min_rate: float = DEFAULT_MIN_RATE
+    net_target_rate: float = DEFAULT_TARGET_RATE
+    net_target_rates: Dict[str, float] = field(default_factory=dict)
+
+    # Result cache, incremental state store
+    cache_dir: str = DEFAULT_CACHE_DIR
+    cache_ttl_hours: float = DEFAULT_TTL_HOURS
+    cache_max_size_mb: float = DEFAULT_MAX_SIZE_MB
+    cache_not_before: float = 0.0
+    incremental: bool = False
+    state_db: str = DEFAULT_STATE_DB
+    state_ttl_hours: float = 24.0
+
+    # Distributed mode: queue URL of the source tasks (empty = run locally), targets per task, local workers
+    queue: str = ""
+    shard_size: int = 50
+    workers: int = 0
+
+    # Progress table every N seconds (0 = off), event feed address (HOST:PORT or unix:PATH, empty = none)
+    progress_interval: float = 30.0
+    events_listen: str = ""
+
+    # Missing tools: abort the run (strict) or skip the stages that need them
+    required_tools: Tuple[str, ...] = ADVANCED_TOOLS
+    skip_missing_tools: bool = False
+
+    @property
+    def version(self) -> str:
+        return __version__
+
+    def dns_args(self) -> List[str]:
+        """Resolver options of the DNS modules (resolve, bruteforce, reverse)."""
+        args: List[str] = []
+        for resolver in self.dns_resolvers:
+            args += ["--resolver", resolver]
+        if self.resolvers_file:
+            args += ["--resolvers-file", self.resolvers_file]
+        args += ["--rate", f"{self.dns_rate:g}", "--concurrency", str(self.dns_concurrency),
+                 "--timeout", f"{self.dns_timeout:g}", "--retries", str(self.dns_retries)]
+        return args
+
+    def probe_args(self) -> List[str]:
+        """Pool options of the HTTP probe."""
+        return ["--concurrency", str(self.concurrency.get("probe", 200)), "--per-host", str(self.probe_per_host),
+                "--timeout", f"{self.probe_timeout:g}", "--ports", self.probe_ports]
+
+    def port_scan_args(self) -> List[str]:
+        """Port list and limits of the connect scan."""
+        ports = ["--ports", self.port_scan_ports] if self.port_scan_ports else ["--top", str(self.port_scan_top)]
+        return [*ports, "--concurrency", str(self.concurrency.get("port_scan", 500)),
+                "--per-host", str(self.port_scan_per_host), "--timeout", f"{self.port_scan_timeout:g}"]
+
+    def fingerprint_args(self) -> List[str]:
+        """Rule files and index cache of the technology fingerprinting."""
+        args = ["--cache-dir", self.cache_dir]
+        for path in self.tech_rules:
+            args += ["--rules", path]
+        return args
+
+    def cert_args(self) -> List[str]:
+        """Handshake and feedback options of the certificate harvest."""
+        return ["--handshakes", str(self.concurrency.get("cert", 100)), "--handshake-timeout", f"{self.cert_timeout:g}",
+                "--ports", self.cert_ports, "--rounds", str(self.cert_rounds)]
+
+    def permute_args(self) -> List[str]:
+        """Cap, rounds and rule threshold of the permutation engine."""
+        return ["--max-candidates", str(self.permute_max), "--rounds", str(self.permute_rounds),
+                "--min-count", str(self.permute_min_count)]
+
+    def find_wordlist(self) -> Optional[str]:
+        for path in ((self.wordlist,) if self.wordlist else WORDLISTS):
+            if path and os.path.isfile(path):
+                return path
+        return None
+
+    @classmethod
+    def from_env(cls, profile: str = "advanced", environ: Optional[Mapping[str, str]] = None) -> "RunConfig":
+        """The ``profile`` preset with the scripts' environment overrides applied."""
+        if profile not in PROFILES:
+            raise ValueError(f"unknown profile {profile!r}, expected one of {', '.join(PROFILES)}")
+        env = os.environ if environ is None else environ
+        config = replace(PROFILES[profile])
+        config.budgets = dict(config.budgets)
+        config.concurrency = dict(config.concurrency)
+        config.net_target_rates = dict(config.net_target_rates)
+
+        def value(name: str, convert, current, minimum: Optional[float] = None):
+            raw = env.get(name, "")
+            if raw == "":
+                return current
+            try:
+                converted = convert(raw)
+            except ValueError as exc:
+                raise ValueError(f"{name}={raw!r}: {exc}") from None
+            if minimum is not None and converted < minimum:
+                raise ValueError(f"{name}={raw!r}: must be at least {minimum:g}")
+            return converted
+
+        config.max_jobs = value("MAX_PARALLEL_JOBS", int, config.max_jobs, minimum=1)
+        for resource in config.budgets:
+            config.budgets[resource] = value(f"{resource.upper()}_BUDGET", int, config.budgets[resource], minimum=1)
+        # <NAME>_CONCURRENCY sizes a worker pool: a per-domain source or one of the probing pools
+        for pool in sorted(POOLS.union(config.concurrency)):
+            size = value(f"{pool.upper()}_CONCURRENCY", int, None, minimum=1)
+            if size is not None:
+                config.concurrency[pool] = size
+        config.sources = value("SOURCES", str.split, config.sources)
+        config.plugin_path = value("PLUGIN_PATH", lambda raw: [path for path in raw.split(os.pathsep) if path],
+                                   config.plugin_path)
+
+        config.dns_resolvers = value("DNS_RESOLVERS", str.split, config.dns_resolvers)
+        config.resolvers_file = value("RESOLVERS_FILE", str, config.resolvers_file)
+        config.dns_rate = value("DNS_RATE_PER_RESOLVER", float, config.dns_rate)
+        config.dns_concurrency = value("DNS_CONCURRENCY", int, config.dns_concurrency)
+        config.dns_timeout = value("DNS_TIMEOUT", float, config.dns_timeout)
+        config.dns_retries = value("DNS_RETRIES", int, config.dns_retries)
+
+        config.wordlist_tools = value("WORDLIST_TOOLS", lambda raw: raw == "true", config.wordlist_tools)
+        config.bruteforce_depth = value("BRUTEFORCE_DEPTH", int, config.bruteforce_depth)
+        config.wordlist = value("WORDLIST", str, config.wordlist)
+
+        config.http_probe = value("HTTP_PROBE", lambda raw: raw != "false", config.http_probe)
+        config.probe_per_host = value("PROBE_PER_HOST", int, config.probe_per_host)
+        config.probe_timeout = value("PROBE_TIMEOUT", float, config.probe_timeout)
+        config.probe_ports = value("PROBE_PORTS", str, config.probe_ports)
+
+        config.cert_harvest = value("CERT_HARVEST", lambda raw: raw != "false", config.cert_harvest)
+        config.cert_ports = value("CERT_PORTS", str, config.cert_ports)
+        config.cert_timeout = value("CERT_TIMEOUT", float, config.cert_timeout)
+        config.cert_rounds = value("CERT_ROUNDS", int, config.cert_rounds)
+
+        config.permutations = value("PERMUTATIONS", lambda raw: raw != "false", config.permutations)
+        config.permute_max = value("PERMUTE_MAX", int, config.permute_max)
+        config.permute_rounds = value("PERMUTE_ROUNDS", int, config.permute_rounds)
+        config.permute_min_count = value("PERMUTE_MIN_COUNT", int, config.permute_min_count)
+
+        config.port_scan = value("PORT_SCAN", lambda raw: raw != "false", config.port_scan)
+        config.port_scan_top = value("PORT_SCAN_TOP", int, config.port_scan_top)
+        config.port_scan_ports = value("PORT_SCAN_PORTS", str, config.port_scan_ports)
+        config.port_scan_per_host = value("PORT_SCAN_PER_HOST", int, config.port_scan_per_host)
+        config.port_scan_timeout = value("PORT_SCAN_TIMEOUT", float, config.port_scan_timeout)
+
+        config.tech_fingerprint = value("TECH_FINGERPRINT", lambda raw: raw != "false", config.tech_fingerprint)
+        config.tech_rules = value("TECH_RULES", lambda raw: [path for path in raw.split(os.pathsep) if path],
+                                  config.tech_rules)
+
+        config.cidr_intel = value("CIDR_INTEL", lambda raw: raw == "true", config.cidr_intel)
+        config.whois_ranges = value("WHOIS_RANGES", lambda raw: raw == "true", config.whois_ranges)
+        config.reverse_dns = value("REVERSE_DNS", lambda raw: raw != "false", config.reverse_dns)
+
+        config.sort_memory_mb = value("SORT_MEMORY_MB", float, config.sort_memory_mb)
+        config.sort_workers = value("SORT_WORKERS", int, config.sort_workers)
+
+        config.net_rate = value("NET_RATE", float, config.net_rate)
+        config.net_min_rate = value("NET_MIN_RATE", float, config.net_min_rate)
+        config.net_target_rate = value("NET_TARGET_RATE", float, config.net_target_rate)
+        config.net_target_rates.update(value("NET_TARGET_RATES", parse_target_rates, {}))
+
+        config.cache_dir = value("CACHE_DIR", str, config.cache_dir)
+        config.cache_ttl_hours = value("CACHE_TTL_HOURS", float, config.cache_ttl_hours)
+        config.cache_max_size_mb = value("CACHE_MAX_SIZE_MB", float, config.cache_max_size_mb)
+        config.cache_not_before = value("CACHE_NOT_BEFORE", float, config.cache_not_before)
+        config.state_db = value("STATE_DB", str, config.state_db)
+        config.state_ttl_hours = value("STATE_TTL_HOURS", float, config.state_ttl_hours)
+
+        config.queue = value("QUEUE", str, config.queue)
+        config.shard_size = value("SHARD_SIZE", int, config.shard_size)
+        config.workers = value("WORKERS", int, config.workers)
+
+        config.progress_interval = value("PROGRESS_INTERVAL", float, config.progress_interval)
+        config.events_listen = value("EVENTS_LISTEN", str, config.events_listen)
+        return config
+
+
+def parse_target_rates(raw: str) -> Dict[str, float]:
+    """``example.com=20 example.org=5`` as per-target request rates."""
+    rates: Dict[str, float] = {}
+    for spec in raw.split():
+        target, separator, rate = spec.partition("=")
+        if not separator or not target:
+            raise ValueError(f"expected DOMAIN=RATE, got {spec!r}")
+        rates[target.strip().lower()] = float(rate)
+    return rates
+
+
+PROFILES: Dict[str, RunConfig] = {
+    "advanced": RunConfig(),
+    # One stage and one domain at a time, gentler DNS rates, the CIDR and WHOIS intelligence passes
+    "simple": RunConfig(
+        profile="simple",
+        title="Simple Reconnaissance Automation Suite",
+        max_jobs=1,
+        concurrency={"assetfinder": 1, "ffuf": 1, "sudomy": 1, "amass_intel": 1, "probe": 50, "cert": 20,
+                     "port_scan": 100},
+        default_concurrency=1,
+        dns_rate=100.0,
+        dns_concurrency=500,
+        permute_max=50_000,
+        sort_workers=1,
+        cidr_intel=True,
+        whois_ranges=True,
+        required_tools=("python3",),
+        skip_missing_tools=True,
+    ),
+}
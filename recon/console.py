@@ -0,0 +1,36 @@
+"""Status output matching the ``print_status`` helper of the bash scripts."""
+
+from __future__ import annotations
+
+import sys
+
+RED = "\033[0;31m"
+GREEN = "\033[0;32m"
+YELLOW = "\033[1;33m"
+BLUE = "\033[0;34m"
+PURPLE = "\033[0;35m"
+CYAN = "\033[0;36m"
+NC = "\033[0m"
+
+LEVEL_COLORS = {
+    "INFO": BLUE,
+    "SUCCESS": GREEN,
+    "WARNING": YELLOW,
+    "ERROR": RED,
+    "PHASE": PURPLE,
+    "TARGET": CYAN,
+    "PROGRESS": CYAN,
+}
+
+
+def print_status(level: str, message: str, stream=None) -> None:
+    """Print ``[LEVEL] message`` in the same colours as the bash scripts.
+
+    Helpers write to stderr by default so stdout stays free for results.
+    """
+    stream = stream if stream is not None else sys.stderr
+    color = LEVEL_COLORS.get(level, NC)
+    if stream.isatty():
+        print(f"{color}[{level}]{NC} {message}", file=stream, flush=True)
+    else:
+        print(f"[{level}] {message}", file=stream, flush=True)
@@ -0,0 +1,347 @@
+"""Minimal asynchronous DNS client with a shared resolver pool.
+
+Only what the pipeline needs is implemented: building standard recursive
+queries, parsing A/AAAA/CNAME/NS/PTR answers (with name compression) and
+sending them over UDP.  A :class:`ResolverPool` spreads queries over a list
+of upstream resolvers with a per-resolver rate limit, keeps thousands of
+queries in flight over one socket per resolver, and retries timeouts and
+SERVFAIL/REFUSED answers on the next resolver with exponential backoff.
+Truncated UDP answers are asked again over TCP.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import ipaddress
+import random
+import struct
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from .ratelimit import AdaptiveTokenBucket
+
+TYPE_A = 1
+TYPE_NS = 2
+TYPE_CNAME = 5
+TYPE_PTR = 12
+TYPE_AAAA = 28
+TYPE_NAMES = {TYPE_A: "A", TYPE_NS: "NS", TYPE_CNAME: "CNAME", TYPE_PTR: "PTR", TYPE_AAAA: "AAAA"}
+TYPE_CODES = {name: code for code, name in TYPE_NAMES.items()}
+
+CLASS_IN = 1
+
+RCODE_NOERROR = 0
+RCODE_SERVFAIL = 2
+RCODE_NXDOMAIN = 3
+RCODE_REFUSED = 5
+RETRY_RCODES = (RCODE_SERVFAIL, RCODE_REFUSED)
+
+DEFAULT_RESOLVERS = ("1.1.1.1", "8.8.8.8", "9.9.9.9")
+
+
+class DNSError(Exception):
+    """A query could not be answered by any resolver within its retries."""
+
+
+@dataclass
+class Record:
+    name: str
+    type: int
+    ttl: int
+    value: str
+
+
+@dataclass
+class Response:
+    id: int
+    rcode: int
+    truncated: bool
+    question: Tuple[str, int]
+    answers: List[Record] = field(default_factory=list)
+
+    def values(self, rtype: int) -> List[str]:
+        return [record.value for record in self.answers if record.type == rtype]
+
+
+def encode_name(name: str) -> bytes:
+    parts = []
+    for label in name.rstrip(".").split("."):
+        raw = label.encode("ascii")
+        if not raw or len(raw) > 63:
+            raise ValueError(f"invalid DNS name: {name!r}")
+        parts.append(bytes([len(raw)]) + raw)
+    return b"".join(parts) + b"\x00"
+
+
+def build_query(qid: int, name: str, qtype: int) -> bytes:
+    """Standard query with recursion desired."""
+    header = struct.pack("!HHHHHH", qid, 0x0100, 1, 0, 0, 0)
+    return header + encode_name(name) + struct.pack("!HH", qtype, CLASS_IN)
+
+
+def _read_name(data: bytes, offset: int) -> Tuple[str, int]:
+    labels = []
+    end = None
+    jumps = 0
+    while True:
+        length = data[offset]
+        if length & 0xC0 == 0xC0:
+            if end is None:
+                end = offset + 2
+            jumps += 1
+            if jumps > 32:
+                raise ValueError("DNS name compression loop")
+            offset = ((length & 0x3F) << 8) | data[offset + 1]
+            continue
+        offset += 1
+        if length == 0:
+            break
+        labels.append(data[offset:offset + length].decode("ascii", "replace"))
+        offset += length
+    return ".".join(labels).lower(), end if end is not None else offset
+
+
+def parse_response(data: bytes) -> Response:
+    qid, flags, qdcount, ancount, _, _ = struct.unpack("!HHHHHH", data[:12])
+    offset = 12
+    question = ("", 0)
+    for index in range(qdcount):
+        name, offset = _read_name(data, offset)
+        qtype, _ = struct.unpack("!HH", data[offset:offset + 4])
+        offset += 4
+        if index == 0:
+            question = (name, qtype)
+
+    response = Response(id=qid, rcode=flags & 0x000F, truncated=bool(flags & 0x0200), question=question)
+    for _ in range(ancount):
+        name, offset = _read_name(data, offset)
+        rtype, _, ttl, rdlength = struct.unpack("!HHIH", data[offset:offset + 10])
+        offset += 10
+        rdata = data[offset:offset + rdlength]
+        if rtype == TYPE_A and rdlength == 4:
+            value = str(ipaddress.IPv4Address(rdata))
+        elif rtype == TYPE_AAAA and rdlength == 16:
+            value = str(ipaddress.IPv6Address(rdata))
+        elif rtype in (TYPE_CNAME, TYPE_PTR, TYPE_NS):
+            value, _ = _read_name(data, offset)
+        else:
+            value = rdata.hex()
+        response.answers.append(Record(name, rtype, ttl, value))
+        offset += rdlength
+    return response
+
+
+def parse_nameserver(spec: str) -> Tuple[str, int]:
+    """Parse ``host``, ``host:port`` or ``[v6]:port``."""
+    spec = spec.strip()
+    if spec.startswith("["):
+        host, _, port = spec[1:].partition("]:")
+        return host.rstrip("]"), int(port or 53)
+    if spec.count(":") == 1:
+        host, port = spec.split(":")
+        return host, int(port)
+    return spec, 53
+
+
+def system_resolvers(path: str = "/etc/resolv.conf") -> List[str]:
+    try:
+        with open(path, encoding="utf-8") as handle:
+            servers = [line.split()[1] for line in handle if line.startswith("nameserver") and len(line.split()) > 1]
+    except OSError:
+        servers = []
+    return servers or list(DEFAULT_RESOLVERS)
+
+
+def load_resolvers(path: str) -> List[str]:
+    with open(path, encoding="utf-8") as handle:
+        return [line.strip() for line in handle if line.strip() and not line.startswith("#")]
+
+
+class _NameserverProtocol(asyncio.DatagramProtocol):
+    def __init__(self) -> None:
+        self.pending: Dict[int, Tuple[Tuple[str, int], asyncio.Future]] = {}
+
+    def datagram_received(self, data: bytes, addr) -> None:
+        try:
+            response = parse_response(data)
+        except (ValueError, IndexError, struct.error):
+            return
+        entry = self.pending.get(response.id)
+        if entry is None:
+            return
+        question, future = entry
+        if response.question == question and not future.done():
+            future.set_result(response)
+
+    def error_received(self, exc: Exception) -> None:
+        # An ICMP error does not say which query it belongs to, and failing every
+        # query in flight would charge thousands of retries to one lost datagram;
+        # the affected query times out and is retried like any other.
+        pass
+
+
+class Nameserver:
+    """One upstream resolver: a connected UDP socket and its rate limit.
+
+    The rate backs off when the resolver times out or answers SERVFAIL/REFUSED
+    and recovers towards ``rate`` while it keeps answering.
+    """
+
+    def __init__(self, spec: str, rate: float = 0):
+        self.host, self.port = parse_nameserver(spec)
+        self.bucket = AdaptiveTokenBucket(rate, floor=max(1.0, rate / 20))
+        self.transport = None
+        self.protocol: Optional[_NameserverProtocol] = None
+
+    def __repr__(self) -> str:
+        return f"Nameserver({self.host}:{self.port})"
+
+    async def open(self) -> None:
+        loop = asyncio.get_running_loop()
+        self.transport, self.protocol = await loop.create_datagram_endpoint(
+            _NameserverProtocol, remote_addr=(self.host, self.port)
+        )
+
+    def close(self) -> None:
+        if self.transport is not None:
+            self.transport.close()
+
+    async def query(self, name: str, qtype: int, timeout: float) -> Response:
+        await self.bucket.acquire()
+        pending = self.protocol.pending
+        qid = random.getrandbits(16)
+        while qid in pending:
+            qid = random.getrandbits(16)
+        future = asyncio.get_running_loop().create_future()
+        pending[qid] = ((name.rstrip(".").lower(), qtype), future)
+        try:
+            self.transport.sendto(build_query(qid, name, qtype))
+            response = await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            self.bucket.failure()
+            raise
+        finally:
+            pending.pop(qid, None)
+        if response.truncated:
+            try:
+                response = await asyncio.wait_for(self.query_tcp(name, qtype), timeout)
+            except (asyncio.TimeoutError, OSError):
+                self.bucket.failure()
+                raise
+        if response.rcode in RETRY_RCODES:
+            self.bucket.failure()
+        else:
+            self.bucket.success()
+        return response
+
+    async def query_tcp(self, name: str, qtype: int) -> Response:
+        """Ask again over TCP, for answers too large for a UDP datagram."""
+        qid = random.getrandbits(16)
+        query = build_query(qid, name, qtype)
+        reader, writer = await asyncio.open_connection(self.host, self.port)
+        try:
+            writer.write(struct.pack("!H", len(query)) + query)
+            await writer.drain()
+            try:
+                length, = struct.unpack("!H", await reader.readexactly(2))
+                data = await reader.readexactly(length)
+            except asyncio.IncompleteReadError as exc:
+                raise ConnectionError(f"{self} closed the TCP connection") from exc
+        finally:
+            writer.close()
+        try:
+            response = parse_response(data)
+        except (ValueError, IndexError, struct.error) as exc:
+            raise ConnectionError(f"{self} sent a malformed TCP answer") from exc
+        if response.id != qid or response.question != (name.rstrip(".").lower(), qtype):
+            raise ConnectionError(f"{self} answered another question over TCP")
+        return response
+
+
+class ResolverPool:
+    """Spread queries over several resolvers with retries and backoff.
+
+    ``rate`` is the per-resolver query rate (queries/second, 0 = unlimited)
+    and ``concurrency`` caps the number of queries in flight overall.  Use as
+    an async context manager so the sockets are opened and closed.
+    """
+
+    def __init__(
+        self,
+        resolvers: Optional[Sequence[str]] = None,
+        rate: float = 0,
+        timeout: float = 2.0,
+        retries: int = 3,
+        backoff: float = 0.25,
+        concurrency: int = 1000,
+    ):
+        self.nameservers = [Nameserver(spec, rate) for spec in (resolvers or system_resolvers())]
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.semaphore = asyncio.Semaphore(max(1, min(concurrency, 60000 * len(self.nameservers))))
+        self._next = 0
+        self.stats = {"queries": 0, "retries": 0, "failures": 0}
+
+    async def __aenter__(self) -> "ResolverPool":
+        for nameserver in self.nameservers:
+            await nameserver.open()
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        for nameserver in self.nameservers:
+            nameserver.close()
+
+    def _pick(self) -> int:
+        index = self._next
+        self._next = (self._next + 1) % len(self.nameservers)
+        return index
+
+    async def query(self, name: str, qtype: int = TYPE_A) -> Response:
+        """Return the first NOERROR/NXDOMAIN answer, retrying on other resolvers."""
+        async with self.semaphore:
+            start = self._pick()
+            last_error: Optional[BaseException] = None
+            for attempt in range(self.retries + 1):
+                nameserver = self.nameservers[(start + attempt) % len(self.nameservers)]
+                if attempt:
+                    self.stats["retries"] += 1
+                    await asyncio.sleep(self.backoff * (2 ** (attempt - 1)) * random.uniform(0.5, 1.5))
+                self.stats["queries"] += 1
+                try:
+                    response = await nameserver.query(name, qtype, self.timeout)
+                except (asyncio.TimeoutError, OSError) as exc:
+                    last_error = exc
+                    continue
+                if response.rcode in RETRY_RCODES:
+                    last_error = DNSError(f"{nameserver} answered rcode {response.rcode}")
+                    continue
+                return response
+            self.stats["failures"] += 1
+            raise DNSError(f"{name} {TYPE_NAMES.get(qtype, qtype)}: no answer after {self.retries + 1} attempts ({last_error!r})")
+
+    async def resolve(self, name: str, qtype: int = TYPE_A) -> List[str]:
+        """Values of ``qtype`` records for ``name``; empty for NXDOMAIN/NODATA."""
+        response = await self.query(name, qtype)
+        return response.values(qtype)
+
+
+def add_resolver_arguments(parser: argparse.ArgumentParser, concurrency: int = 1000) -> None:
+    """Options shared by every command that queries through a :class:`ResolverPool`."""
+    parser.add_argument("--resolver", action="append", default=[], metavar="HOST[:PORT]",
+                        help="upstream resolver (repeatable, default: /etc/resolv.conf)")
+    parser.add_argument("--resolvers-file", help="file with one resolver per line")
+    parser.add_argument("--rate", type=float, default=0, help="queries per second per resolver (0 = unlimited)")
+    parser.add_argument("--concurrency", type=int, default=concurrency, help="queries in flight")
+    parser.add_argument("--timeout", type=float, default=2.0, help="seconds to wait for an answer")
+    parser.add_argument("--retries", type=int, default=3, help="retries on other resolvers")
+
+
+def pool_options(args: argparse.Namespace) -> dict:
+    """:class:`ResolverPool` keyword arguments from :func:`add_resolver_arguments` options."""
+    resolvers = list(args.resolver)
+    if args.resolvers_file:
+        resolvers.extend(load_resolvers(args.resolvers_file))
+    return dict(resolvers=resolvers or None, rate=args.rate, concurrency=args.concurrency,
+                timeout=args.timeout, retries=args.retries)
@@ -0,0 +1,993 @@
+"""Asyncio orchestrator of the reconnaissance pipeline.
+
+One engine runs both the advanced and the simple suite (see
+:mod:`recon.config` for the presets): the enumeration tools, aggregation,
+resolution, probing and intelligence passes are stages of a :class:`~recon.scheduler.Scheduler`
+graph, each a coroutine that starts the external tools as subprocesses.
+The enumeration stages are built from the declared sources of
+:mod:`recon.sources`, built-in and plugin alike.
+What the bash scripts did through helper invocations happens in-process:
+
+* every tool result goes through the :class:`~recon.cache.ResultCache`,
+* every network tool runs on a lease of the shared :class:`~recon.budget.NetworkBudget`
+  with the rate and concurrency flags of its share,
+* stages and per-target tasks are recorded in the run :class:`~recon.manifest.Manifest`
+  (so ``--resume`` skips finished work) and in the run profile, with the CPU
+  time and peak RSS of the processes they started,
+* they publish their progress to the run's event log, which drives the
+  progress table and the event feed (see :mod:`recon.events`).
+
+The DNS engines, the HTTP probe and the aggregator run as ``python3 -m recon.<module>``
+child processes, so their CPU-bound loops do not stall the orchestrator.
+The output layout is the one of the original ``setup_directories``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import functools
+import os
+import shutil
+import subprocess
+import sys
+import threading
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import IO, Awaitable, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from .broker import DONE, FAILED, open_queue
+from .budget import NetworkBudget, tool_flags
+from .cache import ResultCache, cache_key, normalize_output
+from .config import RunConfig
+from .console import print_status
+from .events import Dashboard, EventLog, History, LineCounter
+from .intel import IntelGraph
+from .manifest import Manifest
+from .parsers import findings_path, write_findings
+from .pool import clean_domain, merge_shards, read_targets, run_pool
+from .profile import MeasuredProcess, Profiler, Usage, count_lines
+from .scheduler import DISK, DNS, NETWORK, Node, Result, Scheduler, resumable
+from .sources import OUTPUT, STDIN, STDOUT, TARGET, Source, enabled
+
+LAYOUT = (
+    "subdomains/subfinder", "subdomains/assetfinder", "subdomains/amass", "subdomains/bbot",
+    "subdomains/ffuf", "subdomains/subdog", "subdomains/sudomy", "subdomains/dnscan",
+    "subdomains/bruteforce", "subdomains/permutations", "subdomains/by_target",
+    "enumeration/live_hosts", "enumeration/technologies", "enumeration/certificates",
+    "intelligence/org_intel", "intelligence/asn_intel", "intelligence/cidr_intel", "intelligence/whois_data",
+    "ports", "screenshots", "reports", "wordlists", "raw_output",
+)
+
+DISPATCH_POLL = 1.0
+
+INDEX_FILE = "subdomains/final_subdomains.idx"
+
+PACKAGE_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def setup_directories(base_dir: str) -> str:
+    for relative in LAYOUT:
+        os.makedirs(os.path.join(base_dir, relative), exist_ok=True)
+    return base_dir
+
+
+def touch(path: str) -> None:
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "a", encoding="utf-8"):
+        pass
+
+
+def iter_lines(paths: Sequence[str]) -> Iterator[str]:
+    """Stripped non-empty lines of ``paths``; unreadable files are skipped."""
+    for path in paths:
+        try:
+            with open(path, encoding="utf-8", errors="replace") as handle:
+                for line in handle:
+                    line = line.strip()
+                    if line:
+                        yield line
+        except OSError:
+            continue
+
+
+def read_lines(paths: Sequence[str]) -> List[str]:
+    return list(iter_lines(paths))
+
+
+def text_files(directory: str) -> List[str]:
+    found = []
+    for root, _, files in os.walk(directory):
+        found.extend(os.path.join(root, name) for name in sorted(files) if name.endswith(".txt"))
+    return found
+
+
+class Meter:
+    """CPU time and peak RSS of the processes a stage or per-target task started.
+
+    Usage is added to the enclosing meter too, so a stage accounts for the
+    processes of its per-target tasks.
+    """
+
+    def __init__(self, parent: Optional["Meter"] = None):
+        self.parent = parent
+        self.started = time.monotonic()
+        self.cpu_user = 0.0
+        self.cpu_system = 0.0
+        self.max_rss_kb = 0
+
+    def add(self, usage: Usage) -> None:
+        self.cpu_user += usage.cpu_user
+        self.cpu_system += usage.cpu_system
+        self.max_rss_kb = max(self.max_rss_kb, usage.max_rss_kb)
+        if self.parent is not None:
+            self.parent.add(usage)
+
+    def usage(self, returncode: int) -> Usage:
+        return Usage(time.monotonic() - self.started, self.cpu_user, self.cpu_system, self.max_rss_kb, returncode)
+
+
+_meter: ContextVar[Optional[Meter]] = ContextVar("recon_meter", default=None)
+
+# Stage and target the running code works for, named in the events it publishes
+_task: ContextVar[Tuple[str, str]] = ContextVar("recon_task", default=("", ""))
+
+
+def _pump(pipe: IO[bytes], output: str, parse: Callable[[Iterable[str]], Iterable[str]],
+          counter: Optional[LineCounter] = None) -> None:
+    """Write what ``parse`` makes of the lines of ``pipe`` to ``output`` as they arrive."""
+    lines = (text for text in (raw.decode("utf-8", "replace").strip() for raw in pipe) if text)
+    try:
+        with open(output, "w", encoding="utf-8") as out:
+            for name in parse(lines):
+                out.write(f"{name}\n")
+                out.flush()
+                if counter is not None:
+                    counter.add()
+    finally:
+        if counter is not None:
+            counter.flush()
+        # Keep the tool from blocking on a full pipe if the parser stopped early
+        for _ in pipe:
+            pass
+        pipe.close()
+
+
+async def _in_thread(func: Callable[..., None], *args) -> None:
+    """Run ``func`` on a thread of its own (a pool thread could be held up by other pumps)."""
+    loop = asyncio.get_running_loop()
+    done = loop.create_future()
+
+    def target() -> None:
+        try:
+            func(*args)
+        except Exception as exc:
+            loop.call_soon_threadsafe(done.set_exception, exc)
+        else:
+            loop.call_soon_threadsafe(done.set_result, None)
+
+    threading.Thread(target=target, daemon=True).start()
+    await done
+
+
+@dataclass
+class StageRun:
+    """What a stage coroutine gets: the targets it scans and, when streaming, its upstream signal."""
+
+    name: str
+    targets_file: str
+    upstream_done: Optional[asyncio.Event] = None
+
+
+@dataclass
+class Stage:
+    """A pipeline stage: its coroutine, scheduling constraints and result files.
+
+    ``outputs`` are relative to the output directory.  ``source`` marks the
+    enumeration tools: their outputs are aggregated, planned in incremental
+    mode and credited with the names only they found; the aggregator also
+    tails their ``partials``, files holding part of the result before the
+    stage finishes.
+    """
+
+    name: str
+    run: Callable[[StageRun], Awaitable[Optional[int]]]
+    resources: Tuple[str, ...] = ()
+    deps: Tuple[str, ...] = ()
+    streams: Tuple[str, ...] = ()
+    outputs: Tuple[str, ...] = ()
+    tools: Tuple[str, ...] = ()
+    source: bool = False
+    partials: Tuple[str, ...] = ()
+
+
+class Engine:
+    """One run of the pipeline over ``targets_file`` into ``output_dir``."""
+
+    def __init__(self, config: RunConfig, output_dir: str, targets_file: str,
+                 budget: Optional[NetworkBudget] = None):
+        self.config = config
+        self.output_dir = output_dir
+        self.targets_file = targets_file
+        self.wordlist = config.find_wordlist()
+        self.cache = ResultCache(config.cache_dir)
+        self.manifest = Manifest(self.out("manifest.db"))
+        # A worker passes the budget its tasks share
+        self._own_budget = budget is None
+        self.budget = budget or NetworkBudget(self.out("budget.db"))
+        # Distributed mode: source stages become tasks on this queue
+        self.queue = open_queue(config.queue) if config.queue else None
+        self.run_id = self.manifest.get_meta("run_id") or ""
+        if self.queue is not None and not self.run_id:
+            # Prefix of the task ids; kept in the manifest so a resumed run finds its tasks
+            self.run_id = f"{os.path.basename(os.path.abspath(output_dir))}-{os.urandom(4).hex()}"
+            self.manifest.set_meta("run_id", self.run_id)
+        self.profiler = Profiler(self.out("reports", "profile.jsonl"))
+        self.events = EventLog(self.out("reports", "events.jsonl"))
+        self.env = dict(os.environ)
+        self.env["PYTHONPATH"] = os.pathsep.join(filter(None, (PACKAGE_ROOT, os.environ.get("PYTHONPATH"))))
+        self._cache_locks: Dict[str, asyncio.Lock] = {}
+        self.stages = self.build_stages()
+
+    def close(self) -> None:
+        self.cache.close()
+        self.manifest.close()
+        self.events.close()
+        if self._own_budget:
+            self.budget.close()
+        if self.queue is not None:
+            self.queue.close()
+
+    def out(self, *parts: str) -> str:
+        return os.path.join(self.output_dir, *parts)
+
+    @property
+    def sources(self) -> List[Stage]:
+        return [stage for stage in self.stages if stage.source]
+
+    # -- stage graph -----------------------------------------------------------
+
+    def build_stages(self) -> List[Stage]:
+        targets = read_targets(self.targets_file)
+        stages = [self.source_stage(source, targets) for source in enabled(self.config)]
+        if not self.config.wordlist_tools:
+            stages.append(Stage("run_dns_bruteforce", self.run_dns_bruteforce, (DNS,),
+                                outputs=("subdomains/bruteforce/bruteforce.txt",), source=True))
+
+        # Stages that add names after the aggregator (resolved, to resolved_hosts.txt) and those that wait for them
+        certificates = ("harvest_certificates",) if self.config.cert_harvest else ()
+        feedback = (*certificates, *(("permute_subdomains",) if self.config.permutations else ()))
+        stages += [
+            Stage("aggregate_subdomains", self.aggregate_subdomains,
+                  streams=tuple(stage.name for stage in stages), outputs=("final_subdomains.txt",)),
+            Stage("resolve_subdomains", self.resolve_subdomains,
+                  streams=("aggregate_subdomains",), outputs=("resolved_subdomains.txt",)),
+            Stage("index_subdomains", self.index_subdomains, (DISK,), deps=("aggregate_subdomains", *feedback),
+                  outputs=(INDEX_FILE,)),
+            Stage("run_amass_intel", self.run_amass_intel, (NETWORK,),
+                  outputs=("intelligence/org_intel/org_intel.txt",), tools=("amass",)),
+        ]
+        if self.config.cert_harvest:
+            stages.append(Stage("harvest_certificates", self.harvest_certificates, streams=("resolve_subdomains",),
+                                outputs=("enumeration/certificates/certificates.jsonl",)))
+        if self.config.permutations:
+            # Learns from the names the certificates added as well
+            stages.append(Stage("permute_subdomains", self.permute_subdomains, (DNS,),
+                                deps=("resolve_subdomains", *certificates),
+                                outputs=("subdomains/permutations/permutations.txt",)))
+        if self.config.http_probe:
+            stages.append(Stage("probe_http", self.probe_http, streams=("resolve_subdomains", *feedback),
+                                outputs=("enumeration/live_hosts/live_hosts.txt",)))
+            if self.config.tech_fingerprint:
+                stages.append(Stage("fingerprint_technologies", self.fingerprint_technologies, streams=("probe_http",),
+                                    outputs=("enumeration/technologies/technologies.txt",)))
+        if self.config.port_scan:
+            stages.append(Stage("scan_ports", self.scan_ports, streams=("resolve_subdomains", *feedback),
+                                outputs=("ports/ports.jsonl",)))
+        if self.config.reverse_dns:
+            stages.append(Stage("run_reverse_dns", self.run_reverse_dns, streams=("run_amass_intel",),
+                                outputs=("intelligence/reverse_dns_results.txt",)))
+        if self.config.incremental:
+            stages.append(Stage("update_state", self.update_state, deps=("aggregate_subdomains", *feedback)))
+        return stages
+
+    def source_stage(self, source: Source, targets: Sequence[str]) -> Stage:
+        # Per-domain shards are tailed by the aggregator before the stage merges them
+        shards = tuple(f"raw_output/{source.name}/{clean_domain(domain)}.txt" for domain in targets
+                       ) if source.input == TARGET and self.queue is None else ()
+        return Stage(source.stage, functools.partial(self.run_source, source), source.resources,
+                     outputs=(source.result,), tools=(source.binary,), source=True, partials=shards)
+
+    def missing_tools(self, tools: Sequence[str]) -> List[str]:
+        return [tool for tool in tools if shutil.which(tool) is None]
+
+    def _node(self, stage: Stage) -> Node:
+        async def run() -> int:
+            return await self._run_stage(stage, node.upstream_done)
+
+        node = Node(name=stage.name, run=run, resources=stage.resources, deps=stage.deps, streams=stage.streams)
+        return node
+
+    async def _run_stage(self, stage: Stage, upstream_done: Optional[asyncio.Event]) -> int:
+        targets_file = self.targets_file
+        if stage.source and self.config.incremental:
+            # In incremental mode a tool only scans the targets whose cached results are stale
+            plan_file = self.out("state", f"{stage.name}.targets")
+            if os.path.isfile(plan_file):
+                if os.path.getsize(plan_file) == 0:
+                    print_status("INFO", f"Skipping {stage.name}: cached results are still fresh")
+                    return 0
+                targets_file = plan_file
+
+        missing = self.missing_tools(stage.tools) if not (stage.source and self.queue) else []
+        if missing and self.config.skip_missing_tools:
+            print_status("WARNING", f"Skipping {stage.name}: {', '.join(missing)} not installed")
+            for output in stage.outputs:
+                touch(self.out(output))
+            return 0
+
+        meter = Meter()
+        token = _meter.set(meter)
+        task = _task.set((stage.name, ""))
+        outputs = [self.out(output) for output in stage.outputs]
+        self.events.publish("stage_started", stage=stage.name, outputs=outputs)
+        returncode = 1
+        try:
+            returncode = await stage.run(StageRun(stage.name, targets_file, upstream_done)) or 0
+        finally:
+            _meter.reset(token)
+            _task.reset(task)
+            usage = meter.usage(returncode)
+            record = self.profiler.record(stage.name, usage, outputs=outputs)
+            self.events.publish("stage_finished", stage=stage.name, returncode=returncode, wall=round(usage.wall, 3),
+                                lines=record.lines)
+        return returncode
+
+    async def run(self) -> Dict[str, Result]:
+        """Run the stage graph; stages a previous attempt finished are skipped."""
+        print_status("PHASE", "Starting scheduled reconnaissance pipeline...")
+        if self.config.incremental:
+            await self.plan_incremental()
+
+        scheduler = Scheduler(budgets=dict(self.config.budgets), max_jobs=self.config.max_jobs)
+        for stage in self.stages:
+            scheduler.add(self._node(stage))
+        outputs = {stage.name: [self.out(output) for output in stage.outputs] for stage in self.stages}
+        for name in resumable(scheduler, self.manifest, outputs):
+            print_status("INFO", f"Skipping {name}: finished by a previous attempt")
+
+        dashboard = Dashboard(self.events.path, self.config.progress_interval, self.config.events_listen,
+                              History(os.path.join(self.config.cache_dir, "durations.json")))
+        await dashboard.start()
+        self.events.publish("run_started", profile=self.config.profile,
+                            targets=len(read_targets(self.targets_file)))
+        workers = self.start_workers(self.config.workers) if self.queue is not None else []
+        try:
+            results = await scheduler.run()
+        finally:
+            self.stop_workers(workers)
+            self.events.publish("run_finished")
+            await dashboard.stop()
+        for result in sorted(results.values(), key=lambda item: item.started):
+            level = "SUCCESS" if result.ok else "WARNING"
+            print_status(level, f"{result.name} finished in {result.elapsed:.1f}s (exit {result.returncode})")
+        if not all(result.ok for result in results.values()):
+            print_status("WARNING", "Some pipeline stages failed, continuing with available results...")
+        return results
+
+    def start_workers(self, count: int) -> List[subprocess.Popen]:
+        """Local worker processes for the run's queue, logging to ``raw_output/workers``."""
+        log_dir = self.out("raw_output", "workers")
+        os.makedirs(log_dir, exist_ok=True)
+        workers = []
+        for index in range(1, count + 1):
+            with open(os.path.join(log_dir, f"worker_{index}.log"), "ab") as log:
+                workers.append(subprocess.Popen(
+                    [sys.executable, "-m", "recon.worker", "--queue", self.config.queue,
+                     "--work-dir", os.path.join(log_dir, f"worker_{index}"), "--name", f"{self.run_id}:{index}",
+                     "--parent", str(os.getpid())],
+                    stdin=subprocess.DEVNULL, stdout=log, stderr=log, env=self.env,
+                ))
+        if workers:
+            print_status("INFO", f"Started {len(workers)} local workers on {self.config.queue}")
+        return workers
+
+    def stop_workers(self, workers: Sequence[subprocess.Popen]) -> None:
+        for worker in workers:
+            worker.terminate()
+        for worker in workers:
+            try:
+                worker.wait(timeout=30)
+            except subprocess.TimeoutExpired:
+                worker.kill()
+                worker.wait()
+
+    # -- processes -------------------------------------------------------------
+
+    async def run_process(
+        self,
+        argv: Sequence[str],
+        stdout: Optional[str] = None,
+        stdin: Optional[str] = None,
+        stdin_until: Optional[asyncio.Event] = None,
+        timeout: Optional[int] = None,
+        quiet: bool = True,
+        parse: Optional[Callable[[Iterable[str]], Iterable[str]]] = None,
+    ) -> int:
+        """Run ``argv`` to completion and return its exit status (127 if it is not installed).
+
+        ``stdout``/``stdin`` name files to redirect to/from.  With ``parse``
+        the stripped lines of stdout go through it and its results are
+        written to ``stdout`` line by line while the process runs.  With
+        ``stdin_until`` the process reads a pipe that is closed once the
+        event is set.  ``quiet`` discards the tool's own output, as the
+        scripts did with ``2>/dev/null``.
+        """
+        argv = list(argv)
+        if timeout:
+            argv = ["timeout", str(timeout), *argv]
+        out = open(stdout, "wb") if stdout and parse is None else None
+        inp = open(stdin, "rb") if stdin else None
+        try:
+            process = MeasuredProcess(
+                argv,
+                stdin=inp or (subprocess.PIPE if stdin_until is not None else subprocess.DEVNULL),
+                stdout=subprocess.PIPE if parse else out or (subprocess.DEVNULL if quiet else None),
+                stderr=subprocess.DEVNULL if quiet else None,
+                env=self.env,
+            )
+        except FileNotFoundError:
+            print_status("WARNING", f"{argv[0]} not found")
+            return 127
+        finally:
+            for handle in (out, inp):
+                if handle is not None:
+                    handle.close()
+
+        pumped = None
+        if parse is not None:
+            stage, target = _task.get()
+            counter = LineCounter(self.events, stage, target) if stage else None
+            pumped = asyncio.ensure_future(_in_thread(_pump, process.popen.stdout, stdout, parse, counter))
+        exited = asyncio.ensure_future(process.wait())
+        if stdin_until is not None:
+            upstream = asyncio.ensure_future(stdin_until.wait())
+            await asyncio.wait({exited, upstream}, return_when=asyncio.FIRST_COMPLETED)
+            upstream.cancel()
+            if not exited.done():
+                process.stdin.close()
+        usage = await exited
+        if pumped is not None:
+            await pumped
+        meter = _meter.get()
+        if meter is not None:
+            meter.add(usage)
+        return usage.returncode
+
+    async def run_module(self, module: str, *args: str, **kwargs) -> int:
+        """Run ``python3 -m recon.<module>``, showing its status output."""
+        return await self.run_process([sys.executable, "-m", f"recon.{module}", *args], quiet=False, **kwargs)
+
+    async def run_tool(self, tool: str, argv: Sequence[str], target: str = "", **kwargs) -> int:
+        """Run a network tool on a lease of the shared budget, with the flags of its share.
+
+        The exit status adapts the budget: failures and timeouts back it off.
+        The budget is a SQLite database shared with other processes, so it is
+        used from a thread rather than blocking the event loop on its locks.
+        """
+        target = target.strip().lower()
+        while True:
+            share = await asyncio.to_thread(self.budget.lease, tool, os.getpid(), target)
+            if share is not None:
+                break
+            await asyncio.sleep(1.0)
+        returncode = 1
+        try:
+            returncode = await self.run_process([*argv, *tool_flags(tool, share)], **kwargs)
+        finally:
+            await asyncio.to_thread(self.budget.release, tool, os.getpid(), target, returncode == 0)
+        if returncode != 0:
+            label = f"{tool} {target}".strip()
+            print_status("WARNING", f"{label} exited with {returncode}, backing off the network budget")
+        return returncode
+
+    async def cached(
+        self,
+        output: str,
+        tool: str,
+        produce: Callable[[], Awaitable[object]],
+        target: str = "",
+        args: Sequence[str] = (),
+        inputs: Sequence[str] = (),
+    ) -> bool:
+        """Fill ``output`` from the result cache, or by awaiting ``produce()`` and caching what it wrote.
+
+        Returns whether the cache had the result.  Identical invocations,
+        in this run or another, wait for the first one instead of running
+        the tool twice.  Empty results, and those of a ``produce()`` that
+        returned a non-zero exit status, are not stored.
+        """
+        key = cache_key(tool, target, args, inputs)
+        label = f"{tool} {target}".strip()
+        ttl = self.config.cache_ttl_hours * 3600
+        async with self._cache_locks.setdefault(key, asyncio.Lock()):
+            while True:
+                content = await asyncio.to_thread(self.cache.get, key, ttl, self.config.cache_not_before)
+                if content is not None:
+                    with open(output, "wb") as handle:
+                        handle.write(content)
+                    print_status("INFO", f"Cache hit: {label}")
+                    return True
+                if await asyncio.to_thread(self.cache.claim, key, os.getpid()) is None:
+                    break
+                await asyncio.sleep(1.0)
+
+            try:
+                if await produce() not in (None, 0):
+                    return False
+                try:
+                    with open(output, encoding="utf-8", errors="replace") as handle:
+                        content = normalize_output(handle)
+                except OSError:
+                    content = b""
+                if content:
+                    await asyncio.to_thread(self.cache.put, key, tool, target, content)
+                    await asyncio.to_thread(self.cache.prune, ttl, self.config.cache_max_size_mb * 1024 * 1024)
+            finally:
+                await asyncio.to_thread(self.cache.release, key)
+        return False
+
+    async def per_target(
+        self,
+        task: str,
+        parent: str,
+        targets_file: str,
+        concurrency: int,
+        shard_dir: str,
+        merged_file: str,
+        run: Callable[[str, str], Awaitable[Optional[int]]],
+        shard_pattern: str = "{clean}.txt",
+        dedupe: bool = True,
+    ) -> int:
+        """Run ``run(domain, shard)`` for every target on a bounded pool and merge the shards.
+
+        Each target is a ``task`` in the manifest and the profile; targets a
+        previous attempt finished are not run again.  Returns 1 if a target
+        failed, else 0.
+        """
+        os.makedirs(shard_dir, exist_ok=True)
+        targets = read_targets(targets_file)
+        shards = {
+            domain: os.path.join(shard_dir, shard_pattern.format(clean=clean_domain(domain), domain=domain))
+            for domain in targets
+        }
+        for domain in targets:
+            self.manifest.register(task, domain)
+        self.events.publish("pool_started", stage=parent, task=task, targets=len(targets), concurrency=concurrency)
+
+        async def worker(domain: str) -> int:
+            shard = shards[domain]
+            if self.manifest.is_complete(task, domain, [shard]):
+                print_status("INFO", f"Skipping {task} {domain}: finished by a previous attempt")
+                self.events.publish("task_finished", stage=parent, task=task, target=domain, returncode=0,
+                                    skipped=True)
+                return 0
+            self.manifest.start(task, domain)
+            meter = Meter(parent=_meter.get())
+            _meter.set(meter)
+            _task.set((parent, domain))
+            self.events.publish("task_started", stage=parent, task=task, target=domain, output=shard)
+            returncode = 1
+            try:
+                returncode = await run(domain, shard) or 0
+                if not os.path.exists(shard):
+                    touch(shard)
+            finally:
+                self.manifest.finish(task, domain, returncode, [shard])
+                usage = meter.usage(returncode)
+                record = self.profiler.record(task, usage, target=domain, parent=parent, outputs=[shard])
+                self.events.publish("task_finished", stage=parent, task=task, target=domain, returncode=returncode,
+                                    wall=round(usage.wall, 3), lines=record.lines)
+            return returncode
+
+        results = await run_pool(targets, worker, concurrency)
+        failed = sorted(domain for domain, code in results.items() if code != 0)
+        if failed:
+            print_status("WARNING", f"{len(failed)} of {len(results)} targets failed: {' '.join(failed)}")
+        # A large merge sorts on worker processes; keep the event loop free meanwhile
+        await _in_thread(functools.partial(merge_shards, [shards[domain] for domain in targets], merged_file,
+                                           dedupe=dedupe, memory_mb=self.config.sort_memory_mb,
+                                           workers=self.config.sort_workers))
+        return 1 if failed else 0
+
+    def report_count(self, label: str, path: str) -> None:
+        if os.path.isfile(path):
+            print_status("SUCCESS", f"{label} found {count_lines([path])} subdomains")
+        else:
+            print_status("WARNING", f"{label} output file not created")
+            touch(path)
+
+    # -- enumeration stages ------------------------------------------------------
+
+    def _paths(self, source: Source, targets_file: str, domain: str = "", output: str = "") -> Dict[str, str]:
+        """Values of the placeholders of ``source``'s templates."""
+        values = {"targets": targets_file, "domain": domain, "clean": clean_domain(domain),
+                  "output": output, "wordlist": self.wordlist or ""}
+        values["raw"] = self.out(source.raw.format_map(values)) if source.raw not in (STDOUT, OUTPUT) else output
+        return values
+
+    async def produce_source(self, source: Source, targets_file: str, output: str, domain: str = "") -> int:
+        """Run ``source`` once, write the names it found to ``output`` and return the tool's exit status."""
+        values = self._paths(source, targets_file, domain, output)
+        argv = [source.binary, *(arg.format_map(values) for arg in source.argv)]
+        stdin = targets_file if source.input == STDIN else None
+        if source.raw == STDOUT:
+            # Names reach the result file, and the aggregator, while the tool is still running
+            return await self.run_tool(source.binary, argv, target=domain, stdin=stdin, stdout=output,
+                                       parse=lambda lines: source.parser(lines, domain), timeout=source.timeout)
+        if source.raw != OUTPUT:
+            os.makedirs(os.path.dirname(values["raw"]), exist_ok=True)
+        returncode = await self.run_tool(source.binary, argv, target=domain, stdin=stdin, timeout=source.timeout)
+        if source.reader is not None:
+            # Large structured outputs are read off the event loop
+            raw = values["raw"]
+            await _in_thread(write_findings, source.reader(raw, domain), output, findings_path(raw))
+        elif source.raw != OUTPUT:
+            raw = values["raw"]
+            files = text_files(raw) if os.path.isdir(raw) else [raw]
+            with open(output, "w", encoding="utf-8") as out:
+                out.writelines(f"{name}\n" for name in source.parser(iter_lines(files), domain))
+        return returncode
+
+    async def source_target(self, source: Source, domain: str, shard: str) -> int:
+        print_status("TARGET", f"{source.title} processing: {domain}")
+        returncode = 0
+
+        async def produce() -> int:
+            nonlocal returncode
+            returncode = await self.produce_source(source, self.targets_file, shard, domain)
+            return returncode
+
+        inputs = [self.wordlist] if source.wordlist else []
+        await self.cached(shard, source.name, produce, target=domain, args=source.cache_args, inputs=inputs)
+        return returncode
+
+    async def run_source(self, source: Source, run: StageRun) -> int:
+        """Run ``source`` on the targets of ``run`` (or queue it) and return 0, or non-zero if the tool failed."""
+        output = self.out(source.result)
+        os.makedirs(os.path.dirname(output), exist_ok=True)
+        if self.queue is not None:
+            return await self.dispatch_source(source, run)
+        if source.wordlist and self.wordlist is None:
+            print_status("WARNING", f"No wordlist found for {source.title}, skipping...")
+            touch(output)
+            return 0
+        print_status("INFO", f"Running {source.title}...")
+
+        if source.input == TARGET:
+            concurrency = self.config.concurrency.get(source.name, self.config.default_concurrency)
+
+            async def target(domain: str, shard: str) -> int:
+                return await self.source_target(source, domain, shard)
+
+            returncode = await self.per_target(source.task, run.name, run.targets_file, concurrency,
+                                               self.out("raw_output", source.name), output, target)
+        else:
+            returncode = 0
+
+            async def produce() -> int:
+                nonlocal returncode
+                returncode = await self.produce_source(source, run.targets_file, output)
+                return returncode
+
+            inputs = [run.targets_file, *([self.wordlist] if source.wordlist else [])]
+            await self.cached(output, source.name, produce, args=source.cache_args, inputs=inputs)
+        self.report_count(source.title, output)
+        return returncode
+
+    async def dispatch_source(self, source: Source, run: StageRun) -> int:
+        """Queue ``source`` in shards of targets and append the names the workers stream back to its result."""
+        output = self.out(source.result)
+        targets = read_targets(run.targets_file)
+        size = max(1, self.config.shard_size)
+        task_ids = []
+        for index in range(0, len(targets), size):
+            shard = targets[index:index + size]
+            # The id names the slice of targets, so a resume with another SHARD_SIZE does not replay the wrong one
+            task_ids.append(f"{self.run_id}:{source.name}:{index}+{len(shard)}")
+            self.queue.enqueue(task_ids[-1], {"profile": self.config.profile, "source": source.name,
+                                              "targets": shard})
+        print_status("INFO", f"Queued {source.title}: {len(task_ids)} tasks of up to {size} targets")
+
+        # A resumed run replays the results of tasks finished before, so the file is rebuilt from the start
+        seen = set()
+        cursor = None
+        with open(output, "w", encoding="utf-8") as out:
+            while True:
+                states = self.queue.status(task_ids)
+                cursor, names = self.queue.results(task_ids, cursor)
+                for name in names:
+                    if name not in seen:
+                        seen.add(name)
+                        out.write(f"{name}\n")
+                out.flush()
+                if all(states.get(task_id, ("", ""))[0] in (DONE, FAILED) for task_id in task_ids):
+                    break
+                await asyncio.sleep(DISPATCH_POLL)
+
+        failed = {task_id: error for task_id, (status, error) in states.items() if status == FAILED}
+        for task_id, error in sorted(failed.items()):
+            print_status("WARNING", f"{task_id} failed: {error}")
+        self.report_count(source.title, output)
+        return 1 if failed else 0
+
+    async def run_dns_bruteforce(self, run: StageRun) -> int:
+        output = self.out("subdomains/bruteforce/bruteforce.txt")
+        if self.wordlist is None:
+            print_status("WARNING", "No wordlist found for DNS brute-force, skipping...")
+            touch(output)
+            return 0
+        print_status("INFO", f"Running DNS brute-force (depth {self.config.bruteforce_depth})...")
+        # One pass over all targets; names other tools already reported are not queried again
+        returncode = await self.run_module(
+            "bruteforce", "--targets", run.targets_file, "--wordlist", self.wordlist,
+            "--depth", str(self.config.bruteforce_depth),
+            "--known", self.out("final_subdomains.txt"),
+            "--known", self.out("state", "cached_subdomains.txt"),
+            "--output", output, *self.config.dns_args(),
+        )
+        if os.path.isfile(output):
+            print_status("SUCCESS", f"DNS brute-force found {count_lines([output])} subdomains")
+        return returncode
+
+    # -- aggregation and resolution ----------------------------------------------
+
+    async def aggregate_subdomains(self, run: StageRun) -> int:
+        print_status("PHASE", "Aggregating and cleaning subdomain results as tools write them...")
+        # Every tool output, plus names replayed from the state store in incremental mode
+        inputs = [self.out(output) for stage in self.sources for output in (*stage.outputs, *stage.partials)]
+        inputs.append(self.out("state", "cached_subdomains.txt"))
+        returncode = await self.run_module(
+            "aggregate", "--follow",
+            "--output", self.out("final_subdomains.txt"),
+            "--raw", self.out("subdomains", "all_subdomains_raw.txt"),
+            "--clean", self.out("subdomains", "all_subdomains_clean.txt"),
+            "--sort-memory-mb", f"{self.config.sort_memory_mb:g}",
+            "--sort-workers", str(self.config.sort_workers),
+            "--events", self.events.path,
+            *inputs, stdin_until=run.upstream_done,
+        )
+        print_status("SUCCESS", f"Total unique subdomains found: {count_lines([self.out('final_subdomains.txt')])}")
+        return returncode
+
+    async def index_subdomains(self, run: StageRun) -> int:
+        """Reversed-label index of the final names and the per-target lists in subdomains/by_target."""
+        print_status("PHASE", "Indexing subdomains by target...")
+        return await self.run_module(
+            "index", "--index", self.out(INDEX_FILE), "build",
+            "--input", self.out("final_subdomains.txt"),
+            "--roots", self.targets_file, "--shard-dir", self.out("subdomains", "by_target"),
+        )
+
+    async def resolve_subdomains(self, run: StageRun) -> int:
+        print_status("PHASE", "Resolving subdomains and filtering wildcard DNS...")
+        # Tail final_subdomains.txt while the aggregator writes it
+        returncode = await self.run_module(
+            "resolve", "--follow",
+            "--input", self.out("final_subdomains.txt"),
+            "--output", self.out("resolved_subdomains.txt"),
+            "--hosts", self.out("subdomains", "resolved_hosts.txt"),
+            "--wildcards", self.out("subdomains", "wildcard_subdomains.txt"),
+            *self.config.dns_args(), stdin_until=run.upstream_done,
+        )
+        print_status("SUCCESS", f"Resolved subdomains: {count_lines([self.out('resolved_subdomains.txt')])}")
+        return returncode
+
+    # -- permutations ---------------------------------------------------------------
+
+    async def permute_subdomains(self, run: StageRun) -> int:
+        print_status("PHASE", "Resolving permutations learned from the resolved subdomains...")
+        permutations = self.out("subdomains", "permutations")
+        # Candidates stream from the generator into the resolver; names found are appended like the certificates'
+        returncode = await self.run_module(
+            "permute",
+            "--input", self.out("resolved_subdomains.txt"),
+            "--scope", self.targets_file,
+            "--known", self.out("final_subdomains.txt"),
+            "--known", self.out("state", "cached_subdomains.txt"),
+            "--append", self.out("final_subdomains.txt"),
+            "--output", os.path.join(permutations, "permutations.txt"),
+            "--rules", os.path.join(permutations, "rules.txt"),
+            "--resolved", self.out("resolved_subdomains.txt"),
+            "--hosts", self.out("subdomains", "resolved_hosts.txt"),
+            "--wildcards", self.out("subdomains", "wildcard_subdomains.txt"),
+            *self.config.permute_args(), *self.config.dns_args(),
+        )
+        print_status("SUCCESS", f"New subdomains from permutations: "
+                                f"{count_lines([os.path.join(permutations, 'permutations.txt')])}")
+        return returncode
+
+    # -- certificates ---------------------------------------------------------------
+
+    async def harvest_certificates(self, run: StageRun) -> int:
+        print_status("PHASE", "Harvesting TLS certificates of the resolved subdomains...")
+        certs = self.out("enumeration", "certificates")
+        # In-scope SAN names nobody found are resolved and appended to the name lists once resolution is done
+        returncode = await self.run_module(
+            "certs", "--follow",
+            "--input", self.out("subdomains", "resolved_hosts.txt"),
+            "--scope", self.targets_file,
+            "--output", os.path.join(certs, "certificates.jsonl"),
+            "--tls-hosts", os.path.join(certs, "tls_hosts.jsonl"),
+            "--names", os.path.join(certs, "san_subdomains.txt"),
+            "--new", os.path.join(certs, "new_subdomains.txt"),
+            "--known", self.out("final_subdomains.txt"),
+            "--resolved", self.out("resolved_subdomains.txt"),
+            "--wildcards", self.out("subdomains", "wildcard_subdomains.txt"),
+            *self.config.cert_args(), *self.config.dns_args(), stdin_until=run.upstream_done,
+        )
+        print_status("SUCCESS", f"New subdomains from certificates: "
+                                f"{count_lines([os.path.join(certs, 'new_subdomains.txt')])}")
+        return returncode
+
+    # -- live hosts -----------------------------------------------------------------
+
+    async def probe_http(self, run: StageRun) -> int:
+        print_status("PHASE", "Probing HTTP/HTTPS services of the resolved subdomains...")
+        live = self.out("enumeration", "live_hosts")
+        # Tail resolved_hosts.txt while the resolver writes it; each name is probed at its resolved address
+        returncode = await self.run_module(
+            "probe", "--follow",
+            "--input", self.out("subdomains", "resolved_hosts.txt"),
+            "--output", os.path.join(live, "live_hosts.jsonl"),
+            "--urls", os.path.join(live, "live_hosts.txt"),
+            *(["--responses", os.path.join(live, "responses.jsonl"), "--favicon"] if self.config.tech_fingerprint
+              else []),
+            *self.config.probe_args(), stdin_until=run.upstream_done,
+        )
+        print_status("SUCCESS", f"Live HTTP services: {count_lines([os.path.join(live, 'live_hosts.txt')])}")
+        return returncode
+
+    async def fingerprint_technologies(self, run: StageRun) -> int:
+        print_status("PHASE", "Fingerprinting the technologies of the live HTTP services...")
+        technologies = self.out("enumeration", "technologies")
+        # Tail the probe's captured responses; the indexed rules are cached under the cache directory
+        returncode = await self.run_module(
+            "fingerprint", "--follow",
+            "--input", self.out("enumeration", "live_hosts", "responses.jsonl"),
+            "--output", os.path.join(technologies, "technologies.jsonl"),
+            "--summary", os.path.join(technologies, "technologies.txt"),
+            *self.config.fingerprint_args(), stdin_until=run.upstream_done,
+        )
+        print_status("SUCCESS", f"Fingerprinted hosts: "
+                                f"{count_lines([os.path.join(technologies, 'technologies.txt')])}")
+        return returncode
+
+    # -- ports ----------------------------------------------------------------------
+
+    async def scan_ports(self, run: StageRun) -> int:
+        print_status("PHASE", "Scanning the ports of the resolved addresses...")
+        # Tail resolved_hosts.txt while the resolver writes it; an address shared by many names is scanned once
+        returncode = await self.run_module(
+            "ports", "--follow",
+            "--input", self.out("subdomains", "resolved_hosts.txt"),
+            "--output", self.out("ports", "ports.jsonl"),
+            "--ips", self.out("ports", "ip_ports.txt"),
+            "--hosts", self.out("ports", "host_ports.txt"),
+            *self.config.port_scan_args(), stdin_until=run.upstream_done,
+        )
+        print_status("SUCCESS", f"Open ports: {count_lines([self.out('ports', 'ports.jsonl')])}")
+        return returncode
+
+    # -- intelligence --------------------------------------------------------------
+
+    async def amass_org_target(self, domain: str, shard: str) -> None:
+        org_name = domain.split(".")[0]
+        print_status("TARGET", f"Intel gathering for: {domain}")
+
+        async def produce() -> None:
+            await self.run_tool("amass", ["amass", "intel", "-org", org_name, "-o", shard], target=domain)
+
+        # Targets sharing a first label share the org lookup
+        await self.cached(shard, "amass_intel_org", produce, target=org_name)
+
+    async def amass_intel_lookup(self, kind: str, value: str) -> List[str]:
+        """Lines of ``amass intel -active -<kind> <value>``, from the cache when an earlier run asked the same."""
+        directory = "asn_intel" if kind == "asn" else f"{kind}_intel"
+        output = self.out("intelligence", directory, f"{kind}_{value.replace('/', '_')}.txt")
+
+        async def produce() -> None:
+            await self.run_tool("amass", ["amass", "intel", "-active", f"-{kind}", value, "-o", output])
+
+        await self.cached(output, f"amass_intel_{kind}", produce, target=value, args=["-active"])
+        return read_lines([output])
+
+    async def whois_lookup(self, asn: str) -> List[str]:
+        """The RADb registry's answer for the routes of ``asn``, cached like the amass lookups."""
+        answer = self.out("intelligence", "whois_data", f"whois_{asn}.txt")
+
+        async def produce() -> None:
+            await self.run_tool("whois", ["whois", "-h", "whois.radb.net", "--", f"-i origin {asn}"], stdout=answer)
+
+        await self.cached(answer, "whois_radb", produce, target=asn)
+        return read_lines([answer])
+
+    async def run_amass_intel(self, run: StageRun) -> int:
+        intel = self.out("intelligence")
+        org_intel = os.path.join(intel, "org_intel", "org_intel.txt")
+        print_status("PHASE", "Running Amass intelligence gathering...")
+        whois = self.config.whois_ranges
+        if whois and self.missing_tools(["whois"]):
+            print_status("WARNING", "whois not installed, skipping WHOIS lookups")
+            whois = False
+
+        # Every ASN is looked up as soon as the first organization answer naming it is in,
+        # its ranges as soon as its answer is; the reverse DNS sweep tails all_asn.txt and whois_cidrs.txt
+        with open(os.path.join(intel, "asn_intel", "all_asn.txt"), "w", encoding="utf-8") as asn_file, \
+                open(os.path.join(intel, "whois_data", "whois_cidrs.txt"), "w", encoding="utf-8") as whois_file:
+            graph = IntelGraph(
+                functools.partial(self.amass_intel_lookup, "asn"), asn_file,
+                whois=self.whois_lookup if whois else None, whois_file=whois_file,
+                cidr=functools.partial(self.amass_intel_lookup, "cidr") if self.config.cidr_intel else None,
+                concurrency=self.config.concurrency["amass_intel"],
+            )
+
+            async def org_target(domain: str, shard: str) -> None:
+                await self.amass_org_target(domain, shard)
+                graph.add_org(read_lines([shard]))
+
+            print_status("INFO", "Gathering organization, ASN and CIDR intelligence...")
+            await self.per_target("amass_org_target", run.name, run.targets_file,
+                                  self.config.concurrency["amass_intel"], os.path.join(intel, "org_intel"),
+                                  org_intel, org_target, shard_pattern="org_{clean}.txt", dedupe=False)
+            # Organizations a previous attempt looked up
+            graph.add_org(read_lines([org_intel]))
+            await graph.join()
+
+        print_status("SUCCESS", f"Intelligence: {len(graph.asns)} ASNs, {len(graph.routes)} WHOIS routes, "
+                                f"{len(graph.networks)} CIDR lookups")
+        return 1 if graph.failed else 0
+
+    async def run_reverse_dns(self, run: StageRun) -> int:
+        print_status("PHASE", "Performing reverse DNS lookups...")
+        # Ranges of the ASN intelligence and the WHOIS routes, swept as the intel stage finds them
+        returncode = await self.run_module(
+            "reverse", "--follow",
+            "--input", self.out("intelligence", "asn_intel", "all_asn.txt"),
+            "--input", self.out("intelligence", "whois_data", "whois_cidrs.txt"),
+            "--cidrs", self.out("intelligence", "cidr_ranges.txt"),
+            "--output", self.out("intelligence", "reverse_dns_results.txt"),
+            *self.config.dns_args(), stdin_until=run.upstream_done,
+        )
+        if returncode != 0:
+            print_status("WARNING", "Reverse DNS sweep failed")
+        return returncode
+
+    # -- incremental state -----------------------------------------------------------
+
+    async def plan_incremental(self) -> None:
+        """Decide which targets each tool still has to scan."""
+        print_status("INFO", f"Incremental mode: state store {self.config.state_db} "
+                             f"(TTL {self.config.state_ttl_hours:g}h)")
+        stage_args = [arg for stage in self.sources for arg in ("--stage", stage.name)]
+        await self.run_module("state", "--db", self.config.state_db, "plan", "--targets", self.targets_file,
+                              "--plan-dir", self.out("state"), "--ttl-hours", f"{self.config.state_ttl_hours:g}",
+                              *stage_args)
+
+    async def update_state(self, run: StageRun) -> int:
+        """Record this run in the state store and write new/vanished names.
+
+        Besides the sources' results, the names the certificate and
+        permutation feedback added to ``final_subdomains.txt`` are recorded
+        under those stages, so they take part in the new/vanished diff too.
+        """
+        print_status("PHASE", "Updating incremental state store...")
+        outputs = {stage.name: self.out(stage.outputs[0]) for stage in self.sources}
+        if self.config.cert_harvest:
+            outputs["harvest_certificates"] = self.out("enumeration", "certificates", "new_subdomains.txt")
+        if self.config.permutations:
+            outputs["permute_subdomains"] = self.out("subdomains", "permutations", "permutations.txt")
+        stage_args = [arg for stage, path in outputs.items() for arg in ("--stage", f"{stage}={path}")]
+        return await self.run_module("state", "--db", self.config.state_db, "record",
+                                     "--targets", self.targets_file, "--plan-dir", self.out("state"),
+                                     *stage_args)
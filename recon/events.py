@@ -0,0 +1,527 @@
+"""Run events, the live progress view and the monitoring feed.
+
+Every stage and per-target task publishes what it does to the run's event
+log, ``reports/events.jsonl``, one JSON object per line with the ``time``
+and ``kind`` of the event::
+
+    {"kind": "task_finished", "stage": "run_sudomy", "task": "sudomy_target",
+     "target": "example.com", "returncode": 0, "wall": 212.4, "lines": 57, "time": 1735732800.1}
+
+Kinds: ``run_started``/``run_finished``, ``stage_started``/``stage_finished``
+(with the stage's ``outputs``), ``pool_started`` (targets and concurrency of
+a stage's per-target pool), ``task_started``/``task_finished`` (with the
+task's ``output``), ``lines`` (names a tool has written so far, published
+while it runs) and ``names`` (new unique names the aggregator took from one
+of the outputs).  Like the profile, the log is appended with one
+``O_APPEND`` write per event, so the engine, its threads and the aggregator
+process all publish to it.
+
+The :class:`Dashboard` of a run tails the log.  Every ``PROGRESS_INTERVAL``
+seconds it prints a table of the running stages: targets done and running,
+lines and new names per minute, and an ETA.  The ETA comes from the
+per-target durations of this run, or, before the first target of a stage
+finishes, from the durations of earlier runs kept in
+``<CACHE_DIR>/durations.json``.  With ``EVENTS_LISTEN`` (``127.0.0.1:8765``
+or ``unix:/run/recon.sock``) it also serves the events over HTTP:
+
+* ``GET /events``: Server-Sent Events, every event of the run so far and then
+  the live ones.  ``Last-Event-ID`` (or ``?since=N``) resumes after event N,
+* ``GET /status``: the progress table as JSON.
+
+Command line usage (for a run in another terminal, or a finished one)::
+
+    python3 -m recon.events --events recon_example_com_20250101_120000/reports/events.jsonl watch
+    python3 -m recon.events --events out/reports/events.jsonl serve --listen 127.0.0.1:8765
+    curl -N http://127.0.0.1:8765/events
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from .console import print_status
+
+DEFAULT_INTERVAL = 30.0
+POLL_INTERVAL = 0.5
+LINES_INTERVAL = 1.0
+
+# Weight of the latest run in the per-target durations kept for the ETA
+HISTORY_WEIGHT = 0.3
+
+
+class EventLog:
+    """Appends events to a JSON lines file shared by every publisher of a run."""
+
+    def __init__(self, path: str):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+
+    def publish(self, kind: str, **fields) -> None:
+        event = {"kind": kind, "time": round(time.time(), 3), **fields}
+        line = json.dumps(event, sort_keys=True) + "\n"
+        os.write(self._fd, line.encode("utf-8"))
+
+    def close(self) -> None:
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+
+class LineCounter:
+    """Counts the lines a tool writes and publishes the count at most every ``LINES_INTERVAL`` seconds."""
+
+    def __init__(self, events: EventLog, stage: str, target: str = ""):
+        self.events = events
+        self.stage = stage
+        self.target = target
+        self.lines = 0
+        self._published = 0
+        self._next = time.monotonic() + LINES_INTERVAL
+
+    def add(self, count: int = 1) -> None:
+        self.lines += count
+        if time.monotonic() >= self._next:
+            self.flush()
+
+    def flush(self) -> None:
+        self._next = time.monotonic() + LINES_INTERVAL
+        if self.lines != self._published:
+            self._published = self.lines
+            self.events.publish("lines", stage=self.stage, target=self.target, lines=self.lines)
+
+
+class EventReader:
+    """Reads the events appended to a log since the last poll."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.offset = 0
+        self.partial = b""
+
+    def poll(self) -> List[Dict]:
+        try:
+            with open(self.path, "rb") as handle:
+                handle.seek(self.offset)
+                chunk = handle.read()
+        except OSError:
+            return []
+        self.offset += len(chunk)
+        complete, _, self.partial = (self.partial + chunk).rpartition(b"\n")
+        events = []
+        for line in complete.split(b"\n") if complete else ():
+            try:
+                event = json.loads(line)
+            except ValueError:
+                continue
+            if isinstance(event, dict):
+                events.append(event)
+        return events
+
+
+class History:
+    """Mean wall time per task (per-target pools) and per stage, over earlier runs."""
+
+    def __init__(self, path: str = ""):
+        self.path = path
+        self.seconds: Dict[str, float] = {}
+        if path:
+            try:
+                with open(path, encoding="utf-8") as handle:
+                    self.seconds = {key: float(value) for key, value in json.load(handle).items()}
+            except (OSError, ValueError, TypeError, AttributeError):
+                self.seconds = {}
+
+    def get(self, name: str) -> Optional[float]:
+        return self.seconds.get(name)
+
+    def update(self, name: str, seconds: float) -> None:
+        previous = self.seconds.get(name)
+        self.seconds[name] = seconds if previous is None else (
+            HISTORY_WEIGHT * seconds + (1 - HISTORY_WEIGHT) * previous)
+
+    def save(self) -> None:
+        if not self.path:
+            return
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with open(f"{self.path}.tmp", "w", encoding="utf-8") as out:
+            json.dump({key: round(value, 3) for key, value in sorted(self.seconds.items())}, out, indent=1)
+        os.replace(f"{self.path}.tmp", self.path)
+
+
+@dataclass
+class StageProgress:
+    name: str
+    started: float
+    finished: Optional[float] = None
+    returncode: Optional[int] = None
+    task: str = ""
+    targets: int = 0
+    concurrency: int = 1
+    done: int = 0
+    failed: int = 0
+    running: Dict[str, float] = field(default_factory=dict)
+    durations: List[float] = field(default_factory=list)
+    lines: Dict[str, int] = field(default_factory=dict)
+    names: int = 0
+
+    def per_target(self, history: History) -> Optional[float]:
+        if self.durations:
+            return sum(self.durations) / len(self.durations)
+        return history.get(self.task) if self.task else None
+
+    def eta(self, now: float, history: History) -> Optional[float]:
+        """Seconds until the stage finishes, ``None`` while there is nothing to estimate from."""
+        if self.finished is not None:
+            return 0.0
+        if not self.targets:
+            expected = history.get(self.name)
+            return None if expected is None else max(expected - (now - self.started), 0.0)
+        per_target = self.per_target(history)
+        if per_target is None:
+            return None
+        waiting = max(self.targets - self.done - self.failed - len(self.running), 0)
+        in_flight = sum(max(per_target - (now - started), 0.0) for started in self.running.values())
+        return (waiting * per_target + in_flight) / max(1, min(self.concurrency, self.targets))
+
+
+class Progress:
+    """State of a run rebuilt from its events."""
+
+    def __init__(self, history: Optional[History] = None):
+        self.history = history or History()
+        self.stages: Dict[str, StageProgress] = {}
+        self.owners: Dict[str, Tuple[str, str]] = {}
+        self.names = 0
+        self.started: Optional[float] = None
+        self.finished: Optional[float] = None
+
+    def _stage(self, name: str, at: float) -> StageProgress:
+        if name not in self.stages:
+            self.stages[name] = StageProgress(name, at)
+        return self.stages[name]
+
+    def apply(self, event: Dict) -> None:
+        kind = event.get("kind")
+        at = float(event.get("time", time.time()))
+        name = str(event.get("stage", ""))
+        target = str(event.get("target", ""))
+        if kind == "run_started":
+            self.started = at
+        elif kind == "run_finished":
+            self.finished = at
+        elif kind == "stage_started":
+            # A resumed run starts the stage again
+            self.stages[name] = stage = StageProgress(name, at)
+            for output in event.get("outputs", ()):
+                self.owners[os.path.normpath(output)] = (name, "")
+        elif kind == "stage_finished":
+            stage = self._stage(name, at)
+            stage.finished, stage.returncode = at, int(event.get("returncode", 0))
+            if not stage.targets:
+                self.history.update(name, float(event.get("wall", at - stage.started)))
+                if "lines" in event:
+                    stage.lines[""] = int(event["lines"])
+        elif kind == "pool_started":
+            stage = self._stage(name, at)
+            stage.task = str(event.get("task", ""))
+            stage.targets += int(event.get("targets", 0))
+            stage.concurrency = int(event.get("concurrency", 1))
+        elif kind == "task_started":
+            self._stage(name, at).running[target] = at
+            if event.get("output"):
+                self.owners[os.path.normpath(event["output"])] = (name, target)
+        elif kind == "task_finished":
+            stage = self._stage(name, at)
+            stage.running.pop(target, None)
+            if int(event.get("returncode", 0)):
+                stage.failed += 1
+            else:
+                stage.done += 1
+            if not event.get("skipped"):
+                stage.durations.append(float(event.get("wall", 0.0)))
+            if "lines" in event:
+                stage.lines[target] = int(event["lines"])
+        elif kind == "lines":
+            stage = self._stage(name, at)
+            stage.lines[target] = max(stage.lines.get(target, 0), int(event.get("lines", 0)))
+        elif kind == "names":
+            self.names = int(event.get("total", self.names))
+            owner = self.owners.get(os.path.normpath(str(event.get("path", ""))))
+            if owner is not None:
+                self._stage(owner[0], at).names += int(event.get("new", 0))
+
+    def save_history(self) -> None:
+        for stage in self.stages.values():
+            if stage.task and stage.durations:
+                self.history.update(stage.task, sum(stage.durations) / len(stage.durations))
+        self.history.save()
+
+    def eta(self, now: Optional[float] = None) -> Optional[float]:
+        """Seconds until the last running stage finishes (stages not started yet are not counted)."""
+        now = time.time() if now is None else now
+        estimates = [stage.eta(now, self.history) for stage in self.stages.values() if stage.finished is None]
+        known = [estimate for estimate in estimates if estimate is not None]
+        return max(known) if known else None
+
+    def snapshot(self, now: Optional[float] = None) -> Dict:
+        now = time.time() if now is None else now
+        stages = []
+        for stage in self.stages.values():
+            elapsed = (stage.finished or now) - stage.started
+            lines = sum(stage.lines.values())
+            stages.append({
+                "stage": stage.name, "running": stage.finished is None, "returncode": stage.returncode,
+                "elapsed": round(elapsed, 1), "targets": stage.targets, "done": stage.done,
+                "failed": stage.failed, "in_flight": sorted(stage.running), "lines": lines,
+                "names": stage.names,
+                "lines_per_min": round(lines / elapsed * 60, 1) if elapsed > 0 else 0.0,
+                "names_per_min": round(stage.names / elapsed * 60, 1) if elapsed > 0 else 0.0,
+                "eta": _round(stage.eta(now, self.history)),
+            })
+        return {"started": self.started, "finished": self.finished, "names": self.names,
+                "eta": _round(self.eta(now)), "stages": stages}
+
+
+def _round(value: Optional[float]) -> Optional[float]:
+    return None if value is None else round(value, 1)
+
+
+def format_duration(seconds: Optional[float]) -> str:
+    if seconds is None:
+        return "?"
+    seconds = int(round(seconds))
+    if seconds >= 3600:
+        return f"{seconds // 3600}h{seconds % 3600 // 60:02d}m"
+    if seconds >= 60:
+        return f"{seconds // 60}m{seconds % 60:02d}s"
+    return f"{seconds}s"
+
+
+def format_progress(progress: Progress, now: Optional[float] = None) -> List[str]:
+    """Table of the running stages, with the overall name count and ETA."""
+    snapshot = progress.snapshot(now)
+    running = [stage for stage in snapshot["stages"] if stage["running"]]
+    done = len(snapshot["stages"]) - len(running)
+    lines = [f"{len(running)} stages running, {done} finished, {snapshot['names']} unique names, "
+             f"ETA {format_duration(snapshot['eta'])}"]
+    if running:
+        lines.append(f"{'stage':<26} {'targets':>13} {'lines':>8} {'lines/min':>10} {'new':>7} "
+                     f"{'new/min':>8} {'elapsed':>8} {'ETA':>7}")
+    for stage in running:
+        targets = (f"{stage['done']}/{stage['targets']} +{len(stage['in_flight'])}" if stage["targets"] else "-")
+        if stage["failed"]:
+            targets += f" !{stage['failed']}"
+        lines.append(f"{stage['stage']:<26} {targets:>13} {stage['lines']:>8} {stage['lines_per_min']:>10.0f} "
+                     f"{stage['names']:>7} {stage['names_per_min']:>8.0f} "
+                     f"{format_duration(stage['elapsed']):>8} {format_duration(stage['eta']):>7}")
+    return lines
+
+
+class FeedServer:
+    """Serves the events and the progress of a run over HTTP, on TCP or a Unix socket."""
+
+    def __init__(self, progress: Progress, listen: str):
+        self.progress = progress
+        self.listen = listen
+        self.backlog: List[Dict] = []
+        self.clients: Set[asyncio.Queue] = set()
+        self.server: Optional[asyncio.AbstractServer] = None
+
+    async def start(self) -> None:
+        if self.listen.startswith("unix:"):
+            path = self.listen[len("unix:"):]
+            if os.path.exists(path):
+                os.unlink(path)
+            self.server = await asyncio.start_unix_server(self.handle, path=path)
+        else:
+            host, _, port = self.listen.rpartition(":")
+            self.server = await asyncio.start_server(self.handle, host or "127.0.0.1", int(port))
+        print_status("INFO", f"Event feed on {self.listen}: GET /events (SSE), GET /status")
+
+    async def stop(self) -> None:
+        for client in list(self.clients):
+            client.put_nowait(None)
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+        if self.listen.startswith("unix:") and os.path.exists(self.listen[len("unix:"):]):
+            os.unlink(self.listen[len("unix:"):])
+
+    def broadcast(self, event: Dict) -> None:
+        self.backlog.append(event)
+        for client in self.clients:
+            client.put_nowait((len(self.backlog), event))
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            request = (await reader.readline()).decode("latin-1").split()
+            headers = {}
+            while True:
+                line = (await reader.readline()).decode("latin-1").strip()
+                if not line:
+                    break
+                key, _, value = line.partition(":")
+                headers[key.strip().lower()] = value.strip()
+            if len(request) < 2 or request[0] != "GET":
+                await self._respond(writer, "405 Method Not Allowed", "text/plain", b"GET only\n")
+                return
+            url = urlsplit(request[1])
+            if url.path == "/events":
+                since = headers.get("last-event-id") or parse_qs(url.query).get("since", ["0"])[0]
+                await self._stream(writer, int(since) if since.isdigit() else 0)
+            elif url.path in ("/", "/status"):
+                body = json.dumps(self.progress.snapshot(), indent=1).encode("utf-8") + b"\n"
+                await self._respond(writer, "200 OK", "application/json", body)
+            else:
+                await self._respond(writer, "404 Not Found", "text/plain", b"try /events or /status\n")
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _respond(self, writer: asyncio.StreamWriter, status: str, content_type: str, body: bytes) -> None:
+        writer.write(f"HTTP/1.1 {status}\r\nContent-Type: {content_type}\r\nContent-Length: {len(body)}\r\n"
+                     f"Connection: close\r\n\r\n".encode("latin-1") + body)
+        await writer.drain()
+
+    async def _stream(self, writer: asyncio.StreamWriter, since: int) -> None:
+        queue: asyncio.Queue = asyncio.Queue()
+        # Registered before the backlog is replayed, so no event falls in between
+        self.clients.add(queue)
+        try:
+            writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: text/event-stream\r\nCache-Control: no-cache\r\n"
+                         b"Connection: close\r\n\r\n")
+            replayed = len(self.backlog)
+            for number, event in enumerate(self.backlog[since:replayed], since + 1):
+                writer.write(_sse(number, event))
+            await writer.drain()
+            while True:
+                item = await queue.get()
+                if item is None:
+                    break
+                number, event = item
+                if number > max(since, replayed):
+                    writer.write(_sse(number, event))
+                    await writer.drain()
+        finally:
+            self.clients.discard(queue)
+
+
+def _sse(number: int, event: Dict) -> bytes:
+    return f"id: {number}\nevent: {event.get('kind', 'message')}\ndata: {json.dumps(event)}\n\n".encode("utf-8")
+
+
+class Dashboard:
+    """Tails a run's event log into the progress table, the terminal and the feed."""
+
+    def __init__(self, path: str, interval: float = DEFAULT_INTERVAL, listen: str = "",
+                 history: Optional[History] = None):
+        self.reader = EventReader(path)
+        self.interval = interval
+        self.progress = Progress(history)
+        self.feed = FeedServer(self.progress, listen) if listen else None
+        self._stopped = asyncio.Event()
+        self._task: Optional[asyncio.Future] = None
+
+    def poll(self) -> int:
+        events = self.reader.poll()
+        for event in events:
+            self.progress.apply(event)
+            if self.feed is not None:
+                self.feed.broadcast(event)
+        return len(events)
+
+    def show(self) -> None:
+        for line in format_progress(self.progress):
+            print_status("PROGRESS", line)
+
+    async def start(self) -> None:
+        if self.feed is not None:
+            try:
+                await self.feed.start()
+            except (OSError, ValueError) as exc:
+                print_status("WARNING", f"Cannot serve events on {self.feed.listen}: {exc}")
+                self.feed = None
+        self._task = asyncio.ensure_future(self._run())
+
+    async def _run(self) -> None:
+        next_show = time.monotonic() + self.interval
+        while not self._stopped.is_set():
+            self.poll()
+            if self.interval and time.monotonic() >= next_show:
+                next_show = time.monotonic() + self.interval
+                self.show()
+            try:
+                await asyncio.wait_for(self._stopped.wait(), POLL_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+
+    async def stop(self, save_history: bool = True) -> None:
+        """Read the last events, keep the durations for the next ETA and close the feed."""
+        self._stopped.set()
+        if self._task is not None:
+            await self._task
+        self.poll()
+        if save_history:
+            self.progress.save_history()
+        if self.feed is not None:
+            await self.feed.stop()
+
+
+async def _follow(path: str, interval: float, listen: str) -> None:
+    """Follow the log of another process until its run finishes (or, serving, until interrupted)."""
+    dashboard = Dashboard(path, interval, listen)
+    await dashboard.start()
+    try:
+        while dashboard.progress.finished is None or listen:
+            await asyncio.sleep(POLL_INTERVAL)
+    finally:
+        # Durations are kept by the run itself
+        await dashboard.stop(save_history=False)
+    if not listen:
+        dashboard.show()
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python3 -m recon.events",
+        description="Follow the progress of a run, or serve its events, from its event log.",
+    )
+    parser.add_argument("--events", required=True, help="reports/events.jsonl of the run")
+    sub = parser.add_subparsers(dest="command", required=True)
+    watch = sub.add_parser("watch", help="print the progress table until the run finishes")
+    watch.add_argument("--interval", type=float, default=5.0, help="seconds between tables (default 5)")
+    sub.add_parser("status", help="print the progress table once")
+    serve = sub.add_parser("serve", help="serve /events (SSE) and /status until interrupted")
+    serve.add_argument("--listen", required=True, help="HOST:PORT or unix:PATH")
+    args = parser.parse_args(argv)
+
+    if not os.path.isfile(args.events):
+        print_status("ERROR", f"No event log at {args.events}")
+        return 1
+    if args.command == "status":
+        dashboard = Dashboard(args.events, 0.0)
+        dashboard.poll()
+        dashboard.show()
+        return 0
+    try:
+        if args.command == "serve":
+            asyncio.run(_follow(args.events, 0.0, args.listen))
+        else:
+            asyncio.run(_follow(args.events, args.interval, ""))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
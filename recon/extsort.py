@@ -0,0 +1,202 @@
+"""Memory-bounded external sort and de-duplication of name lists.
+
+``sort -u`` over tens of millions of names (bbot's spider, recursive
+dnscan) spills to disk single-threaded; holding them in a Python set needs
+several gigabytes.  The external sort splits the inputs into byte ranges,
+sorts and de-duplicates them on a process pool into runs that fit the
+memory cap, then merges the runs with a k-way heap merge that drops the
+duplicates between runs.  With more runs than ``FAN_IN`` the runs are
+merged in groups (in parallel) first.  Inputs that fit the memory cap are
+sorted in memory without starting any worker.
+
+Lines are compared as bytes with surrounding whitespace removed, so the
+order is that of ``LC_ALL=C sort -u``.  Runs live in a temporary directory
+next to the output (``--tmp-dir`` to move them), removed at the end.
+
+Command line usage (like ``sort -u -o``)::
+
+    python3 -m recon.extsort --output out/subdomains/all_subdomains_clean.txt \\
+        --memory-mb 1024 --workers 8 out/subdomains/*/*.txt
+"""
+
+from __future__ import annotations
+
+import argparse
+import heapq
+import math
+import multiprocessing
+import os
+import shutil
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack
+from typing import Iterable, Iterator, List, Optional, Sequence, Set, Tuple
+
+from .console import print_status
+
+DEFAULT_MEMORY_MB = 1024
+FAN_IN = 64
+BUFFER = 1 << 20
+# Memory of one kept line besides its bytes: the bytes object header and its set/list slots
+LINE_OVERHEAD = 100
+# In-memory sort when the input bytes times this stay under the cap (short lines cost more than their bytes)
+IN_MEMORY_FACTOR = 6
+
+Segment = Tuple[str, int, int]
+
+
+def _segment_blocks(path: str, start: int, end: int) -> Iterator[List[bytes]]:
+    """Stripped non-empty lines starting in ``[start, end)`` of ``path``, a block at a time."""
+    with open(path, "rb") as handle:
+        if start:
+            # The line running across ``start`` belongs to the previous segment
+            handle.seek(start - 1)
+            start += len(handle.readline()) - 1
+        remaining = end - start
+        carry = b""
+        while remaining > 0:
+            block = handle.read(min(BUFFER, remaining))
+            if not block:
+                break
+            remaining -= len(block)
+            lines = (carry + block).split(b"\n")
+            carry = lines.pop()
+            yield list(filter(None, map(bytes.strip, lines)))
+        # A line starting before ``end`` is finished even when it runs past it
+        carry = (carry + handle.readline()).strip() if carry else b""
+        if carry:
+            yield [carry]
+
+
+def _write_run(lines: Set[bytes], run_dir: str) -> str:
+    fd, path = tempfile.mkstemp(suffix=".run", dir=run_dir)
+    with os.fdopen(fd, "wb", buffering=BUFFER) as out:
+        out.writelines(line + b"\n" for line in sorted(lines))
+    return path
+
+
+def _sort_segment(segment: Segment, run_dir: str, memory: int) -> List[str]:
+    """Sorted, de-duplicated runs of one segment, each within ``memory`` bytes."""
+    runs: List[str] = []
+    lines: Set[bytes] = set()
+    used = 0
+    for block in _segment_blocks(*segment):
+        before = len(lines)
+        lines.update(block)
+        # Memory of the names the block added, at the block's average name length
+        used += (len(lines) - before) * (LINE_OVERHEAD + sum(map(len, block)) // max(1, len(block)))
+        if used >= memory:
+            runs.append(_write_run(lines, run_dir))
+            lines.clear()
+            used = 0
+    if lines:
+        runs.append(_write_run(lines, run_dir))
+    return runs
+
+
+def _merge(runs: Sequence[str], output: str) -> int:
+    """k-way merge of sorted runs into ``output``, each line once; returns the number of lines."""
+    count = 0
+    previous = None
+    with ExitStack() as stack:
+        files = [stack.enter_context(open(run, "rb", buffering=BUFFER)) for run in runs]
+        with open(output, "wb", buffering=BUFFER) as out:
+            for line in heapq.merge(*files):
+                if line != previous:
+                    out.write(line)
+                    previous = line
+                    count += 1
+    return count
+
+
+def _merge_group(runs: Sequence[str], run_dir: str) -> str:
+    fd, path = tempfile.mkstemp(suffix=".run", dir=run_dir)
+    os.close(fd)
+    _merge(runs, path)
+    for run in runs:
+        os.unlink(run)
+    return path
+
+
+def _segments(paths: Sequence[str], size: int) -> List[Segment]:
+    segments: List[Segment] = []
+    for path in paths:
+        length = os.path.getsize(path)
+        segments.extend((path, start, min(start + size, length)) for start in range(0, length, size))
+    return segments
+
+
+def external_sort(
+    inputs: Iterable[str],
+    output: str,
+    memory_mb: float = DEFAULT_MEMORY_MB,
+    workers: int = 0,
+    tmp_dir: Optional[str] = None,
+) -> int:
+    """Sort and de-duplicate the lines of ``inputs`` into ``output`` within ``memory_mb``.
+
+    ``workers`` processes (default: one per core) generate the runs; missing
+    inputs are skipped.  Returns the number of lines written.
+    """
+    paths = [path for path in inputs if os.path.isfile(path)]
+    memory = max(1, int(memory_mb * 1024 * 1024))
+    workers = workers or os.cpu_count() or 1
+    total = sum(os.path.getsize(path) for path in paths)
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+
+    if total * IN_MEMORY_FACTOR <= memory:
+        lines: Set[bytes] = set()
+        for path in paths:
+            for block in _segment_blocks(path, 0, total + 1):
+                lines.update(block)
+        temporary = f"{output}.tmp"
+        with open(temporary, "wb", buffering=BUFFER) as out:
+            out.writelines(line + b"\n" for line in sorted(lines))
+        os.replace(temporary, output)
+        return len(lines)
+
+    # Each worker holds its share of the cap; a segment is a few runs' worth at most
+    per_worker = max(1 << 20, memory // workers)
+    size = max(1 << 20, min(per_worker, math.ceil(total / workers)))
+    segments = _segments(paths, size)
+    run_dir = tempfile.mkdtemp(prefix=".extsort-", dir=tmp_dir or os.path.dirname(os.path.abspath(output)))
+    try:
+        with ProcessPoolExecutor(max_workers=min(workers, len(segments)),
+                                 mp_context=multiprocessing.get_context("spawn")) as pool:
+            runs = [run for segment_runs in pool.map(_sort_segment, segments, [run_dir] * len(segments),
+                                                      [per_worker] * len(segments))
+                    for run in segment_runs]
+            while len(runs) > FAN_IN:
+                groups = [runs[start:start + FAN_IN] for start in range(0, len(runs), FAN_IN)]
+                runs = list(pool.map(_merge_group, groups, [run_dir] * len(groups)))
+        temporary = f"{output}.tmp"
+        count = _merge(runs, temporary)
+        os.replace(temporary, output)
+        return count
+    finally:
+        shutil.rmtree(run_dir, ignore_errors=True)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python3 -m recon.extsort",
+        description="Sort and de-duplicate name lists within a memory cap (sort -u).",
+    )
+    parser.add_argument("inputs", nargs="+", help="files to merge (missing ones are skipped)")
+    parser.add_argument("--output", required=True, help="sorted unique lines")
+    parser.add_argument("--memory-mb", type=float, default=DEFAULT_MEMORY_MB,
+                        help=f"memory cap of the sort in MB (default {DEFAULT_MEMORY_MB})")
+    parser.add_argument("--workers", type=int, default=0, help="processes generating runs (default: one per core)")
+    parser.add_argument("--tmp-dir", help="directory of the sorted runs (default: next to --output)")
+    args = parser.parse_args(argv)
+
+    started = time.monotonic()
+    count = external_sort(args.inputs, args.output, args.memory_mb, args.workers, args.tmp_dir)
+    print_status("INFO", f"Sorted {count} unique lines into {args.output} in {time.monotonic() - started:.1f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,454 @@
+"""Technology fingerprinting of the responses captured by the HTTP probe.
+
+Rules use the Wappalyzer schema (``headers``, ``cookies``, ``html``,
+``scriptSrc``, ``meta``, ``implies``, ``cats`` and a ``categories`` table,
+with ``\\;version:\\1`` suffixes), plus ``favicon``: the MurmurHash3 of the
+base64 favicon, as Shodan's ``http.favicon.hash``.  The built-in rules are
+``recon/technologies.json``; ``--rules`` adds files in the same format,
+Wappalyzer's own included.
+
+Instead of running every pattern over every body, a :class:`RuleSet`
+indexes them once:
+
+* header and cookie patterns by header and cookie name, so a response only
+  runs those of the names it has,
+* every body pattern (``html``, ``scriptSrc``, ``meta``) by literals every
+  match must contain one of (an alternation gives one per branch), and all
+  those anchors are compiled into one trie-shaped regular expression: a body
+  is lowercased and scanned once, and only the patterns whose anchor occurs
+  in it are run (patterns without a usable anchor run on every body),
+* favicon hashes in a dictionary.
+
+The scan does not see an anchor that starts inside the match of another, so
+an anchor's hits also run the patterns of those it may hide; anchors start
+at their rarest character in HTML to keep both the scan fast and such
+overlaps rare.  Building the index means parsing every pattern, so the
+result is cached as JSON under ``--cache-dir``, keyed by the rule files'
+contents; patterns themselves are compiled the first time an anchor hits.
+
+In ``--follow`` mode the input is tailed while the probe writes it, until
+stdin reaches EOF.
+
+Command line usage (as called from the engine)::
+
+    python3 -m recon.fingerprint --follow --input out/enumeration/live_hosts/responses.jsonl \\
+        --output out/enumeration/technologies/technologies.jsonl \\
+        --summary out/enumeration/technologies/technologies.txt --cache-dir ~/.cache/recon
+"""
+
+from __future__ import annotations
+
+import argparse
+import base64
+import hashlib
+import json
+import os
+import re
+import struct
+import sys
+import time
+from typing import Dict, Iterable, List, Optional, Sequence, TextIO, Tuple
+
+try:  # Python 3.11 moved the regular expression parser
+    from re import _parser as sre_parse
+except ImportError:  # pragma: no cover - depends on the Python version
+    import sre_parse
+
+from .aggregate import FileFollower, stdin_closed_event
+from .console import print_status
+
+DEFAULT_RULES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "technologies.json")
+FORMAT = 2
+MIN_ANCHOR = 3
+BODY_KEYS = ("html", "scriptSrc", "scripts")
+
+# Characters by how often they occur in HTML, most frequent first; anchors start at their rarest one
+_HTML_FREQUENCY = {char: rank for rank, char in enumerate(
+    " e\"tao<>=/isnrlcd-pmhu.:gfb_vyw0k1x2j34q5z6789;#,&?()%!'[]{}@$*+|~^`\\")}
+_VERSION_REFERENCE = re.compile(r"\\(\d+)")
+
+
+def murmur3_32(data: bytes, seed: int = 0) -> int:
+    """Signed 32-bit MurmurHash3 of ``data`` (what ``mmh3.hash`` returns)."""
+    c1, c2, mask = 0xCC9E2D51, 0x1B873593, 0xFFFFFFFF
+    value = seed & mask
+    blocks = len(data) // 4
+    for block in struct.unpack(f"<{blocks}I", data[:blocks * 4]):
+        block = (block * c1) & mask
+        block = ((block << 15) | (block >> 17)) & mask
+        value ^= (block * c2) & mask
+        value = ((value << 13) | (value >> 19)) & mask
+        value = (value * 5 + 0xE6546B64) & mask
+    tail = data[blocks * 4:]
+    if tail:
+        block = int.from_bytes(tail, "little")
+        block = (block * c1) & mask
+        block = ((block << 15) | (block >> 17)) & mask
+        value ^= (block * c2) & mask
+    value ^= len(data)
+    value ^= value >> 16
+    value = (value * 0x85EBCA6B) & mask
+    value ^= value >> 13
+    value = (value * 0xC2B2AE35) & mask
+    value ^= value >> 16
+    return value - (1 << 32) if value & 0x80000000 else value
+
+
+def favicon_hash(data: bytes) -> int:
+    """Shodan's favicon hash: MurmurHash3 of the MIME base64 of the icon."""
+    return murmur3_32(base64.encodebytes(data))
+
+
+def _split(pattern: str) -> Tuple[str, str]:
+    """Regular expression and version template of a Wappalyzer pattern (``regex\\;version:\\1``)."""
+    regex, *tags = pattern.split("\\;")
+    version = next((tag[len("version:"):] for tag in tags if tag.startswith("version:")), "")
+    return regex, version
+
+
+def _listed(value) -> List[str]:
+    return [value] if isinstance(value, str) else list(value or ())
+
+
+def _weight(text: str) -> int:
+    common = len(_HTML_FREQUENCY)
+    return sum(_HTML_FREQUENCY.get(char, common) for char in text)
+
+
+def _required(sequence) -> Optional[List[str]]:
+    """Literals of which every match of the parsed ``sequence`` contains one, the rarest such set found."""
+    options: List[List[str]] = []
+    run: List[str] = []
+    for op, value in list(sequence) + [(None, None)]:
+        if op is sre_parse.LITERAL:
+            run.append(chr(value).lower())
+            continue
+        if len(run) >= MIN_ANCHOR:
+            options.append(["".join(run)])
+        run = []
+        if op is sre_parse.SUBPATTERN:
+            inner = _required(value[-1])
+            if inner:
+                options.append(inner)
+        elif op is sre_parse.BRANCH:
+            branches = [_required(branch) for branch in value[1]]
+            if all(branches):
+                options.append([text for branch in branches for text in branch])
+    if not options:
+        return None
+    return max(options, key=lambda texts: min(map(_weight, texts)))
+
+
+def anchors(regex: str) -> Optional[List[str]]:
+    """Lowercase literals of which every match of ``regex`` contains one, ``None`` if there are none long enough.
+
+    Runs of literals are taken at the top level and through groups and
+    alternations, the set whose most common member is rarest in HTML; each
+    literal is cut to start at its rarest character.
+    """
+    try:
+        texts = _required(sre_parse.parse(regex, re.IGNORECASE))
+    except (re.error, RecursionError, OverflowError):
+        return None
+    if texts is None:
+        return None
+    common = len(_HTML_FREQUENCY)
+    cut = []
+    for text in texts:
+        keep = min(len(text), 5)
+        start = max(range(len(text) - keep + 1),
+                    key=lambda index: (_HTML_FREQUENCY.get(text[index], common), -index))
+        cut.append(text[start:])
+    return list(dict.fromkeys(cut))
+
+
+def _overlapping(text: str, words: Iterable[str]) -> List[str]:
+    """``text`` and the ``words`` a scan that matches ``text`` would skip over.
+
+    Those that are its prefixes (the scan takes the longest) or start inside
+    it: found ``text`` means their patterns have to run too.
+    """
+    words = set(words)
+    found = [text]
+    for start in range(len(text)):
+        rest = text[start:]
+        found += [rest[:end] for end in range(MIN_ANCHOR, len(rest) + 1) if rest[:end] in words]
+        if start:
+            found += [word for word in words if len(word) > len(rest) and word.startswith(rest)]
+    return list(dict.fromkeys(found))
+
+
+def trie_regex(words: Iterable[str]) -> str:
+    """One regular expression matching any of ``words``, shaped as their trie (longest match first)."""
+    trie: Dict[str, dict] = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def build(node: Dict[str, dict]) -> str:
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        inner = branches[0] if len(branches) == 1 else f"(?:{'|'.join(branches)})"
+        return f"(?:{inner})?" if "" in node else inner
+
+    return build(trie) or "(?!)"
+
+
+class RuleSet:
+    """Indexed header, cookie, body and favicon patterns (see the module docstring)."""
+
+    def __init__(self, index: dict):
+        self.index = index
+        self.technologies: List[Tuple[str, List[str], List[str]]] = [tuple(entry) for entry in index["technologies"]]
+        self.patterns: List[Tuple[int, str, str]] = [tuple(entry) for entry in index["patterns"]]
+        self.anchors: Dict[str, List[int]] = index["anchors"]
+        self.unanchored: List[int] = index["unanchored"]
+        self.headers: Dict[str, List[int]] = index["headers"]
+        self.cookies: Dict[str, List[int]] = index["cookies"]
+        self.favicons: Dict[str, List[int]] = index["favicons"]
+        self.scanner = re.compile(index["scanner"])
+        self._ids = {name: number for number, (name, _, _) in enumerate(self.technologies)}
+        self._compiled: Dict[int, re.Pattern] = {}
+
+    @classmethod
+    def build(cls, rules: Sequence[dict]) -> "RuleSet":
+        """Index Wappalyzer-style rule documents (later documents override earlier technologies)."""
+        categories: Dict[str, str] = {}
+        technologies: Dict[str, dict] = {}
+        for document in rules:
+            categories.update({str(key): value["name"] if isinstance(value, dict) else value
+                               for key, value in document.get("categories", {}).items()})
+            technologies.update(document.get("technologies", {}) if "technologies" in document else document)
+
+        names = sorted(technologies)
+        ids = {name: number for number, name in enumerate(names)}
+        index: dict = {"format": FORMAT, "technologies": [], "patterns": [], "anchors": {}, "unanchored": [],
+                       "headers": {}, "cookies": {}, "favicons": {}}
+
+        def add(tech: int, pattern: str, key: Optional[Tuple[str, str]] = None, body: bool = False) -> None:
+            regex, version = _split(pattern)
+            try:
+                re.compile(regex, re.IGNORECASE)
+            except (re.error, RecursionError, OverflowError):
+                return  # JavaScript-only syntax
+            number = len(index["patterns"])
+            index["patterns"].append((tech, regex, version))
+            if key is not None:
+                index[key[0]].setdefault(key[1], []).append(number)
+            elif body:
+                texts = anchors(regex)
+                if texts is None:
+                    index["unanchored"].append(number)
+                for text in texts or ():
+                    index["anchors"].setdefault(text, []).append(number)
+
+        for name in names:
+            spec = technologies[name]
+            tech = ids[name]
+            implies = [_split(implied)[0] for implied in _listed(spec.get("implies"))]
+            index["technologies"].append((name, [categories.get(str(cat), str(cat)) for cat in spec.get("cats", ())],
+                                          implies))
+            for header, pattern in (spec.get("headers") or {}).items():
+                add(tech, pattern, ("headers", header.lower()))
+            for cookie, pattern in (spec.get("cookies") or {}).items():
+                add(tech, pattern, ("cookies", cookie))
+            for key in BODY_KEYS:
+                for pattern in _listed(spec.get(key)):
+                    add(tech, pattern, body=True)
+            for meta, patterns in (spec.get("meta") or {}).items():
+                for pattern in _listed(patterns):
+                    regex, version = _split(pattern)
+                    value = regex[1:] if regex.startswith("^") else regex
+                    value = value[:-1] + "[\"'>\\s]" if value.endswith("$") and not value.endswith("\\$") else value
+                    add(tech, f"<meta[^>]+(?:name|property)=[\"']?{re.escape(meta)}[\"']?[^>]*?content=[\"']?{value}"
+                              + (f"\\;version:{version}" if version else ""), body=True)
+            icons = spec.get("favicon")
+            for icon in icons if isinstance(icons, list) else [] if icons is None else [icons]:
+                index["favicons"].setdefault(str(int(icon)), []).append(tech)
+        words = index["anchors"]
+        index["anchors"] = {text: sorted({number for other in _overlapping(text, words) for number in words[other]})
+                            for text in words}
+        index["scanner"] = trie_regex(words)
+        return cls(index)
+
+    @classmethod
+    def load(cls, paths: Sequence[str], cache_dir: Optional[str] = None) -> "RuleSet":
+        """The rule set of ``paths``, from the cache when the same files were indexed before."""
+        contents = []
+        for path in paths:
+            with open(path, "rb") as handle:
+                contents.append(handle.read())
+        key = hashlib.sha256(b"\0".join([str(FORMAT).encode(), *contents])).hexdigest()[:32]
+        cache_file = os.path.join(cache_dir, "technologies", f"{key}.json") if cache_dir else None
+        if cache_file and os.path.isfile(cache_file):
+            try:
+                with open(cache_file, encoding="utf-8") as handle:
+                    return cls(json.load(handle))
+            except (OSError, ValueError, KeyError, re.error):
+                pass  # rebuilt below
+        rules = cls.build([json.loads(content) for content in contents])
+        if cache_file:
+            os.makedirs(os.path.dirname(cache_file), exist_ok=True)
+            partial = f"{cache_file}.{os.getpid()}"
+            with open(partial, "w", encoding="utf-8") as out:
+                json.dump(rules.index, out)
+            os.replace(partial, cache_file)
+        return rules
+
+    def _pattern(self, number: int) -> re.Pattern:
+        if number not in self._compiled:
+            self._compiled[number] = re.compile(self.patterns[number][1], re.IGNORECASE)
+        return self._compiled[number]
+
+    def _run(self, number: int, text: str, found: Dict[int, str]) -> None:
+        match = self._pattern(number).search(text)
+        if match is None:
+            return
+        tech, _, template = self.patterns[number]
+        version = _VERSION_REFERENCE.sub(
+            lambda ref: (match.group(int(ref.group(1))) or "") if int(ref.group(1)) <= (match.re.groups or 0) else "",
+            template).strip() if template else ""
+        if len(version) > len(found.get(tech, "")) or tech not in found:
+            found[tech] = version
+
+    def match(self, headers: Iterable[Tuple[str, str]], body: str, favicon: Optional[int] = None) -> Dict[str, str]:
+        """Technologies (name -> version, empty if unknown) of one response."""
+        found: Dict[int, str] = {}
+        for name, value in headers:
+            name = name.lower()
+            for number in self.headers.get(name, ()):
+                self._run(number, value, found)
+            if name == "set-cookie":
+                cookie, _, value = value.partition(";")[0].partition("=")
+                for number in self.cookies.get(cookie.strip(), ()):
+                    self._run(number, value, found)
+
+        candidates = set(self.unanchored)
+        for text in set(self.scanner.findall(body.lower())):
+            candidates.update(self.anchors[text])
+        for number in sorted(candidates):
+            self._run(number, body, found)
+
+        if favicon is not None:
+            for tech in self.favicons.get(str(favicon), ()):
+                found.setdefault(tech, "")
+
+        by_name = {self.technologies[tech][0]: version for tech, version in found.items()}
+        pending = list(by_name)
+        while pending:
+            for implied in self.technologies[self._ids[pending.pop()]][2]:
+                if implied in self._ids and implied not in by_name:
+                    by_name[implied] = ""
+                    pending.append(implied)
+        return by_name
+
+    def categories(self, name: str) -> List[str]:
+        return self.technologies[self._ids[name]][1] if name in self._ids else []
+
+
+class Fingerprinter:
+    """Matches response records and writes the technologies found."""
+
+    def __init__(self, rules: RuleSet, output: TextIO, summary: Optional[TextIO] = None):
+        self.rules = rules
+        self.output = output
+        self.summary = summary
+        self.responses = 0
+        self.identified = 0
+        self.counts: Dict[str, int] = {}
+
+    def add(self, lines: Iterable[str]) -> None:
+        for line in lines:
+            try:
+                record = json.loads(line)
+                headers = record.get("headers") or ()
+                found = self.rules.match(headers.items() if isinstance(headers, dict) else headers,
+                                         record.get("body") or "", record.get("favicon_hash"))
+            except (ValueError, TypeError, AttributeError):
+                continue  # not a response record
+            self.responses += 1
+            if not found:
+                continue
+            self.identified += 1
+            technologies = [{"name": name, "version": version, "categories": self.rules.categories(name)}
+                            for name, version in sorted(found.items())]
+            for name in found:
+                self.counts[name] = self.counts.get(name, 0) + 1
+            url = record.get("url", "")
+            self.output.write(json.dumps({"url": url, "host": record.get("host", ""),
+                                          "technologies": technologies}) + "\n")
+            if self.summary is not None:
+                listed = ", ".join(f"{name}:{version}" if version else name for name, version in sorted(found.items()))
+                self.summary.write(f"{url} {listed}\n")
+        self.output.flush()
+        if self.summary is not None:
+            self.summary.flush()
+
+
+def fingerprint(
+    input_path: str,
+    output_path: str,
+    summary_path: Optional[str],
+    rules: RuleSet,
+    follow: bool = False,
+    interval: float = 0.5,
+) -> Fingerprinter:
+    """Fingerprint every response of ``input_path`` (tailing it with ``follow``)."""
+    follower = FileFollower([input_path])
+    done = stdin_closed_event() if follow else None
+
+    with open(output_path, "w", encoding="utf-8") as output, \
+            open(summary_path or os.devnull, "w", encoding="utf-8") as summary:
+        fingerprinter = Fingerprinter(rules, output, summary if summary_path else None)
+        if done is not None:
+            while not done.is_set():
+                fingerprinter.add(follower.poll())
+                done.wait(interval)
+        fingerprinter.add(follower.poll(final=True))
+    return fingerprinter
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python3 -m recon.fingerprint",
+        description="Identify the technologies of the probed hosts from their headers, bodies and favicons.",
+    )
+    parser.add_argument("--input", required=True, help="responses.jsonl of recon.probe --responses")
+    parser.add_argument("--output", required=True, help="JSON line per identified host")
+    parser.add_argument("--summary", help="also write '<url> <tech>[:<version>], ...' lines here")
+    parser.add_argument("--rules", action="append", default=[],
+                        help="Wappalyzer-format rule file added to the built-in rules (repeatable)")
+    parser.add_argument("--no-default-rules", action="store_true", help="use only the --rules files")
+    parser.add_argument("--cache-dir", help="directory of the indexed rule cache")
+    parser.add_argument("--follow", action="store_true",
+                        help="keep tailing the input until stdin is closed")
+    parser.add_argument("--interval", type=float, default=0.5, help="poll interval in seconds")
+    args = parser.parse_args(argv)
+
+    follow = args.follow
+    if follow and sys.stdin.isatty():
+        print_status("WARNING", "--follow needs stdin from the scheduler, making a single pass instead")
+        follow = False
+
+    paths = ([] if args.no_default_rules else [DEFAULT_RULES]) + args.rules
+    if not paths:
+        parser.error("no rules: drop --no-default-rules or give --rules")
+    started = time.monotonic()
+    rules = RuleSet.load(paths, args.cache_dir)
+    loaded = time.monotonic()
+    fingerprinter = fingerprint(args.input, args.output, args.summary, rules, follow, args.interval)
+    top = sorted(fingerprinter.counts.items(), key=lambda item: (-item[1], item[0]))[:10]
+    print_status(
+        "SUCCESS",
+        f"Fingerprinting: {fingerprinter.identified}/{fingerprinter.responses} responses identified "
+        f"({', '.join(f'{name} x{count}' for name, count in top) or 'none'}); "
+        f"{len(rules.technologies)} technologies loaded in {loaded - started:.2f}s",
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,262 @@
+"""Compact on-disk index of the discovered subdomains.
+
+Names are stored as reversed-label keys (``www.example.com`` becomes
+``com.example.www.``) in one sorted array, so every name under a root is a
+contiguous range of keys, apex included: ``com.example.`` is a prefix of
+the keys of ``example.com`` and of nothing else.  Counting or listing the
+names of a root is two binary searches, and the names of all targets are
+attributed in one pass over the sorted roots.  A name belongs to its most
+specific target (:func:`recon.names.root_of`), so overlapping targets such
+as ``example.com`` and ``dev.example.com`` do not count a name twice.
+
+The file is read through ``mmap``; it holds a header, the offsets of the
+keys and the keys themselves::
+
+    b"RECONIDX" | count (uint64) | offsets (uint64 * (count + 1)) | keys
+
+The report's per-target breakdown and the per-target lists in
+``subdomains/by_target/`` are built from it.
+
+Command line usage (as called from the engine)::
+
+    python3 -m recon.index --index out/subdomains/final_subdomains.idx build \\
+        --input out/final_subdomains.txt --roots out/targets.txt \\
+        --shard-dir out/subdomains/by_target
+    python3 -m recon.index --index out/subdomains/final_subdomains.idx count --roots out/targets.txt
+    python3 -m recon.index --index out/subdomains/final_subdomains.idx list example.com
+    python3 -m recon.index --index out/subdomains/final_subdomains.idx owner --roots out/targets.txt www.example.com
+"""
+
+from __future__ import annotations
+
+import argparse
+import array
+import bisect
+import mmap
+import os
+import struct
+import sys
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from .console import print_status
+from .names import normalize_name, root_of
+from .pool import clean_domain, read_targets
+
+MAGIC = b"RECONIDX"
+_HEADER = struct.Struct("=8sQ")  # native order, like the offsets read through memoryview.cast
+
+
+def to_key(name: str) -> bytes:
+    """``www.example.com`` -> ``b"com.example.www."``."""
+    return (".".join(reversed(name.split("."))) + ".").encode("ascii")
+
+
+def from_key(key: bytes) -> str:
+    return ".".join(reversed(key.decode("ascii").rstrip(".").split(".")))
+
+
+class _MappedKeys:
+    """Sequence view of the keys of an index file, read from the mapping on demand."""
+
+    def __init__(self, data: mmap.mmap):
+        magic, self.count = _HEADER.unpack_from(data, 0)
+        if magic != MAGIC:
+            raise ValueError("not a subdomain index")
+        self.data = data
+        self.offsets = memoryview(data)[_HEADER.size:_HEADER.size + 8 * (self.count + 1)].cast("Q")
+        self.base = _HEADER.size + 8 * (self.count + 1)
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __getitem__(self, position: int) -> bytes:
+        if position < 0:
+            position += self.count
+        if not 0 <= position < self.count:
+            raise IndexError(position)
+        return self.data[self.base + self.offsets[position]:self.base + self.offsets[position + 1]]
+
+    def release(self) -> None:
+        self.offsets.release()
+
+
+class SubdomainIndex:
+    """Sorted reversed-label keys, from an index file or built in memory."""
+
+    def __init__(self, keys: Sequence[bytes], mapping: Optional[mmap.mmap] = None):
+        self.keys = keys
+        self._mapping = mapping
+
+    @classmethod
+    def open(cls, path: str) -> "SubdomainIndex":
+        with open(path, "rb") as handle:
+            mapping = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+        return cls(_MappedKeys(mapping), mapping)
+
+    @classmethod
+    def from_names(cls, names: Iterable[str]) -> "SubdomainIndex":
+        return cls(sorted({to_key(name) for name in normalized(names)}))
+
+    def close(self) -> None:
+        if self._mapping is not None:
+            self.keys.release()
+            self._mapping.close()
+            self._mapping = None
+
+    def __enter__(self) -> "SubdomainIndex":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def __contains__(self, name: str) -> bool:
+        key = to_key(name)
+        position = bisect.bisect_left(self.keys, key)
+        return position < len(self.keys) and self.keys[position] == key
+
+    def span(self, root: str) -> Tuple[int, int]:
+        """Positions ``[start, end)`` of the keys of ``root`` and everything under it."""
+        prefix = to_key(root)
+        start = bisect.bisect_left(self.keys, prefix)
+        # "/" sorts right after ".", so it bounds every key starting with the prefix
+        end = bisect.bisect_left(self.keys, prefix[:-1] + b"/", start)
+        return start, end
+
+    def _owned(self, roots: Sequence[str]) -> Dict[str, List[Tuple[int, int]]]:
+        """Spans of the keys each root owns: its own span minus the spans of the targets nested in it."""
+        spans = {root: self.span(root) for root in roots}
+        owned: Dict[str, List[Tuple[int, int]]] = {}
+        # In key order a nested root follows its parent, so a stack of open roots finds the direct parents
+        stack: List[str] = []
+        for root in sorted(spans, key=to_key):
+            while stack and not to_key(root).startswith(to_key(stack[-1])):
+                stack.pop()
+            start, end = spans[root]
+            owned[root] = [(start, end)]
+            if stack:
+                parent = owned[stack[-1]]
+                for position, (parent_start, parent_end) in enumerate(parent):
+                    if parent_start <= start and end <= parent_end:
+                        parent[position:position + 1] = [(parent_start, start), (end, parent_end)]
+                        break
+            stack.append(root)
+        return owned
+
+    def count_by_root(self, roots: Sequence[str]) -> Dict[str, int]:
+        """Number of names each root owns, in the order of ``roots``."""
+        owned = self._owned(roots)
+        return {root: sum(end - start for start, end in owned[root]) for root in roots}
+
+    def list_by_root(self, root: str, roots: Sequence[str] = ()) -> Iterator[str]:
+        """Names under ``root``; with ``roots`` only those it owns among them."""
+        spans = self._owned([root, *roots])[root] if roots else [self.span(root)]
+        for start, end in spans:
+            for position in range(start, end):
+                yield from_key(self.keys[position])
+
+    def names(self) -> Iterator[str]:
+        for position in range(len(self.keys)):
+            yield from_key(self.keys[position])
+
+
+def normalized(names: Iterable[str]) -> Iterator[str]:
+    for raw in names:
+        name = normalize_name(raw)
+        if name is not None:
+            yield name
+
+
+def write_index(path: str, names: Iterable[str]) -> int:
+    """Write the index of ``names`` to ``path`` (atomically) and return the number of keys."""
+    keys = sorted({to_key(name) for name in normalized(names)})
+    offsets = [0]
+    for key in keys:
+        offsets.append(offsets[-1] + len(key))
+    temporary = f"{path}.tmp"
+    with open(temporary, "wb") as out:
+        out.write(_HEADER.pack(MAGIC, len(keys)))
+        array.array("Q", offsets).tofile(out)
+        out.writelines(keys)
+    os.replace(temporary, path)
+    return len(keys)
+
+
+def write_shards(index: SubdomainIndex, roots: Sequence[str], shard_dir: str) -> Dict[str, int]:
+    """``<shard_dir>/<clean root>.txt`` with the names each root owns; returns the counts."""
+    os.makedirs(shard_dir, exist_ok=True)
+    counts = index.count_by_root(roots)
+    for root in roots:
+        with open(os.path.join(shard_dir, f"{clean_domain(root)}.txt"), "w", encoding="utf-8") as out:
+            out.writelines(f"{name}\n" for name in index.list_by_root(root, roots))
+    return counts
+
+
+def _read_names(path: str) -> Iterator[str]:
+    with open(path, encoding="utf-8", errors="replace") as handle:
+        yield from handle
+
+
+def _roots(path: str) -> List[str]:
+    return [root for root in normalized(read_targets(path))]
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python3 -m recon.index",
+        description="Build and query the reversed-label index of discovered subdomains.",
+    )
+    parser.add_argument("--index", required=True, help="index file, e.g. out/subdomains/final_subdomains.idx")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    build_parser = sub.add_parser("build", help="index a file of names")
+    build_parser.add_argument("--input", required=True, help="names, one per line")
+    build_parser.add_argument("--roots", help="targets file; with --shard-dir writes the names each target owns")
+    build_parser.add_argument("--shard-dir", help="directory of the per-target name lists")
+
+    count_parser = sub.add_parser("count", help="names owned by each target")
+    count_parser.add_argument("--roots", required=True, help="targets file")
+
+    list_parser = sub.add_parser("list", help="names under a root")
+    list_parser.add_argument("root")
+    list_parser.add_argument("--roots", help="targets file; leave out names owned by a more specific target")
+
+    owner_parser = sub.add_parser("owner", help="target owning each name")
+    owner_parser.add_argument("--roots", required=True, help="targets file")
+    owner_parser.add_argument("names", nargs="+")
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        count = write_index(args.index, _read_names(args.input))
+        print_status("SUCCESS", f"Indexed {count} names into {args.index}")
+        if args.roots and args.shard_dir:
+            with SubdomainIndex.open(args.index) as index:
+                write_shards(index, _roots(args.roots), args.shard_dir)
+            print_status("INFO", f"Per-target name lists written to {args.shard_dir}")
+        return 0
+
+    if args.command == "owner":
+        roots = set(_roots(args.roots))
+        for raw in args.names:
+            name = normalize_name(raw)
+            print(f"{raw} {(root_of(name, roots) if name else None) or '-'}")
+        return 0
+
+    if not os.path.isfile(args.index):
+        print_status("ERROR", f"No subdomain index at {args.index}")
+        return 1
+    with SubdomainIndex.open(args.index) as index:
+        if args.command == "count":
+            for root, count in index.count_by_root(_roots(args.roots)).items():
+                print(f"{root} {count}")
+        else:
+            roots = _roots(args.roots) if args.roots else ()
+            for name in index.list_by_root(args.root.lower(), roots):
+                print(name)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
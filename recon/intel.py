@@ -0,0 +1,105 @@
+"""Organization -> ASN -> CIDR intelligence graph of ``run_amass_intel``.
+
+The scripts read ``org_intel.txt`` line by line and ran ``amass intel -asn``
+for every line with an ASN, one at a time, so an ASN announced by several
+organizations was looked up once per mention; the simple script then ran
+``amass intel -cidr`` and the RADb WHOIS query on the first ``head -3``
+results only.  The graph takes every ASN and range as soon as the lookup
+that names it finishes:
+
+* every ASN the organization lookups mention is looked up once
+  (``amass intel -asn``), with up to ``concurrency`` lookups in flight,
+* with ``whois`` each ASN's RADb routes are fetched too,
+* with ``cidr`` every range of the ASN answers and routes is looked up
+  (``amass intel -cidr``), except ranges inside one already looked up.
+
+The lookups themselves (the cached tool runs) are the engine's; the graph
+appends their answers to ``asn_file`` and the routes to ``whois_file`` as
+they arrive, which the reverse DNS sweep tails (see :mod:`recon.reverse`).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import ipaddress
+import re
+from typing import Awaitable, Callable, Dict, IO, Iterable, List, Optional, Set
+
+from .console import print_status
+from .reverse import extract_cidrs
+
+ASN = re.compile(r"AS[0-9]+")
+RADB_CIDR = re.compile(r"(?:[0-9]{1,3}\.){3}[0-9]{1,3}/[0-9]+")
+
+Lookup = Callable[[str], Awaitable[List[str]]]
+
+
+class IntelGraph:
+    """Deduplicated, concurrent ASN, WHOIS and CIDR lookups fed by organization answers."""
+
+    def __init__(self, asn: Lookup, asn_file: IO[str], whois: Optional[Lookup] = None,
+                 whois_file: Optional[IO[str]] = None, cidr: Optional[Lookup] = None, concurrency: int = 3):
+        self.lookup_asn = asn
+        self.lookup_whois = whois
+        self.lookup_cidr = cidr
+        self.asn_file = asn_file
+        self.whois_file = whois_file
+        self.semaphore = asyncio.Semaphore(max(1, concurrency))
+        self.asns: Dict[str, None] = {}
+        self.routes: Dict[str, None] = {}
+        self.networks: List[ipaddress.IPv4Network] = []
+        self.tasks: Set[asyncio.Future] = set()
+        self.failed = 0
+
+    def _spawn(self, lookup: Lookup, value: str, then: Callable[[str, List[str]], None]) -> None:
+        async def run() -> None:
+            async with self.semaphore:
+                try:
+                    lines = await lookup(value)
+                except Exception as exc:  # one failed lookup must not stop the others
+                    print_status("WARNING", f"Intel lookup {value} raised {exc!r}")
+                    self.failed += 1
+                    return
+            then(value, lines)
+
+        self.tasks.add(asyncio.ensure_future(run()))
+
+    def add_org(self, lines: Iterable[str]) -> None:
+        """Queue the ASNs of organization answers that were not seen yet."""
+        for asn in ASN.findall("\n".join(lines)):
+            if asn in self.asns:
+                continue
+            self.asns[asn] = None
+            self._spawn(self.lookup_asn, asn, self._asn_done)
+            if self.lookup_whois is not None:
+                self._spawn(self.lookup_whois, asn, self._whois_done)
+
+    def _asn_done(self, asn: str, lines: List[str]) -> None:
+        self.asn_file.writelines(f"{line}\n" for line in lines)
+        self.asn_file.flush()
+        self.add_networks(extract_cidrs(lines))
+        # ASNs that the answer mentions (peers, siblings) are not followed: only the organizations' own
+
+    def _whois_done(self, asn: str, lines: List[str]) -> None:
+        routes = [route for line in lines for route in RADB_CIDR.findall(line) if route not in self.routes]
+        self.routes.update(dict.fromkeys(routes))
+        if self.whois_file is not None and routes:
+            self.whois_file.writelines(f"{route}\n" for route in dict.fromkeys(routes))
+            self.whois_file.flush()
+        self.add_networks(extract_cidrs(routes))
+
+    def add_networks(self, networks: Iterable[ipaddress.IPv4Network]) -> None:
+        """Queue CIDR lookups of ranges not inside a range already queued."""
+        if self.lookup_cidr is None:
+            return
+        for network in networks:
+            if any(network.subnet_of(known) for known in self.networks):
+                continue
+            self.networks.append(network)
+            self._spawn(self.lookup_cidr, str(network), lambda value, lines: None)
+
+    async def join(self) -> None:
+        """Wait for every lookup, including those queued by lookups that finish meanwhile."""
+        while self.tasks:
+            done, _ = await asyncio.wait(self.tasks)
+            self.tasks -= done
@@ -0,0 +1,169 @@
+"""Run manifest for checkpointing and resuming interrupted runs.
+
+Every pipeline stage, and every per-target task of the worker pools, is
+recorded in ``<output dir>/manifest.db`` as ``pending``, ``running``,
+``done`` or ``failed`` together with the SHA-256 of the files it produced.
+The scheduler and the worker pool consult it before starting work: a stage
+or task that is ``done`` and whose outputs still have the recorded checksums
+is skipped, so ``--resume <dir>`` only redoes what was unfinished, failed or
+has been modified since.  A stage whose dependencies had to run again is
+re-run as well.
+
+Command line usage (to inspect a run)::
+
+    python3 -m recon.manifest --db out/manifest.db meta start_time
+    python3 -m recon.manifest --db out/manifest.db show [--summary]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import time
+from collections import Counter
+from typing import Dict, List, Optional, Sequence
+
+from .cache import file_digest
+from .console import print_status
+
+PENDING = "pending"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+STATUSES = (PENDING, RUNNING, DONE, FAILED)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    stage TEXT NOT NULL,
+    target TEXT NOT NULL,
+    status TEXT NOT NULL,
+    started REAL,
+    finished REAL,
+    returncode INTEGER,
+    outputs TEXT NOT NULL DEFAULT '{}',
+    PRIMARY KEY (stage, target)
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+
+class Manifest:
+    """Task states of one run; ``target`` is ``""`` for a whole stage."""
+
+    def __init__(self, path: str):
+        self.base = os.path.dirname(os.path.abspath(path))
+        self.db = sqlite3.connect(path, timeout=60, isolation_level=None)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.executescript(SCHEMA)
+
+    def close(self) -> None:
+        self.db.close()
+
+    def checksums(self, paths: Sequence[str]) -> Dict[str, str]:
+        """Digests keyed by path relative to the run directory, so a resume may name it differently."""
+        return {os.path.relpath(os.path.abspath(path), self.base): file_digest(path) for path in paths}
+
+    def set_meta(self, key: str, value: str) -> None:
+        self.db.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value))
+
+    def get_meta(self, key: str) -> Optional[str]:
+        row = self.db.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def register(self, stage: str, target: str = "") -> None:
+        self.db.execute(
+            "INSERT OR IGNORE INTO tasks (stage, target, status) VALUES (?, ?, ?)", (stage, target, PENDING)
+        )
+
+    def start(self, stage: str, target: str = "") -> None:
+        self.db.execute(
+            """INSERT INTO tasks (stage, target, status, started) VALUES (?, ?, ?, ?)
+               ON CONFLICT (stage, target) DO UPDATE SET status = excluded.status,
+                   started = excluded.started, finished = NULL, returncode = NULL""",
+            (stage, target, RUNNING, time.time()),
+        )
+
+    def finish(self, stage: str, target: str, returncode: int, outputs: Sequence[str] = ()) -> None:
+        self.db.execute(
+            "UPDATE tasks SET status = ?, finished = ?, returncode = ?, outputs = ? WHERE stage = ? AND target = ?",
+            (DONE if returncode == 0 else FAILED, time.time(), returncode,
+             json.dumps(self.checksums(outputs), sort_keys=True), stage, target),
+        )
+
+    def is_complete(self, stage: str, target: str = "", outputs: Sequence[str] = ()) -> bool:
+        """Whether the task finished and its outputs are unchanged since."""
+        row = self.db.execute(
+            "SELECT status, outputs FROM tasks WHERE stage = ? AND target = ?", (stage, target)
+        ).fetchone()
+        if row is None or row[0] != DONE:
+            return False
+        recorded = json.loads(row[1])
+        return all(recorded.get(path) == digest for path, digest in self.checksums(outputs).items())
+
+    def entries(self) -> List[sqlite3.Row]:
+        self.db.row_factory = sqlite3.Row
+        try:
+            return self.db.execute("SELECT * FROM tasks ORDER BY started IS NULL, started, stage, target").fetchall()
+        finally:
+            self.db.row_factory = None
+
+
+def status_summary(entries: Sequence[sqlite3.Row]) -> str:
+    """``"20 done, 0 failed, ..."`` counts of the tasks per status."""
+    counts = Counter(entry["status"] for entry in entries)
+    return ", ".join(f"{counts[status]} {status}" for status in STATUSES)
+
+
+def format_entry(entry: sqlite3.Row) -> str:
+    elapsed = ""
+    if entry["started"] and entry["finished"]:
+        elapsed = f"{entry['finished'] - entry['started']:.1f}s"
+    return f"{entry['status']:<8} {entry['stage']:<24} {entry['target'] or '-':<32} {elapsed}"
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python3 -m recon.manifest",
+        description="Run manifest of stage and per-target task states.",
+    )
+    parser.add_argument("--db", required=True, help="manifest database, e.g. out/manifest.db")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    meta_parser = sub.add_parser("meta", help="print a recorded run option")
+    meta_parser.add_argument("key")
+
+    show_parser = sub.add_parser("show", help="list task states")
+    show_parser.add_argument("--summary", action="store_true", help="only count tasks per status")
+    args = parser.parse_args(argv)
+
+    if not os.path.isfile(args.db):
+        print_status("ERROR", f"No run manifest at {args.db}")
+        return 1
+
+    manifest = Manifest(args.db)
+    try:
+        if args.command == "meta":
+            value = manifest.get_meta(args.key)
+            if value is None:
+                return 1
+            print(value)
+        else:
+            entries = manifest.entries()
+            if args.summary:
+                print(status_summary(entries))
+                return 0
+            for entry in entries:
+                print(format_entry(entry))
+    finally:
+        manifest.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,62 @@
+"""Hostname normalisation shared by every stage that handles discovered names."""
+
+from __future__ import annotations
+
+import re
+from typing import Optional
+
+try:  # IDNA 2008 when the idna package is installed, stdlib IDNA 2003 otherwise
+    import idna as _idna
+except ImportError:  # pragma: no cover - depends on the environment
+    _idna = None
+
+# Same acceptance rules as the grep filters in aggregate_subdomains, plus
+# punycode TLDs and single-character leftmost labels.
+_VALID_NAME = re.compile(r"^[a-z0-9]([a-z0-9.-]*[a-z0-9])?\.([a-z]{2,}|xn--[a-z0-9-]+)$")
+
+
+def _to_ascii(name: str) -> Optional[str]:
+    if name.isascii():
+        return name
+    try:
+        if _idna is not None:
+            return _idna.encode(name, uts46=True).decode("ascii")
+        return name.encode("idna").decode("ascii")
+    except (UnicodeError, ValueError):
+        return None
+
+
+def normalize_name(raw: str) -> Optional[str]:
+    """Return the canonical form of a hostname, or ``None`` if it is not one.
+
+    Lowercases, strips whitespace, leading wildcard labels (``*.``), leading
+    and trailing dots and converts internationalised names to punycode.
+    """
+    name = raw.strip().lower()
+    while name.startswith("*."):
+        name = name[2:]
+    name = name.strip(".")
+    if not name:
+        return None
+    name = _to_ascii(name)
+    if name is None or ".." in name or len(name) > 253:
+        return None
+    if not _VALID_NAME.match(name):
+        return None
+    if any(label.startswith("-") or label.endswith("-") or len(label) > 63 for label in name.split(".")):
+        return None
+    return name
+
+
+def root_of(name: str, roots) -> Optional[str]:
+    """Return the most specific root in ``roots`` that owns ``name``.
+
+    ``roots`` is a set of normalised root domains; the apex itself counts as
+    belonging to its root.
+    """
+    labels = name.split(".")
+    for start in range(len(labels) - 1):
+        candidate = ".".join(labels[start:])
+        if candidate in roots:
+            return candidate
+    return None
@@ -0,0 +1,304 @@
+"""Streaming readers of the structured outputs of bbot, sudomy and ffuf.
+
+The bash scripts read these outputs with ``find -exec cat {} \\;``, ``jq``
+and ``sed`` and kept the lines that looked like hostnames.  The readers
+parse the outputs in the engine's process, one pass and one file at a time,
+and keep what the tools know about every name:
+
+* bbot: the NDJSON events of each scan directory (``output.json`` /
+  ``*.ndjson``): ``DNS_NAME``, ``URL``, ``IP_ADDRESS``, ``OPEN_TCP_PORT``
+  and the ``resolved_hosts`` of every in-scope event, with the module that
+  emitted it.  Scans without an event file fall back to their ``*.txt``
+  lists.
+* sudomy: every ``*.txt`` of its result directory, one finding per line with
+  the hostname, IP and URL tokens of the line; the module is the file
+  (``Passive_Collect/crtsh.txt`` -> ``crtsh``).
+* ffuf: the ``results`` array of its JSON report, decoded one result at a
+  time instead of loading the report.
+
+A reader yields :class:`Finding` records; the engine writes their hosts to
+the source's result file and the records to ``findings.jsonl`` next to the
+raw output (see :attr:`recon.sources.Source.reader`).
+
+Command line usage (to inspect an output)::
+
+    python3 -m recon.parsers bbot out/subdomains/bbot
+    python3 -m recon.parsers sudomy out/subdomains/sudomy/individual/sudomy_example_com --domain example.com
+    python3 -m recon.parsers ffuf out/subdomains/ffuf/ffuf_example_com.json --jsonl
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import re
+import socket
+import sys
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterator, List, Optional, Sequence
+
+BUFFER = 1 << 16
+
+_HOSTNAME = re.compile(r"^[a-zA-Z0-9_.-]+\.[a-zA-Z]{2,}$")
+_TOKEN_SPLIT = re.compile(r"[\s,;|\"'<>()\[\]]+")
+_FFUF_RESULTS = re.compile(r'"results"\s*:\s*\[')
+_URL_HOST = re.compile(r"[a-zA-Z][a-zA-Z0-9+.-]*://(?:[^@/?#]*@)?(\[[^\]/]*\]|[^:/?#]*)")
+
+# bbot event types whose ``data`` is a URL
+_URL_EVENTS = ("URL", "URL_UNVERIFIED", "URL_HINT")
+
+
+@dataclass(frozen=True)
+class Finding:
+    """What an output says about one name: its host, an address, a URL and the module that found it."""
+
+    host: str = ""
+    ip: str = ""
+    url: str = ""
+    module: str = ""
+
+
+def _ip(token: str) -> str:
+    """``token`` if it is an IPv4 address, the canonical form of an IPv6 one, else ``""``."""
+    if not token or not (token[0].isdigit() or ":" in token):
+        return ""
+    try:
+        socket.inet_pton(socket.AF_INET, token)
+        return token
+    except OSError:
+        pass
+    try:
+        return socket.inet_ntop(socket.AF_INET6, socket.inet_pton(socket.AF_INET6, token))
+    except (OSError, ValueError):
+        return ""
+
+
+def _url_host(url: str) -> str:
+    match = _URL_HOST.match(url)
+    return match.group(1).strip("[]").lower() if match else ""
+
+
+def _in_domain(host: str, domain: str) -> bool:
+    return not domain or host == domain or host.endswith(f".{domain}")
+
+
+def _files(directory: str, suffixes: Sequence[str]) -> List[str]:
+    found = []
+    for root, _, files in os.walk(directory):
+        found.extend(os.path.join(root, name) for name in sorted(files) if name.endswith(tuple(suffixes)))
+    return sorted(found)
+
+
+def _lines(path: str) -> Iterator[str]:
+    try:
+        with open(path, encoding="utf-8", errors="replace") as handle:
+            for line in handle:
+                line = line.strip()
+                if line:
+                    yield line
+    except OSError:
+        return
+
+
+# -- bbot ----------------------------------------------------------------------------
+
+
+def _bbot_event(event: Dict, domain: str) -> Iterator[Finding]:
+    if event.get("scope_distance", 0) not in (0, None):
+        return
+    kind = str(event.get("type", ""))
+    data = event.get("data")
+    module = str(event.get("module", "") or "")
+    host = str(event.get("host", "") or "").lower()
+    url = ip = ""
+    if kind in _URL_EVENTS and isinstance(data, str):
+        url = data
+    elif isinstance(data, dict):
+        url = str(data.get("url", "") or "")
+    elif kind == "IP_ADDRESS" and isinstance(data, str):
+        ip = _ip(data)
+    elif kind.startswith("DNS_NAME") and isinstance(data, str) and not host:
+        host = data.lower()
+    if not host and url:
+        host = _url_host(url)
+    if _ip(host):
+        ip, host = ip or _ip(host), ""
+    if host and not _in_domain(host, domain):
+        return
+    resolved = [address for address in map(_ip, event.get("resolved_hosts") or ()) if address]
+    if host or ip or url:
+        yield Finding(host, ip or (resolved[0] if resolved else ""), url, module)
+    for address in resolved[1:]:
+        yield Finding(host, address, "", module)
+
+
+def _bbot_scans(path: str) -> Dict[str, List[str]]:
+    """Files under ``path`` by scan: the first directory below ``path``, ``""`` for the files of ``path`` itself."""
+    scans: Dict[str, List[str]] = {}
+    for name in _files(path, (".json", ".ndjson", ".txt")):
+        relative = os.path.relpath(name, path)
+        scan = relative.split(os.sep, 1)[0] if os.sep in relative else ""
+        scans.setdefault(scan, []).append(name)
+    return scans
+
+
+def _bbot_events(events_file: str, domain: str) -> Iterator[Finding]:
+    for line in _lines(events_file):
+        try:
+            event = json.loads(line)
+        except ValueError:
+            continue
+        if isinstance(event, dict):
+            yield from _bbot_event(event, domain)
+
+
+def read_bbot(path: str, domain: str = "") -> Iterator[Finding]:
+    """Findings of the bbot scans under ``path`` (one directory per scan)."""
+    if not os.path.isdir(path):
+        yield from _bbot_events(path, domain)
+        return
+    for _, files in sorted(_bbot_scans(path).items()):
+        events = [name for name in files if name.endswith((".json", ".ndjson"))]
+        for events_file in events:
+            yield from _bbot_events(events_file, domain)
+        if events:
+            continue
+        # A scan without an event file falls back to its name lists
+        for listing in files:
+            for line in _lines(listing):
+                if _HOSTNAME.match(line) and _in_domain(line.lower(), domain):
+                    yield Finding(line.lower(), module="bbot")
+
+
+# -- sudomy ----------------------------------------------------------------------------
+
+
+def _sudomy_line(line: str, domain: str, module: str) -> Optional[Finding]:
+    host = ip = url = ""
+    for token in _TOKEN_SPLIT.split(line):
+        if not token:
+            continue
+        if "://" in token:
+            url = url or token
+            token = _url_host(token)
+        address = _ip(token)
+        if address:
+            ip = ip or address
+        elif not host and _HOSTNAME.match(token) and _in_domain(token.lower(), domain):
+            host = token.lower()
+    if not (host or ip or url):
+        return None
+    return Finding(host, ip, url, module)
+
+
+def read_sudomy(path: str, domain: str = "") -> Iterator[Finding]:
+    """Findings of a sudomy result directory (or of one of its files)."""
+    for listing in _files(path, (".txt",)) if os.path.isdir(path) else [path]:
+        module = os.path.splitext(os.path.basename(listing))[0]
+        for line in _lines(listing):
+            finding = _sudomy_line(line, domain, module)
+            if finding is not None:
+                yield finding
+
+
+# -- ffuf ------------------------------------------------------------------------------
+
+
+def _ffuf_results(handle) -> Iterator[Dict]:
+    """The objects of the ``results`` array of an ffuf JSON report, decoded as they are read."""
+    decoder = json.JSONDecoder()
+    buffer = ""
+    eof = False
+    while True:
+        match = _FFUF_RESULTS.search(buffer)
+        if match:
+            position = match.end()
+            break
+        if eof:
+            return
+        chunk = handle.read(BUFFER)
+        eof = not chunk
+        # Keep enough of the tail for a key split across two reads
+        buffer = buffer[-32:] + chunk
+    while True:
+        while position < len(buffer) and buffer[position] in " \t\r\n,":
+            position += 1
+        if position < len(buffer) and buffer[position] == "]":
+            return
+        try:
+            result, position = decoder.raw_decode(buffer, position)
+        except ValueError:
+            if eof:
+                return
+            chunk = handle.read(BUFFER)
+            eof = not chunk
+            buffer = buffer[position:] + chunk
+            position = 0
+            continue
+        if isinstance(result, dict):
+            yield result
+
+
+def read_ffuf(path: str, domain: str = "") -> Iterator[Finding]:
+    """Findings of the results of an ffuf JSON report."""
+    try:
+        handle = open(path, encoding="utf-8", errors="replace")
+    except OSError:
+        return
+    with handle:
+        for result in _ffuf_results(handle):
+            url = str(result.get("url", "") or "")
+            host = _url_host(url) or str(result.get("host", "") or "").split(":")[0].lower()
+            if host and _in_domain(host, domain):
+                yield Finding(host, "", url, "ffuf")
+
+
+READERS: Dict[str, Callable[[str, str], Iterator[Finding]]] = {
+    "bbot": read_bbot,
+    "sudomy": read_sudomy,
+    "ffuf": read_ffuf,
+}
+
+
+def findings_path(raw: str) -> str:
+    """``<dir>/findings.jsonl`` for a raw directory, ``<name>.findings.jsonl`` beside a raw file."""
+    return os.path.join(raw, "findings.jsonl") if os.path.isdir(raw) else f"{os.path.splitext(raw)[0]}.findings.jsonl"
+
+
+def write_findings(findings: Iterator[Finding], output: str, records: str) -> int:
+    """Hosts of ``findings`` to ``output`` (each once), every finding to the ``records`` JSON lines."""
+    seen = set()
+    os.makedirs(os.path.dirname(records) or ".", exist_ok=True)
+    with open(output, "w", encoding="utf-8") as out, open(records, "w", encoding="utf-8") as record:
+        for finding in findings:
+            record.write(json.dumps(vars(finding)) + "\n")
+            if finding.host and finding.host not in seen:
+                seen.add(finding.host)
+                out.write(f"{finding.host}\n")
+    return len(seen)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python3 -m recon.parsers",
+        description="Print the names (or findings) in a bbot, sudomy or ffuf output.",
+    )
+    parser.add_argument("format", choices=sorted(READERS))
+    parser.add_argument("path", help="output file or directory of the tool")
+    parser.add_argument("--domain", default="", help="keep the names under this domain")
+    parser.add_argument("--jsonl", action="store_true", help="print every finding as JSON instead of the names")
+    args = parser.parse_args(argv)
+
+    seen = set()
+    for finding in READERS[args.format](args.path, args.domain.lower()):
+        if args.jsonl:
+            print(json.dumps(vars(finding)))
+        elif finding.host and finding.host not in seen:
+            seen.add(finding.host)
+            print(finding.host)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,392 @@
+"""Subdomain permutations learned from the discovered names.
+
+Most names the passive sources and the wordlist miss are variations of the
+ones they found: ``dev-api`` next to ``api``, ``staging.shop`` next to
+``prod.shop``, ``web03`` next to ``web02``.  Instead of a fixed alteration
+wordlist, the rules are learned from the resolved names of each target and
+ranked by how often the pattern holds where it could apply:
+
+* ``swap``: tokens (the ``-``-separated parts of a label) seen in the same
+  place of different names, e.g. ``dev-api`` and ``prod-api`` make
+  ``dev`` <-> ``prod``; the weight is the number of places they share,
+* ``prefix`` / ``suffix``: tokens seen at the start or end of labels,
+  applied to the leftmost label (``api`` -> ``dev-api``, ``api-staging``),
+* ``label``: leftmost labels of deeper names, added in front of the others
+  (``shop.example.com`` -> ``dev.shop.example.com``),
+* ``step``: number gaps between otherwise equal labels, applied to every
+  number of a name, zero padding kept (``web02`` -> ``web03``).
+
+Candidates are generated lazily, best-ranked rule first, deduplicated
+against every known name (held as a :class:`recon.index.SubdomainIndex`),
+and go straight from the generator into the resolver through a bounded
+queue; ``--max-candidates`` caps the queries of the whole run.  Names that
+resolve (wildcard answers excluded) are appended to the result lists like
+any other, and are permuted in turn for ``--rounds`` rounds.
+
+Command line usage (as called from the engine)::
+
+    python3 -m recon.permute --input out/resolved_subdomains.txt --scope out/targets.txt \\
+        --known out/final_subdomains.txt --known out/state/cached_subdomains.txt \\
+        --append out/final_subdomains.txt \\
+        --output out/subdomains/permutations/permutations.txt \\
+        --rules out/subdomains/permutations/rules.txt \\
+        --resolved out/resolved_subdomains.txt --hosts out/subdomains/resolved_hosts.txt \\
+        --wildcards out/subdomains/wildcard_subdomains.txt \\
+        --max-candidates 200000 --rounds 2 --resolver 1.1.1.1 --rate 200
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import re
+import sys
+import time
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Set, Tuple
+
+from .console import print_status
+from .dns import ResolverPool, add_resolver_arguments, pool_options
+from .index import SubdomainIndex, normalized
+from .names import root_of
+from .pool import read_targets
+from .resolve import Resolution, ResolveStats, resolve_stream, resolver_workers
+
+# Tokens kept per swap context: a context shared by more names is a numbering scheme, not an environment
+MAX_GROUP = 32
+# Largest number gap learned as a step rule
+MAX_STEP = 3
+# Places added to the denominator of every score, so a rule seen twice out of two does not outrank the rest
+PRIOR = 5
+
+_DIGITS = re.compile(r"\d+")
+
+Base = Tuple[Tuple[str, ...], str]  # labels below the root, root
+
+
+class Rule(NamedTuple):
+    score: float
+    weight: int
+    kind: str
+    old: str
+    new: str
+
+    def __str__(self) -> str:
+        if self.kind == "swap":
+            return f"{self.old} -> {self.new}"
+        return {"prefix": f"{self.new}-<label>", "suffix": f"<label>-{self.new}", "label": f"{self.new}.<name>",
+                "step": f"<n>{self.new}"}[self.kind]
+
+
+def split(name: str, roots: Set[str]) -> Optional[Base]:
+    """``(labels, root)`` of an in-scope name below its root, ``None`` for the apex or out of scope."""
+    root = root_of(name, roots)
+    if root is None or root == name:
+        return None
+    return tuple(name[: -len(root) - 1].split(".")), root
+
+
+def _tokens(label: str) -> Optional[List[str]]:
+    # Punycode and other double hyphens do not split into tokens
+    if label.startswith("xn--") or "--" in label:
+        return None
+    return label.split("-")
+
+
+class PatternModel:
+    """Label statistics of the discovered names, turned into ranked :class:`Rule` lists."""
+
+    def __init__(self) -> None:
+        self.names = 0
+        self.contexts: Dict[int, List[str]] = {}
+        self.occurrences: Counter = Counter()
+        self.prefixes: Counter = Counter()
+        self.suffixes: Counter = Counter()
+        self.labels: Counter = Counter()
+        self.numbers: Dict[int, Set[int]] = defaultdict(set)
+
+    def add(self, base: Base) -> None:
+        labels, root = base
+        self.names += 1
+        if len(labels) > 1:
+            self.labels[labels[0]] += 1
+        for position, label in enumerate(labels):
+            head = labels[:position]
+            tail = (*labels[position + 1:], root)
+            for match in _DIGITS.finditer(label):
+                pattern = f"{label[:match.start()]}#{label[match.end():]}"
+                self.numbers[hash((head, pattern, tail))].add(int(match.group()))
+            tokens = _tokens(label)
+            if tokens is None:
+                continue
+            if len(tokens) > 1:
+                if not tokens[0].isdigit():
+                    self.prefixes[tokens[0]] += 1
+                if not tokens[-1].isdigit():
+                    self.suffixes[tokens[-1]] += 1
+            elif len(labels) == 1:
+                continue  # the bare ``*.root`` context would pair every first-level name with every other
+            for index, token in enumerate(tokens):
+                if token.isdigit():
+                    continue
+                pattern = "-".join((*tokens[:index], "*", *tokens[index + 1:]))
+                group = self.contexts.setdefault(hash((head, pattern, tail)), [])
+                if len(group) < MAX_GROUP and token not in group:
+                    group.append(token)
+                    self.occurrences[token] += 1
+
+    def update(self, bases: Iterable[Base]) -> None:
+        for base in bases:
+            self.add(base)
+
+    def rules(self, min_count: int = 1) -> List[Rule]:
+        """Every rule observed at least ``min_count`` times, most likely to hold first.
+
+        The score of a rule is the share of the places it could apply where
+        the discovered names show it: the contexts of ``old`` that also hold
+        ``new`` for a swap, the names that carry the prefix, suffix or label,
+        the numbered labels with a neighbour at that distance.
+        """
+        pairs: Counter = Counter()
+        for group in self.contexts.values():
+            if len(group) > 1:
+                for old in group:
+                    for new in group:
+                        if old != new:
+                            pairs[old, new] += 1
+        steps: Counter = Counter()
+        numbered = sum(map(len, self.numbers.values()))
+        for numbers in self.numbers.values():
+            if len(numbers) > 1:
+                ordered = sorted(numbers)
+                for low, high in zip(ordered, ordered[1:]):
+                    if high - low <= MAX_STEP:
+                        steps[high - low] += 1
+
+        names = self.names + PRIOR
+        rules = [Rule(count / (self.occurrences[old] + PRIOR), count, "swap", old, new)
+                 for (old, new), count in pairs.items()]
+        rules += [Rule(count / names, count, "prefix", "", token) for token, count in self.prefixes.items()]
+        rules += [Rule(count / names, count, "suffix", "", token) for token, count in self.suffixes.items()]
+        rules += [Rule(count / names, count, "label", "", label) for label, count in self.labels.items()]
+        for step, count in steps.items():
+            score = count / (numbered + PRIOR)
+            rules += [Rule(score, count, "step", "", f"+{step}"), Rule(score, count, "step", "", f"-{step}")]
+        rules = [rule for rule in rules if rule.weight >= min_count]
+        rules.sort(key=lambda rule: (-rule.score, -rule.weight, rule.kind, rule.old, rule.new))
+        return rules
+
+
+def _name(labels: Sequence[str], position: int, label: str, root: str) -> Optional[str]:
+    """``labels`` with ``label`` at ``position``, under ``root``; ``None`` if too long for DNS."""
+    if len(label) > 63:
+        return None
+    name = ".".join((*labels[:position], label, *labels[position + 1:], root))
+    return name if len(name) <= 253 else None
+
+
+def _swapped(base: Base, old: str, new: str) -> Iterator[Optional[str]]:
+    labels, root = base
+    for position, label in enumerate(labels):
+        tokens = _tokens(label)
+        if tokens is None or old not in tokens:
+            continue
+        for index, token in enumerate(tokens):
+            if token == old:
+                yield _name(labels, position, "-".join((*tokens[:index], new, *tokens[index + 1:])), root)
+
+
+def _stepped(base: Base, step: int) -> Iterator[Optional[str]]:
+    labels, root = base
+    for position, label in enumerate(labels):
+        for match in _DIGITS.finditer(label):
+            number = int(match.group()) + step
+            if number >= 0:
+                # Zero-padded numbers keep their width (web09 -> web10), others do not (web12 -> web9)
+                digits = str(number).zfill(len(match.group()) if match.group().startswith("0") else 0)
+                yield _name(labels, position, f"{label[:match.start()]}{digits}{label[match.end():]}", root)
+
+
+def _affixed(base: Base, rule: Rule) -> Optional[str]:
+    labels, root = base
+    first = labels[0]
+    if rule.kind == "label":
+        return None if first == rule.new else _name((rule.new, *labels), 0, rule.new, root)
+    tokens = _tokens(first)
+    if tokens is None or rule.new in tokens:
+        return None
+    return _name(labels, 0, f"{rule.new}-{first}" if rule.kind == "prefix" else f"{first}-{rule.new}", root)
+
+
+def permutations(rules: Sequence[Rule], bases: Sequence[Base]) -> Iterator[str]:
+    """Every rule applied to every base it fits, rule by rule; duplicates included."""
+    swapped = {rule.old for rule in rules if rule.kind == "swap"}
+    by_token: Dict[str, List[int]] = defaultdict(list)
+    numbered: List[int] = []
+    for position, (labels, _) in enumerate(bases):
+        for token in {token for label in labels for token in (_tokens(label) or ())} & swapped:
+            by_token[token].append(position)
+        if _DIGITS.search(".".join(labels)):
+            numbered.append(position)
+
+    for rule in rules:
+        if rule.kind == "swap":
+            for position in by_token.get(rule.old, ()):
+                yield from filter(None, _swapped(bases[position], rule.old, rule.new))
+        elif rule.kind == "step":
+            for position in numbered:
+                yield from filter(None, _stepped(bases[position], int(rule.new)))
+        else:
+            yield from filter(None, (_affixed(base, rule) for base in bases))
+
+
+class KnownNames:
+    """Names not to query again: the index of the discovered names plus those found since."""
+
+    def __init__(self, index: SubdomainIndex):
+        self.index = index
+        self.added: Set[str] = set()
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.added or name in self.index
+
+    def add(self, name: str) -> None:
+        self.added.add(name)
+
+
+def candidates(rules: Sequence[Rule], bases: Sequence[Base], known: KnownNames, limit: int) -> Iterator[str]:
+    """New names from :func:`permutations`, each once, at most ``limit`` of them."""
+    if limit <= 0:
+        return
+    seen: Set[str] = set()
+    for name in permutations(rules, bases):
+        if name in seen or name in known:
+            continue
+        seen.add(name)
+        yield name
+        if len(seen) >= limit:
+            return
+
+
+@dataclass
+class PermuteStats:
+    names: int = 0
+    rules: int = 0
+    queried: int = 0
+    found: int = 0
+
+
+def write_rules(path: str, rules: Sequence[Rule]) -> None:
+    with open(path, "w", encoding="utf-8") as out:
+        out.writelines(f"{rule.score:.4f}\t{rule.weight}\t{rule.kind}\t{rule}\n" for rule in rules)
+
+
+async def permute(
+    bases: List[Base],
+    roots: Set[str],
+    known: KnownNames,
+    files: Dict[str, str],
+    limit: int,
+    rounds: int,
+    min_count: int,
+    options: dict,
+) -> Tuple[PermuteStats, ResolveStats]:
+    """Learn, generate and resolve for ``rounds`` rounds; the names found are the bases of the next one."""
+    stats = PermuteStats(names=len(bases))
+    resolve_stats = ResolveStats()
+    model = PatternModel()
+    workers = resolver_workers(options)
+    async with ResolverPool(**options) as pool:
+        with open(files["output"], "w", encoding="utf-8") as output, \
+                open(files["resolved"], "a", encoding="utf-8") as resolved, \
+                open(files["hosts"], "a", encoding="utf-8") as hosts, \
+                open(files["wildcards"], "a", encoding="utf-8") as wildcards, \
+                open(files["append"], "a", encoding="utf-8") as append:
+            for round_number in range(1, rounds + 1):
+                model.update(bases)
+                rules = model.rules(min_count)
+                if round_number == 1:
+                    stats.rules = len(rules)
+                    if files.get("rules"):
+                        write_rules(files["rules"], rules)
+                if not rules or stats.queried >= limit:
+                    break
+                print_status("INFO", f"Permutations: round {round_number}, {len(rules)} rules on {len(bases)} names")
+                found: List[str] = []
+
+                def on_resolved(resolution: Resolution) -> None:
+                    found.append(resolution.name)
+                    output.write(f"{resolution.name}\n")
+                    append.write(f"{resolution.name}\n")
+                    output.flush()
+                    append.flush()
+
+                queue: "asyncio.Queue[Optional[str]]" = asyncio.Queue(maxsize=workers * 4)
+
+                async def feed() -> None:
+                    for name in candidates(rules, bases, known, limit - stats.queried):
+                        known.add(name)
+                        stats.queried += 1
+                        await queue.put(name)
+                    for _ in range(workers):
+                        await queue.put(None)
+
+                await asyncio.gather(feed(), resolve_stream(pool, queue, workers, resolved, hosts, wildcards,
+                                                             resolve_stats, on_resolved))
+                stats.found += len(found)
+                bases = [base for base in (split(name, roots) for name in found) if base is not None]
+                if not bases:
+                    break
+    return stats, resolve_stats
+
+
+def _lines(paths: Sequence[str]) -> Iterator[str]:
+    for path in paths:
+        if os.path.isfile(path):
+            with open(path, encoding="utf-8", errors="replace") as handle:
+                yield from handle
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python3 -m recon.permute",
+        description="Resolve permutations of the discovered subdomains, learned from their label patterns.",
+    )
+    parser.add_argument("--input", required=True, help="resolved names the patterns are learned from")
+    parser.add_argument("--scope", required=True, help="targets file; names under a target are in scope")
+    parser.add_argument("--known", action="append", default=[],
+                        help="names not to query again (repeatable); the input always is")
+    parser.add_argument("--append", required=True, help="name list the names found are appended to")
+    parser.add_argument("--output", required=True, help="names found by the permutations")
+    parser.add_argument("--rules", help="learned rules (score, observations, kind, rule), best first")
+    parser.add_argument("--resolved", required=True, help="resolved name list the names found are appended to")
+    parser.add_argument("--hosts", required=True, help="resolved hosts list (name and addresses) appended to")
+    parser.add_argument("--wildcards", required=True, help="wildcard answers list appended to")
+    parser.add_argument("--max-candidates", type=int, default=200_000, help="names queried in all rounds at most")
+    parser.add_argument("--rounds", type=int, default=2, help="rounds; each permutes the names of the last")
+    parser.add_argument("--min-count", type=int, default=2, help="observations a rule needs (default 2)")
+    add_resolver_arguments(parser)
+    args = parser.parse_args(argv)
+
+    started = time.monotonic()
+    roots = set(normalized(read_targets(args.scope)))
+    names = list(dict.fromkeys(normalized(_lines([args.input]))))
+    bases = [base for base in (split(name, roots) for name in names) if base is not None]
+    known = KnownNames(SubdomainIndex.from_names(_lines([args.input, *args.known])))
+    files = {"output": args.output, "rules": args.rules, "resolved": args.resolved, "hosts": args.hosts,
+             "wildcards": args.wildcards, "append": args.append}
+    stats, resolve_stats = asyncio.run(permute(bases, roots, known, files, args.max_candidates, args.rounds,
+                                               args.min_count, pool_options(args)))
+    print_status(
+        "SUCCESS",
+        f"Permutations: {stats.found} names from {stats.queried} queries ({stats.rules} rules learned from "
+        f"{stats.names} names, {resolve_stats.wildcard} wildcard, {resolve_stats.failed} failed) "
+        f"in {time.monotonic() - started:.1f}s",
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,88 @@
+"""Bounded worker pool for per-domain tool loops.
+
+Tools without native list support (assetfinder, ffuf, sudomy, amass intel -org)
+used to run one domain at a time inside ``while read -r domain`` loops.  The
+pool runs up to ``concurrency`` domains at once, gives each domain its own
+shard file and merges the shards once every domain has finished, so no two
+workers ever append to the same output file.
+
+The engine runs its per-target tasks on the pool
+(:meth:`recon.engine.Engine.per_target`), records each target as a task in
+the run manifest, so targets a previous attempt finished are not run again,
+and appends the resource usage of every target to the run profile (see
+:mod:`recon.profile`) under the stage that started the pool.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import re
+from typing import Awaitable, Callable, Dict, Iterable, List, Sequence
+
+from .console import print_status
+from .extsort import DEFAULT_MEMORY_MB, external_sort
+
+
+def clean_domain(domain: str) -> str:
+    """Filesystem-safe form of a domain, same as ``${domain//[.:]/_}``."""
+    return re.sub(r"[.:]", "_", domain)
+
+
+def read_targets(path: str) -> List[str]:
+    """Read non-empty, de-duplicated targets in file order."""
+    seen: Dict[str, None] = {}
+    with open(path, encoding="utf-8", errors="replace") as handle:
+        for line in handle:
+            domain = line.strip()
+            if domain:
+                seen.setdefault(domain, None)
+    return list(seen)
+
+
+async def run_pool(
+    targets: Iterable[str],
+    worker: Callable[[str], Awaitable[int]],
+    concurrency: int,
+) -> Dict[str, int]:
+    """Run ``worker(domain)`` for every target with at most ``concurrency`` in flight.
+
+    Returns the exit status of every target.  A worker that raises is
+    reported as failed without affecting the other targets.
+    """
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    results: Dict[str, int] = {}
+
+    async def guarded(domain: str) -> None:
+        async with semaphore:
+            try:
+                results[domain] = await worker(domain)
+            except Exception as exc:
+                print_status("WARNING", f"{domain}: worker raised {exc!r}")
+                results[domain] = 1
+
+    await asyncio.gather(*(guarded(domain) for domain in targets))
+    return results
+
+
+def merge_shards(shards: Sequence[str], merged_file: str, dedupe: bool = True,
+                 memory_mb: float = DEFAULT_MEMORY_MB, workers: int = 0) -> int:
+    """Merge shard files into ``merged_file`` and return the number of lines written.
+
+    With ``dedupe`` the output is sorted and unique (like ``sort -u``, with
+    the external sort of :mod:`recon.extsort` within ``memory_mb``);
+    otherwise shards are concatenated in target order.
+    """
+    os.makedirs(os.path.dirname(merged_file) or ".", exist_ok=True)
+    if dedupe:
+        return external_sort(shards, merged_file, memory_mb, workers)
+
+    count = 0
+    with open(merged_file, "w", encoding="utf-8") as out:
+        for shard in shards:
+            if os.path.isfile(shard):
+                with open(shard, encoding="utf-8", errors="replace") as handle:
+                    for line in handle:
+                        out.write(line if line.endswith("\n") else f"{line}\n")
+                        count += 1
+    return count
@@ -0,0 +1,399 @@
+"""Asynchronous TCP connect scan of the resolved addresses.
+
+Every address in the resolver's ``--hosts`` lines is scanned once, however
+many names share it: the names are only needed for the per-host results.
+Each address gets ``--top`` ports of :data:`TOP_PORTS` (or ``--ports``),
+at most ``--per-host`` connects at a time:
+
+* a port is ``open`` when the connect completes, ``closed`` when it is
+  refused and ``filtered`` when nothing answers in time,
+* every answer (open or closed) is a round-trip sample of its address;
+  the connect timeout of the address follows them as TCP's RTO does
+  (``srtt + 4 * rttvar``, between ``--min-timeout`` and ``--timeout``), so
+  filtered ports of a near host cost milliseconds, and such a timeout is
+  retried ``--retries`` times, doubling it each time (up to ``--timeout``)
+  as TCP backs off its retransmission timer,
+* connects in flight overall are an :class:`~recon.ratelimit.AdaptiveLimit`
+  of at most ``--concurrency``: answers widen it, round trips well above an
+  address's fastest and local socket exhaustion halve it,
+* an address that answered none of its first ``--down-after`` ports is
+  given up.
+
+Open ports are written as JSON lines as they are found; ``--ips`` and
+``--hosts`` get the per-address and per-name results at the end.
+In ``--follow`` mode the input is tailed while the resolver writes it,
+until stdin reaches EOF.
+
+Command line usage (as called from the engine)::
+
+    python3 -m recon.ports --follow --input out/subdomains/resolved_hosts.txt \\
+        --output out/ports/ports.jsonl --ips out/ports/ip_ports.txt \\
+        --hosts out/ports/host_ports.txt --top 100 --concurrency 500
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import errno
+import ipaddress
+import json
+import os
+import socket
+import struct
+import sys
+import time
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Sequence, Set, TextIO, Tuple
+
+from .aggregate import FileFollower, stdin_closed_event
+from .console import print_status
+from .names import normalize_name
+from .ratelimit import AdaptiveLimit
+
+# nmap's most frequently open TCP ports, most frequent first
+TOP_PORTS = (
+    80, 23, 443, 21, 22, 25, 3389, 110, 445, 139, 143, 53, 135, 3306, 8080, 1723, 111, 995, 993, 5900,
+    1025, 587, 8888, 199, 1720, 465, 548, 113, 81, 6001, 10000, 514, 5060, 179, 1026, 2000, 8443, 8000, 32768, 554,
+    26, 1433, 49152, 2001, 515, 8008, 49154, 1027, 5666, 646, 5000, 5631, 631, 49153, 8081, 2049, 88, 79, 5800, 106,
+    2121, 1110, 49155, 6000, 513, 990, 5357, 427, 49156, 543, 544, 5101, 144, 7, 389, 8009, 3128, 444, 9999, 5009,
+    7070, 5190, 3000, 5432, 1900, 3986, 13, 1029, 9, 5051, 6646, 49157, 1028, 873, 1755, 2717, 4899, 9100, 119, 37,
+)
+OPEN, CLOSED, FILTERED = "open", "closed", "filtered"
+# Answers slower than this many times an address's fastest (plus the slack) count as congestion
+CONGESTION_FACTOR = 3.0
+CONGESTION_SLACK = 0.02
+# The scanning host ran out of sockets or ports: back off and try again
+LOCAL_ERRORS = {errno.EMFILE, errno.ENFILE, errno.ENOBUFS, errno.EADDRNOTAVAIL, errno.EAGAIN}
+_LINGER_RESET = struct.pack("ii", 1, 0)
+
+
+def _state(code: int) -> str:
+    """The port state of a connect's error code; errors that say nothing about the port are raised."""
+    if code == 0:
+        return OPEN
+    if code == errno.ECONNREFUSED:
+        return CLOSED
+    if code == errno.ETIMEDOUT:
+        return FILTERED
+    raise OSError(code, os.strerror(code))
+
+
+def top_ports(count: int) -> List[int]:
+    """The ``count`` most frequent ports; past :data:`TOP_PORTS` the others follow in ascending order."""
+    ports = list(TOP_PORTS[:count])
+    if count > len(TOP_PORTS):
+        listed = set(TOP_PORTS)
+        ports += [port for port in range(1, 65536) if port not in listed][:count - len(TOP_PORTS)]
+    return ports
+
+
+def parse_ports(spec: str) -> List[int]:
+    """``22,80,8000-8100`` as a port list, in the given order and without repeats."""
+    ports: Dict[int, None] = {}
+    for item in spec.split(","):
+        item = item.strip()
+        if not item:
+            continue
+        low, _, high = item.partition("-")
+        first, last = int(low), int(high or low)
+        if not 1 <= first <= last <= 65535:
+            raise ValueError(f"bad port range {item!r} in {spec!r}")
+        ports.update(dict.fromkeys(range(first, last + 1)))
+    return list(ports)
+
+
+def parse_addresses(line: str) -> Tuple[Optional[str], List[str]]:
+    """Name and addresses of a ``--hosts`` line of :mod:`recon.resolve`; a bare address has no name."""
+    fields = line.split()
+    if not fields:
+        return None, []
+    try:
+        return None, [str(ipaddress.ip_address(fields[0]))]
+    except ValueError:
+        pass
+    addresses = []
+    for value in (fields[1].split(",") if len(fields) > 1 else ()):
+        try:
+            addresses.append(str(ipaddress.ip_address(value)))
+        except ValueError:
+            continue  # "-" for names without an address
+    return normalize_name(fields[0]), addresses
+
+
+class RttEstimator:
+    """Smoothed round-trip time of one address and the connect timeout it implies (RFC 6298)."""
+
+    def __init__(self) -> None:
+        self.srtt = 0.0
+        self.rttvar = 0.0
+        self.minimum = 0.0
+        self.samples = 0
+
+    def update(self, sample: float) -> None:
+        if self.samples == 0:
+            self.srtt, self.rttvar, self.minimum = sample, sample / 2, sample
+        else:
+            self.rttvar = 0.75 * self.rttvar + 0.25 * abs(self.srtt - sample)
+            self.srtt = 0.875 * self.srtt + 0.125 * sample
+            self.minimum = min(self.minimum, sample)
+        self.samples += 1
+
+    def timeout(self, floor: float, ceiling: float) -> float:
+        if self.samples == 0:
+            return ceiling
+        return min(ceiling, max(floor, self.srtt + 4 * self.rttvar))
+
+    def congested(self, sample: float) -> bool:
+        return sample > self.minimum * CONGESTION_FACTOR + CONGESTION_SLACK
+
+
+@dataclass
+class Target:
+    """One address, the names that resolve to it and what its scan found."""
+
+    address: str
+    names: Set[str] = field(default_factory=set)
+    rtt: RttEstimator = field(default_factory=RttEstimator)
+    open: List[int] = field(default_factory=list)
+    probes: int = 0
+    answered: int = 0
+    down: bool = False
+
+
+@dataclass
+class ScanStats:
+    addresses: int = 0
+    names: int = 0
+    probes: int = 0
+    states: Dict[str, int] = field(default_factory=lambda: {OPEN: 0, CLOSED: 0, FILTERED: 0})
+    retries: int = 0
+    down: int = 0
+
+
+class PortScanner:
+    """Connect scan of addresses with adaptive timeouts and concurrency (see the module docstring)."""
+
+    def __init__(self, output: TextIO, concurrency: int = 500, per_host: int = 32, timeout: float = 1.5,
+                 min_timeout: float = 0.05, retries: int = 1, down_after: int = 20):
+        self.output = output
+        self.limit = AdaptiveLimit(concurrency, floor=max(1, concurrency // 50))
+        self.per_host = max(1, per_host)
+        self.timeout = timeout
+        self.min_timeout = min(min_timeout, timeout)
+        self.retries = retries
+        self.down_after = down_after
+        self.stats = ScanStats()
+
+    async def _connect(self, address: str, port: int, timeout: float) -> str:
+        # A non-blocking connect watched for writability: no task per connect, unlike sock_connect + wait_for
+        loop = asyncio.get_running_loop()
+        sock = socket.socket(socket.AF_INET6 if ":" in address else socket.AF_INET, socket.SOCK_STREAM)
+        try:
+            sock.setblocking(False)
+            # Reset instead of FIN on close: no TIME_WAIT left behind per open port
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_LINGER, _LINGER_RESET)
+            code = sock.connect_ex((address, port))
+            if code == 0:
+                return OPEN
+            if code != errno.EINPROGRESS:
+                return _state(code)
+            result: "asyncio.Future[int]" = loop.create_future()
+
+            def writable() -> None:
+                if not result.done():
+                    result.set_result(sock.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR))
+
+            def expired() -> None:
+                if not result.done():
+                    result.set_result(errno.ETIMEDOUT)
+
+            loop.add_writer(sock.fileno(), writable)
+            timer = loop.call_later(timeout, expired)
+            try:
+                return _state(await result)
+            finally:
+                timer.cancel()
+                loop.remove_writer(sock.fileno())
+        finally:
+            sock.close()
+
+    async def probe(self, target: Target, port: int) -> str:
+        """State of ``port`` on ``target``, feeding its round-trip estimate and the concurrency limit."""
+        attempts = 0
+        while True:
+            timeout = min(self.timeout, target.rtt.timeout(self.min_timeout, self.timeout) * 2 ** attempts)
+            async with self.limit:
+                started = time.monotonic()
+                try:
+                    state = await self._connect(target.address, port, timeout)
+                except OSError as exc:
+                    if exc.errno in LOCAL_ERRORS:
+                        self.limit.failure()
+                        await asyncio.sleep(self.min_timeout)
+                        continue
+                    state = FILTERED  # unreachable: an ICMP error, nothing to retry
+                    timeout = self.timeout
+                elapsed = time.monotonic() - started
+            self.stats.probes += 1
+            if state != FILTERED:
+                if target.rtt.samples and target.rtt.congested(elapsed):
+                    self.limit.failure()
+                else:
+                    self.limit.success()
+                target.rtt.update(elapsed)
+                return state
+            # Only a timeout shortened by the address's round trips may have been too short
+            if timeout >= self.timeout or attempts >= self.retries:
+                return state
+            attempts += 1
+            self.stats.retries += 1
+
+    async def _port(self, target: Target, port: int) -> None:
+        state = await self.probe(target, port)
+        target.probes += 1
+        self.stats.states[state] += 1
+        if state == FILTERED:
+            if not target.answered and target.probes >= self.down_after > 0:
+                target.down = True
+            return
+        target.answered += 1
+        if state == OPEN:
+            target.open.append(port)
+            self.output.write(json.dumps({"address": target.address, "port": port,
+                                          "rtt": round(target.rtt.srtt * 1000, 1),
+                                          "hosts": sorted(target.names)}) + "\n")
+            self.output.flush()
+
+    async def scan(self, target: Target, ports: Sequence[int]) -> None:
+        """Scan ``ports`` of ``target``, ``per_host`` at a time, until done or the address is given up."""
+        pending = iter(ports)
+
+        async def worker() -> None:
+            for port in pending:
+                if target.down:
+                    return
+                await self._port(target, port)
+
+        await asyncio.gather(*(worker() for _ in range(min(self.per_host, len(ports)))))
+        if target.down:
+            self.stats.down += 1
+
+
+async def scan_file(
+    input_path: str,
+    scanner: PortScanner,
+    ports: Sequence[int],
+    follow: bool = False,
+    interval: float = 0.5,
+) -> Dict[str, Target]:
+    """Scan every address of ``input_path`` once (tailing it with ``follow``); returns the targets."""
+    targets: Dict[str, Target] = {}
+    names: Set[str] = set()
+    # Enough addresses at once to fill the concurrency limit with their per-host connects
+    workers = max(1, -(-int(scanner.limit.aimd.ceiling) // scanner.per_host) * 2)
+    queue: "asyncio.Queue[Optional[Target]]" = asyncio.Queue(maxsize=workers * 4)
+    follower = FileFollower([input_path])
+    done = stdin_closed_event() if follow else None
+
+    async def feed() -> None:
+        while True:
+            finished = done is None or done.is_set()
+            for line in follower.poll(final=finished):
+                name, addresses = parse_addresses(line)
+                if name:
+                    names.add(name)
+                for address in addresses:
+                    target = targets.get(address)
+                    if target is None:
+                        target = targets[address] = Target(address)
+                        await queue.put(target)
+                    if name:
+                        target.names.add(name)
+            if finished:
+                break
+            await asyncio.sleep(interval)
+        for _ in range(workers):
+            await queue.put(None)
+
+    async def worker() -> None:
+        while True:
+            target = await queue.get()
+            if target is None:
+                return
+            await scanner.scan(target, ports)
+
+    await asyncio.gather(feed(), *(worker() for _ in range(workers)))
+    scanner.stats.addresses = len(targets)
+    scanner.stats.names = len(names)
+    return targets
+
+
+def write_results(targets: Iterable[Target], ips_path: Optional[str], hosts_path: Optional[str]) -> None:
+    """``<address> <port>,...`` per address and ``<name>:<port>`` per name, of the open ports."""
+    found = sorted((target for target in targets if target.open),
+                   key=lambda target: ipaddress.ip_address(target.address))
+    if ips_path:
+        with open(ips_path, "w", encoding="utf-8") as out:
+            out.writelines(f"{target.address} {','.join(map(str, sorted(target.open)))}\n" for target in found)
+    if hosts_path:
+        by_name: Dict[str, Set[int]] = {}
+        for target in found:
+            for name in target.names:
+                by_name.setdefault(name, set()).update(target.open)
+        with open(hosts_path, "w", encoding="utf-8") as out:
+            out.writelines(f"{name}:{port}\n" for name in sorted(by_name) for port in sorted(by_name[name]))
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python3 -m recon.ports",
+        description="TCP connect scan of every resolved address, once per address.",
+    )
+    parser.add_argument("--input", required=True, help="resolved_hosts.txt of recon.resolve, or an address list")
+    parser.add_argument("--output", required=True, help="JSON line per open port")
+    parser.add_argument("--ips", help="also write '<address> <port>,...' per address with open ports")
+    parser.add_argument("--hosts", help="also write '<name>:<port>' per open port of every name")
+    parser.add_argument("--top", type=int, default=100, help="scan the N most frequently open ports (default 100)")
+    parser.add_argument("--ports", help="scan these ports instead, e.g. 22,80,8000-8100")
+    parser.add_argument("--concurrency", type=int, default=500, help="most connects in flight overall")
+    parser.add_argument("--per-host", type=int, default=32, help="connects in flight per address")
+    parser.add_argument("--timeout", type=float, default=1.5,
+                        help="connect timeout in seconds before an address has answered, and the most after")
+    parser.add_argument("--min-timeout", type=float, default=0.05, help="shortest adaptive connect timeout")
+    parser.add_argument("--retries", type=int, default=1, help="retries of a port timed out by an adaptive timeout")
+    parser.add_argument("--down-after", type=int, default=20,
+                        help="give up an address none of whose first N ports answered (0 = never)")
+    parser.add_argument("--follow", action="store_true",
+                        help="keep tailing the input until stdin is closed")
+    parser.add_argument("--interval", type=float, default=0.5, help="poll interval in seconds")
+    args = parser.parse_args(argv)
+
+    follow = args.follow
+    if follow and sys.stdin.isatty():
+        print_status("WARNING", "--follow needs stdin from the scheduler, making a single pass instead")
+        follow = False
+
+    ports = parse_ports(args.ports) if args.ports else top_ports(args.top)
+    if not ports:
+        parser.error("no ports to scan")
+    started = time.monotonic()
+    with open(args.output, "w", encoding="utf-8") as output:
+        scanner = PortScanner(output, args.concurrency, args.per_host, args.timeout, args.min_timeout,
+                              args.retries, args.down_after)
+        targets = asyncio.run(scan_file(args.input, scanner, ports, follow, args.interval))
+    write_results(targets.values(), args.ips, args.hosts)
+    stats = scanner.stats
+    print_status(
+        "SUCCESS",
+        f"Port scan: {stats.states[OPEN]} open ports on {sum(1 for target in targets.values() if target.open)}"
+        f"/{stats.addresses} addresses ({stats.names} names), {len(ports)} ports each; "
+        f"{stats.probes} connects ({stats.states[CLOSED]} closed, {stats.states[FILTERED]} filtered, "
+        f"{stats.retries} retried), {stats.down} addresses given up, "
+        f"concurrency ended at {int(scanner.limit.limit)} in {time.monotonic() - started:.1f}s",
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
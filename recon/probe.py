@@ -0,0 +1,509 @@
+"""Pooled asynchronous HTTP/HTTPS probing of the resolved subdomains.
+
+Every resolved name is asked for ``/`` over HTTPS and, when that does not
+answer, over HTTP (``--ports``, in order), straight at the address the
+resolver found, with the name as SNI and ``Host``.  A live host gets one
+JSON line with the status, title, content length, server, redirect chain
+and timings, written as soon as it answers:
+
+* requests go through a :class:`ConnectionPool`: at most ``--concurrency``
+  requests in flight overall and ``--per-host`` per address (names on one
+  shared frontend share its limit), keep-alive connections are kept idle
+  per origin and reused by the redirects and later requests to it,
+* redirects are followed up to ``--max-redirects``, the chain recorded,
+* bodies are read up to ``--max-body`` bytes for the title; a larger body
+  ends its connection instead of being drained.
+
+Certificates are not verified: a name is probed for what it serves.
+In ``--follow`` mode the input is tailed while the resolver writes it,
+until stdin reaches EOF.
+
+Command line usage (as called from the engine)::
+
+    python3 -m recon.probe --follow --input out/subdomains/resolved_hosts.txt \\
+        --output out/enumeration/live_hosts/live_hosts.jsonl \\
+        --urls out/enumeration/live_hosts/live_hosts.txt \\
+        --concurrency 200 --per-host 4 --timeout 10
+
+The input takes ``--hosts`` lines of :mod:`recon.resolve` or plain names;
+``--urls`` gets the probed URL of every live host.  ``--responses`` gets
+the headers and body of every final response, with ``--favicon`` the hash
+of the host's ``/favicon.ico`` too, for :mod:`recon.fingerprint`.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import html
+import json
+import re
+import ssl
+import sys
+import time
+import zlib
+from dataclasses import dataclass, field
+from typing import Dict, List, NamedTuple, Optional, Sequence, TextIO, Tuple
+from urllib.parse import urljoin, urlsplit
+
+from .aggregate import FileFollower, stdin_closed_event
+from .console import print_status
+from .fingerprint import favicon_hash
+from .names import normalize_name
+
+DEFAULT_PORTS = {"https": 443, "http": 80}
+REDIRECTS = (301, 302, 303, 307, 308)
+USER_AGENT = "Mozilla/5.0 (compatible; recon-probe)"
+MAX_HEADERS = 100
+MAX_IDLE = 2
+TITLE_LENGTH = 200
+
+_TITLE = re.compile(rb"<title[^>]*>(.*?)</title", re.IGNORECASE | re.DOTALL)
+_CHARSET = re.compile(r"charset=[\"']?([\w.:-]+)", re.IGNORECASE)
+
+PROBE_ERRORS = (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError, ValueError, UnicodeError)
+
+
+class ProbeError(ValueError):
+    """The peer answered something that is not HTTP/1.x."""
+
+
+class Origin(NamedTuple):
+    scheme: str
+    host: str
+    port: int
+    address: str
+
+    @property
+    def netloc(self) -> str:
+        return self.host if DEFAULT_PORTS.get(self.scheme) == self.port else f"{self.host}:{self.port}"
+
+    def url(self, path: str = "/") -> str:
+        return f"{self.scheme}://{self.netloc}{path}"
+
+
+@dataclass
+class Response:
+    status: int
+    reason: str
+    headers: List[Tuple[str, str]]
+    body: bytes = b""
+    truncated: bool = False
+    keep_alive: bool = False
+
+    def header(self, name: str) -> str:
+        for key, value in self.headers:
+            if key == name:
+                return value
+        return ""
+
+    def text(self) -> str:
+        """The body decoded with the charset of ``Content-Type`` (UTF-8 if none or unknown)."""
+        match = _CHARSET.search(self.header("content-type"))
+        try:
+            return self.body.decode(match.group(1) if match else "utf-8", "replace")
+        except LookupError:
+            return self.body.decode("utf-8", "replace")
+
+    @property
+    def title(self) -> str:
+        match = _TITLE.search(self.body)
+        if not match:
+            return ""
+        body = Response(self.status, self.reason, self.headers, match.group(1))
+        return " ".join(html.unescape(body.text()).split())[:TITLE_LENGTH]
+
+    @property
+    def content_length(self) -> int:
+        declared = self.header("content-length")
+        return int(declared) if declared.isdigit() else len(self.body)
+
+
+@dataclass
+class Connection:
+    origin: Origin
+    reader: asyncio.StreamReader
+    writer: asyncio.StreamWriter
+    requests: int = 0
+
+    def close(self) -> None:
+        self.writer.close()
+
+
+async def _read_body(reader: asyncio.StreamReader, response: Response, max_body: int) -> None:
+    """Read the body of ``response`` (up to ``max_body`` bytes) and decide if the connection survives it."""
+    encoding = response.header("transfer-encoding").lower()
+    length = response.header("content-length")
+    if "chunked" in encoding:
+        body = bytearray()
+        while True:
+            size = int((await reader.readline()).split(b";")[0].strip() or b"0", 16)
+            if size == 0:
+                while (await reader.readline()).strip():
+                    pass
+                break
+            if len(body) + size > max_body:
+                body += await reader.readexactly(max_body - len(body))
+                response.truncated = True
+                response.keep_alive = False
+                break
+            body += await reader.readexactly(size)
+            await reader.readline()
+        response.body = bytes(body)
+    elif length.isdigit():
+        size = int(length)
+        response.body = await reader.readexactly(min(size, max_body))
+        if size > max_body:
+            response.truncated = True
+            response.keep_alive = False
+    else:
+        # Delimited by the end of the connection
+        body = bytearray()
+        while len(body) < max_body:
+            chunk = await reader.read(max_body - len(body))
+            if not chunk:
+                break
+            body += chunk
+        response.body = bytes(body)
+        response.truncated = len(body) >= max_body
+        response.keep_alive = False
+
+    if response.header("content-encoding").lower() in ("gzip", "deflate") and response.body:
+        # Asked for identity, but some servers compress anyway
+        try:
+            response.body = zlib.decompressobj(zlib.MAX_WBITS | 32).decompress(response.body, max_body)
+        except zlib.error:
+            pass
+
+
+async def read_response(reader: asyncio.StreamReader, method: str, max_body: int) -> Response:
+    """Parse one HTTP/1.x response from ``reader``; interim 1xx answers are skipped."""
+    while True:
+        line = await reader.readline()
+        if not line:
+            raise ConnectionResetError("connection closed before the status line")
+        version, _, rest = line.decode("latin-1").rstrip("\r\n").partition(" ")
+        code, _, reason = rest.partition(" ")
+        if not version.startswith("HTTP/1.") or not code.isdigit():
+            raise ProbeError(f"not an HTTP response: {line[:40]!r}")
+        headers = []
+        while True:
+            line = await reader.readline()
+            if not line.strip():
+                break
+            if len(headers) == MAX_HEADERS:
+                raise ProbeError("too many headers")
+            name, _, value = line.decode("latin-1").partition(":")
+            headers.append((name.strip().lower(), value.strip()))
+        status = int(code)
+        if not 100 <= status < 200 or status == 101:
+            break
+
+    connection = dict(headers).get("connection", "").lower()
+    keep_alive = "close" not in connection if version == "HTTP/1.1" else "keep-alive" in connection
+    response = Response(status, reason, headers, keep_alive=keep_alive)
+    if method != "HEAD" and status not in (101, 204, 304):
+        await _read_body(reader, response, max_body)
+    return response
+
+
+class ConnectionPool:
+    """Keep-alive HTTP/1.1 connections with a global and a per-address limit.
+
+    ``concurrency`` caps the requests in flight overall, ``per_host`` those
+    to one address.  Up to ``MAX_IDLE`` finished connections per origin wait
+    for the next request to it.  Use as an async context manager so idle
+    connections are closed.
+    """
+
+    def __init__(self, concurrency: int = 200, per_host: int = 4, timeout: float = 10.0,
+                 max_body: int = 256 * 1024):
+        self.semaphore = asyncio.Semaphore(max(1, concurrency))
+        self.per_host = max(1, per_host)
+        self.timeout = timeout
+        self.max_body = max_body
+        self.context = ssl.SSLContext(ssl.PROTOCOL_TLS_CLIENT)
+        self.context.check_hostname = False
+        self.context.verify_mode = ssl.CERT_NONE
+        self._hosts: Dict[str, asyncio.Semaphore] = {}
+        self._idle: Dict[Origin, List[Connection]] = {}
+        self.stats = {"requests": 0, "connections": 0, "reused": 0}
+
+    async def __aenter__(self) -> "ConnectionPool":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        for connections in self._idle.values():
+            for connection in connections:
+                connection.close()
+        self._idle.clear()
+
+    def _host(self, address: str) -> asyncio.Semaphore:
+        if address not in self._hosts:
+            self._hosts[address] = asyncio.Semaphore(self.per_host)
+        return self._hosts[address]
+
+    def _take(self, origin: Origin) -> Optional[Connection]:
+        idle = self._idle.get(origin)
+        while idle:
+            connection = idle.pop()
+            if not connection.reader.at_eof() and not connection.writer.is_closing():
+                return connection
+            connection.close()
+        return None
+
+    def _put(self, connection: Connection) -> None:
+        idle = self._idle.setdefault(connection.origin, [])
+        if len(idle) < MAX_IDLE:
+            idle.append(connection)
+        else:
+            connection.close()
+
+    async def _connect(self, origin: Origin) -> Connection:
+        tls = {"ssl": self.context, "server_hostname": origin.host} if origin.scheme == "https" else {}
+        reader, writer = await asyncio.open_connection(origin.address, origin.port, limit=2 ** 16, **tls)
+        self.stats["connections"] += 1
+        return Connection(origin, reader, writer)
+
+    async def _exchange(self, connection: Connection, path: str, method: str, timing: Dict[str, float]) -> Response:
+        request = (f"{method} {path} HTTP/1.1\r\nHost: {connection.origin.netloc}\r\nUser-Agent: {USER_AGENT}\r\n"
+                   "Accept: */*\r\nAccept-Encoding: identity\r\nConnection: keep-alive\r\n\r\n")
+        sent = time.monotonic()
+        connection.writer.write(request.encode("latin-1", "replace"))
+        await connection.writer.drain()
+        response = await read_response(connection.reader, method, self.max_body)
+        timing["response"] = (time.monotonic() - sent) * 1000
+        connection.requests += 1
+        return response
+
+    async def fetch(self, origin: Origin, path: str = "/", method: str = "GET") -> Tuple[Response, Dict[str, float]]:
+        """Send one request to ``origin``; returns the response and its timings in milliseconds."""
+        async with self.semaphore, self._host(origin.address):
+            started = time.monotonic()
+            timing = {"connect": 0.0}
+            self.stats["requests"] += 1
+            connection = self._take(origin)
+            if connection is not None:
+                self.stats["reused"] += 1
+                try:
+                    response = await asyncio.wait_for(self._exchange(connection, path, method, timing), self.timeout)
+                except PROBE_ERRORS:
+                    # The server dropped the idle connection: once more on a new one
+                    connection.close()
+                    connection = None
+            if connection is None:
+                connecting = time.monotonic()
+                connection = await asyncio.wait_for(self._connect(origin), self.timeout)
+                timing["connect"] = (time.monotonic() - connecting) * 1000
+                try:
+                    response = await asyncio.wait_for(self._exchange(connection, path, method, timing), self.timeout)
+                except BaseException:
+                    connection.close()
+                    raise
+            if response.keep_alive:
+                self._put(connection)
+            else:
+                connection.close()
+            timing["total"] = (time.monotonic() - started) * 1000
+            return response, timing
+
+
+def parse_ports(spec: str) -> List[Tuple[str, int]]:
+    """``https:443,http:80`` as (scheme, port) pairs; a bare scheme takes its default port."""
+    pairs = []
+    for item in spec.split(","):
+        scheme, _, port = item.strip().lower().partition(":")
+        if scheme not in DEFAULT_PORTS:
+            raise ValueError(f"unknown scheme {scheme!r} in {spec!r}")
+        pairs.append((scheme, int(port) if port else DEFAULT_PORTS[scheme]))
+    return pairs
+
+
+def parse_host(line: str) -> Tuple[Optional[str], Optional[str]]:
+    """Name and first address of a ``--hosts`` line of :mod:`recon.resolve` (or a plain name)."""
+    fields = line.split()
+    name = normalize_name(fields[0]) if fields else None
+    addresses = fields[1] if len(fields) > 1 and fields[1] != "-" else ""
+    return name, addresses.split(",")[0] or None
+
+
+async def probe_host(pool: ConnectionPool, name: str, address: Optional[str], ports: Sequence[Tuple[str, int]],
+                     max_redirects: int = 5, capture: bool = False, favicon: bool = False) -> Optional[dict]:
+    """The record of the first of ``ports`` that answers ``name``, ``None`` if none does.
+
+    With ``capture`` the record also has the ``headers`` and ``body`` of the
+    final response; with ``favicon`` the ``favicon_hash`` of the final
+    origin's ``/favicon.ico`` (on the same pooled connection), if it has one.
+    """
+    for scheme, port in ports:
+        origin = Origin(scheme, name, port, address or name)
+        try:
+            response, timing = await pool.fetch(origin)
+        except PROBE_ERRORS + (ssl.SSLError,):
+            continue
+        break
+    else:
+        return None
+
+    record = {
+        "url": origin.url(), "host": name, "address": origin.address, "scheme": scheme, "port": port,
+        "status": response.status, "timing": {key: round(value, 1) for key, value in timing.items()},
+    }
+    chain = []
+    current, path, final = origin, "/", response
+    while final.status in REDIRECTS and final.header("location") and len(chain) < max_redirects:
+        target = urlsplit(urljoin(current.url(path), final.header("location")))
+        chain.append({"url": current.url(path), "status": final.status})
+        if target.scheme not in DEFAULT_PORTS or not target.hostname:
+            break
+        host = target.hostname.lower()
+        # The name's own address is known; other names go through the system resolver
+        current = Origin(target.scheme, host, target.port or DEFAULT_PORTS[target.scheme],
+                         origin.address if host == name else host)
+        path = (target.path or "/") + (f"?{target.query}" if target.query else "")
+        try:
+            final, timing = await pool.fetch(current, path)
+        except PROBE_ERRORS + (ssl.SSLError,):
+            record["redirect_error"] = current.url(path)
+            break
+        record["timing"]["total"] = round(record["timing"]["total"] + timing["total"], 1)
+    record.update({
+        "final_url": current.url(path), "final_status": final.status, "title": final.title,
+        "content_length": final.content_length, "content_type": final.header("content-type"),
+        "server": final.header("server"), "redirects": chain,
+    })
+    if capture:
+        record.update({"headers": final.headers, "body": final.text()})
+    if favicon:
+        try:
+            icon, _ = await pool.fetch(current, "/favicon.ico")
+        except PROBE_ERRORS + (ssl.SSLError,):
+            return record
+        if icon.status == 200 and icon.body and not icon.truncated and "html" not in icon.header("content-type"):
+            record["favicon_hash"] = favicon_hash(icon.body)
+    return record
+
+
+@dataclass
+class ProbeStats:
+    hosts: int = 0
+    live: int = 0
+    statuses: Dict[int, int] = field(default_factory=dict)
+
+
+async def probe_file(
+    input_path: str,
+    output_path: str,
+    urls_path: Optional[str],
+    options: dict,
+    ports: Sequence[Tuple[str, int]],
+    max_redirects: int = 5,
+    follow: bool = False,
+    interval: float = 0.5,
+    responses_path: Optional[str] = None,
+    favicon: bool = False,
+) -> Tuple[ProbeStats, Dict[str, int]]:
+    """Probe every name of ``input_path`` (tailing it with ``follow``); returns the stats and the pool's.
+
+    With ``responses_path`` the final response of every live host (headers,
+    body text, favicon hash) is written there, one JSON line each.
+    """
+    stats = ProbeStats()
+    workers = max(1, options.get("concurrency", 200))
+    queue: "asyncio.Queue[Optional[Tuple[str, Optional[str]]]]" = asyncio.Queue(maxsize=workers * 4)
+    follower = FileFollower([input_path])
+    done = stdin_closed_event() if follow else None
+    seen = set()
+
+    async def feed() -> None:
+        while True:
+            finished = done is None or done.is_set()
+            for line in follower.poll(final=finished):
+                name, address = parse_host(line)
+                if name and name not in seen:
+                    seen.add(name)
+                    stats.hosts += 1
+                    await queue.put((name, address))
+            if finished:
+                break
+            await asyncio.sleep(interval)
+        for _ in range(workers):
+            await queue.put(None)
+
+    async def worker(pool: ConnectionPool, output: TextIO, urls: Optional[TextIO],
+                     responses: Optional[TextIO]) -> None:
+        while True:
+            item = await queue.get()
+            if item is None:
+                return
+            record = await probe_host(pool, *item, ports, max_redirects, responses is not None, favicon)
+            if record is None:
+                continue
+            if responses is not None:
+                response = {"url": record["final_url"], "host": record["host"], "status": record["final_status"],
+                            "headers": record.pop("headers"), "body": record.pop("body")}
+                if "favicon_hash" in record:
+                    response["favicon_hash"] = record["favicon_hash"]
+                responses.write(json.dumps(response) + "\n")
+                responses.flush()
+            stats.live += 1
+            stats.statuses[record["status"]] = stats.statuses.get(record["status"], 0) + 1
+            output.write(json.dumps(record) + "\n")
+            output.flush()
+            if urls is not None:
+                urls.write(f"{record['url']}\n")
+                urls.flush()
+
+    async with ConnectionPool(**options) as pool:
+        with open(output_path, "w", encoding="utf-8") as output, \
+                open(urls_path or "/dev/null", "w", encoding="utf-8") as urls, \
+                open(responses_path or "/dev/null", "w", encoding="utf-8") as responses:
+            await asyncio.gather(feed(), *(worker(pool, output, urls if urls_path else None,
+                                                  responses if responses_path else None) for _ in range(workers)))
+    return stats, pool.stats
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python3 -m recon.probe",
+        description="Probe the resolved subdomains over HTTPS and HTTP through a pooled async client.",
+    )
+    parser.add_argument("--input", required=True, help="resolved_hosts.txt of recon.resolve, or a name list")
+    parser.add_argument("--output", required=True, help="JSON line per live host")
+    parser.add_argument("--urls", help="also write the URL of every live host here")
+    parser.add_argument("--ports", default="https:443,http:80",
+                        help="scheme:port pairs tried in order until one answers (default https:443,http:80)")
+    parser.add_argument("--concurrency", type=int, default=200, help="requests in flight overall")
+    parser.add_argument("--per-host", type=int, default=4, help="requests in flight per address")
+    parser.add_argument("--timeout", type=float, default=10.0, help="seconds per connection and request")
+    parser.add_argument("--max-redirects", type=int, default=5)
+    parser.add_argument("--max-body", type=int, default=256 * 1024, help="bytes of a body read for the title")
+    parser.add_argument("--responses", help="also write the final response of every live host here (JSON lines)")
+    parser.add_argument("--favicon", action="store_true", help="hash the /favicon.ico of every live host")
+    parser.add_argument("--follow", action="store_true",
+                        help="keep tailing the input until stdin is closed")
+    parser.add_argument("--interval", type=float, default=0.5, help="poll interval in seconds")
+    args = parser.parse_args(argv)
+
+    follow = args.follow
+    if follow and sys.stdin.isatty():
+        print_status("WARNING", "--follow needs stdin from the scheduler, making a single pass instead")
+        follow = False
+
+    started = time.monotonic()
+    options = {"concurrency": args.concurrency, "per_host": args.per_host, "timeout": args.timeout,
+               "max_body": args.max_body}
+    stats, pool = asyncio.run(probe_file(args.input, args.output, args.urls, options, parse_ports(args.ports),
+                                         args.max_redirects, follow, args.interval, args.responses, args.favicon))
+    statuses = ", ".join(f"{count}x {status}" for status, count in sorted(stats.statuses.items()))
+    print_status(
+        "SUCCESS",
+        f"HTTP probe: {stats.live}/{stats.hosts} hosts answer ({statuses or 'none'}), "
+        f"{pool['requests']} requests on {pool['connections']} connections ({pool['reused']} reused) "
+        f"in {time.monotonic() - started:.1f}s",
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,284 @@
+"""Per-stage and per-target resource profile of a run.
+
+The engine and the worker pool reap the processes they start with
+``wait4``, which reports the CPU time and peak RSS of the process and of
+every descendant it waited for (a stage's tools, a pool's targets).  Each
+finished stage or per-target task is appended to ``reports/profile.jsonl``
+as one JSON object::
+
+    {"stage": "sudomy_target", "target": "example.com", "parent": "run_sudomy",
+     "wall": 12.4, "cpu_user": 3.1, "cpu_system": 0.4, "max_rss_kb": 81234,
+     "returncode": 0, "lines": 57, "outputs": ["out/raw_output/sudomy/example_com.txt"]}
+
+``summary`` fills in ``unique_new``, the names of a record's outputs that no
+other enumeration tool (``--source``) found, and prints the table of the
+report, so tools that cost a lot but add nothing unique stand out; the
+report runs it at the end of every run.  A run
+resumed with ``--resume`` appends to the same file; the latest record of a
+stage or task wins.
+
+Command line usage (to inspect a run)::
+
+    python3 -m recon.profile --profile out/reports/profile.jsonl summary \\
+        --source run_subfinder --source run_assetfinder --top 10
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+from collections import defaultdict
+from dataclasses import asdict, dataclass, field
+from typing import Dict, IO, List, Optional, Sequence, Set
+
+from .console import print_status
+from .names import normalize_name
+
+
+@dataclass
+class Usage:
+    wall: float
+    cpu_user: float
+    cpu_system: float
+    max_rss_kb: int
+    returncode: int
+
+    @property
+    def cpu(self) -> float:
+        return self.cpu_user + self.cpu_system
+
+
+def _exit_status(status: int) -> int:
+    if os.WIFSIGNALED(status):
+        return 128 + os.WTERMSIG(status)
+    return os.WEXITSTATUS(status)
+
+
+class MeasuredProcess:
+    """A subprocess reaped with ``wait4`` on its own thread.
+
+    asyncio subprocesses are reaped by the event loop's child watcher, which
+    throws the resource usage away, so the process is started with
+    :class:`subprocess.Popen` and awaited through a future instead.
+    """
+
+    def __init__(self, argv: Sequence[str], stdin=None, stdout=None, stderr=None, env: Optional[Dict[str, str]] = None):
+        self._loop = asyncio.get_running_loop()
+        self._exited: asyncio.Future = self._loop.create_future()
+        self.started = time.monotonic()
+        self.popen = subprocess.Popen(list(argv), stdin=stdin, stdout=stdout, stderr=stderr, env=env)
+        self.stdin: Optional[IO[bytes]] = self.popen.stdin
+        threading.Thread(target=self._reap, daemon=True).start()
+
+    def _reap(self) -> None:
+        _, status, rusage = os.wait4(self.popen.pid, 0)
+        returncode = _exit_status(status)
+        self.popen.returncode = returncode  # already reaped, keep Popen from waiting again
+        usage = Usage(
+            wall=time.monotonic() - self.started,
+            cpu_user=rusage.ru_utime,
+            cpu_system=rusage.ru_stime,
+            max_rss_kb=rusage.ru_maxrss,
+            returncode=returncode,
+        )
+        self._loop.call_soon_threadsafe(self._exited.set_result, usage)
+
+    async def wait(self) -> Usage:
+        return await asyncio.shield(self._exited)
+
+
+def count_lines(paths: Sequence[str]) -> int:
+    total = 0
+    for path in paths:
+        try:
+            with open(path, "rb") as handle:
+                total += sum(chunk.count(b"\n") for chunk in iter(lambda: handle.read(1 << 20), b""))
+        except OSError:
+            continue
+    return total
+
+
+@dataclass
+class Record:
+    stage: str
+    target: str = ""
+    parent: str = ""
+    wall: float = 0.0
+    cpu_user: float = 0.0
+    cpu_system: float = 0.0
+    max_rss_kb: int = 0
+    returncode: int = 0
+    lines: int = 0
+    outputs: List[str] = field(default_factory=list)
+    unique_new: Optional[int] = None
+
+    @property
+    def tool(self) -> str:
+        """Enumeration stage the record belongs to (a per-target task counts for its stage)."""
+        return self.parent or self.stage
+
+
+class Profiler:
+    """Appends one JSON line per finished stage or per-target task."""
+
+    def __init__(self, path: str):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+
+    def record(
+        self,
+        stage: str,
+        usage: Usage,
+        target: str = "",
+        parent: str = "",
+        outputs: Sequence[str] = (),
+    ) -> Record:
+        record = Record(
+            stage=stage,
+            target=target,
+            parent=parent,
+            wall=round(usage.wall, 3),
+            cpu_user=round(usage.cpu_user, 3),
+            cpu_system=round(usage.cpu_system, 3),
+            max_rss_kb=usage.max_rss_kb,
+            returncode=usage.returncode,
+            lines=count_lines(outputs),
+            outputs=list(outputs),
+        )
+        data = {key: value for key, value in asdict(record).items() if value is not None}
+        line = json.dumps(data, sort_keys=True) + "\n"
+        # One O_APPEND write per record, so the scheduler and pools can share the file
+        fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, line.encode("utf-8"))
+        finally:
+            os.close(fd)
+        return record
+
+
+def load_records(path: str) -> List[Record]:
+    """Latest record of every (stage, target), in file order."""
+    latest: Dict[tuple, Record] = {}
+    with open(path, encoding="utf-8") as handle:
+        for line in handle:
+            try:
+                data = json.loads(line)
+                record = Record(**data)
+            except (ValueError, TypeError):
+                continue
+            latest.pop((record.stage, record.target), None)
+            latest[(record.stage, record.target)] = record
+    return list(latest.values())
+
+
+def _names(paths: Sequence[str]) -> Set[str]:
+    names: Set[str] = set()
+    for path in paths:
+        try:
+            with open(path, encoding="utf-8", errors="replace") as handle:
+                for line in handle:
+                    name = normalize_name(line)
+                    if name:
+                        names.add(name)
+        except OSError:
+            continue
+    return names
+
+
+def fill_unique_new(records: Sequence[Record], sources: Sequence[str]) -> None:
+    """Set ``unique_new`` on every record of a ``sources`` tool.
+
+    A name counts for a record when no other source tool reported it; the
+    per-target tasks of a tool share their tool's names.
+    """
+    sources = set(sources)
+    found_by: Dict[str, Set[str]] = defaultdict(set)
+    per_record: Dict[int, Set[str]] = {}
+    for index, record in enumerate(records):
+        if record.tool not in sources:
+            continue
+        per_record[index] = _names(record.outputs)
+        for name in per_record[index]:
+            found_by[name].add(record.tool)
+    for index, names in per_record.items():
+        tool = records[index].tool
+        records[index].unique_new = sum(1 for name in names if found_by[name] == {tool})
+
+
+def _format_rss(kilobytes: int) -> str:
+    if kilobytes >= 1024 * 1024:
+        return f"{kilobytes / (1024 * 1024):.1f}G"
+    if kilobytes >= 1024:
+        return f"{kilobytes / 1024:.0f}M"
+    return f"{kilobytes}K"
+
+
+def format_table(records: Sequence[Record]) -> List[str]:
+    rows = [f"{'Stage':<24} {'Target':<28} {'Wall':>8} {'CPU':>8} {'Peak RSS':>9} {'Exit':>4} {'Lines':>8} {'Unique':>7}"]
+    for record in records:
+        unique = "-" if record.unique_new is None else str(record.unique_new)
+        rows.append(
+            f"{record.stage:<24} {record.target or '-':<28} {record.wall:>7.1f}s "
+            f"{record.cpu_user + record.cpu_system:>7.1f}s {_format_rss(record.max_rss_kb):>9} "
+            f"{record.returncode:>4} {record.lines:>8} {unique:>7}"
+        )
+    return rows
+
+
+def summarize(path: str, sources: Sequence[str], top: int = 10) -> List[str]:
+    """Fill in ``unique_new`` for the ``sources`` stages, rewrite ``path`` and return the report table.
+
+    Stages are listed slowest first, followed by the ``top`` slowest per-target tasks.
+    """
+    records = load_records(path)
+    fill_unique_new(records, sources)
+
+    partial = f"{path}.{os.getpid()}.tmp"
+    with open(partial, "w", encoding="utf-8") as out:
+        for record in records:
+            data = {key: value for key, value in asdict(record).items() if value is not None}
+            out.write(json.dumps(data, sort_keys=True) + "\n")
+    os.replace(partial, path)
+
+    stages = sorted((record for record in records if not record.target), key=lambda item: -item.wall)
+    tasks = sorted((record for record in records if record.target), key=lambda item: -item.wall)
+    rows = format_table(stages)
+    if tasks and top > 0:
+        rows.append("")
+        rows.append(f"Slowest per-target tasks ({min(top, len(tasks))} of {len(tasks)}):")
+        rows.extend(format_table(tasks[:top])[1:])
+    return rows
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python3 -m recon.profile",
+        description="Summarise the per-stage resource profile of a run.",
+    )
+    parser.add_argument("--profile", required=True, help="profile written by the scheduler and pools")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    summary_parser = sub.add_parser("summary", help="fill in unique contributions and print the report table")
+    summary_parser.add_argument("--source", action="append", default=[],
+                                help="enumeration stage whose names count towards unique_new (repeatable)")
+    summary_parser.add_argument("--top", type=int, default=10,
+                                help="slowest per-target tasks to list (default: 10)")
+    args = parser.parse_args(argv)
+
+    if not os.path.isfile(args.profile):
+        print_status("ERROR", f"No run profile at {args.profile}")
+        return 1
+
+    for row in summarize(args.profile, args.source, args.top):
+        print(row)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
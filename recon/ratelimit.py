@@ -0,0 +1,149 @@
+"""Rate limiting primitives shared by the network-facing engines."""
+
+from __future__ import annotations
+
+import asyncio
+import collections
+import time
+from dataclasses import dataclass
+from typing import Deque, Optional
+
+
+class TokenBucket:
+    """Asyncio token bucket allowing ``rate`` operations per second.
+
+    ``burst`` tokens may be spent at once after an idle period.  A ``rate`` of
+    zero or less disables limiting.
+    """
+
+    def __init__(self, rate: float, burst: Optional[float] = None):
+        self.rate = rate
+        self.burst = burst if burst is not None else max(1.0, rate)
+        self.tokens = self.burst
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self, tokens: float = 1.0) -> None:
+        if self.rate <= 0:
+            return
+        async with self._lock:
+            while True:
+                self._refill()
+                if self.tokens >= tokens:
+                    self.tokens -= tokens
+                    return
+                await asyncio.sleep((tokens - self.tokens) / self.rate)
+
+
+@dataclass
+class AIMD:
+    """Additive-increase/multiplicative-decrease of a rate between ``floor`` and ``ceiling``.
+
+    ``step`` defaults to a tenth of the ceiling.
+    """
+
+    ceiling: float
+    floor: float = 1.0
+    step: Optional[float] = None
+    factor: float = 0.5
+
+    def __post_init__(self) -> None:
+        self.floor = min(self.floor, self.ceiling)
+        if self.step is None:
+            self.step = max(1.0, self.ceiling / 10)
+
+    def increase(self, rate: float, weight: float = 1.0) -> float:
+        return min(self.ceiling, rate + self.step * weight)
+
+    def decrease(self, rate: float) -> float:
+        return max(self.floor, rate * self.factor)
+
+
+class AdaptiveTokenBucket(TokenBucket):
+    """Token bucket whose rate follows :class:`AIMD` from observed outcomes.
+
+    Every success raises the rate by ``step / rate``, i.e. by about ``step``
+    per second of traffic; a failure (timeout, throttling answer) halves it,
+    at most once per ``cooldown`` seconds so a burst of failures caused by one
+    overload only counts once.
+    """
+
+    def __init__(self, rate: float, floor: float = 1.0, cooldown: float = 1.0):
+        super().__init__(rate)
+        self.aimd = AIMD(ceiling=rate, floor=floor)
+        self.cooldown = cooldown
+        self._decreased = 0.0
+
+    def success(self) -> None:
+        if self.rate <= 0 or self.rate >= self.aimd.ceiling:
+            return
+        self._refill()
+        self.rate = self.aimd.increase(self.rate, weight=1.0 / self.rate)
+
+    def failure(self) -> None:
+        now = time.monotonic()
+        if self.rate <= 0 or now - self._decreased < self.cooldown:
+            return
+        self._refill()
+        self.rate = self.aimd.decrease(self.rate)
+        self._decreased = now
+
+
+class AdaptiveLimit:
+    """Concurrency limit whose size follows :class:`AIMD` from observed outcomes.
+
+    Used as ``async with limit:`` around one operation.  Like a TCP
+    congestion window, every success widens it by ``step / limit`` (about
+    ``step`` per limit's worth of answers) and a failure halves it, at most
+    once per ``cooldown`` seconds.  Operations already running when it
+    shrinks finish; new ones wait until fewer than the limit are running.
+    """
+
+    def __init__(self, limit: int, floor: int = 1, cooldown: float = 1.0):
+        self.aimd = AIMD(ceiling=float(max(1, limit)), floor=float(max(1, floor)))
+        self.limit = self.aimd.ceiling
+        self.cooldown = cooldown
+        self.active = 0
+        self._waiters: Deque[asyncio.Future] = collections.deque()
+        self._decreased = 0.0
+
+    async def __aenter__(self) -> "AdaptiveLimit":
+        while self.active >= int(self.limit):
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters.append(waiter)
+            try:
+                await waiter
+            except asyncio.CancelledError:
+                self._wake()
+                raise
+        self.active += 1
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        self.active -= 1
+        self._wake()
+
+    def _wake(self) -> None:
+        free = int(self.limit) - self.active
+        while free > 0 and self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                free -= 1
+
+    def success(self) -> None:
+        if self.limit < self.aimd.ceiling:
+            self.limit = self.aimd.increase(self.limit, weight=1.0 / self.limit)
+            self._wake()
+
+    def failure(self) -> None:
+        now = time.monotonic()
+        if now - self._decreased < self.cooldown:
+            return
+        self.limit = self.aimd.decrease(self.limit)
+        self._decreased = now
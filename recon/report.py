@@ -0,0 +1,182 @@
+"""Reconnaissance report and summary of a finished run.
+
+``reports/reconnaissance_report.txt`` carries the per-tool and per-target
+counts plus the incremental changes, run profile, network budget and run
+manifest sections; ``summary.txt`` is the short overview the simple suite
+used to write.  Both are rebuilt from the files in the output directory, so
+a resumed run reports on everything done by all of its attempts.
+"""
+
+from __future__ import annotations
+
+import os
+import time
+from typing import List, Sequence, TextIO
+
+from .budget import format_rates
+from .engine import INDEX_FILE, Engine
+from .index import SubdomainIndex
+from .manifest import format_entry, status_summary
+from .names import normalize_name
+from .pool import read_targets
+from .profile import count_lines, summarize
+from .state import tool_name
+
+RULE = "=" * 78
+
+
+def _count(path: str) -> int:
+    return count_lines([path]) if os.path.isfile(path) else 0
+
+
+def _names(path: str) -> List[str]:
+    try:
+        with open(path, encoding="utf-8", errors="replace") as handle:
+            return [line.strip() for line in handle if line.strip()]
+    except OSError:
+        return []
+
+
+def _section(out: TextIO, title: str, lines: Sequence[str] = ()) -> None:
+    out.write(f"\n{RULE}\n{title}\n{RULE}\n")
+    out.writelines(f"{line}\n" for line in lines)
+
+
+def _breakdown(engine: Engine, targets: Sequence[str], names: Sequence[str]) -> List[str]:
+    """Names each target owns (apex included, nested targets not counted twice), from the subdomain index."""
+    roots = {domain: normalize_name(domain) or domain for domain in targets}
+    path = engine.out(INDEX_FILE)
+    index = SubdomainIndex.open(path) if os.path.isfile(path) else SubdomainIndex.from_names(names)
+    with index:
+        counts = index.count_by_root(list(roots.values()))
+    return [f"- {domain}: {counts[root]} subdomains" for domain, root in roots.items()]
+
+
+def write_report(engine: Engine, start_time: int, end_time: int) -> str:
+    """Write ``reports/reconnaissance_report.txt`` and return its path."""
+    config = engine.config
+    targets = read_targets(engine.targets_file)
+    final = _names(engine.out("final_subdomains.txt"))
+    report_file = engine.out("reports", "reconnaissance_report.txt")
+
+    with open(report_file, "w", encoding="utf-8") as out:
+        out.write(f"{RULE}\nRECONNAISSANCE REPORT\n{config.title} v{config.version}\n"
+                  f"Coded by: {config.author}\n{RULE}\n")
+        out.write(f"Target(s): {','.join(targets)}\n")
+        out.write(f"Number of targets: {len(targets)}\n")
+        out.write(f"Scan Start Time: {time.ctime(start_time)}\n")
+        out.write(f"Scan End Time: {time.ctime(end_time)}\n")
+        out.write(f"Duration: {end_time - start_time} seconds\n")
+        out.write(f"Generated: {time.ctime()}\n")
+        _section(out, "SUBDOMAIN ENUMERATION RESULTS")
+
+        out.write("Tool Results:\n")
+        for stage in engine.sources:
+            tool_dir = os.path.basename(os.path.dirname(stage.outputs[0]))
+            out.write(f"{tool_dir:<15}: {_count(engine.out(stage.outputs[0]))} subdomains\n")
+        out.write("\n")
+        out.write(f"Total Unique Subdomains: {len(final)}\n")
+        out.write(f"Resolved Subdomains: {_count(engine.out('resolved_subdomains.txt'))}\n")
+        out.write(f"Wildcard Answers Dropped: {_count(engine.out('subdomains', 'wildcard_subdomains.txt'))}\n")
+        out.write(f"Live HTTP Services: {_count(engine.out('enumeration', 'live_hosts', 'live_hosts.txt'))}\n")
+        out.write(f"TLS Certificates: {_count(engine.out('enumeration', 'certificates', 'certificates.jsonl'))} unique, "
+                  f"{_count(engine.out('enumeration', 'certificates', 'new_subdomains.txt'))} new subdomains\n")
+        out.write(f"Permutations: {_count(engine.out('subdomains', 'permutations', 'permutations.txt'))} new subdomains "
+                  f"from {_count(engine.out('subdomains', 'permutations', 'rules.txt'))} learned rules\n")
+        out.write(f"Open Ports: {_count(engine.out('ports', 'ports.jsonl'))} on "
+                  f"{_count(engine.out('ports', 'ip_ports.txt'))} addresses\n")
+        out.write(f"Fingerprinted Hosts: "
+                  f"{_count(engine.out('enumeration', 'technologies', 'technologies.txt'))}\n")
+        out.write("\nSample Subdomains (first 10):\n")
+        out.writelines(f"{name}\n" for name in final[:10])
+        out.write("\n")
+
+        _section(out, "TARGET BREAKDOWN:", _breakdown(engine, targets, final))
+
+        # Incremental changes since the previous run
+        if os.path.isdir(engine.out("state")):
+            _section(out, "INCREMENTAL CHANGES:", [
+                f"New subdomains: {_count(engine.out('state', 'new_subdomains.txt'))}",
+                f"Vanished subdomains: {_count(engine.out('state', 'vanished_subdomains.txt'))}",
+                "- state/new_subdomains.txt: Names not seen by any previous run",
+                "- state/vanished_subdomains.txt: Names seen by the previous run but not this one",
+            ])
+
+        # Cost of every stage and the names only it found
+        profile = engine.out("reports", "profile.jsonl")
+        if os.path.isfile(profile):
+            _section(out, "RUN PROFILE:", summarize(profile, [stage.name for stage in engine.sources]))
+
+        # The network budget the tools ended with (lower than configured = upstream pushed back)
+        _section(out, "NETWORK BUDGET (current/configured requests per second):",
+                 format_rates(engine.budget.rates()))
+
+        entries = engine.manifest.entries()
+        _section(out, f"RUN MANIFEST: {status_summary(entries)}", [format_entry(entry) for entry in entries])
+
+        _section(out, "FILES GENERATED:", [
+            "- final_subdomains.txt: All unique subdomains found",
+            "- resolved_subdomains.txt: Subdomains that resolve, wildcard answers removed",
+            "- subdomains/resolved_hosts.txt: Resolved subdomains with their IPs and CNAMEs",
+            "- enumeration/live_hosts/live_hosts.jsonl: Status, title, length, redirects and timings of every live host",
+            "- enumeration/technologies/technologies.jsonl: Technologies, versions and categories of every live host",
+            "- ports/ip_ports.txt: Open ports of every resolved address (each address scanned once)",
+            "- ports/host_ports.txt: '<name>:<port>' for every open port of every resolved name",
+            "- enumeration/certificates/certificates.jsonl: Issuer, expiry and SANs of every certificate served",
+            "- enumeration/certificates/new_subdomains.txt: In-scope SAN names no tool found (resolved and added)",
+            "- subdomains/permutations/permutations.txt: Resolved permutations of the names found (added)",
+            "- subdomains/permutations/rules.txt: Permutation rules learned from the names, best first",
+            "- subdomains/: Individual tool outputs",
+            "- subdomains/**/findings.jsonl: Host, IP, URL and module of every bbot, sudomy and ffuf finding",
+            "- subdomains/by_target/: The subdomains of each target",
+            f"- {INDEX_FILE}: Reversed-label index of the subdomains (python3 -m recon.index)",
+            "- intelligence/: Organization and ASN intelligence",
+            "- reports/: This report and other analysis files",
+            "- targets.txt: Input targets used for scan",
+            f"- manifest.db: Stage and per-target task states (resume with --resume {engine.output_dir})",
+            "- reports/profile.jsonl: Wall time, CPU time, peak RSS, exit status and output of every stage and task",
+            "- reports/events.jsonl: Start, finish, lines and new names of every stage and task as they happened",
+        ])
+    return report_file
+
+
+def write_summary(engine: Engine) -> str:
+    """Write the short ``summary.txt`` overview and return its path."""
+    config = engine.config
+    targets = read_targets(engine.targets_file)
+    final = _names(engine.out("final_subdomains.txt"))
+    intel = engine.out("intelligence")
+    summary_file = engine.out("summary.txt")
+
+    with open(summary_file, "w", encoding="utf-8") as out:
+        out.write(f"RECONNAISSANCE SUMMARY\n{config.title} v{config.version}\nCoded by: {config.author}\n")
+        out.write("=====================================\n")
+        out.write(f"Generated: {time.ctime()}\n")
+        out.write(f"Target(s): {','.join(targets)}\n")
+        out.write(f"Number of targets: {len(targets)}\n")
+        out.write(f"Total Subdomains: {len(final)}\n")
+        out.write(f"Resolved Subdomains: {_count(engine.out('resolved_subdomains.txt'))}\n")
+        out.write(f"Live HTTP Services: {_count(engine.out('enumeration', 'live_hosts', 'live_hosts.txt'))}\n")
+        out.write("\nTool Results:\n")
+        for stage in engine.sources:
+            out.write(f"- {tool_name(stage.name)}: {_count(engine.out(stage.outputs[0]))}\n")
+        out.write("\nTarget Breakdown:\n")
+        out.writelines(f"{line}\n" for line in _breakdown(engine, targets, final))
+        out.write("\nKey Files:\n")
+        out.write("- final_subdomains.txt: All unique subdomains\n")
+        out.write("- resolved_subdomains.txt: Subdomains that resolve, wildcard answers removed\n")
+        out.write("- subdomains/resolved_hosts.txt: Resolved subdomains with their IPs and CNAMEs\n")
+        out.write("- enumeration/live_hosts/live_hosts.txt: URLs of the live HTTP/HTTPS services\n")
+        out.write("- enumeration/technologies/technologies.txt: Technologies of every live host\n")
+        out.write("- ports/host_ports.txt: Open ports of every resolved subdomain\n")
+        out.write("- intelligence/: Organization, ASN, and CIDR data\n")
+        out.write("- intelligence/reverse_dns_results.txt: Reverse DNS results\n")
+        out.write("- reports/reconnaissance_report.txt: Full report\n")
+        out.write("- targets.txt: Input targets used\n")
+        asn_files = [name for name in os.listdir(os.path.join(intel, "asn_intel"))
+                     if name.startswith("asn_") and name.endswith(".txt")]
+        out.write("\nIntelligence:\n")
+        out.write(f"- Organization intel: {_count(os.path.join(intel, 'org_intel', 'org_intel.txt'))} entries\n")
+        out.write(f"- ASN intel: {len(asn_files)} ASNs processed\n")
+        out.write(f"- Reverse DNS: {_count(os.path.join(intel, 'reverse_dns_results.txt'))} entries\n")
+    return summary_file
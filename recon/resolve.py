@@ -0,0 +1,252 @@
+"""Mass DNS resolution with wildcard filtering.
+
+Every aggregated name is resolved (A and AAAA, following CNAMEs) through the
+shared :class:`recon.dns.ResolverPool`.  Names that do not resolve are
+dropped, and so are names that only resolve because their parent zone has a
+wildcard record: the first time a parent is seen, a few random labels under
+it are probed and a name whose addresses and CNAME targets are all among the
+probe answers is treated as a wildcard hit.
+
+In ``--follow`` mode the input file is tailed while the aggregator is still
+writing it, until stdin reaches EOF.
+
+Command line usage (as called from the engine)::
+
+    python3 -m recon.resolve --follow --input out/final_subdomains.txt \\
+        --output out/resolved_subdomains.txt \\
+        --hosts out/subdomains/resolved_hosts.txt \\
+        --wildcards out/subdomains/wildcard_subdomains.txt \\
+        --resolver 1.1.1.1 --rate 200 --concurrency 1000
+
+``--hosts`` lines are ``<name> <ip>[,<ip>...] <cname>[,<cname>...]`` with
+``-`` for an empty column.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import random
+import string
+import sys
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, FrozenSet, List, Optional, Sequence, TextIO
+
+from .aggregate import FileFollower, stdin_closed_event
+from .console import print_status
+from .dns import TYPE_A, TYPE_AAAA, TYPE_CNAME, DNSError, ResolverPool, add_resolver_arguments, pool_options
+from .names import normalize_name
+
+WILDCARD_PROBES = 3
+_LABEL_CHARS = string.ascii_lowercase + string.digits
+
+
+@dataclass
+class Resolution:
+    name: str
+    addresses: List[str] = field(default_factory=list)
+    cnames: List[str] = field(default_factory=list)
+
+    @property
+    def signature(self) -> FrozenSet[str]:
+        return frozenset(self.addresses) | frozenset(self.cnames)
+
+    def hosts_line(self) -> str:
+        return f"{self.name} {','.join(self.addresses) or '-'} {','.join(self.cnames) or '-'}\n"
+
+
+async def resolve_name(
+    pool: ResolverPool, name: str, qtypes: Sequence[int] = (TYPE_A, TYPE_AAAA)
+) -> Optional[Resolution]:
+    """Addresses of ``name`` and the CNAMEs followed to reach them, ``None`` if it has none."""
+    answers = await asyncio.gather(*(pool.query(name, qtype) for qtype in qtypes))
+    resolution = Resolution(name)
+    for response in answers:
+        for record in response.answers:
+            if record.type == TYPE_CNAME and record.value not in resolution.cnames:
+                resolution.cnames.append(record.value)
+            elif record.type in (TYPE_A, TYPE_AAAA) and record.value not in resolution.addresses:
+                resolution.addresses.append(record.value)
+    return resolution if resolution.signature else None
+
+
+class WildcardDetector:
+    """Probe each parent zone once for wildcard records."""
+
+    def __init__(self, pool: ResolverPool, probes: int = WILDCARD_PROBES):
+        self.pool = pool
+        self.probes = probes
+        self._zones: Dict[str, asyncio.Future] = {}
+
+    @property
+    def wildcard_zones(self) -> List[str]:
+        return sorted(zone for zone, future in self._zones.items() if future.done() and future.result())
+
+    async def answers(self, parent: str) -> FrozenSet[str]:
+        """Union of the wildcard answers under ``parent`` (empty if none)."""
+        if parent not in self._zones:
+            self._zones[parent] = asyncio.ensure_future(self._probe(parent))
+        return await asyncio.shield(self._zones[parent])
+
+    async def _probe(self, parent: str) -> FrozenSet[str]:
+        async def probe() -> FrozenSet[str]:
+            label = "".join(random.choices(_LABEL_CHARS, k=16))
+            try:
+                resolution = await resolve_name(self.pool, f"{label}.{parent}")
+            except DNSError:
+                return frozenset()
+            return resolution.signature if resolution else frozenset()
+
+        results = await asyncio.gather(*(probe() for _ in range(self.probes)))
+        return frozenset().union(*results)
+
+    async def is_wildcard_hit(self, resolution: Resolution) -> bool:
+        parent = resolution.name.partition(".")[2]
+        if parent.count(".") < 1:
+            return False
+        wildcard = await self.answers(parent)
+        return bool(wildcard) and resolution.signature <= wildcard
+
+
+def resolver_workers(options: dict) -> int:
+    """Names to resolve at once for the pool ``options`` of :func:`recon.dns.pool_options`.
+
+    Every name is an A and an AAAA query at once, so half of the pool's
+    ``concurrency`` (the queries in flight) keeps it full; more workers would
+    only queue on its semaphore.
+    """
+    return max(1, options.get("concurrency", 1000) // 2)
+
+
+@dataclass
+class ResolveStats:
+    names: int = 0
+    resolved: int = 0
+    unresolved: int = 0
+    wildcard: int = 0
+    failed: int = 0
+
+
+async def resolve_stream(
+    pool: ResolverPool,
+    queue: "asyncio.Queue[Optional[str]]",
+    workers: int,
+    output: TextIO,
+    hosts: TextIO,
+    wildcards: TextIO,
+    stats: ResolveStats,
+    on_resolved: Optional[Callable[[Resolution], None]] = None,
+) -> WildcardDetector:
+    """Resolve names from ``queue`` (``None`` ends a worker) and write results as they arrive.
+
+    ``on_resolved`` is called with every resolution that is kept.
+    """
+    detector = WildcardDetector(pool)
+
+    async def worker() -> None:
+        while True:
+            name = await queue.get()
+            if name is None:
+                return
+            try:
+                resolution = await resolve_name(pool, name)
+            except DNSError:
+                stats.failed += 1
+                continue
+            if resolution is None:
+                stats.unresolved += 1
+            elif await detector.is_wildcard_hit(resolution):
+                stats.wildcard += 1
+                wildcards.write(f"{name}\n")
+            else:
+                stats.resolved += 1
+                output.write(f"{name}\n")
+                hosts.write(resolution.hosts_line())
+                output.flush()
+                hosts.flush()
+                if on_resolved is not None:
+                    on_resolved(resolution)
+
+    await asyncio.gather(*(worker() for _ in range(workers)))
+    return detector
+
+
+async def resolve_file(
+    input_path: str,
+    output_path: str,
+    hosts_path: str,
+    wildcards_path: str,
+    options: dict,
+    follow: bool = False,
+    interval: float = 0.5,
+) -> ResolveStats:
+    stats = ResolveStats()
+    workers = resolver_workers(options)
+    queue: "asyncio.Queue[Optional[str]]" = asyncio.Queue(maxsize=workers * 4)
+    follower = FileFollower([input_path])
+    done = stdin_closed_event() if follow else None
+    seen = set()
+
+    async def feed() -> None:
+        while True:
+            finished = done is None or done.is_set()
+            for line in follower.poll(final=finished):
+                name = normalize_name(line)
+                if name and name not in seen:
+                    seen.add(name)
+                    stats.names += 1
+                    await queue.put(name)
+            if finished:
+                break
+            await asyncio.sleep(interval)
+        for _ in range(workers):
+            await queue.put(None)
+
+    async with ResolverPool(**options) as pool:
+        with open(output_path, "w", encoding="utf-8") as output, \
+                open(hosts_path, "w", encoding="utf-8") as hosts, \
+                open(wildcards_path, "w", encoding="utf-8") as wildcards:
+            _, detector = await asyncio.gather(
+                feed(), resolve_stream(pool, queue, workers, output, hosts, wildcards, stats)
+            )
+    if detector.wildcard_zones:
+        print_status("WARNING", f"Wildcard DNS under: {', '.join(detector.wildcard_zones[:10])}"
+                     + (" ..." if len(detector.wildcard_zones) > 10 else ""))
+    return stats
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python3 -m recon.resolve",
+        description="Resolve aggregated subdomains and drop wildcard-only answers.",
+    )
+    parser.add_argument("--input", required=True, help="name list, e.g. final_subdomains.txt")
+    parser.add_argument("--output", required=True, help="names that resolved")
+    parser.add_argument("--hosts", required=True, help="names with their addresses and CNAMEs")
+    parser.add_argument("--wildcards", required=True, help="names dropped as wildcard answers")
+    parser.add_argument("--follow", action="store_true",
+                        help="keep tailing the input until stdin is closed")
+    parser.add_argument("--interval", type=float, default=0.5, help="poll interval in seconds")
+    add_resolver_arguments(parser)
+    args = parser.parse_args(argv)
+
+    follow = args.follow
+    if follow and sys.stdin.isatty():
+        print_status("WARNING", "--follow needs stdin from the scheduler, making a single pass instead")
+        follow = False
+
+    started = time.monotonic()
+    stats = asyncio.run(resolve_file(args.input, args.output, args.hosts, args.wildcards,
+                                     pool_options(args), follow, args.interval))
+    print_status(
+        "SUCCESS",
+        f"Resolution: {stats.resolved}/{stats.names} names resolve "
+        f"({stats.wildcard} wildcard, {stats.unresolved} unresolved, {stats.failed} failed) "
+        f"in {time.monotonic() - started:.1f}s",
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
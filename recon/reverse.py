@@ -0,0 +1,192 @@
+"""Reverse DNS sweep over the CIDR ranges found by the intelligence stages.
+
+Replaces the ``prips | head | dig -x`` loops of the former bash pipelines, which
+only looked at the first few addresses of each range and paid a process
+spawn per lookup.  Every address of every range is covered; only the part
+of a range no earlier range covered is queried, so overlapping ASN
+announcements are swept once, and the addresses are produced lazily so a /16
+does not have to fit in memory.
+
+In ``--follow`` mode the inputs are tailed while the intelligence stage
+appends to them, and every new range is swept as soon as it appears, until
+stdin reaches EOF.
+
+Command line usage (as called from the engine)::
+
+    python3 -m recon.reverse --follow --input out/intelligence/asn_intel/all_asn.txt \\
+        --input out/intelligence/whois_data/whois_cidrs.txt \\
+        --cidrs out/intelligence/cidr_ranges.txt \\
+        --output out/intelligence/reverse_dns_results.txt \\
+        --resolver 1.1.1.1 --resolver 8.8.8.8 --rate 500 --concurrency 2000
+
+Results are streamed as ``<ip> -> <name>`` lines, one per PTR record.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import ipaddress
+import re
+import sys
+from typing import Iterable, Iterator, List, Optional, Sequence, Set, TextIO, Tuple
+
+from .aggregate import FileFollower, stdin_closed_event
+from .console import print_status
+from .dns import TYPE_PTR, DNSError, ResolverPool, add_resolver_arguments, pool_options
+
+_CIDR = re.compile(r"\b(?:\d{1,3}\.){3}\d{1,3}/\d{1,2}\b")
+
+
+def extract_cidrs(lines: Iterable[str]) -> List[ipaddress.IPv4Network]:
+    """IPv4 networks mentioned anywhere in ``lines``, in order of appearance."""
+    found: List[ipaddress.IPv4Network] = []
+    seen: Set[ipaddress.IPv4Network] = set()
+    for line in lines:
+        for match in _CIDR.findall(line):
+            try:
+                network = ipaddress.IPv4Network(match, strict=False)
+            except ValueError:
+                continue
+            if network not in seen:
+                seen.add(network)
+                found.append(network)
+    return found
+
+
+def iter_addresses(networks: Sequence[ipaddress.IPv4Network]) -> Iterator[str]:
+    """Every host address of the collapsed ``networks``, generated lazily."""
+    for network in ipaddress.collapse_addresses(networks):
+        hosts = network.hosts() if network.prefixlen < 31 else iter(network)
+        for address in hosts:
+            yield str(address)
+
+
+def uncovered(network: ipaddress.IPv4Network,
+              swept: Sequence[ipaddress.IPv4Network]) -> List[ipaddress.IPv4Network]:
+    """The parts of ``network`` outside every range of ``swept``."""
+    parts = [network]
+    for done in swept:
+        remaining = []
+        for part in parts:
+            if part.subnet_of(done):
+                continue
+            if done.subnet_of(part):
+                remaining.extend(part.address_exclude(done))
+            else:
+                remaining.append(part)
+        parts = remaining
+    return sorted(parts)
+
+
+async def sweep(
+    pool: ResolverPool,
+    queue: "asyncio.Queue[Optional[str]]",
+    output: TextIO,
+    workers: int,
+) -> int:
+    """Resolve PTR records for the addresses of ``queue`` (``None`` ends a worker), writing them as they arrive."""
+    found = 0
+
+    async def worker() -> None:
+        nonlocal found
+        while True:
+            address = await queue.get()
+            if address is None:
+                return
+            try:
+                names = await pool.resolve(ipaddress.ip_address(address).reverse_pointer, TYPE_PTR)
+            except DNSError:
+                continue
+            for name in names:
+                output.write(f"{address} -> {name}\n")
+                found += 1
+            if names:
+                output.flush()
+
+    await asyncio.gather(*(worker() for _ in range(max(1, workers))))
+    return found
+
+
+async def reverse_dns(
+    inputs: Sequence[str],
+    output_path: str,
+    options: dict,
+    follow: bool = False,
+    interval: float = 0.5,
+) -> Tuple[List[ipaddress.IPv4Network], int, int]:
+    """Sweep the ranges of ``inputs`` (tailing them with ``follow``); returns the ranges, addresses and PTRs."""
+    workers = max(1, options["concurrency"])
+    queue: "asyncio.Queue[Optional[str]]" = asyncio.Queue(maxsize=workers * 4)
+    follower = FileFollower(inputs)
+    done = stdin_closed_event() if follow else None
+    networks: List[ipaddress.IPv4Network] = []
+    known: Set[ipaddress.IPv4Network] = set()
+    swept: List[ipaddress.IPv4Network] = []
+    addresses = 0
+
+    async def feed() -> None:
+        nonlocal swept, addresses
+        while True:
+            finished = done is None or done.is_set()
+            for network in extract_cidrs(follower.poll(final=finished)):
+                if network in known:
+                    continue
+                known.add(network)
+                networks.append(network)
+                parts = uncovered(network, swept)
+                if not parts:
+                    continue
+                swept = list(ipaddress.collapse_addresses([*swept, *parts]))
+                addresses += sum(part.num_addresses for part in parts)
+                print_status("INFO", f"Reverse DNS: sweeping {network}")
+                for address in iter_addresses(parts):
+                    await queue.put(address)
+            if finished:
+                break
+            await asyncio.sleep(interval)
+        for _ in range(workers):
+            await queue.put(None)
+
+    async with ResolverPool(**options) as pool:
+        with open(output_path, "w", encoding="utf-8") as output:
+            _, found = await asyncio.gather(feed(), sweep(pool, queue, output, workers))
+        if pool.stats["failures"]:
+            print_status("WARNING", f"Reverse DNS: {pool.stats['failures']} lookups failed after retries")
+    return networks, addresses, found
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python3 -m recon.reverse",
+        description="PTR sweep over every address of the discovered CIDR ranges.",
+    )
+    parser.add_argument("--input", action="append", default=[], required=True,
+                        help="file to extract CIDR ranges from (repeatable)")
+    parser.add_argument("--output", required=True, help="'<ip> -> <name>' results")
+    parser.add_argument("--cidrs", help="also write the extracted ranges here")
+    parser.add_argument("--follow", action="store_true",
+                        help="keep tailing the inputs until stdin is closed")
+    parser.add_argument("--interval", type=float, default=0.5, help="poll interval in seconds")
+    add_resolver_arguments(parser)
+    args = parser.parse_args(argv)
+
+    follow = args.follow
+    if follow and sys.stdin.isatty():
+        print_status("WARNING", "--follow needs stdin from the scheduler, making a single pass instead")
+        follow = False
+
+    networks, addresses, found = asyncio.run(
+        reverse_dns(args.input, args.output, pool_options(args), follow, args.interval))
+    if args.cidrs:
+        with open(args.cidrs, "w", encoding="utf-8") as handle:
+            handle.writelines(f"{network}\n" for network in sorted(networks))
+    if not networks:
+        print_status("WARNING", "Reverse DNS: no CIDR ranges found")
+        return 0
+    print_status("SUCCESS", f"Reverse DNS: {found} PTR records from {addresses} addresses in {len(networks)} ranges")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
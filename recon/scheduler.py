@@ -0,0 +1,222 @@
+"""DAG scheduler for reconnaissance stages.
+
+Every stage of the pipeline is a node that declares the resource classes it
+occupies (CPU, network, DNS-heavy, disk) and the stages it depends on.  A node
+starts as soon as all of its dependencies have finished and each of its
+resource classes has a free slot, so a slow tool only delays the stages that
+actually consume its output instead of everything queued behind it.
+
+Dependencies are ordering constraints only: a failed tool does not cancel its
+dependents, matching the "warn and continue" behaviour of the bash scripts.
+
+A node can also *stream* from other nodes.  It starts right away,
+consumes their output while they run and is told they have finished through
+its ``upstream_done`` event (the engine closes the stdin of the module it
+runs then).  Streaming nodes mostly wait on their inputs, so they take no
+resource slots and do not count against the job cap.
+
+:func:`resumable` records every stage in the run manifest (see
+:mod:`recon.manifest`) and skips the stages finished by a previous attempt,
+as long as their output files are unchanged and none of their dependencies
+has to run again.
+
+The graph is built and run by :class:`recon.engine.Engine`; this module has
+no command line of its own.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, List, Optional, Sequence
+
+from .console import print_status
+from .manifest import Manifest
+
+CPU = "cpu"
+NETWORK = "network"
+DNS = "dns"
+DISK = "disk"
+RESOURCE_CLASSES = (CPU, NETWORK, DNS, DISK)
+
+DEFAULT_BUDGETS = {
+    CPU: os.cpu_count() or 2,
+    NETWORK: 6,
+    DNS: 2,
+    DISK: 2,
+}
+
+
+class SchedulerError(ValueError):
+    """Raised for an invalid stage graph (unknown dependency, cycle, ...)."""
+
+
+@dataclass
+class Node:
+    """A schedulable stage.
+
+    ``run`` is a zero-argument coroutine function returning an exit status.
+    For streaming nodes the scheduler sets ``upstream_done`` once every node
+    listed in ``streams`` has finished.
+    """
+
+    name: str
+    run: Callable[[], Awaitable[int]]
+    resources: Sequence[str] = ()
+    deps: Sequence[str] = ()
+    streams: Sequence[str] = ()
+    upstream_done: Optional[asyncio.Event] = field(default=None, repr=False)
+
+
+@dataclass
+class Result:
+    name: str
+    returncode: int
+    started: float
+    finished: float
+
+    @property
+    def elapsed(self) -> float:
+        return self.finished - self.started
+
+    @property
+    def ok(self) -> bool:
+        return self.returncode == 0
+
+
+@dataclass
+class Scheduler:
+    """Run nodes concurrently within per-class budgets and a global job cap."""
+
+    budgets: Dict[str, int] = field(default_factory=lambda: dict(DEFAULT_BUDGETS))
+    max_jobs: Optional[int] = None
+    nodes: Dict[str, Node] = field(default_factory=dict)
+
+    def add(self, node: Node) -> Node:
+        if node.name in self.nodes:
+            raise SchedulerError(f"duplicate stage: {node.name}")
+        self.nodes[node.name] = node
+        return node
+
+    def validate(self) -> List[str]:
+        """Check the graph and return the node names in topological order."""
+        if self.max_jobs is not None and self.max_jobs < 1:
+            raise SchedulerError(f"the job cap must be at least 1, not {self.max_jobs}")
+        for node in self.nodes.values():
+            for dep in (*node.deps, *node.streams):
+                if dep not in self.nodes:
+                    raise SchedulerError(f"{node.name}: unknown dependency {dep}")
+            if node.streams and node.resources:
+                raise SchedulerError(f"{node.name}: streaming stages cannot hold resource classes")
+            for resource in node.resources:
+                if resource not in self.budgets:
+                    raise SchedulerError(f"{node.name}: unknown resource class {resource}")
+                if self.budgets[resource] < 1:
+                    raise SchedulerError(f"{node.name}: resource class {resource} has no budget")
+
+        order: List[str] = []
+        state: Dict[str, int] = {}
+
+        def visit(name: str, path: List[str]) -> None:
+            if state.get(name) == 2:
+                return
+            if state.get(name) == 1:
+                cycle = " -> ".join(path[path.index(name):] + [name])
+                raise SchedulerError(f"dependency cycle: {cycle}")
+            state[name] = 1
+            for dep in (*self.nodes[name].deps, *self.nodes[name].streams):
+                visit(dep, path + [name])
+            state[name] = 2
+            order.append(name)
+
+        for name in self.nodes:
+            visit(name, [])
+        return order
+
+    def _can_start(self, node: Node, free: Dict[str, int], done: Dict[str, Result]) -> bool:
+        if any(dep not in done for dep in node.deps):
+            return False
+        return all(free[resource] > 0 for resource in node.resources)
+
+    def _release_streams(self, running: Dict[asyncio.Task, Node], done: Dict[str, Result]) -> None:
+        for node in running.values():
+            if node.streams and all(name in done for name in node.streams):
+                node.upstream_done.set()
+
+    async def run(self) -> Dict[str, Result]:
+        self.validate()
+        free = dict(self.budgets)
+        pending = list(self.nodes.values())
+        running: Dict[asyncio.Task, Node] = {}
+        started: Dict[str, float] = {}
+        done: Dict[str, Result] = {}
+
+        while pending or running:
+            for node in list(pending):
+                busy = sum(1 for other in running.values() if not other.streams)
+                if not node.streams and self.max_jobs is not None and busy >= self.max_jobs:
+                    continue
+                if not self._can_start(node, free, done):
+                    continue
+                pending.remove(node)
+                for resource in node.resources:
+                    free[resource] -= 1
+                node.upstream_done = asyncio.Event()
+                started[node.name] = time.monotonic()
+                running[asyncio.ensure_future(node.run())] = node
+            self._release_streams(running, done)
+
+            if not running:
+                raise SchedulerError(f"no stage can start: {', '.join(node.name for node in pending)}")
+            finished, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+            for task in finished:
+                node = running.pop(task)
+                for resource in node.resources:
+                    free[resource] += 1
+                try:
+                    returncode = task.result()
+                except Exception as exc:  # a crashing stage must not stall the graph
+                    print_status("ERROR", f"{node.name} raised {exc!r}")
+                    returncode = 1
+                done[node.name] = Result(node.name, returncode, started[node.name], time.monotonic())
+        return done
+
+
+async def _already_done() -> int:
+    return 0
+
+
+def _recorded(run: Callable[[], Awaitable[int]], manifest: Manifest, name: str, outputs: Sequence[str]):
+    async def recorded() -> int:
+        manifest.start(name)
+        returncode = 1
+        try:
+            returncode = await run()
+        finally:
+            manifest.finish(name, "", returncode, outputs)
+        return returncode
+
+    return recorded
+
+
+def resumable(scheduler: Scheduler, manifest: Manifest, outputs: Dict[str, List[str]]) -> List[str]:
+    """Record every stage in ``manifest`` and skip those a previous attempt finished.
+
+    Returns the skipped stages.  A stage is only skipped when it is done, its
+    outputs still match their recorded checksums and all of its dependencies
+    were skipped too.
+    """
+    skipped: List[str] = []
+    for name in scheduler.validate():
+        node = scheduler.nodes[name]
+        files = outputs.get(name, [])
+        manifest.register(name)
+        upstream = (*node.deps, *node.streams)
+        if all(dep in skipped for dep in upstream) and manifest.is_complete(name, "", files):
+            node.run = _already_done
+            skipped.append(name)
+        else:
+            node.run = _recorded(node.run, manifest, name, files)
+    return skipped
@@ -0,0 +1,216 @@
+"""Enumeration sources: the plugin interface of the engine's subdomain tools.
+
+Every external enumeration tool is a :class:`Source` that declares how it is
+run and how its output becomes names; the engine (:mod:`recon.engine`)
+turns each enabled source into a pipeline stage, so adding a tool means
+declaring one :class:`Source` instead of writing a stage.  A source declares
+
+* the ``binary`` (checked by the dependency check, skipped when missing
+  with ``--skip-missing-tools``) and its ``argv`` template,
+* its input: the targets file as an argument (``LIST``), the targets file
+  on stdin (``STDIN``) or one run per domain on a worker pool (``TARGET``),
+* where its raw output goes (``raw``): stdout (``STDOUT``, parsed while the
+  tool runs), the result file itself (``OUTPUT``) or files and directories
+  the tool writes, parsed once it exits,
+* the ``parser`` turning those raw lines into names, or for structured
+  outputs a ``reader`` of the raw file or directory (:mod:`recon.parsers`)
+  yielding findings: names with the IPs, URLs and tool modules behind them,
+* the ``timeout`` of a run and the scheduler resource classes the stage
+  holds.
+
+The names are written to the source's result file as the parser yields
+them and the aggregator tails the result files (per-target shards
+included), so a slow source does not hold back the names of a fast one.
+
+The ``argv`` and ``raw`` templates take ``{targets}``, ``{domain}``,
+``{clean}`` (the domain with ``.``/``:`` replaced by ``_``), ``{output}``,
+``{raw}`` and ``{wordlist}``; ``raw`` is relative to the output directory.
+
+Plugins are ``*.py`` files in the directories of ``PLUGIN_PATH`` with a
+module-level ``SOURCES`` list; a plugin source named like a built-in one
+replaces it.  Sources with ``default=False`` only run when named in
+``SOURCES`` (``SOURCES="subfinder bbot mytool"``), apart from the wordlist
+sources, which ``WORDLIST_TOOLS=true`` enables.  A minimal plugin::
+
+    from recon.sources import TARGET, Source
+
+    SOURCES = [Source("findomain", "findomain", ("-t", "{domain}", "-q"), label="Findomain", input=TARGET)]
+"""
+
+from __future__ import annotations
+
+import importlib.util
+import os
+import re
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from .budget import TOOL_FLAGS
+from .config import POOLS, RunConfig
+from .console import print_status
+from .parsers import Finding, read_bbot, read_ffuf, read_sudomy
+from .scheduler import CPU, DISK, DNS, NETWORK
+
+# Inputs
+LIST = "list"
+STDIN = "stdin"
+TARGET = "target"
+
+# Raw outputs other than a file/directory template
+STDOUT = "-"
+OUTPUT = "{output}"
+
+BBOT_PRESETS = ("subdomain-enum", "cloud-enum", "code-enum", "email-enum", "spider", "web-basic",
+                "paramminer", "dirbust-light", "web-screenshots")
+FFUF_MATCH_CODES = "200,301,302,403"
+
+_HOSTNAME = re.compile(r"^[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$")
+
+Parser = Callable[[Iterable[str], str], Iterable[str]]
+Reader = Callable[[str, str], Iterable[Finding]]
+
+
+def parse_lines(lines: Iterable[str], domain: str) -> Iterable[str]:
+    """Every line is a name (the aggregator normalises them)."""
+    return lines
+
+
+def parse_hostnames(lines: Iterable[str], domain: str) -> Iterator[str]:
+    """Lines that look like a hostname, each once."""
+    seen = set()
+    for line in lines:
+        if line not in seen and _HOSTNAME.match(line):
+            seen.add(line)
+            yield line
+
+
+def parse_domain_names(lines: Iterable[str], domain: str) -> Iterator[str]:
+    """Lines that are a subdomain of the target being scanned."""
+    pattern = re.compile(rf"^[a-zA-Z0-9.-]+\.{re.escape(domain)}$")
+    return (line for line in lines if pattern.match(line))
+
+
+@dataclass(frozen=True)
+class Source:
+    """An enumeration tool and the contract of its input and output.
+
+    ``name`` is the stage (``run_<name>``), cache and state key of the
+    source; ``output`` defaults to ``subdomains/<name>/<name>.txt``.
+    A ``reader`` takes the place of ``parser`` for a raw file or directory:
+    it gets the path and the domain and yields :class:`recon.parsers.Finding`
+    records, kept in ``findings.jsonl`` beside the raw output.
+    ``cache_args`` are the arguments that change what the tool finds
+    (part of the result cache key), ``rate_flags`` the flags through which
+    it takes its share of the network budget (see
+    :data:`recon.budget.TOOL_FLAGS`).
+    """
+
+    name: str
+    binary: str
+    argv: Tuple[str, ...]
+    label: str = ""
+    input: str = LIST
+    raw: str = STDOUT
+    parser: Parser = parse_lines
+    reader: Optional[Reader] = None
+    output: str = ""
+    timeout: Optional[int] = None
+    resources: Tuple[str, ...] = (NETWORK,)
+    cache_args: Tuple[str, ...] = ()
+    rate_flags: Tuple[str, ...] = ()
+    wordlist: bool = False
+    default: bool = True
+
+    @property
+    def stage(self) -> str:
+        return f"run_{self.name}"
+
+    @property
+    def task(self) -> str:
+        """Manifest and profile name of a per-target run."""
+        return f"{self.name}_target"
+
+    @property
+    def title(self) -> str:
+        return self.label or self.name
+
+    @property
+    def result(self) -> str:
+        return self.output or f"subdomains/{self.name}/{self.name}.txt"
+
+
+BUILTIN = (
+    Source("subfinder", "subfinder", ("-dL", "{targets}", "-o", "{output}", "-all", "-silent"),
+           label="Subfinder", raw=OUTPUT, cache_args=("-all",)),
+    Source("assetfinder", "assetfinder", ("--subs-only", "{domain}"), label="AssetFinder", input=TARGET),
+    Source("amass_passive", "amass", ("enum", "-passive", "-df", "{targets}", "-o", "{output}"),
+           label="Amass passive", raw=OUTPUT, output="subdomains/amass/amass_passive.txt", resources=(NETWORK, DNS)),
+    Source("bbot", "bbot", ("-l", "{targets}", "-p", *BBOT_PRESETS, "--allow-deadly", "-o", "{raw}/"),
+           label="BBOT", raw="subdomains/bbot", reader=read_bbot, output="subdomains/bbot/bbot_subdomains.txt",
+           timeout=600, resources=(NETWORK, CPU), cache_args=(",".join(BBOT_PRESETS),)),
+    Source("subdog", "subdog", ("-tools", "all"), label="Subdog", input=STDIN, cache_args=("all",)),
+    Source("sudomy", "sudomy", ("-d", "{domain}", "--all", "-o", "{raw}/"), label="Sudomy", input=TARGET,
+           raw="subdomains/sudomy/individual/sudomy_{clean}", reader=read_sudomy, timeout=300,
+           resources=(NETWORK, DISK), cache_args=("--all",)),
+    Source("ffuf", "ffuf", ("-w", "{wordlist}", "-u", "https://FUZZ.{domain}", "-mc", FFUF_MATCH_CODES,
+                            "-o", "{raw}", "-of", "json", "-s"),
+           label="FFUF", input=TARGET, raw="subdomains/ffuf/ffuf_{clean}.json", reader=read_ffuf,
+           cache_args=(FFUF_MATCH_CODES,), wordlist=True, default=False),
+    Source("dnscan", "dnscan", ("-l", "{targets}", "-w", "{wordlist}", "-r", "--maxdepth", "3", "-o", "{output}"),
+           label="DNScan", raw=OUTPUT, resources=(DNS,), cache_args=("-r --maxdepth 3",), wordlist=True,
+           default=False),
+)
+
+SOURCES: Dict[str, Source] = {}
+
+
+def register(source: Source) -> None:
+    """Add ``source``, replacing a source of the same name."""
+    if source.input not in (LIST, STDIN, TARGET):
+        raise ValueError(f"source {source.name}: unknown input {source.input!r}")
+    if source.reader is not None and source.raw in (STDOUT, OUTPUT):
+        raise ValueError(f"source {source.name}: a reader needs a raw file or directory")
+    SOURCES[source.name] = source
+    if source.input == TARGET:
+        POOLS.add(source.name)
+    if source.rate_flags:
+        TOOL_FLAGS[source.binary] = source.rate_flags
+
+
+def load_plugins(paths: Sequence[str]) -> List[Source]:
+    """Import the ``*.py`` plugins in ``paths`` and register their ``SOURCES``."""
+    loaded: List[Source] = []
+    for directory in paths:
+        if not os.path.isdir(directory):
+            print_status("WARNING", f"Plugin directory not found: {directory}")
+            continue
+        for filename in sorted(os.listdir(directory)):
+            if not filename.endswith(".py") or filename.startswith("_"):
+                continue
+            path = os.path.join(directory, filename)
+            spec = importlib.util.spec_from_file_location(f"recon_plugin_{filename[:-3]}", path)
+            module = importlib.util.module_from_spec(spec)
+            try:
+                spec.loader.exec_module(module)
+            except Exception as exc:
+                print_status("WARNING", f"Could not load plugin {path}: {exc}")
+                continue
+            for source in getattr(module, "SOURCES", ()):
+                register(source)
+                loaded.append(source)
+    return loaded
+
+
+def enabled(config: RunConfig) -> List[Source]:
+    """The sources a run with ``config`` uses, in registration order."""
+    if config.sources:
+        unknown = [name for name in config.sources if name not in SOURCES]
+        if unknown:
+            print_status("WARNING", f"Unknown sources ignored: {' '.join(unknown)}")
+        return [source for source in SOURCES.values() if source.name in config.sources]
+    return [source for source in SOURCES.values()
+            if source.default or (source.wordlist and config.wordlist_tools)]
+
+
+for _source in BUILTIN:
+    register(_source)
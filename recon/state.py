@@ -0,0 +1,280 @@
+"""Persistent subdomain state for incremental re-scans.
+
+A SQLite database, keyed by root domain, remembers every subdomain the
+pipeline has seen, which tools reported it and when it was first and last
+seen.  In ``--incremental`` mode the engine uses it to:
+
+* skip a tool for the roots it scanned less than ``--ttl-hours`` ago and
+  replay its cached names instead (``plan``), and
+* record this run's results and emit only the names that are new since the
+  previous run or that have vanished from it (``record``).
+
+Command line usage (as called from the engine)::
+
+    python3 -m recon.state --db ~/.recon/state.db plan --targets targets.txt \\
+        --plan-dir out/state --ttl-hours 24 --stage run_subfinder --stage run_bbot
+    python3 -m recon.state --db ~/.recon/state.db record --targets targets.txt \\
+        --plan-dir out/state --stage run_subfinder=out/subdomains/subfinder/subfinder.txt
+
+``plan`` writes ``<plan-dir>/<stage>.targets`` with the roots each stage still
+has to scan and ``<plan-dir>/cached_subdomains.txt`` with the replayed names.
+``record`` writes ``new_subdomains.txt`` and ``vanished_subdomains.txt``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sqlite3
+import sys
+import time
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from .console import print_status
+from .names import normalize_name, root_of
+from .pool import read_targets
+
+DEFAULT_DB = os.path.join(os.path.expanduser("~"), ".recon", "state.db")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS subdomains (
+    root TEXT NOT NULL,
+    name TEXT NOT NULL,
+    first_seen REAL NOT NULL,
+    last_seen REAL NOT NULL,
+    PRIMARY KEY (root, name)
+);
+CREATE TABLE IF NOT EXISTS sightings (
+    root TEXT NOT NULL,
+    name TEXT NOT NULL,
+    tool TEXT NOT NULL,
+    first_seen REAL NOT NULL,
+    last_seen REAL NOT NULL,
+    PRIMARY KEY (root, name, tool)
+);
+CREATE TABLE IF NOT EXISTS source_runs (
+    root TEXT NOT NULL,
+    tool TEXT NOT NULL,
+    last_run REAL NOT NULL,
+    PRIMARY KEY (root, tool)
+);
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    root TEXT NOT NULL,
+    started REAL NOT NULL,
+    finished REAL
+);
+"""
+
+
+def tool_name(stage: str) -> str:
+    """Tool recorded for a stage: ``run_amass_passive`` -> ``amass_passive``."""
+    return stage[4:] if stage.startswith("run_") else stage
+
+
+class StateStore:
+    """Thin wrapper around the SQLite state database."""
+
+    def __init__(self, path: str = DEFAULT_DB):
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.db = sqlite3.connect(path)
+        self.db.executescript(SCHEMA)
+
+    def close(self) -> None:
+        self.db.commit()
+        self.db.close()
+
+    # -- sources -----------------------------------------------------------
+
+    def is_fresh(self, root: str, tool: str, ttl: float, now: float) -> bool:
+        row = self.db.execute(
+            "SELECT last_run FROM source_runs WHERE root = ? AND tool = ?", (root, tool)
+        ).fetchone()
+        return row is not None and row[0] >= now - ttl
+
+    def cached_names(self, root: str, tool: str) -> List[str]:
+        """Names the tool reported on its last run for ``root``."""
+        return [row[0] for row in self.db.execute(
+            """SELECT s.name FROM sightings s
+               JOIN source_runs r ON r.root = s.root AND r.tool = s.tool
+               WHERE s.root = ? AND s.tool = ? AND s.last_seen >= r.last_run""",
+            (root, tool),
+        )]
+
+    def mark_source_run(self, root: str, tool: str, when: float) -> None:
+        self.db.execute(
+            """INSERT INTO source_runs (root, tool, last_run) VALUES (?, ?, ?)
+               ON CONFLICT (root, tool) DO UPDATE SET last_run = excluded.last_run""",
+            (root, tool, when),
+        )
+
+    # -- names -------------------------------------------------------------
+
+    def record(self, root: str, tool: str, names: Iterable[str], now: float) -> None:
+        rows = [(root, name, now, now) for name in names]
+        self.db.executemany(
+            """INSERT INTO subdomains (root, name, first_seen, last_seen) VALUES (?, ?, ?, ?)
+               ON CONFLICT (root, name) DO UPDATE SET last_seen = excluded.last_seen""",
+            rows,
+        )
+        self.db.executemany(
+            """INSERT INTO sightings (root, name, tool, first_seen, last_seen) VALUES (?, ?, ?, ?, ?)
+               ON CONFLICT (root, name, tool) DO UPDATE SET last_seen = excluded.last_seen""",
+            [(root, name, tool, first, last) for root, name, first, last in rows],
+        )
+
+    # -- runs --------------------------------------------------------------
+
+    def start_run(self, root: str, now: float) -> int:
+        cursor = self.db.execute("INSERT INTO runs (root, started) VALUES (?, ?)", (root, now))
+        return cursor.lastrowid
+
+    def open_run(self, root: str) -> Optional[Tuple[int, float]]:
+        return self.db.execute(
+            "SELECT id, started FROM runs WHERE root = ? AND finished IS NULL ORDER BY id DESC LIMIT 1",
+            (root,),
+        ).fetchone()
+
+    def finish_run(self, run_id: int, now: float) -> None:
+        self.db.execute("UPDATE runs SET finished = ? WHERE id = ?", (now, run_id))
+
+    def changes(self, root: str, run_id: int, started: float) -> Tuple[List[str], List[str]]:
+        """Names new in this run and names seen by the previous run but not this one."""
+        new = [row[0] for row in self.db.execute(
+            "SELECT name FROM subdomains WHERE root = ? AND first_seen >= ? ORDER BY name",
+            (root, started),
+        )]
+        previous = self.db.execute(
+            "SELECT started FROM runs WHERE root = ? AND id != ? AND finished IS NOT NULL "
+            "ORDER BY started DESC LIMIT 1",
+            (root, run_id),
+        ).fetchone()
+        if previous is None:
+            return new, []
+        vanished = [row[0] for row in self.db.execute(
+            "SELECT name FROM subdomains WHERE root = ? AND last_seen >= ? AND last_seen < ? ORDER BY name",
+            (root, previous[0], started),
+        )]
+        return new, vanished
+
+
+def read_roots(targets_file: str) -> List[str]:
+    roots = []
+    for target in read_targets(targets_file):
+        root = normalize_name(target)
+        if root and root not in roots:
+            roots.append(root)
+    return roots
+
+
+def plan(store: StateStore, roots: Sequence[str], stages: Sequence[str], plan_dir: str, ttl: float) -> Dict[str, List[str]]:
+    """Decide which roots every stage still has to scan and replay the rest."""
+    now = time.time()
+    os.makedirs(plan_dir, exist_ok=True)
+    for root in roots:
+        store.start_run(root, now)
+
+    stale: Dict[str, List[str]] = {}
+    cached: Set[str] = set()
+    for stage in stages:
+        tool = tool_name(stage)
+        stale[stage] = []
+        for root in roots:
+            if store.is_fresh(root, tool, ttl, now):
+                names = store.cached_names(root, tool)
+                store.record(root, tool, names, now)
+                cached.update(names)
+            else:
+                stale[stage].append(root)
+        with open(os.path.join(plan_dir, f"{stage}.targets"), "w", encoding="utf-8") as handle:
+            handle.writelines(f"{root}\n" for root in stale[stage])
+
+    with open(os.path.join(plan_dir, "cached_subdomains.txt"), "w", encoding="utf-8") as handle:
+        handle.writelines(f"{name}\n" for name in sorted(cached))
+    store.db.commit()
+    return stale
+
+
+def record(store: StateStore, roots: Sequence[str], outputs: Dict[str, str], plan_dir: str) -> Tuple[List[str], List[str]]:
+    """Store the names each stage found for the roots it scanned and diff the run."""
+    now = time.time()
+    root_set = set(roots)
+    runs = {root: store.open_run(root) for root in roots}
+
+    for stage, path in outputs.items():
+        tool = tool_name(stage)
+        planned = os.path.join(plan_dir, f"{stage}.targets")
+        scanned = set(read_roots(planned)) if os.path.exists(planned) else root_set
+        if not scanned or not os.path.exists(path):
+            continue
+        found: Dict[str, Set[str]] = {root: set() for root in scanned}
+        with open(path, encoding="utf-8", errors="replace") as handle:
+            for line in handle:
+                name = normalize_name(line)
+                root = root_of(name, root_set) if name else None
+                if root in found:
+                    found[root].add(name)
+        for root, names in found.items():
+            run = runs.get(root)
+            store.record(root, tool, names, now)
+            store.mark_source_run(root, tool, run[1] if run else now)
+
+    all_new: List[str] = []
+    all_vanished: List[str] = []
+    for root, run in runs.items():
+        if run is None:
+            run = (store.start_run(root, now), now)
+        new, vanished = store.changes(root, run[0], run[1])
+        store.finish_run(run[0], now)
+        all_new.extend(new)
+        all_vanished.extend(vanished)
+    store.db.commit()
+
+    for filename, names in (("new_subdomains.txt", all_new), ("vanished_subdomains.txt", all_vanished)):
+        with open(os.path.join(plan_dir, filename), "w", encoding="utf-8") as handle:
+            handle.writelines(f"{name}\n" for name in names)
+    return all_new, all_vanished
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python3 -m recon.state",
+        description="Persistent subdomain state for incremental re-scans.",
+    )
+    parser.add_argument("--db", default=os.environ.get("STATE_DB", DEFAULT_DB), help="SQLite state database")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    plan_parser = sub.add_parser("plan", help="skip fresh sources and replay their cached names")
+    plan_parser.add_argument("--targets", required=True)
+    plan_parser.add_argument("--plan-dir", required=True)
+    plan_parser.add_argument("--ttl-hours", type=float, default=24.0,
+                             help="cached results younger than this are reused")
+    plan_parser.add_argument("--stage", action="append", default=[], help="tool stage to plan (repeatable)")
+
+    record_parser = sub.add_parser("record", help="store this run and write new/vanished names")
+    record_parser.add_argument("--targets", required=True)
+    record_parser.add_argument("--plan-dir", required=True)
+    record_parser.add_argument("--stage", action="append", default=[], metavar="STAGE=OUTPUT",
+                               help="tool stage and its output file (repeatable)")
+    args = parser.parse_args(argv)
+
+    store = StateStore(args.db)
+    roots = read_roots(args.targets)
+    try:
+        if args.command == "plan":
+            stale = plan(store, roots, args.stage, args.plan_dir, args.ttl_hours * 3600)
+            for stage, pending in stale.items():
+                if len(pending) < len(roots):
+                    print_status("INFO", f"{stage}: {len(roots) - len(pending)}/{len(roots)} targets fresh, reusing cached results")
+        else:
+            outputs = dict(spec.split("=", 1) for spec in args.stage)
+            new, vanished = record(store, roots, outputs, args.plan_dir)
+            print_status("SUCCESS", f"Incremental state: {len(new)} new, {len(vanished)} vanished subdomains")
+    finally:
+        store.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
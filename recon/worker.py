@@ -0,0 +1,182 @@
+"""Worker of a distributed run.
+
+A worker claims source tasks (a source and a shard of targets, see
+:mod:`recon.broker`) from the queue and runs them with the same code as a
+local run (:meth:`recon.engine.Engine.run_source`): result cache, network
+budget, per-domain worker pools and parsers included.  While the source
+runs, the worker tails its result file (the per-domain shards of a
+per-target source) and pushes new names to the queue, so the coordinator's
+aggregator sees them before the task finishes; the lease of the task is
+renewed on every push.
+
+Each task runs in its own directory under ``--work-dir``, removed once the
+task is finished; tasks of one worker, and workers sharing a work
+directory, share the network budget in ``<work-dir>/budget.db``.  The
+worker's environment (``PLUGIN_PATH``, ``CACHE_DIR``, ``WORDLIST``,
+``NET_RATE``, ...) configures its side of the run, the task only names the
+profile, source and targets.
+
+Command line usage::
+
+    python3 -m recon.worker --queue sqlite:///shared/queue.db --tasks 2
+    QUEUE=redis://broker:6379/0 python3 -m recon.worker --work-dir /var/tmp/recon-worker
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import re
+import shutil
+import signal
+import socket
+import sys
+from typing import Any, Dict, Optional, Sequence
+
+from .aggregate import FileFollower
+from .broker import DEFAULT_LEASE, TaskQueue, open_queue
+from .budget import NetworkBudget
+from .cache import pid_alive
+from .config import RunConfig
+from .console import print_status
+from .engine import Engine, StageRun, setup_directories
+from .sources import SOURCES, TARGET, load_plugins
+
+DEFAULT_WORK_DIR = os.path.join(os.path.expanduser("~"), ".recon", "worker")
+PUSH_INTERVAL = 1.0
+
+
+class Worker:
+    """Claims and runs tasks until stopped (or, with ``exit_when_idle``, until the queue is empty)."""
+
+    def __init__(self, queue: TaskQueue, work_dir: str, name: str, tasks: int = 1,
+                 lease: float = DEFAULT_LEASE, poll: float = 1.0, exit_when_idle: bool = False,
+                 parent: int = 0):
+        self.queue = queue
+        self.work_dir = work_dir
+        self.name = name
+        self.tasks = tasks
+        self.lease = lease
+        self.poll = poll
+        self.exit_when_idle = exit_when_idle
+        self.parent = parent
+        self.stopping = asyncio.Event()
+        os.makedirs(work_dir, exist_ok=True)
+        config = RunConfig.from_env()
+        self.budget = NetworkBudget(os.path.join(work_dir, "budget.db"))
+        self.budget.configure(config.net_rate, config.net_min_rate, config.net_target_rate, config.net_target_rates)
+
+    def close(self) -> None:
+        self.budget.close()
+
+    async def run(self) -> int:
+        print_status("INFO", f"Worker {self.name} waiting for tasks ({self.tasks} at a time)")
+        running: set = set()
+        while not self.stopping.is_set():
+            if self.parent and not pid_alive(self.parent):
+                print_status("WARNING", f"Coordinator {self.parent} is gone, stopping")
+                break
+            while len(running) < self.tasks:
+                task = self.queue.claim(self.name, self.lease)
+                if task is None:
+                    break
+                running.add(asyncio.ensure_future(self.handle(*task)))
+            if not running and self.exit_when_idle:
+                break
+            if running:
+                _, running = await asyncio.wait(running, timeout=self.poll, return_when=asyncio.FIRST_COMPLETED)
+                continue
+            try:
+                await asyncio.wait_for(self.stopping.wait(), timeout=self.poll)
+            except asyncio.TimeoutError:
+                pass
+        if running:
+            await asyncio.wait(running)
+        return 0
+
+    async def handle(self, task_id: str, payload: Dict[str, Any], attempt: int) -> None:
+        source = SOURCES.get(payload["source"])
+        if source is None:
+            self.queue.complete(task_id, self.name, False, f"unknown source {payload['source']} on {self.name}")
+            return
+        if shutil.which(source.binary) is None:
+            self.queue.complete(task_id, self.name, False, f"{source.binary} not installed on {self.name}")
+            return
+        print_status("TARGET", f"{source.title}: {len(payload['targets'])} targets ({task_id}, attempt {attempt})")
+
+        task_dir = setup_directories(os.path.join(self.work_dir, re.sub(r"[^A-Za-z0-9_.-]", "_", task_id)))
+        targets_file = os.path.join(task_dir, "targets.txt")
+        with open(targets_file, "w", encoding="utf-8") as out:
+            out.writelines(f"{domain}\n" for domain in payload["targets"])
+        config = RunConfig.from_env(payload["profile"])
+        config.queue = ""  # run the source here instead of queueing it again
+        engine = Engine(config, task_dir, targets_file, budget=self.budget)
+        stage = engine.source_stage(source, payload["targets"])
+        follower = FileFollower([engine.out(path) for path in (stage.partials if source.input == TARGET
+                                                               else stage.outputs)])
+        ok, error = False, ""
+        try:
+            running = asyncio.ensure_future(engine.run_source(source, StageRun(stage.name, targets_file)))
+            while not running.done():
+                await asyncio.wait({running}, timeout=PUSH_INTERVAL)
+                self.queue.push(task_id, follower.poll())
+                self.queue.heartbeat(task_id, self.name, self.lease)
+            returncode = running.result()
+            self.queue.push(task_id, follower.poll(final=True))
+            ok = returncode == 0
+            if not ok:
+                error = f"{source.binary} exited with {returncode}"
+                print_status("ERROR", f"{task_id} failed: {error}")
+        except Exception as exc:
+            error = f"{type(exc).__name__}: {exc}"
+            print_status("ERROR", f"{task_id} failed: {error}")
+        finally:
+            self.queue.complete(task_id, self.name, ok, error)
+            engine.close()
+            shutil.rmtree(task_dir, ignore_errors=True)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python3 -m recon.worker",
+        description="Run source tasks of distributed reconnaissance runs.",
+    )
+    parser.add_argument("--queue", default=os.environ.get("QUEUE", ""), required=not os.environ.get("QUEUE"),
+                        help="queue URL: sqlite:///path/queue.db, a database path or redis://host:port/db")
+    parser.add_argument("--work-dir", default=DEFAULT_WORK_DIR, help="directory for the task scratch directories")
+    parser.add_argument("--tasks", type=int, default=1, help="tasks run at the same time (default 1)")
+    parser.add_argument("--lease", type=float, default=DEFAULT_LEASE,
+                        help="seconds without a heartbeat before a task is handed to another worker")
+    parser.add_argument("--name", default=f"{socket.gethostname()}:{os.getpid()}", help="worker name")
+    parser.add_argument("--exit-when-idle", action="store_true", help="exit once the queue has no pending task")
+    parser.add_argument("--parent", type=int, default=0, help="stop once this process (the coordinator) exits")
+    args = parser.parse_args(argv)
+
+    load_plugins(RunConfig.from_env().plugin_path)
+    try:
+        queue = open_queue(args.queue)
+    except RuntimeError as exc:
+        print_status("ERROR", str(exc))
+        return 1
+
+    async def run() -> int:
+        worker = Worker(queue, args.work_dir, args.name, max(1, args.tasks), args.lease,
+                        exit_when_idle=args.exit_when_idle, parent=args.parent)
+        loop = asyncio.get_running_loop()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            # Finish the running tasks, claim no new ones
+            loop.add_signal_handler(signum, worker.stopping.set)
+        try:
+            return await worker.run()
+        finally:
+            worker.close()
+
+    try:
+        return asyncio.run(run())
+    finally:
+        queue.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
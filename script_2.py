@@ -154,18 +154,20 @@ target.domain.co.uk
 
 ## 🚦 Execution Flow
 
+Both scripts launch the same Python engine (`python3 -m recon --profile advanced|simple`);
+the profile decides how much of its stage graph runs at once.
+
 ### Advanced Script (Parallel)
 1. **Input Validation** → Domain/File detection
 2. **Dependency Check** → Tool availability
-3. **Parallel Phase** → Subfinder, AssetFinder, Amass
-4. **Sequential Phase** → BBOT, FFUF, Sudomy, DNScan
-5. **Aggregation** → Deduplication and cleanup
-6. **Intelligence** → Amass intel gathering
-7. **Reporting** → Comprehensive analysis
+3. **Scheduled Phase** → Every enumeration tool runs as soon as a slot of its resource budget is free
+4. **Streaming Aggregation** → Deduplication and resolution while the tools still run
+5. **Intelligence** → Amass intel gathering alongside enumeration
+6. **Reporting** → Comprehensive analysis
 
 ### Simple Script (Sequential)
 1. **Input Validation** → Domain/File detection
-2. **Sequential Execution** → All tools in order
+2. **Sequential Execution** → The same stages, one at a time
 3. **Aggregation** → Result combination
 4. **Intelligence** → Basic intel gathering
 5. **Summary** → Quick report generation
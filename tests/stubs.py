@@ -0,0 +1,70 @@
+"""Stand-ins for the resolvers of :mod:`recon.dns` in tests that never leave the loopback."""
+
+import asyncio
+import ipaddress
+import struct
+from collections import Counter
+
+from recon.dns import TYPE_A, TYPE_CNAME, DNSError, Record, Response, parse_response
+
+
+class StubPool:
+    """Answers A queries from ``records`` (name -> addresses or ``"cname:<target>"``).
+
+    Every name under a zone of ``wildcards`` resolves to that zone's address;
+    names in ``failing`` raise :class:`DNSError`.  Queries are counted per
+    name in ``queries``.
+    """
+
+    def __init__(self, records=None, wildcards=None, failing=()):
+        self.records = dict(records or {})
+        self.wildcards = dict(wildcards or {})
+        self.failing = set(failing)
+        self.queries = Counter()
+
+    async def query(self, name, qtype=TYPE_A):
+        self.queries[name] += 1
+        if name in self.failing:
+            raise DNSError(name)
+        answers = []
+        if qtype == TYPE_A:
+            values = self.records.get(name)
+            if values is None:
+                zone = next((zone for zone in self.wildcards if name.endswith(f".{zone}")), None)
+                values = [self.wildcards[zone]] if zone else []
+            for value in values:
+                if value.startswith("cname:"):
+                    answers.append(Record(name, TYPE_CNAME, 60, value[6:]))
+                else:
+                    answers.append(Record(name, TYPE_A, 60, value))
+        return Response(0, 0, False, (name, qtype), answers)
+
+    async def resolve(self, name, qtype=TYPE_A):
+        return (await self.query(name, qtype)).values(qtype)
+
+
+class DNSServer(asyncio.DatagramProtocol):
+    """Loopback UDP resolver answering A queries from ``records`` (name -> address), empty otherwise."""
+
+    def __init__(self, records):
+        self.records = records
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def datagram_received(self, data, addr):
+        qid, = struct.unpack("!H", data[:2])
+        name, qtype = parse_response(data).question
+        address = self.records.get(name) if qtype == TYPE_A else None
+        answer = b""
+        if address is not None:
+            answer = b"\xc0\x0c" + struct.pack("!HHIH", TYPE_A, 1, 60, 4) + ipaddress.IPv4Address(address).packed
+        header = struct.pack("!HHHHHH", qid, 0x8180, 1, 1 if answer else 0, 0, 0)
+        self.transport.sendto(header + data[12:] + answer, addr)
+
+
+async def start_dns(records):
+    """Start a :class:`DNSServer` on 127.0.0.1; returns its transport and its ``host:port``."""
+    transport, _ = await asyncio.get_running_loop().create_datagram_endpoint(
+        lambda: DNSServer(records), local_addr=("127.0.0.1", 0))
+    return transport, "127.0.0.1:%d" % transport.get_extra_info("sockname")[1]
@@ -0,0 +1,64 @@
+from recon.aggregate import Aggregator, FileFollower, aggregate
+from recon.events import EventLog, EventReader
+from recon.names import normalize_name, root_of
+
+
+def test_normalize_name():
+    assert normalize_name("  *.*.WWW.Example.COM.\n") == "www.example.com"
+    assert normalize_name("bücher.example.de") == "xn--bcher-kva.example.de"
+    assert normalize_name("a.xn--p1ai") == "a.xn--p1ai"
+    for raw in ("", "localhost", "a..example.com", "-a.example.com", "a_b.example.com", "10.0.0.1",
+                "x" * 64 + ".example.com"):
+        assert normalize_name(raw) is None, raw
+
+
+def test_root_of():
+    roots = {"example.com", "dev.example.com"}
+    assert root_of("api.dev.example.com", roots) == "dev.example.com"
+    assert root_of("example.com", roots) == "example.com"
+    assert root_of("notexample.com", roots) is None
+
+
+def test_file_follower_tails_growing_and_rewritten_files(tmp_path):
+    path = tmp_path / "tool.txt"
+    follower = FileFollower([str(path), str(tmp_path / "late.txt")])
+    assert follower.poll() == []
+    path.write_text("a.example.com\nb.exa")
+    assert follower.poll() == ["a.example.com"]
+    with open(path, "a") as handle:
+        handle.write("mple.com\nc.example.com")
+    assert follower.poll() == ["b.example.com"]
+    assert follower.poll(final=True) == ["c.example.com"]
+    # A shrunk file was rewritten: read it again from the start
+    path.write_text("d.example.com\n")
+    (tmp_path / "late.txt").write_text("e.example.com\n")
+    assert follower.poll_files() == {str(path): ["d.example.com"], str(tmp_path / "late.txt"): ["e.example.com"]}
+
+
+def test_aggregator_dedupes_normalised_names():
+    aggregator = Aggregator()
+    assert aggregator.add("WWW.example.com\n") == "www.example.com"
+    assert aggregator.add("*.www.example.com.") is None
+    assert aggregator.add_lines(["api.example.com", "not a name", "api.example.com", ""]) == 1
+    assert aggregator.names == {"www.example.com", "api.example.com"}
+    assert aggregator.lines_seen == 6
+
+
+def test_aggregate_single_pass(tmp_path):
+    first, second = tmp_path / "subfinder.txt", tmp_path / "amass.txt"
+    first.write_text("www.example.com\nAPI.example.com\n")
+    second.write_text("api.example.com\n\n*.mail.example.com")
+    files = {name: str(tmp_path / f"{name}.txt") for name in ("final", "raw", "clean")}
+    events = EventLog(str(tmp_path / "events.jsonl"))
+    try:
+        aggregator = aggregate([str(first), str(second)], files["final"], files["raw"], files["clean"],
+                               events=events)
+    finally:
+        events.close()
+    assert len(aggregator.names) == 3
+    assert (tmp_path / "final.txt").read_text() == "www.example.com\napi.example.com\nmail.example.com\n"
+    assert (tmp_path / "raw.txt").read_text().split() == ["www.example.com", "API.example.com", "api.example.com",
+                                                          "*.mail.example.com"]
+    assert (tmp_path / "clean.txt").read_text() == "api.example.com\nmail.example.com\nwww.example.com\n"
+    published = [(event["path"], event["new"], event["total"]) for event in EventReader(events.path).poll()]
+    assert published == [(str(first), 2, 2), (str(second), 1, 3)]
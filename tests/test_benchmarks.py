@@ -0,0 +1,89 @@
+import asyncio
+import subprocess
+
+import pytest
+
+from benchmarks import fake_tools
+from benchmarks.fake_dns import FakeDNS, answer
+from recon.dns import TYPE_A, TYPE_AAAA, TYPE_PTR, ResolverPool, build_query, parse_response
+from recon.parsers import read_bbot, read_ffuf
+
+
+def ask(name, qtype=TYPE_A, hit=100):
+    return parse_response(answer(build_query(9, name, qtype), hit))
+
+
+def test_fake_dns_answers():
+    response = ask("H3.example.com")
+    assert (response.id, response.rcode, response.question) == (9, 0, ("h3.example.com", TYPE_A))
+    assert response.values(TYPE_A)[0].startswith("127.")
+    assert ask("h3.example.com") == response
+    assert ask("h3.example.com", TYPE_AAAA).answers == [] and ask("h3.example.com", TYPE_AAAA).rcode == 0
+    # Unknown labels, a second level and a miss are NXDOMAIN
+    assert [ask(name).rcode for name in ("mail.example.com", "h3.h4.example.com", "example.com")] == [3, 3, 3]
+    assert ask("h3.example.com", hit=0).rcode == 3
+    assert ask("4.3.2.10.in-addr.arpa", TYPE_PTR).values(TYPE_PTR) == ["ptr-10-2-3-4.example.net"]
+
+
+def test_fake_dns_over_udp():
+    async def run():
+        loop = asyncio.get_running_loop()
+        transport, _ = await loop.create_datagram_endpoint(lambda: FakeDNS(100, 0.01), local_addr=("127.0.0.1", 0))
+        port = transport.get_extra_info("sockname")[1]
+        try:
+            async with ResolverPool([f"127.0.0.1:{port}"], timeout=2.0, retries=0) as pool:
+                return await asyncio.gather(pool.resolve("www.example.com"), pool.resolve("mail.example.com"))
+        finally:
+            transport.close()
+
+    found, missing = asyncio.run(run())
+    assert len(found) == 1 and missing == []
+
+
+@pytest.fixture
+def fast(monkeypatch):
+    monkeypatch.setenv("FAKE_LATENCY", "0")
+    monkeypatch.setenv("FAKE_LATENCY_PER_TARGET", "0")
+    monkeypatch.setenv("FAKE_NAMES", "10")
+
+
+def test_names_are_deterministic_and_overlap():
+    subfinder = list(fake_tools.names("subfinder", "example.com", 50))
+    assert subfinder == list(fake_tools.names("subfinder", "example.com", 50))
+    assert len(subfinder) == len(set(subfinder)) and subfinder[-1] == "www.example.com"
+    assert all(name.endswith(".example.com") for name in subfinder)
+    amass = set(fake_tools.names("amass", "example.com", 50))
+    assert 1 < len(amass & set(subfinder)) < len(amass)
+
+
+def test_list_tools_write_their_outputs(tmp_path, fast):
+    targets = tmp_path / "targets.txt"
+    targets.write_text("example.com\nexample.org\n")
+    assert fake_tools.run("subfinder", ["-dL", str(targets), "-o", str(tmp_path / "subfinder.txt")]) == 0
+    lines = (tmp_path / "subfinder.txt").read_text().split()
+    assert lines == [*fake_tools.names("subfinder", "example.com", 10), *fake_tools.names("subfinder", "example.org", 10)]
+
+    assert fake_tools.run("bbot", ["-t", "example.com", "-o", str(tmp_path / "bbot")]) == 0
+    hosts = {finding.host for finding in read_bbot(str(tmp_path / "bbot"), "example.com")}
+    assert hosts == set(fake_tools.names("bbot", "example.com", 10))
+
+    ffuf = str(tmp_path / "ffuf.json")
+    assert fake_tools.run("ffuf", ["-u", "https://FUZZ.example.com", "-o", ffuf]) == 0
+    assert {finding.host for finding in read_ffuf(ffuf, "example.com")} == set(fake_tools.names("ffuf", "example.com", 10))
+
+
+def test_intel_chain(fast, capsys):
+    assert fake_tools.run("amass", ["intel", "-org", "example"]) == 0
+    asns = [line.split(",")[0] for line in capsys.readouterr().out.splitlines()]
+    assert asns == fake_tools.asns("example")
+    assert fake_tools.run("whois", ["-h", "whois.radb.net", f"-i origin {asns[0]}"]) == 0
+    assert capsys.readouterr().out.split()[:2] == ["route:", fake_tools.cidr(asns[0])]
+
+
+def test_installed_wrappers(tmp_path, fast, monkeypatch):
+    monkeypatch.setenv("FAKE_FAIL", "assetfinder")
+    bin_dir = fake_tools.install(str(tmp_path / "bin"))
+    done = subprocess.run([f"{bin_dir}/subfinder", "-d", "example.com"], capture_output=True, text=True, timeout=30)
+    assert done.returncode == 0
+    assert done.stdout.split() == list(fake_tools.names("subfinder", "example.com", 10))
+    assert subprocess.run([f"{bin_dir}/assetfinder", "--subs-only", "example.com"], timeout=30).returncode == 1
@@ -0,0 +1,169 @@
+import asyncio
+import fnmatch
+
+import pytest
+
+from recon import sources  # noqa: F401  (registers the built-in sources)
+from recon.broker import MAX_ATTEMPTS, RedisQueue, SQLiteQueue, open_queue, task_summary
+from recon.manifest import DONE, FAILED, PENDING, RUNNING
+from recon.worker import Worker
+
+
+class FakeRedis:
+    """The subset of redis-py (with ``decode_responses=True``) the queue uses, in memory."""
+
+    def __init__(self):
+        self.data = {}
+
+    def hget(self, key, field):
+        return self.data.get(key, {}).get(field)
+
+    def hmget(self, key, *fields):
+        return [self.hget(key, field) for field in fields]
+
+    def hgetall(self, key):
+        return dict(self.data.get(key, {}))
+
+    def hset(self, key, field=None, value=None, mapping=None):
+        values = self.data.setdefault(key, {})
+        values.update({name: str(item) for name, item in (mapping or {field: value}).items()})
+
+    def hincrby(self, key, field, amount):
+        value = int(self.hget(key, field) or 0) + amount
+        self.hset(key, field, value)
+        return value
+
+    def rpush(self, key, *values):
+        self.data.setdefault(key, []).extend(values)
+
+    def lpop(self, key):
+        values = self.data.get(key)
+        return values.pop(0) if values else None
+
+    def lrange(self, key, start, end):
+        values = self.data.get(key, [])
+        return values[start:] if end == -1 else values[start:end + 1]
+
+    def lrem(self, key, count, value):
+        self.data[key] = [item for item in self.data.get(key, []) if item != value]
+
+    def zadd(self, key, mapping):
+        self.data.setdefault(key, {}).update(mapping)
+
+    def zrem(self, key, member):
+        self.data.get(key, {}).pop(member, None)
+
+    def zrangebyscore(self, key, low, high):
+        return [member for member, score in self.data.get(key, {}).items() if low <= score <= high]
+
+    def scan_iter(self, match):
+        return [key for key in list(self.data) if fnmatch.fnmatchcase(key, match)]
+
+    def delete(self, *keys):
+        for key in keys:
+            self.data.pop(key, None)
+
+    def close(self):
+        pass
+
+
+def redis_queue() -> RedisQueue:
+    queue = RedisQueue.__new__(RedisQueue)
+    queue.db, queue.prefix = FakeRedis(), "recon"
+    return queue
+
+
+@pytest.fixture(params=["sqlite", "redis"])
+def queue(request, tmp_path):
+    queue = SQLiteQueue(str(tmp_path / "queue.db")) if request.param == "sqlite" else redis_queue()
+    yield queue
+    queue.close()
+
+
+def test_claim_push_and_complete(queue):
+    queue.enqueue("run:subfinder:0", {"source": "subfinder", "targets": ["example.com"]})
+    queue.enqueue("run:subfinder:1", {"source": "subfinder", "targets": ["example.org"]})
+    task_id, payload, attempt = queue.claim("w1")
+    assert (task_id, payload["targets"], attempt) == ("run:subfinder:0", ["example.com"], 1)
+    queue.push(task_id, ["www.example.com", "api.example.com"])
+    cursor, names = queue.results([task_id])
+    assert names == ["www.example.com", "api.example.com"]
+    queue.push(task_id, ["mail.example.com"])
+    assert queue.results([task_id], cursor)[1] == ["mail.example.com"]
+    queue.complete(task_id, "w1", True)
+    # A finished task is not queued again (a resumed run replays its results)
+    queue.enqueue(task_id, {"source": "subfinder", "targets": ["example.com"]})
+    assert queue.status([task_id, "run:subfinder:1"]) == {task_id: (DONE, ""), "run:subfinder:1": (PENDING, "")}
+    assert queue.claim("w1")[0] == "run:subfinder:1"
+    assert queue.claim("w1") is None
+
+
+def test_expired_lease_goes_to_another_worker(queue):
+    queue.enqueue("run:bbot:0", {})
+    queue.claim("w1", lease=-1)
+    task_id, _, attempt = queue.claim("w2")
+    assert (task_id, attempt) == ("run:bbot:0", 2)
+    # The first worker finishing late does not change the task
+    queue.complete(task_id, "w1", False, "late")
+    assert queue.status([task_id]) == {task_id: (RUNNING, "lease of w1 expired")}
+    queue.complete(task_id, "w2", True)
+    assert queue.status([task_id])[task_id][0] == DONE
+
+
+def test_failed_task_is_given_up_after_max_attempts(queue):
+    queue.enqueue("run:amass:0", {})
+    for attempt in range(1, MAX_ATTEMPTS + 1):
+        task_id, _, claimed = queue.claim("w1")
+        assert claimed == attempt
+        queue.complete(task_id, "w1", False, f"exit {attempt}")
+    assert queue.status([task_id]) == {task_id: (FAILED, f"exit {MAX_ATTEMPTS}")}
+    assert queue.claim("w1") is None
+    # A failed task queued again (resumed run) starts over
+    queue.enqueue(task_id, {})
+    assert queue.claim("w1")[2] == 1
+
+
+def test_expired_lease_counts_as_an_attempt(queue):
+    queue.enqueue("run:sudomy:0", {})
+    for _ in range(MAX_ATTEMPTS):
+        queue.claim("w1", lease=-1)
+    assert queue.claim("w2") is None
+    assert queue.status(["run:sudomy:0"])["run:sudomy:0"] == (FAILED, "lease of w1 expired")
+
+
+def test_tasks_and_purge(queue):
+    for task_id in ("a:subfinder:0", "a:subfinder:1", "b:subfinder:0"):
+        queue.enqueue(task_id, {})
+    queue.claim("w1")
+    assert task_summary(queue.tasks("a:")) == "1 pending, 1 running, 0 done, 0 failed"
+    assert queue.purge("a:") == 2
+    assert [task["id"] for task in queue.tasks()] == ["b:subfinder:0"]
+
+
+def test_open_queue(tmp_path):
+    queue = open_queue(f"sqlite://{tmp_path}/queue.db")
+    assert isinstance(queue, SQLiteQueue) and queue.path == f"{tmp_path}/queue.db"
+    queue.close()
+
+
+def test_worker_fails_tasks_it_cannot_run(tmp_path, monkeypatch):
+    monkeypatch.setattr("recon.worker.shutil.which", lambda binary: None)
+    queue = SQLiteQueue(str(tmp_path / "queue.db"))
+    queue.enqueue("run:nosuch:0", {"source": "nosuch", "targets": ["example.com"], "profile": "advanced"})
+    queue.enqueue("run:subfinder:0", {"source": "subfinder", "targets": ["example.com"], "profile": "advanced"})
+
+    async def run():
+        worker = Worker(queue, str(tmp_path / "work"), "w1", tasks=2, poll=0.01, exit_when_idle=True)
+        try:
+            return await worker.run()
+        finally:
+            worker.close()
+
+    try:
+        assert asyncio.run(run()) == 0
+        errors = {task["id"]: (task["status"], task["error"]) for task in queue.tasks()}
+    finally:
+        queue.close()
+    # Each is retried until it is given up
+    assert errors == {"run:nosuch:0": (FAILED, "unknown source nosuch on w1"),
+                      "run:subfinder:0": (FAILED, "subfinder not installed on w1")}
@@ -0,0 +1,58 @@
+import asyncio
+import io
+
+from recon.aggregate import FileFollower
+from recon.bruteforce import Bruteforcer, Wordlist, candidates
+
+from .stubs import StubPool
+
+
+def wordlist(tmp_path, *words):
+    path = tmp_path / "words.txt"
+    path.write_text("\n".join(words) + "\n")
+    return Wordlist(str(path))
+
+
+def brute(pool, words, roots, depth, known=None):
+    output = io.StringIO()
+    engine = Bruteforcer(pool, words, output, FileFollower([known]) if known else None, workers=4)
+    stats = asyncio.run(engine.run(roots, depth))
+    return stats, sorted(output.getvalue().split())
+
+
+def brute_forced(pool, zone):
+    """Queries of ``word.zone`` names, leaving out the 16-character wildcard probes."""
+    return sum(count for name, count in pool.queries.items()
+               if name.partition(".")[2] == zone and len(name.partition(".")[0]) != 16)
+
+
+def test_wordlist_keeps_valid_labels(tmp_path):
+    words = wordlist(tmp_path, "WWW", "api", "-bad", "a_b", "", "dev-1")
+    assert list(words) == ["www", "api", "dev-1"]
+    assert list(candidates(words, ["a.com", "b.com"]))[:3] == ["www.a.com", "www.b.com", "api.a.com"]
+
+
+def test_recursion_follows_only_names_it_resolved(tmp_path):
+    known = tmp_path / "known.txt"
+    known.write_text("".join(f"host{i}.example.com\n" for i in range(50)) + "api.example.com\n")
+    pool = StubPool({"www.example.com": ["192.0.2.1"], "api.example.com": ["192.0.2.2"],
+                     "dev.www.example.com": ["192.0.2.3"]})
+    stats, found = brute(pool, wordlist(tmp_path, "www", "api", "dev"), ["example.com"], 3, str(known))
+    assert found == ["dev.www.example.com", "www.example.com"]
+    # Level 1: three words minus the known api; level 2 and 3: one zone each
+    assert brute_forced(pool, "example.com") == 2
+    assert brute_forced(pool, "www.example.com") == 3
+    assert brute_forced(pool, "dev.www.example.com") == 3
+    assert not any(name.endswith(".host0.example.com") or name.endswith(".api.example.com")
+                   for name in pool.queries)
+    assert (stats.queried, stats.skipped, stats.found) == (8, 1, 2)
+
+
+def test_wildcard_answers_are_dropped(tmp_path):
+    pool = StubPool({"www.example.com": ["192.0.2.1"]}, wildcards={"example.com": "198.51.100.1",
+                                                                  "www.example.com": "198.51.100.2"})
+    stats, found = brute(pool, wordlist(tmp_path, "www", "mail", "dev"), ["example.com"], 2)
+    assert found == ["www.example.com"]
+    assert stats.wildcard == 2
+    # The wildcard zone found at level 1 is not brute-forced
+    assert brute_forced(pool, "www.example.com") == 0
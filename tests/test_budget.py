@@ -0,0 +1,100 @@
+import asyncio
+import os
+import subprocess
+import sys
+
+import pytest
+
+from recon.budget import NetworkBudget, tool_flags
+from recon.ratelimit import AIMD, AdaptiveLimit
+
+
+@pytest.fixture
+def budget(tmp_path):
+    budget = NetworkBudget(str(tmp_path / "budget.db"))
+    budget.configure(300, 10, 100, {"slow.example.com": 20})
+    yield budget
+    budget.close()
+
+
+def dead_pid() -> int:
+    process = subprocess.Popen([sys.executable, "-c", "pass"])
+    process.wait()
+    return process.pid
+
+
+def test_aimd():
+    aimd = AIMD(ceiling=100, floor=10)
+    assert aimd.step == 10
+    assert aimd.increase(95) == 100
+    assert aimd.increase(50, weight=0.5) == 55
+    assert aimd.decrease(30) == 15 and aimd.decrease(15) == 10
+    assert AIMD(ceiling=5, floor=10).floor == 5
+
+
+def test_adaptive_limit_backs_off_once_per_cooldown():
+    limit = AdaptiveLimit(8, cooldown=60)
+    limit.failure()
+    limit.failure()
+    assert limit.limit == 4
+    limit.success()
+    assert limit.limit == 4.25
+
+
+def test_leases_split_the_run_rate(budget):
+    pid = os.getpid()
+    assert budget.lease("subfinder", pid) == 300
+    assert budget.lease("ffuf", pid) == 150
+    assert budget.lease("dnscan", pid) == 100
+    budget.release("dnscan", pid)
+    assert budget.lease("bbot", pid) == 100
+
+
+def test_lease_waits_below_the_floor(tmp_path):
+    budget = NetworkBudget(str(tmp_path / "budget.db"))
+    budget.configure(30, 10, 100)
+    try:
+        pid = os.getpid()
+        assert [budget.lease("subfinder", pid), budget.lease("ffuf", pid), budget.lease("dnscan", pid)] == [30, 15, 10]
+        assert budget.lease("amass", pid) is None
+        budget.release("ffuf", pid)
+        assert budget.lease("amass", pid) is not None
+    finally:
+        budget.close()
+
+
+def test_per_target_rates(budget):
+    pid = os.getpid()
+    assert budget.lease("subfinder", pid, "slow.example.com") == 20
+    assert budget.lease("ffuf", pid, "slow.example.com") == 10
+    # Unlisted targets get the default target rate
+    assert budget.lease("subfinder", pid, "example.org") == 100
+
+
+def test_release_adapts_run_and_target_rates(budget):
+    pid = os.getpid()
+    budget.lease("subfinder", pid, "slow.example.com")
+    budget.release("subfinder", pid, "slow.example.com", ok=False)
+    assert budget.rates() == [("", 150, 300), ("slow.example.com", 10, 20)]
+    budget.lease("subfinder", pid, "slow.example.com")
+    budget.release("subfinder", pid, "slow.example.com", ok=True)
+    assert budget.rates() == [("", 180, 300), ("slow.example.com", 12, 20)]
+
+
+def test_leases_of_dead_processes_are_dropped(budget):
+    budget.lease("subfinder", dead_pid())
+    assert budget.lease("ffuf", os.getpid()) == 300
+
+
+def test_leases_from_threads(budget):
+    async def lease_all():
+        return await asyncio.gather(*(asyncio.to_thread(budget.lease, f"tool{i}", os.getpid()) for i in range(8)))
+
+    shares = asyncio.run(lease_all())
+    assert sorted(shares, reverse=True) == [300 / n for n in range(1, 9)]
+
+
+def test_tool_flags():
+    assert tool_flags("subfinder", 42.7) == ["-rl", "42", "-t", "9"]
+    assert tool_flags("dnscan", 3) == ["-t", "1"]
+    assert tool_flags("amass", 100) == []
@@ -0,0 +1,78 @@
+import os
+import subprocess
+import sys
+import time
+
+from recon.cache import ResultCache, cache_key, normalize_output
+
+
+def dead_pid() -> int:
+    process = subprocess.Popen([sys.executable, "-c", "pass"])
+    process.wait()
+    return process.pid
+
+
+def test_cache_key_uses_input_content(tmp_path):
+    first, second = tmp_path / "a.txt", tmp_path / "b.txt"
+    first.write_text("example.com\n")
+    second.write_text("example.com\n")
+    key = cache_key("subfinder", "Example.com ", ["-all"], [str(first)])
+    assert key == cache_key("subfinder", "example.com", ["-all"], [str(second)])
+    assert key != cache_key("subfinder", "example.com", ["-recursive"], [str(first)])
+    second.write_text("example.org\n")
+    assert key != cache_key("subfinder", "example.com", ["-all"], [str(second)])
+
+
+def test_normalize_output():
+    assert normalize_output([" b\n", "a\n", "\n", "b"]) == b"b\na\n"
+
+
+def test_put_get_ttl_and_shared_objects(tmp_path):
+    cache = ResultCache(str(tmp_path))
+    try:
+        digest = cache.put("k1", "subfinder", "example.com", b"www.example.com\n")
+        assert cache.put("k2", "amass", "example.com", b"www.example.com\n") == digest
+        objects = [name for _, _, files in os.walk(tmp_path / "objects") for name in files]
+        assert objects == [f"{digest}.gz"]
+        assert cache.get("k1", ttl=60) == b"www.example.com\n"
+        assert cache.get("k1", ttl=60, not_before=time.time() + 1) is None
+        assert cache.get("missing", ttl=60) is None
+        cache.db.execute("UPDATE entries SET created = created - 120 WHERE key = 'k2'")
+        assert cache.get("k2", ttl=60) is None
+        # An entry whose object is gone is dropped
+        os.remove(os.path.join(tmp_path, "objects", digest[:2], f"{digest}.gz"))
+        assert cache.get("k1", ttl=60) is None
+        assert cache.db.execute("SELECT COUNT(*) FROM entries WHERE key = 'k1'").fetchone()[0] == 0
+    finally:
+        cache.close()
+
+
+def test_claims(tmp_path):
+    cache = ResultCache(str(tmp_path))
+    try:
+        holder = os.getppid()
+        assert cache.claim("k", holder) is None
+        assert cache.claim("k", os.getpid()) == holder
+        cache.release("k")
+        assert cache.claim("k", os.getpid()) is None
+        # The claim of a process that died is taken over
+        cache.db.execute("UPDATE claims SET pid = ? WHERE key = 'k'", (dead_pid(),))
+        assert cache.claim("k", holder) is None
+    finally:
+        cache.close()
+
+
+def test_prune_expired_then_least_recently_used(tmp_path):
+    cache = ResultCache(str(tmp_path))
+    try:
+        for index, key in enumerate(("old", "lru", "recent")):
+            cache.put(key, "tool", "", os.urandom(2048))
+            cache.db.execute("UPDATE entries SET last_used = ? WHERE key = ?", (index, key))
+        cache.db.execute("UPDATE entries SET created = 0 WHERE key = 'old'")
+        sizes = dict(cache.db.execute("SELECT key, size FROM entries"))
+        assert cache.prune(ttl=3600, max_bytes=sizes["recent"]) == 2
+        assert [row[0] for row in cache.db.execute("SELECT key FROM entries")] == ["recent"]
+        objects = [name for _, _, files in os.walk(tmp_path / "objects") for name in files]
+        assert len(objects) == 1
+    finally:
+        cache.close()
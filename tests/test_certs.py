@@ -0,0 +1,143 @@
+import asyncio
+import hashlib
+import io
+import json
+import os
+import socket
+import ssl
+
+from recon.certs import Certificate, FeedBack, Harvester, harvest_file, parse_certificate
+
+from .stubs import start_dns
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures")
+
+
+def read_fixture() -> Certificate:
+    with open(os.path.join(FIXTURES, "certs", "san.der"), "rb") as handle:
+        return parse_certificate(handle.read())
+
+
+def test_parse_certificate():
+    certificate = read_fixture()
+    assert certificate.subject == "CN=www.example.com, O=Example Org"
+    assert certificate.self_signed
+    assert certificate.not_before < certificate.not_after
+    assert certificate.names == ["www.example.com", "*.dev.example.com", "example.com", "shop.example.net",
+                                 "cdn.other.org"]
+    assert certificate.addresses == ["192.0.2.10", "2001:db8::1"]
+
+
+def test_san_names_in_scope_only():
+    names = io.StringIO()
+    harvester = Harvester(["example.com", "Shop.Example.NET"], io.StringIO(), io.StringIO(), names)
+    harvester._add_names(read_fixture())
+    # Wildcards become their zone, names outside every target are dropped
+    assert names.getvalue().split() == ["www.example.com", "dev.example.com", "example.com", "shop.example.net"]
+
+
+def test_san_names_written_once():
+    names = io.StringIO()
+    harvester = Harvester(["example.com"], io.StringIO(), io.StringIO(), names)
+    harvester._add_names(Certificate("a", names=["www.example.com", "WWW.example.com.", "*.www.example.com"]))
+    harvester._add_names(Certificate("b", names=["www.example.com", "bad..example.com", "notexample.com"]))
+    assert names.getvalue().split() == ["www.example.com"]
+
+
+def server_context(tmp_path) -> ssl.SSLContext:
+    with open(os.path.join(FIXTURES, "certs", "san.der"), "rb") as handle:
+        (tmp_path / "san.pem").write_text(ssl.DER_cert_to_PEM_cert(handle.read()))
+    context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+    context.load_cert_chain(str(tmp_path / "san.pem"), os.path.join(FIXTURES, "certs", "san.key"))
+    return context
+
+
+async def tls_server(context: ssl.SSLContext, host: str, port: int = 0):
+    async def handle(reader, writer):
+        try:
+            await reader.read()
+        except (ConnectionError, ssl.SSLError):
+            pass
+        writer.close()
+
+    return await asyncio.start_server(handle, host, port, ssl=context)
+
+
+def lines(stream: io.StringIO):
+    return [json.loads(line) for line in stream.getvalue().splitlines()]
+
+
+def closed_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def test_grab_and_harvest_parse_shared_certificates_once(tmp_path):
+    context = server_context(tmp_path)
+
+    async def run():
+        first = await tls_server(context, "127.0.0.1")
+        port = first.sockets[0].getsockname()[1]
+        # A second host serving the same certificate on the same port
+        second = await tls_server(context, "127.0.0.2", port)
+        output, tls_hosts, names = io.StringIO(), io.StringIO(), io.StringIO()
+        harvester = Harvester(["example.com"], output, tls_hosts, names, timeout=2.0)
+        try:
+            der = await harvester.grab("www.example.com", "127.0.0.1", port)
+            await harvester.harvest("www.example.com", "127.0.0.1", port)
+            await harvester.harvest("shop.example.com", "127.0.0.2", port)
+            await harvester.harvest("gone.example.com", "127.0.0.1", closed_port())
+        finally:
+            first.close()
+            second.close()
+        return der, harvester, output, tls_hosts, names
+
+    der, harvester, output, tls_hosts, names = asyncio.run(run())
+    with open(os.path.join(FIXTURES, "certs", "san.der"), "rb") as handle:
+        assert der == handle.read()
+    assert harvester.stats == {"handshakes": 2, "failed": 1}
+    assert len(harvester.certificates) == 1
+    assert [record["subject"] for record in lines(output)] == ["CN=www.example.com, O=Example Org"]
+    hosts = lines(tls_hosts)
+    assert [(host["host"], host["address"]) for host in hosts] == [("www.example.com", "127.0.0.1"),
+                                                                  ("shop.example.com", "127.0.0.2")]
+    assert hosts[0]["fingerprint"] == hosts[1]["fingerprint"] == hashlib.sha256(der).hexdigest()
+    assert names.getvalue().split() == ["www.example.com", "dev.example.com", "example.com"]
+
+
+def test_feedback_rounds_resolve_and_handshake_new_names(tmp_path):
+    context = server_context(tmp_path)
+    paths = {name: tmp_path / f"{name}.txt" for name in ("input", "known", "new", "resolved", "wildcards")}
+    paths["input"].write_text("www.example.com 127.0.0.1 -\n")
+    paths["known"].write_text("www.example.com\n")
+    paths["resolved"].write_text("www.example.com\n")
+    for name in ("new", "wildcards"):
+        paths[name].write_text("")
+    feedback = FeedBack(*(str(paths[name]) for name in ("new", "known", "resolved", "input", "wildcards")))
+
+    async def run():
+        server = await tls_server(context, "127.0.0.1")
+        port = server.sockets[0].getsockname()[1]
+        # dev.example.com does not resolve
+        transport, resolver = await start_dns({"example.com": "127.0.0.1", "shop.example.net": "127.0.0.1"})
+        tls_hosts = io.StringIO()
+        harvester = Harvester(["example.com", "shop.example.net"], io.StringIO(), tls_hosts, io.StringIO(),
+                              timeout=2.0)
+        try:
+            counts = await harvest_file(str(paths["input"]), harvester, [port], feedback,
+                                        {"resolvers": [resolver], "timeout": 1.0, "retries": 0})
+        finally:
+            transport.close()
+            server.close()
+        return counts, tls_hosts
+
+    (hosts, added), tls_hosts = asyncio.run(run())
+    new = ["dev.example.com", "example.com", "shop.example.net"]
+    assert (hosts, added) == (3, 3)
+    assert paths["new"].read_text().split() == new
+    assert paths["known"].read_text().split() == ["www.example.com"] + new
+    assert sorted(paths["resolved"].read_text().split()) == ["example.com", "shop.example.net", "www.example.com"]
+    assert sorted(paths["input"].read_text().splitlines()[1:]) == ["example.com 127.0.0.1 -",
+                                                                   "shop.example.net 127.0.0.1 -"]
+    assert sorted(host["host"] for host in lines(tls_hosts)) == ["example.com", "shop.example.net", "www.example.com"]
@@ -0,0 +1,25 @@
+import pytest
+
+from recon import sources  # noqa: F401  (registers the built-in sources' pools)
+from recon.config import RunConfig
+
+
+def test_concurrency_of_registered_pools_only():
+    config = RunConfig.from_env(environ={"SUDOMY_CONCURRENCY": "2", "PROBE_CONCURRENCY": "50",
+                                         "MAX_CONCURRENCY": "unlimited", "FOO_CONCURRENCY": "3"})
+    assert config.concurrency["sudomy"] == 2
+    assert config.concurrency["probe"] == 50
+    assert "max" not in config.concurrency and "foo" not in config.concurrency
+
+
+@pytest.mark.parametrize("environ", [{"PORT_SCAN_CONCURRENCY": "lots"}, {"SUDOMY_CONCURRENCY": "0"},
+                                     {"NET_TARGET_RATES": "example.com"}, {"NET_TARGET_RATES": "example.com=fast"},
+                                     {"DNS_TIMEOUT": "soon"}, {"MAX_PARALLEL_JOBS": "0"}, {"NETWORK_BUDGET": "0"}])
+def test_bad_value_names_the_variable(environ):
+    with pytest.raises(ValueError, match=next(iter(environ))):
+        RunConfig.from_env(environ=environ)
+
+
+def test_target_rates():
+    config = RunConfig.from_env(environ={"NET_TARGET_RATES": "Example.com=20 example.org=2.5"})
+    assert config.net_target_rates == {"example.com": 20.0, "example.org": 2.5}
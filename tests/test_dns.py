@@ -0,0 +1,134 @@
+import asyncio
+import struct
+
+from recon.dns import (TYPE_A, TYPE_CNAME, TYPE_PTR, Nameserver, ResolverPool, build_query, encode_name,
+                       parse_nameserver, parse_response)
+
+
+def answer(query: bytes, flags: int, records: bytes = b"", count: int = 0) -> bytes:
+    """Response to ``query`` with its question echoed and ``records`` appended."""
+    qid = struct.unpack("!H", query[:2])[0]
+    return struct.pack("!HHHHHH", qid, flags, 1, count, 0, 0) + query[12:] + records
+
+
+def a_record(address: bytes, ttl: int = 300) -> bytes:
+    # The name is a pointer to the question at offset 12
+    return b"\xc0\x0c" + struct.pack("!HHIH", TYPE_A, 1, ttl, 4) + address
+
+
+def test_build_query():
+    query = build_query(0x1234, "www.Example.com.", TYPE_A)
+    assert query[:12] == struct.pack("!HHHHHH", 0x1234, 0x0100, 1, 0, 0, 0)
+    assert query[12:] == b"\x03www\x07Example\x03com\x00" + struct.pack("!HH", TYPE_A, 1)
+
+
+def test_encode_name_rejects_bad_labels():
+    for name in ("a..example.com", "x" * 64 + ".example.com"):
+        try:
+            encode_name(name)
+        except ValueError:
+            continue
+        raise AssertionError(f"{name} was encoded")
+
+
+def test_parse_response_with_compression():
+    query = build_query(7, "www.example.com", TYPE_A)
+    # CNAME www -> web.example.com, its target reusing "example.com" of the question
+    target = b"\x03web\xc0\x10"
+    records = (b"\xc0\x0c" + struct.pack("!HHIH", TYPE_CNAME, 1, 60, len(target)) + target
+               + b"\xc0\x2d" + struct.pack("!HHIH", TYPE_A, 1, 30, 4) + bytes((192, 0, 2, 1)))
+    response = parse_response(answer(query, 0x8180, records, 2))
+    assert (response.id, response.rcode, response.truncated) == (7, 0, False)
+    assert response.question == ("www.example.com", TYPE_A)
+    assert response.values(TYPE_CNAME) == ["web.example.com"]
+    assert response.values(TYPE_A) == ["192.0.2.1"]
+    assert response.answers[1].name == "web.example.com"
+
+
+def test_parse_response_rcode_and_tc_bit():
+    query = build_query(9, "1.2.0.192.in-addr.arpa", TYPE_PTR)
+    assert parse_response(answer(query, 0x8183)).rcode == 3
+    truncated = parse_response(answer(query, 0x8380))
+    assert truncated.truncated and truncated.rcode == 0
+
+
+def test_parse_nameserver():
+    assert parse_nameserver("1.1.1.1") == ("1.1.1.1", 53)
+    assert parse_nameserver("127.0.0.1:5353") == ("127.0.0.1", 5353)
+    assert parse_nameserver("[2001:db8::53]:5300") == ("2001:db8::53", 5300)
+    assert parse_nameserver("2001:db8::53") == ("2001:db8::53", 53)
+
+
+class Truncating(asyncio.DatagramProtocol):
+    """Answers every UDP query truncated and empty."""
+
+    def connection_made(self, transport) -> None:
+        self.transport = transport
+
+    def datagram_received(self, data: bytes, addr) -> None:
+        self.transport.sendto(answer(data, 0x8380), addr)
+
+
+async def tcp_answer(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+    length, = struct.unpack("!H", await reader.readexactly(2))
+    response = answer(await reader.readexactly(length), 0x8180, a_record(bytes((192, 0, 2, 7))), 1)
+    writer.write(struct.pack("!H", len(response)) + response)
+    await writer.drain()
+    writer.close()
+
+
+def test_truncated_answer_is_asked_again_over_tcp():
+    async def run():
+        loop = asyncio.get_running_loop()
+        server = await asyncio.start_server(tcp_answer, "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        transport, _ = await loop.create_datagram_endpoint(Truncating, local_addr=("127.0.0.1", port))
+        try:
+            async with ResolverPool([f"127.0.0.1:{port}"], timeout=2.0, retries=0) as pool:
+                return await pool.query("www.example.com")
+        finally:
+            transport.close()
+            server.close()
+            await server.wait_closed()
+
+    response = asyncio.run(run())
+    assert not response.truncated
+    assert response.values(TYPE_A) == ["192.0.2.7"]
+
+
+def test_socket_error_does_not_fail_other_queries():
+    async def run():
+        nameserver = Nameserver("127.0.0.1:53")
+        await nameserver.open()
+        try:
+            future = asyncio.get_running_loop().create_future()
+            nameserver.protocol.pending[1] = (("www.example.com", TYPE_A), future)
+            nameserver.protocol.error_received(ConnectionRefusedError())
+            return future.done()
+        finally:
+            nameserver.close()
+
+    assert not asyncio.run(run())
+
+
+def test_failed_tcp_fallback_backs_off():
+    async def run():
+        loop = asyncio.get_running_loop()
+        transport, _ = await loop.create_datagram_endpoint(Truncating, local_addr=("127.0.0.1", 0))
+        port = transport.get_extra_info("sockname")[1]
+        nameserver = Nameserver(f"127.0.0.1:{port}", rate=100)
+        await nameserver.open()
+        try:
+            # Nothing listens on the TCP side of the port
+            try:
+                await nameserver.query("www.example.com", TYPE_A, 2.0)
+            except OSError:
+                pass
+            else:
+                raise AssertionError("the TCP fallback did not fail")
+            return nameserver.bucket.rate
+        finally:
+            nameserver.close()
+            transport.close()
+
+    assert asyncio.run(run()) < 100
@@ -0,0 +1,155 @@
+import asyncio
+import json
+
+import pytest
+
+from recon import events
+from recon.events import (Dashboard, EventLog, EventReader, FeedServer, History, LineCounter, Progress,
+                          StageProgress, format_duration, format_progress)
+
+
+def test_reader_keeps_partial_lines(tmp_path):
+    path = str(tmp_path / "reports" / "events.jsonl")
+    log = EventLog(path)
+    reader = EventReader(path)
+    assert reader.poll() == []
+    log.publish("run_started", targets=2)
+    with open(path, "a") as out:
+        out.write('not json\n{"kind": "lines", "li')
+    assert [event["kind"] for event in reader.poll()] == ["run_started"]
+    with open(path, "a") as out:
+        out.write('nes": 3}\n')
+    log.publish("run_finished")
+    log.close()
+    assert [event["kind"] for event in reader.poll()] == ["lines", "run_finished"]
+
+
+def test_line_counter_publishes_changes(tmp_path, monkeypatch):
+    path = str(tmp_path / "events.jsonl")
+    log = EventLog(path)
+    monkeypatch.setattr(events, "LINES_INTERVAL", 60.0)
+    counter = LineCounter(log, "run_subfinder", "example.com")
+    counter.add(5)
+    counter.flush()
+    counter.flush()
+    counter.add()
+    counter.flush()
+    log.close()
+    published = [(event["target"], event["lines"]) for event in EventReader(path).poll()]
+    assert published == [("example.com", 5), ("example.com", 6)]
+
+
+def test_history(tmp_path):
+    path = str(tmp_path / "cache" / "durations.json")
+    history = History(path)
+    history.update("sudomy_target", 100.0)
+    history.update("sudomy_target", 200.0)
+    assert history.get("sudomy_target") == pytest.approx(130.0)
+    history.save()
+    assert History(path).get("sudomy_target") == 130.0
+    (tmp_path / "cache" / "durations.json").write_text("[1, 2]")
+    assert History(path).seconds == {}
+
+
+def test_stage_eta():
+    history = History()
+    stage = StageProgress("run_sudomy", started=0.0, task="sudomy_target", targets=4, concurrency=2)
+    # Nothing finished yet and no earlier run
+    assert stage.eta(5.0, history) is None
+    history.update("sudomy_target", 8.0)
+    assert stage.eta(5.0, history) == 16.0
+    stage.done, stage.durations, stage.running = 1, [10.0], {"b.example.com": 6.0}
+    # Two waiting targets and six seconds left of the running one, two at a time
+    assert stage.eta(10.0, history) == 13.0
+    stage.finished = 20.0
+    assert stage.eta(30.0, history) == 0.0
+
+    single = StageProgress("resolve_subdomains", started=0.0)
+    assert single.eta(10.0, history) is None
+    history.update("resolve_subdomains", 25.0)
+    assert single.eta(10.0, history) == 15.0 and single.eta(40.0, history) == 0.0
+
+
+def test_progress_from_events(tmp_path):
+    output = str(tmp_path / "subdomains" / "subfinder" / "example_com.txt")
+    progress = Progress()
+    for event in [
+        {"kind": "run_started", "time": 0},
+        {"kind": "stage_started", "stage": "run_subfinder", "time": 1},
+        {"kind": "pool_started", "stage": "run_subfinder", "task": "subfinder_target", "targets": 3,
+         "concurrency": 2, "time": 1},
+        {"kind": "task_started", "stage": "run_subfinder", "target": "example.com", "output": output, "time": 1},
+        {"kind": "task_started", "stage": "run_subfinder", "target": "example.org", "time": 1},
+        {"kind": "lines", "stage": "run_subfinder", "target": "example.com", "lines": 40, "time": 2},
+        {"kind": "names", "path": output, "new": 30, "total": 30, "time": 3},
+        {"kind": "task_finished", "stage": "run_subfinder", "target": "example.com", "returncode": 0,
+         "wall": 10.0, "lines": 50, "time": 11},
+        {"kind": "task_finished", "stage": "run_subfinder", "target": "example.org", "returncode": 1,
+         "wall": 4.0, "time": 5},
+    ]:
+        progress.apply(event)
+    stage = progress.stages["run_subfinder"]
+    assert (stage.done, stage.failed, stage.running, stage.names, progress.names) == (1, 1, {}, 30, 30)
+    assert stage.lines == {"example.com": 50}
+    snapshot = progress.snapshot(now=13.0)
+    # One target left at the mean of 10s and 4s, two at a time
+    assert snapshot["stages"][0]["eta"] == 3.5 and snapshot["eta"] == 3.5
+    assert snapshot["stages"][0]["names_per_min"] == 150.0
+    assert format_progress(progress, now=13.0)[0] == "1 stages running, 0 finished, 30 unique names, ETA 4s"
+    progress.save_history()
+    assert progress.history.get("subfinder_target") == 7.0
+
+
+def test_format_duration():
+    assert [format_duration(value) for value in (None, 59.4, 61, 3725)] == ["?", "59s", "1m01s", "1h02m"]
+
+
+def test_feed_resumes_after_last_event(tmp_path):
+    path = str(tmp_path / "events.jsonl")
+    log = EventLog(path)
+    for number in range(3):
+        log.publish("lines", stage="run_subfinder", target="example.com", lines=number)
+
+    async def run():
+        dashboard = Dashboard(path, interval=0.0, listen="127.0.0.1:0")
+        dashboard.poll()
+        await dashboard.feed.start()
+        port = dashboard.feed.server.sockets[0].getsockname()[1]
+        try:
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.write(b"GET /events HTTP/1.1\r\nLast-Event-ID: 2\r\n\r\n")
+            await reader.readuntil(b"\r\n\r\n")
+            replayed = await reader.readuntil(b"\n\n")
+            log.publish("run_finished")
+            dashboard.poll()
+            live = await reader.readuntil(b"\n\n")
+            writer.close()
+            status_reader, status_writer = await asyncio.open_connection("127.0.0.1", port)
+            status_writer.write(b"GET /status HTTP/1.1\r\n\r\n")
+            status = await status_reader.read()
+            status_writer.close()
+            return replayed, live, status
+        finally:
+            await dashboard.feed.stop()
+
+    replayed, live, status = asyncio.run(run())
+    log.close()
+    assert replayed.startswith(b"id: 3\nevent: lines\n")
+    assert json.loads(replayed.split(b"data: ")[1])["lines"] == 2
+    assert live.startswith(b"id: 4\nevent: run_finished\n")
+    assert json.loads(status.split(b"\r\n\r\n", 1)[1])["finished"] is not None
+
+
+def test_feed_rejects_other_methods():
+    async def run():
+        feed = FeedServer(Progress(), "127.0.0.1:0")
+        await feed.start()
+        port = feed.server.sockets[0].getsockname()[1]
+        try:
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.write(b"POST /events HTTP/1.1\r\n\r\n")
+            return await reader.readline()
+        finally:
+            await feed.stop()
+
+    assert asyncio.run(run()).startswith(b"HTTP/1.1 405")
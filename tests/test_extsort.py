@@ -0,0 +1,58 @@
+import pytest
+
+from recon import extsort
+from recon.extsort import _segment_blocks, _segments, _sort_segment, external_sort
+
+
+def test_segments_cut_between_lines(tmp_path):
+    path = tmp_path / "names.txt"
+    lines = [f"  host{i}.example.com \n" for i in range(200)] + ["last.example.com"]
+    path.write_text("".join(lines) + "\n\n")
+    expected = [line.strip().encode() for line in lines]
+    for size in (1, 7, 25, 4096):
+        found = [line for segment in _segments([str(path)], size) for block in _segment_blocks(*segment)
+                 for line in block]
+        assert found == expected, size
+
+
+def test_segment_spills_runs(tmp_path, monkeypatch):
+    monkeypatch.setattr(extsort, "BUFFER", 1000)
+    path = tmp_path / "names.txt"
+    path.write_text("".join(f"host{i % 300}.example.com\n" for i in range(600)))
+    runs = _sort_segment((str(path), 0, path.stat().st_size), str(tmp_path), memory=5000)
+    assert len(runs) > 1
+    for run in runs:
+        lines = open(run, "rb").read().splitlines()
+        assert lines == sorted(set(lines))
+
+
+def test_in_memory(tmp_path):
+    (tmp_path / "a.txt").write_text("www.example.com\nB.example.com\n\n  api.example.com  \n")
+    (tmp_path / "b.txt").write_text("api.example.com\nwww.example.com")
+    output = tmp_path / "out" / "all.txt"
+    count = external_sort([str(tmp_path / "a.txt"), str(tmp_path / "missing.txt"), str(tmp_path / "b.txt")],
+                          str(output))
+    # Byte order, like LC_ALL=C sort -u
+    assert count == 3
+    assert output.read_text() == "B.example.com\napi.example.com\nwww.example.com\n"
+
+
+def test_runs_are_merged(tmp_path, monkeypatch):
+    # Merge the runs in groups of two before the final merge
+    monkeypatch.setattr(extsort, "FAN_IN", 2)
+    names = [f"host{i * 7919 % 40000}.example.com" for i in range(40000)]
+    (tmp_path / "a.txt").write_text("\n".join(names[:25000]) + "\n")
+    (tmp_path / "b.txt").write_text("\n".join(names[15000:]) + "\n")
+    output = tmp_path / "all.txt"
+    count = external_sort([str(tmp_path / "a.txt"), str(tmp_path / "b.txt")], str(output), memory_mb=0.5, workers=2)
+    assert count == 40000
+    assert output.read_bytes().splitlines() == sorted({name.encode() for name in names})
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["a.txt", "all.txt", "b.txt"]
+
+
+@pytest.mark.parametrize("memory_mb", [0.5, 64])
+def test_empty_inputs(tmp_path, memory_mb):
+    (tmp_path / "empty.txt").write_text("")
+    output = tmp_path / "all.txt"
+    assert external_sort([str(tmp_path / "empty.txt")], str(output), memory_mb=memory_mb) == 0
+    assert output.read_text() == ""
@@ -0,0 +1,75 @@
+import json
+import os
+import re
+
+from recon.fingerprint import RuleSet, anchors, murmur3_32, trie_regex
+
+RULES = {
+    "categories": {"1": {"name": "CMS"}, "12": {"name": "JavaScript frameworks"}, "22": {"name": "Web servers"}},
+    "technologies": {
+        "Nginx": {"cats": [22], "headers": {"Server": "nginx(?:/([\\d.]+))?\\;version:\\1"}},
+        "PHP": {"cats": [27], "headers": {"X-Powered-By": "^php/?([\\d.]+)?\\;version:\\1"},
+                "cookies": {"PHPSESSID": ""}},
+        "WordPress": {"cats": [1], "html": "<link rel=[\"']stylesheet[\"'] [^>]+/wp-(?:content|includes)/",
+                      "meta": {"generator": "^WordPress ?([\\d.]+)?\\;version:\\1"}, "implies": "PHP"},
+        "jQuery": {"cats": [12], "scriptSrc": "jquery[.-]([\\d.]*\\d)[^/]*\\.js\\;version:\\1"},
+        "Fancy": {"cats": [12], "scripts": "(?:x|y)\\d+", "favicon": -1234},
+        "Broken": {"html": "(?<=a+)b"},
+    },
+}
+
+
+def test_murmur3_reference_values():
+    assert murmur3_32(b"") == 0
+    assert murmur3_32(b"hello") == 613153351
+    assert murmur3_32(b"The quick brown fox jumps over the lazy dog") == 776992547
+
+
+def test_anchors():
+    assert anchors(r"jquery[.-]([\d.]+)\.js") == ["query"]
+    # Through the group, one literal per alternative
+    assert anchors(r"(?:wp-content|wp-includes)/") == ["wp-"]
+    assert anchors(r"^\d+$") is None
+    assert anchors(r"(x|y)\d+") is None
+
+
+def test_trie_regex():
+    pattern = re.compile(trie_regex(["abc", "abd", "ab"]))
+    assert pattern.findall("xab abc abdx abe") == ["ab", "abc", "abd", "ab"]
+    assert re.compile(trie_regex([])).search("anything") is None
+
+
+def test_index_layout():
+    rules = RuleSet.build([RULES])
+    names = [name for name, _, _ in rules.technologies]
+    assert names == sorted(RULES["technologies"])
+    assert rules.categories("WordPress") == ["CMS"]
+    assert rules.categories("PHP") == ["27"]
+    assert set(rules.headers) == {"server", "x-powered-by"}
+    assert set(rules.cookies) == {"PHPSESSID"}
+    assert rules.favicons == {"-1234": [names.index("Fancy")]}
+    # Body patterns with a literal go through the scanner, the others always run
+    unanchored = {rules.technologies[rules.patterns[number][0]][0] for number in rules.unanchored}
+    assert unanchored == {"Fancy"}
+    assert all(rules.technologies[tech][0] != "Broken" for tech, _, _ in rules.patterns)
+
+
+def test_match():
+    rules = RuleSet.build([RULES])
+    body = ('<html><head><meta name="generator" content="WordPress 6.4.2">'
+            '<script src="/js/jquery-3.7.1.min.js"></script></head><body>x42</body></html>')
+    found = rules.match([("Server", "nginx/1.25.3"), ("Set-Cookie", "PHPSESSID=abc; path=/")], body)
+    assert found == {"Nginx": "1.25.3", "PHP": "", "WordPress": "6.4.2", "jQuery": "3.7.1", "Fancy": ""}
+    assert rules.match([], "<p>nothing here</p>", favicon=-1234) == {"Fancy": ""}
+    assert rules.match([("Server", "Apache")], "") == {}
+
+
+def test_index_cached(tmp_path):
+    path = tmp_path / "rules.json"
+    path.write_text(json.dumps(RULES), encoding="utf-8")
+    built = RuleSet.load([str(path)], str(tmp_path / "cache"))
+    cached = os.listdir(tmp_path / "cache" / "technologies")
+    assert len(cached) == 1
+    loaded = RuleSet.load([str(path)], str(tmp_path / "cache"))
+    assert loaded.index == json.loads(json.dumps(built.index))
+    assert loaded.match([("Server", "nginx")], "") == {"Nginx": ""}
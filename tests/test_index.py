@@ -0,0 +1,67 @@
+import pytest
+
+from recon.index import SubdomainIndex, from_key, main, to_key, write_index, write_shards
+
+NAMES = ["WWW.Example.com", "*.api.example.com", "example.com", "a.dev.example.com", "dev.example.com",
+         "notexample.com", "example.com.evil.net", "www.example.org", "bad..name", "www.example.com"]
+ROOTS = ["example.com", "dev.example.com", "example.org"]
+
+
+@pytest.fixture(params=["memory", "file"])
+def index(request, tmp_path):
+    if request.param == "memory":
+        yield SubdomainIndex.from_names(NAMES)
+        return
+    path = str(tmp_path / "names.idx")
+    assert write_index(path, NAMES) == 8
+    with SubdomainIndex.open(path) as index:
+        yield index
+
+
+def test_keys():
+    assert to_key("www.example.com") == b"com.example.www."
+    assert from_key(b"com.example.www.") == "www.example.com"
+
+
+def test_lookup(index):
+    assert len(index) == 8
+    assert "www.example.com" in index and "api.example.com" in index
+    assert "ftp.example.com" not in index and "bad..name" not in index
+    assert list(index.names())[:3] == ["example.com", "api.example.com", "dev.example.com"]
+
+
+def test_root_range_stops_at_the_label(index):
+    # notexample.com and example.com.evil.net share the text, not the labels
+    assert sorted(index.list_by_root("example.com")) == [
+        "a.dev.example.com", "api.example.com", "dev.example.com", "example.com", "www.example.com"]
+
+
+def test_nested_target_owns_its_names(index):
+    assert index.count_by_root(ROOTS) == {"example.com": 3, "dev.example.com": 2, "example.org": 1}
+    assert sorted(index.list_by_root("example.com", ROOTS)) == ["api.example.com", "example.com", "www.example.com"]
+    assert index.count_by_root(["nothing.test"]) == {"nothing.test": 0}
+
+
+def test_shards(index, tmp_path):
+    assert write_shards(index, ROOTS, str(tmp_path / "by_target"))["dev.example.com"] == 2
+    assert (tmp_path / "by_target" / "dev_example_com.txt").read_text() == "dev.example.com\na.dev.example.com\n"
+
+
+def test_not_an_index(tmp_path):
+    path = tmp_path / "names.txt"
+    path.write_bytes(b"www.example.com\n" * 4)
+    with pytest.raises(ValueError):
+        SubdomainIndex.open(str(path))
+
+
+def test_command_line(tmp_path, capsys):
+    (tmp_path / "names.txt").write_text("\n".join(NAMES) + "\n")
+    (tmp_path / "targets.txt").write_text("\n".join(ROOTS) + "\n")
+    index, targets = str(tmp_path / "names.idx"), str(tmp_path / "targets.txt")
+    assert main(["--index", index, "build", "--input", str(tmp_path / "names.txt")]) == 0
+    capsys.readouterr()
+    assert main(["--index", index, "count", "--roots", targets]) == 0
+    assert capsys.readouterr().out == "example.com 3\ndev.example.com 2\nexample.org 1\n"
+    assert main(["--index", index, "owner", "--roots", targets, "a.dev.example.com", "www.example.net"]) == 0
+    assert capsys.readouterr().out == "a.dev.example.com dev.example.com\nwww.example.net -\n"
+    assert main(["--index", str(tmp_path / "missing.idx"), "count", "--roots", targets]) == 1
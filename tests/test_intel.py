@@ -0,0 +1,81 @@
+import asyncio
+import io
+
+from recon.intel import IntelGraph
+
+ASN_ANSWERS = {
+    "AS64500": ["10.1.0.0/16", "10.1.2.0/24", "peer AS64999"],
+    "AS64501": ["10.2.0.0/24"],
+}
+ROUTES = {
+    "AS64500": ["route:      10.1.5.0/24", "origin:     AS64500"],
+    "AS64501": ["route:      10.3.0.0/24", "route:      10.3.0.0/24"],
+}
+
+
+class Lookups:
+    """Answers from tables, counting the lookups and the most in flight at once."""
+
+    def __init__(self, fail=()):
+        self.calls = []
+        self.active = 0
+        self.peak = 0
+        self.fail = fail
+
+    def of(self, kind, answers):
+        async def lookup(value):
+            self.calls.append((kind, value))
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+            await asyncio.sleep(0.01)
+            self.active -= 1
+            if value in self.fail:
+                raise OSError(f"{kind} {value}")
+            return answers.get(value, [])
+
+        return lookup
+
+
+def run_graph(lookups, orgs, whois=True, cidr=True, concurrency=3):
+    asn_file, whois_file = io.StringIO(), io.StringIO()
+
+    async def run():
+        graph = IntelGraph(lookups.of("asn", ASN_ANSWERS), asn_file,
+                           whois=lookups.of("whois", ROUTES) if whois else None, whois_file=whois_file,
+                           cidr=lookups.of("cidr", {}) if cidr else None, concurrency=concurrency)
+        for lines in orgs:
+            graph.add_org(lines)
+        await graph.join()
+        return graph
+
+    return asyncio.run(run()), asn_file, whois_file
+
+
+def test_every_asn_and_range_looked_up_once():
+    lookups = Lookups()
+    graph, asn_file, whois_file = run_graph(lookups, [["AS64500, EXAMPLE-NET", "AS64501, EXAMPLE-2"],
+                                                       ["AS64500, EXAMPLE-NET"]])
+    calls = sorted(lookups.calls)
+    # The peer ASN is not followed and ranges inside 10.1.0.0/16 are not looked up again
+    assert calls == [("asn", "AS64500"), ("asn", "AS64501"), ("cidr", "10.1.0.0/16"), ("cidr", "10.2.0.0/24"),
+                     ("cidr", "10.3.0.0/24"), ("whois", "AS64500"), ("whois", "AS64501")]
+    assert sorted(asn_file.getvalue().splitlines()) == sorted(ASN_ANSWERS["AS64500"] + ASN_ANSWERS["AS64501"])
+    assert sorted(whois_file.getvalue().splitlines()) == ["10.1.5.0/24", "10.3.0.0/24"]
+    assert graph.failed == 0
+
+
+def test_concurrency_and_failures():
+    lookups = Lookups(fail={"AS64500"})
+    orgs = [[f"AS{64500 + number}" for number in range(8)]]
+    graph, asn_file, _ = run_graph(lookups, orgs, whois=False, concurrency=2)
+    assert lookups.peak == 2
+    # The failed ASN is counted and the others go on
+    assert graph.failed == 1
+    assert ("cidr", "10.2.0.0/24") in lookups.calls and "10.1.0.0/16" not in asn_file.getvalue()
+
+
+def test_without_cidr_lookups():
+    lookups = Lookups()
+    _, _, whois_file = run_graph(lookups, [["AS64501"]], cidr=False)
+    assert sorted(lookups.calls) == [("asn", "AS64501"), ("whois", "AS64501")]
+    assert whois_file.getvalue() == "10.3.0.0/24\n"
@@ -0,0 +1,64 @@
+import asyncio
+
+from recon.manifest import DONE, FAILED, Manifest, status_summary
+from recon.scheduler import Node, Scheduler, resumable
+
+
+def test_task_states_and_checksums(tmp_path):
+    output = tmp_path / "subfinder.txt"
+    manifest = Manifest(str(tmp_path / "manifest.db"))
+    try:
+        manifest.register("run_subfinder")
+        manifest.register("run_sudomy", "example.com")
+        assert not manifest.is_complete("run_subfinder")
+        manifest.start("run_subfinder")
+        output.write_text("www.example.com\n")
+        manifest.finish("run_subfinder", "", 0, [str(output)])
+        manifest.start("run_sudomy", "example.com")
+        manifest.finish("run_sudomy", "example.com", 2)
+        assert manifest.is_complete("run_subfinder", "", [str(output)])
+        assert not manifest.is_complete("run_sudomy", "example.com")
+        assert [(entry["stage"], entry["status"]) for entry in manifest.entries()] == [
+            ("run_subfinder", DONE), ("run_sudomy", FAILED)]
+        assert status_summary(manifest.entries()) == "0 pending, 0 running, 1 done, 1 failed"
+        # A modified output makes the stage run again
+        output.write_text("www.example.com\napi.example.com\n")
+        assert not manifest.is_complete("run_subfinder", "", [str(output)])
+        manifest.set_meta("targets", "targets.txt")
+        assert manifest.get_meta("targets") == "targets.txt" and manifest.get_meta("missing") is None
+    finally:
+        manifest.close()
+
+
+def test_resume_skips_finished_stages_and_reruns_dependents(tmp_path):
+    files = {name: tmp_path / f"{name}.txt" for name in ("subfinder", "sudomy", "aggregate")}
+    outputs = {name: [str(path)] for name, path in files.items()}
+    ran = []
+
+    def stage(name, returncode=0):
+        async def run():
+            ran.append(name)
+            files[name].write_text(f"{name}\n")
+            return returncode
+        return run
+
+    def attempt(failing=()):
+        ran.clear()
+        scheduler = Scheduler()
+        for name in ("subfinder", "sudomy"):
+            scheduler.add(Node(name, stage(name, 1 if name in failing else 0)))
+        scheduler.add(Node("aggregate", stage("aggregate"), deps=["subfinder", "sudomy"]))
+        manifest = Manifest(str(tmp_path / "manifest.db"))
+        try:
+            skipped = resumable(scheduler, manifest, outputs)
+            asyncio.run(scheduler.run())
+        finally:
+            manifest.close()
+        return skipped, sorted(ran)
+
+    assert attempt(failing=["sudomy"]) == ([], ["aggregate", "subfinder", "sudomy"])
+    # The failed stage runs again, and so does everything after it
+    assert attempt() == (["subfinder"], ["aggregate", "sudomy"])
+    assert attempt() == (["subfinder", "sudomy", "aggregate"], [])
+    files["subfinder"].write_text("edited\n")
+    assert attempt() == (["sudomy"], ["aggregate", "subfinder"])
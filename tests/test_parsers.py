@@ -0,0 +1,63 @@
+import io
+import os
+
+from recon import parsers
+from recon.parsers import Finding, read_bbot, read_ffuf, read_sudomy
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures")
+
+
+def test_bbot_events_in_scope_only():
+    findings = list(read_bbot(os.path.join(FIXTURES, "bbot", "scan_events"), "example.com"))
+    assert findings == [
+        Finding("www.example.com", "192.0.2.10", "", "crt"),
+        Finding("www.example.com", "2001:db8::1", "", "crt"),
+        Finding("api.example.com", "", "https://api.example.com:8443/v1", "httpx"),
+        Finding("", "192.0.2.20", "", "dnsresolve"),
+    ]
+
+
+def test_bbot_falls_back_to_lists_per_scan():
+    hosts = {finding.host for finding in read_bbot(os.path.join(FIXTURES, "bbot"), "example.com")}
+    # scan_lists has no event file, scan_events has one and its list is not read
+    assert "mail.example.com" in hosts
+    assert "ignored.example.com" not in hosts
+    assert "vpn.example.org" not in hosts
+    assert {"www.example.com", "api.example.com"} <= hosts
+
+
+def test_bbot_event_file():
+    findings = list(read_bbot(os.path.join(FIXTURES, "bbot", "scan_events", "output.json")))
+    assert Finding("other.example.org", "", "", "crt") in findings
+    assert all(finding.host != "cdn.example.net" for finding in findings)
+
+
+def test_sudomy_tree():
+    findings = sorted(read_sudomy(os.path.join(FIXTURES, "sudomy"), "example.com"), key=lambda finding: finding.host)
+    assert findings == [
+        Finding("dev.example.com", "", "", "crtsh"),
+        Finding("shop.example.com", "198.51.100.7", "https://shop.example.com/login", "crtsh"),
+        Finding("static.example.com", "203.0.113.5", "", "ip_dnsres"),
+    ]
+
+
+def test_ffuf_report():
+    findings = list(read_ffuf(os.path.join(FIXTURES, "ffuf", "ffuf_example_com.json"), "example.com"))
+    assert findings == [
+        Finding("admin.example.com", "", "https://admin.example.com", "ffuf"),
+        Finding("git.example.com", "", "https://git.example.com/", "ffuf"),
+        Finding("x.example.com", "", "", "ffuf"),
+    ]
+
+
+def test_ffuf_results_decoded_across_reads(monkeypatch):
+    monkeypatch.setattr(parsers, "BUFFER", 7)
+    with open(os.path.join(FIXTURES, "ffuf", "ffuf_example_com.json"), encoding="utf-8") as handle:
+        results = list(parsers._ffuf_results(handle))
+    assert [result["input"]["FUZZ"] for result in results] == ["admin", "git", "x", "y"]
+    assert results[1]["redirectlocation"] == "https://git.example.com/login?next=%5B%5D"
+
+
+def test_ffuf_without_results():
+    assert list(parsers._ffuf_results(io.StringIO('{"commandline": "ffuf", "config": {}}'))) == []
+    assert list(parsers._ffuf_results(io.StringIO('{"results": []}'))) == []
@@ -0,0 +1,82 @@
+import asyncio
+
+from recon.index import SubdomainIndex
+from recon.permute import KnownNames, PatternModel, Rule, candidates, permutations, permute, split
+
+from .stubs import start_dns
+
+ROOTS = {"example.com", "dev.example.com"}
+NAMES = ["dev-api.example.com", "prod-api.example.com", "dev-shop.example.com", "web01.example.com",
+         "web02.example.com", "shop.eu.example.com", "api.eu.example.com"]
+
+
+def bases(names):
+    return [split(name, ROOTS) for name in names]
+
+
+def test_split():
+    assert split("a.b.example.com", ROOTS) == (("a", "b"), "example.com")
+    assert split("www.dev.example.com", ROOTS) == (("www",), "dev.example.com")
+    assert split("example.com", ROOTS) is None and split("www.example.org", ROOTS) is None
+
+
+def test_rules_learned_from_names():
+    model = PatternModel()
+    model.update(bases(NAMES))
+    rules = {str(rule): rule for rule in model.rules()}
+    assert {"dev -> prod", "prod -> dev", "shop -> api", "dev-<label>", "<label>-api", "api.<name>",
+            "<n>+1", "<n>-1"} <= set(rules)
+    # dev and prod share one place out of dev's two
+    assert rules["dev -> prod"].weight == 1 and rules["prod -> dev"].score > rules["dev -> prod"].score
+    assert model.rules(min_count=2) == [rule for rule in model.rules() if rule.weight >= 2]
+
+
+def test_first_level_names_are_not_swapped():
+    model = PatternModel()
+    model.update(bases(["www.example.com", "mail.example.com", "vpn.example.com"]))
+    assert not [rule for rule in model.rules() if rule.kind == "swap"]
+
+
+def test_steps_keep_zero_padding():
+    step = [Rule(1.0, 1, "step", "", "+1"), Rule(1.0, 1, "step", "", "-3")]
+    assert list(permutations(step, bases(["web09.example.com", "db12-2.example.com"]))) == [
+        "web10.example.com", "db13-2.example.com", "db12-3.example.com",
+        "web06.example.com", "db9-2.example.com"]
+
+
+def test_candidates_skip_known_names_and_stop_at_the_limit():
+    model = PatternModel()
+    model.update(bases(NAMES))
+    known = KnownNames(SubdomainIndex.from_names(NAMES))
+    found = list(candidates(model.rules(), bases(NAMES), known, 1000))
+    assert found[0] == "prod-shop.example.com"
+    assert len(found) == len(set(found)) and not set(found) & set(NAMES)
+    assert list(candidates(model.rules(), bases(NAMES), known, 3)) == found[:3]
+    known.add("prod-shop.example.com")
+    assert "prod-shop.example.com" not in candidates(model.rules(), bases(NAMES), known, 1000)
+
+
+def test_rounds_permute_the_names_found(tmp_path):
+    records = {name: "192.0.2.1" for name in NAMES[:3]}
+    # prod-shop is found in round 1 from dev-shop, then prod-shop-api in round 2 from it
+    records.update({"prod-shop.example.com": "192.0.2.2", "prod-shop-api.example.com": "192.0.2.3"})
+    files = {name: str(tmp_path / f"{name}.txt")
+             for name in ("output", "rules", "resolved", "hosts", "wildcards", "append")}
+
+    async def run():
+        transport, address = await start_dns(records)
+        try:
+            return await permute(bases(NAMES[:3]), ROOTS, KnownNames(SubdomainIndex.from_names(NAMES[:3])), files,
+                                 limit=1000, rounds=2, min_count=1,
+                                 options={"resolvers": [address], "timeout": 1.0, "retries": 0, "concurrency": 20})
+        finally:
+            transport.close()
+
+    stats, resolve_stats = asyncio.run(run())
+    found = ["prod-shop.example.com", "prod-shop-api.example.com"]
+    assert (stats.names, stats.found) == (3, 2)
+    assert open(files["output"]).read().split() == found
+    assert open(files["append"]).read().split() == found
+    assert "prod-shop.example.com 192.0.2.2 -" in open(files["hosts"]).read().splitlines()
+    assert "dev -> prod" in open(files["rules"]).read()
+    assert resolve_stats.wildcard == 0
@@ -0,0 +1,43 @@
+import asyncio
+
+from recon.pool import clean_domain, merge_shards, read_targets, run_pool
+
+
+def test_clean_domain_and_read_targets(tmp_path):
+    assert clean_domain("api.example.com:8443") == "api_example_com_8443"
+    path = tmp_path / "targets.txt"
+    path.write_text("example.com\n\n  example.org \nexample.com\n")
+    assert read_targets(str(path)) == ["example.com", "example.org"]
+
+
+def test_run_pool_bounds_concurrency_and_isolates_failures():
+    active = peak = 0
+
+    async def worker(domain):
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        await asyncio.sleep(0.01)
+        active -= 1
+        if domain == "crash.test":
+            raise RuntimeError("boom")
+        return 2 if domain == "fail.test" else 0
+
+    targets = ["a.test", "fail.test", "crash.test", "b.test", "c.test"]
+    results = asyncio.run(run_pool(targets, worker, 2))
+    assert results == {"a.test": 0, "fail.test": 2, "crash.test": 1, "b.test": 0, "c.test": 0}
+    assert peak == 2
+
+
+def test_merge_shards(tmp_path):
+    first, second = tmp_path / "b.txt", tmp_path / "a.txt"
+    first.write_text("www.example.com\napi.example.com\n")
+    second.write_text("api.example.com\nmail.example.com")
+    shards = [str(first), str(second), str(tmp_path / "missing.txt")]
+
+    merged = tmp_path / "out" / "merged.txt"
+    assert merge_shards(shards, str(merged)) == 3
+    assert merged.read_text() == "api.example.com\nmail.example.com\nwww.example.com\n"
+
+    assert merge_shards(shards, str(merged), dedupe=False) == 4
+    assert merged.read_text().split() == ["www.example.com", "api.example.com", "api.example.com", "mail.example.com"]
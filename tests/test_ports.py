@@ -0,0 +1,131 @@
+import asyncio
+import errno
+import io
+import json
+import socket
+
+import pytest
+
+from recon.ports import (CLOSED, FILTERED, OPEN, TOP_PORTS, PortScanner, RttEstimator, Target, _state,
+                         parse_addresses, parse_ports, scan_file, top_ports, write_results)
+
+
+def test_parse_ports():
+    assert parse_ports("22,80,8000-8003") == [22, 80, 8000, 8001, 8002, 8003]
+    assert parse_ports(" 443 , 80,,443,79-81 ") == [443, 80, 79, 81]
+    assert parse_ports("65535") == [65535]
+
+
+@pytest.mark.parametrize("spec", ["0", "80-79", "1-65536", "http", "-80"])
+def test_parse_ports_rejects(spec):
+    with pytest.raises(ValueError):
+        parse_ports(spec)
+
+
+def test_top_ports():
+    assert top_ports(3) == [80, 23, 443]
+    assert top_ports(len(TOP_PORTS)) == list(TOP_PORTS)
+    more = top_ports(len(TOP_PORTS) + 5)
+    assert more[len(TOP_PORTS):] == [1, 2, 3, 4, 5]
+    assert len(set(top_ports(1000))) == 1000
+
+
+def test_parse_addresses():
+    assert parse_addresses("www.example.com 192.0.2.1,2001:db8::1 cdn.example.net") == (
+        "www.example.com", ["192.0.2.1", "2001:db8::1"])
+    assert parse_addresses("gone.example.com - -") == ("gone.example.com", [])
+    assert parse_addresses("198.51.100.7") == (None, ["198.51.100.7"])
+    assert parse_addresses("   ") == (None, [])
+
+
+def test_connect_states():
+    assert _state(0) == OPEN
+    assert _state(errno.ECONNREFUSED) == CLOSED
+    assert _state(errno.ETIMEDOUT) == FILTERED
+    with pytest.raises(OSError):
+        _state(errno.EMFILE)
+
+
+def test_rtt_timeout():
+    rtt = RttEstimator()
+    assert rtt.timeout(0.1, 1.5) == 1.5
+    rtt.update(0.05)
+    assert rtt.timeout(0.1, 1.5) == pytest.approx(0.15)
+    assert rtt.congested(0.2) and not rtt.congested(0.1)
+
+
+def listener(address: str) -> socket.socket:
+    sock = socket.socket()
+    sock.bind((address, 0))
+    sock.listen(16)
+    return sock
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def test_scan_file_dedupes_addresses_and_writes_results(tmp_path):
+    everywhere, first_only = listener("0.0.0.0"), listener("127.0.0.1")
+    shared, own, closed = everywhere.getsockname()[1], first_only.getsockname()[1], free_port()
+    source = tmp_path / "resolved_hosts.txt"
+    source.write_text("a.example.test 127.0.0.1 -\nb.example.test 127.0.0.1,127.0.0.2 -\n127.0.0.2\n")
+    output = io.StringIO()
+    scanner = PortScanner(output, concurrency=10, per_host=2, timeout=1.0)
+    try:
+        targets = asyncio.run(scan_file(str(source), scanner, [shared, own, closed]))
+    finally:
+        everywhere.close()
+        first_only.close()
+
+    assert sorted(targets) == ["127.0.0.1", "127.0.0.2"]
+    assert targets["127.0.0.1"].names == {"a.example.test", "b.example.test"}
+    assert sorted(targets["127.0.0.1"].open) == sorted([shared, own])
+    assert targets["127.0.0.2"].open == [shared]
+    stats = scanner.stats
+    assert (stats.addresses, stats.names, stats.probes) == (2, 2, 6)
+    assert stats.states == {OPEN: 3, CLOSED: 3, FILTERED: 0}
+    found = sorted((line["address"], line["port"]) for line in map(json.loads, output.getvalue().splitlines()))
+    assert found == sorted([("127.0.0.1", shared), ("127.0.0.1", own), ("127.0.0.2", shared)])
+
+    write_results(targets.values(), str(tmp_path / "ips.txt"), str(tmp_path / "hosts.txt"))
+    low, high = sorted([shared, own])
+    assert (tmp_path / "ips.txt").read_text() == f"127.0.0.1 {low},{high}\n127.0.0.2 {shared}\n"
+    assert (tmp_path / "hosts.txt").read_text().split() == [
+        f"{name}:{port}" for name in ("a.example.test", "b.example.test") for port in (low, high)]
+
+
+class Blackhole(PortScanner):
+    """Every connect times out; the timeouts asked for are recorded."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(io.StringIO(), *args, **kwargs)
+        self.timeouts = []
+
+    async def _connect(self, address, port, timeout):
+        self.timeouts.append(timeout)
+        return FILTERED
+
+
+def test_silent_address_is_given_up():
+    scanner = Blackhole(per_host=1, timeout=0.01, retries=0, down_after=3)
+    target = Target("127.0.0.3")
+    asyncio.run(scanner.scan(target, list(range(1, 11))))
+    assert target.down and target.probes == 3
+    assert scanner.stats.down == 1
+
+
+def test_retry_backs_off_the_timeout():
+    scanner = Blackhole(timeout=1.5, min_timeout=0.05, retries=2)
+    target = Target("127.0.0.1")
+    target.rtt.update(0.02)
+    assert asyncio.run(scanner.probe(target, 81)) == FILTERED
+    assert scanner.timeouts == [pytest.approx(0.06), pytest.approx(0.12), pytest.approx(0.24)]
+    assert scanner.stats.retries == 2
+
+    scanner = Blackhole(timeout=1.5, retries=2)
+    assert asyncio.run(scanner.probe(Target("127.0.0.1"), 81)) == FILTERED
+    # The full timeout is never retried
+    assert scanner.timeouts == [1.5]
@@ -0,0 +1,200 @@
+import asyncio
+import gzip
+
+import pytest
+
+from recon.probe import ConnectionPool, Origin, ProbeError, parse_host, parse_ports, probe_host, read_response
+
+
+def parse(raw: bytes, method: str = "GET", max_body: int = 1 << 16):
+    async def run():
+        reader = asyncio.StreamReader()
+        reader.feed_data(raw)
+        reader.feed_eof()
+        return await read_response(reader, method, max_body)
+
+    return asyncio.run(run())
+
+
+def test_content_length_and_keep_alive():
+    body = b"<html><title> Caf\xe9\n  &amp; Bar </title>"
+    response = parse(b"HTTP/1.1 200 OK\r\nContent-Type: text/html; charset=iso-8859-1\r\n"
+                     b"Content-Length: %d\r\n\r\n" % len(body) + body)
+    assert (response.status, response.reason, response.keep_alive, response.truncated) == (200, "OK", True, False)
+    assert response.title == "Café & Bar"
+    assert response.content_length == len(body)
+
+
+def test_chunked_after_interim_answer():
+    response = parse(b"HTTP/1.1 100 Continue\r\n\r\nHTTP/1.1 404 Not Found\r\nTransfer-Encoding: chunked\r\n"
+                     b"Connection: close\r\n\r\n5;ext=1\r\nhello\r\n6\r\n world\r\n0\r\nX-Trailer: 1\r\n\r\n")
+    assert response.status == 404
+    assert response.body == b"hello world"
+    assert not response.keep_alive
+
+
+def test_body_capped_and_decompressed():
+    body = gzip.compress(b"a" * 100)
+    response = parse(b"HTTP/1.0 200 OK\r\nContent-Encoding: gzip\r\nContent-Length: %d\r\n\r\n" % len(body) + body)
+    assert response.body == b"a" * 100 and not response.keep_alive
+    capped = parse(b"HTTP/1.1 200 OK\r\nContent-Length: 100\r\n\r\n" + b"b" * 100, max_body=10)
+    assert capped.body == b"b" * 10 and capped.truncated and not capped.keep_alive
+    until_close = parse(b"HTTP/1.1 200 OK\r\n\r\nrest of the stream")
+    assert until_close.body == b"rest of the stream" and not until_close.keep_alive
+
+
+def test_head_and_not_http():
+    assert parse(b"HTTP/1.1 200 OK\r\nContent-Length: 10\r\n\r\n", method="HEAD").body == b""
+    with pytest.raises(ProbeError):
+        parse(b"SSH-2.0-OpenSSH_9.6\r\n")
+
+
+def test_parse_ports_and_hosts():
+    assert parse_ports("https, http:8080") == [("https", 443), ("http", 8080)]
+    with pytest.raises(ValueError):
+        parse_ports("ftp:21")
+    assert parse_host("WWW.Example.com 192.0.2.1,192.0.2.2 -") == ("www.example.com", "192.0.2.1")
+    assert parse_host("api.example.com - -") == ("api.example.com", None)
+    assert parse_host("api.example.com") == ("api.example.com", None)
+
+
+def test_origin_url():
+    assert Origin("https", "example.com", 443, "192.0.2.1").url("/a") == "https://example.com/a"
+    assert Origin("http", "example.com", 8080, "192.0.2.1").url() == "http://example.com:8080/"
+
+
+class Server:
+    """Loopback HTTP/1.1 server answering from ``routes`` (path -> (status, headers, body)).
+
+    It keeps connections alive, counts them and the requests in flight, and
+    holds every answer for ``delay`` seconds.
+    """
+
+    def __init__(self, routes, delay=0.0):
+        self.routes = routes
+        self.delay = delay
+        self.connections = 0
+        self.active = 0
+        self.peak = 0
+        self.paths = []
+
+    async def handle(self, reader, writer):
+        self.connections += 1
+        try:
+            while True:
+                request = await reader.readuntil(b"\r\n\r\n")
+                path = request.split(b" ")[1].decode()
+                self.paths.append(path)
+                self.active += 1
+                self.peak = max(self.peak, self.active)
+                await asyncio.sleep(self.delay)
+                self.active -= 1
+                status, headers, body = self.routes.get(path, (404, {}, b"missing"))
+                head = "".join(f"{name}: {value}\r\n" for name, value in headers.items())
+                writer.write(f"HTTP/1.1 {status} X\r\n{head}Content-Length: {len(body)}\r\n\r\n".encode() + body)
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def start(self, host="127.0.0.1"):
+        self.server = await asyncio.start_server(self.handle, host, 0)
+        return self.server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        self.server.close()
+
+
+def serve(routes, test, delay=0.0):
+    """Run ``test(server, port)`` against a :class:`Server` and return its result."""
+    async def run():
+        server = Server(routes, delay)
+        port = await server.start()
+        try:
+            return await test(server, port)
+        finally:
+            await server.stop()
+
+    return asyncio.run(run())
+
+
+PAGE = (200, {"Content-Type": "text/html"}, b"<title>Home</title>")
+
+
+def test_fetch_reuses_keep_alive_connections():
+    async def test(server, port):
+        async with ConnectionPool(timeout=2.0) as pool:
+            origin = Origin("http", "www.example.test", port, "127.0.0.1")
+            first, timing = await pool.fetch(origin)
+            second, _ = await pool.fetch(origin, "/other")
+            return first, second, timing, pool.stats, server.connections
+
+    first, second, timing, stats, connections = serve({"/": PAGE}, test)
+    assert (first.status, first.title, second.status) == (200, "Home", 404)
+    assert set(timing) == {"connect", "response", "total"}
+    assert stats == {"requests": 2, "connections": 1, "reused": 1} and connections == 1
+
+
+def test_per_host_and_global_limits():
+    async def test(server, port, concurrency, per_host, addresses):
+        async with ConnectionPool(concurrency=concurrency, per_host=per_host, timeout=2.0) as pool:
+            await asyncio.gather(*(pool.fetch(Origin("http", f"h{i}.example.test", port, addresses[i % 2]))
+                                   for i in range(6)))
+        return server.peak
+
+    one_address = serve({"/": PAGE}, lambda s, p: test(s, p, 10, 2, ["127.0.0.1"] * 2), delay=0.05)
+    assert one_address == 2
+
+    async def global_cap():
+        # Listen on every address so that both loopback addresses reach the server
+        server = Server({"/": PAGE}, delay=0.05)
+        port = await server.start("0.0.0.0")
+        try:
+            return await test(server, port, 3, 4, ["127.0.0.1", "127.0.0.2"])
+        finally:
+            await server.stop()
+
+    assert asyncio.run(global_cap()) == 3
+
+
+def test_redirect_chain():
+    async def test(server, port):
+        routes = {
+            "/": (301, {"Location": "/a"}, b""),
+            "/a": (302, {"Location": f"http://www.example.test:{port}/b?x=1"}, b""),
+            "/b?x=1": PAGE,
+        }
+        server.routes.update(routes)
+        async with ConnectionPool(timeout=2.0) as pool:
+            record = await probe_host(pool, "www.example.test", "127.0.0.1", [("http", port)])
+            capped = await probe_host(pool, "www.example.test", "127.0.0.1", [("http", port)], max_redirects=1)
+            return record, capped, pool.stats["connections"]
+
+    record, capped, connections = serve({}, test)
+    base = record["url"].rstrip("/")
+    assert [hop["status"] for hop in record["redirects"]] == [301, 302]
+    assert record["redirects"][1]["url"] == f"{base}/a"
+    assert (record["final_url"], record["final_status"], record["title"]) == (f"{base}/b?x=1", 200, "Home")
+    assert capped["final_status"] == 302 and len(capped["redirects"]) == 1
+    assert connections == 1
+
+
+def test_https_falls_back_to_http():
+    async def refuse(reader, writer):
+        writer.close()
+
+    async def test(server, port):
+        tls = await asyncio.start_server(refuse, "127.0.0.1", 0)
+        tls_port = tls.sockets[0].getsockname()[1]
+        try:
+            async with ConnectionPool(timeout=2.0) as pool:
+                live = await probe_host(pool, "www.example.test", "127.0.0.1", [("https", tls_port), ("http", port)])
+                dead = await probe_host(pool, "www.example.test", "127.0.0.1", [("https", tls_port)])
+                return live, dead
+        finally:
+            tls.close()
+
+    live, dead = serve({"/": PAGE}, test)
+    assert (live["scheme"], live["status"], live["title"]) == ("http", 200, "Home")
+    assert dead is None
@@ -0,0 +1,54 @@
+import asyncio
+import json
+import sys
+
+from recon.profile import MeasuredProcess, Profiler, Usage, count_lines, load_records, summarize
+
+
+def usage(wall: float, returncode: int = 0) -> Usage:
+    return Usage(wall=wall, cpu_user=wall / 2, cpu_system=0.1, max_rss_kb=2048, returncode=returncode)
+
+
+def test_measured_process_reports_usage():
+    async def run():
+        process = MeasuredProcess([sys.executable, "-c", "import sys; sum(range(10 ** 6)); sys.exit(3)"])
+        return await process.wait()
+
+    result = asyncio.run(run())
+    assert result.returncode == 3
+    assert result.wall > 0 and result.cpu > 0 and result.max_rss_kb > 0
+
+
+def test_count_lines(tmp_path):
+    (tmp_path / "a.txt").write_text("a\nb\n")
+    (tmp_path / "b.txt").write_text("c\nd")
+    assert count_lines([str(tmp_path / "a.txt"), str(tmp_path / "b.txt"), str(tmp_path / "missing")]) == 3
+
+
+def test_records_latest_wins_and_unique_names(tmp_path):
+    path = str(tmp_path / "reports" / "profile.jsonl")
+    subfinder, sudomy = tmp_path / "subfinder.txt", tmp_path / "sudomy_example_com.txt"
+    subfinder.write_text("www.example.com\napi.example.com\n")
+    sudomy.write_text("www.example.com\nmail.example.com\ndev.example.com\n")
+    profiler = Profiler(path)
+    profiler.record("run_subfinder", usage(9.0, returncode=1), outputs=[str(subfinder)])
+    # A resumed run records the stage again
+    record = profiler.record("run_subfinder", usage(5.0), outputs=[str(subfinder)])
+    assert record.lines == 2
+    profiler.record("sudomy_target", usage(20.0), target="example.com", parent="run_sudomy",
+                    outputs=[str(sudomy)])
+    profiler.record("run_sudomy", usage(21.0))
+    with open(path, "a") as handle:
+        handle.write("not json\n")
+
+    records = load_records(path)
+    assert [(record.stage, record.wall) for record in records] == [
+        ("run_subfinder", 5.0), ("sudomy_target", 20.0), ("run_sudomy", 21.0)]
+
+    rows = summarize(path, ["run_subfinder", "run_sudomy"], top=5)
+    assert rows[1].startswith("run_sudomy") and rows[2].startswith("run_subfinder")
+    assert rows[4] == "Slowest per-target tasks (1 of 1):"
+    assert rows[5].split()[:2] == ["sudomy_target", "example.com"]
+    with open(path) as handle:
+        rewritten = {(data["stage"], data.get("unique_new")) for data in map(json.loads, handle)}
+    assert rewritten == {("run_subfinder", 1), ("sudomy_target", 2), ("run_sudomy", 0)}
@@ -0,0 +1,48 @@
+import pytest
+
+from recon.config import RunConfig
+from recon.engine import Engine, setup_directories
+from recon.report import write_report, write_summary
+from recon.state import tool_name
+
+
+@pytest.fixture
+def engine(tmp_path):
+    out = setup_directories(str(tmp_path / "run"))
+    targets = tmp_path / "run" / "targets.txt"
+    targets.write_text("example.com\ndev.example.com\n")
+    config = RunConfig.from_env(environ={"CACHE_DIR": str(tmp_path / "cache")})
+    engine = Engine(config, out, str(targets))
+    engine.budget.configure(300, 10, 100)
+    yield engine
+    engine.close()
+
+
+def write(engine, relative, *lines):
+    with open(engine.out(relative), "w", encoding="utf-8") as handle:
+        handle.writelines(f"{line}\n" for line in lines)
+
+
+def test_report_and_summary_count_the_run(engine):
+    write(engine, "final_subdomains.txt", "www.example.com", "api.dev.example.com", "dev.example.com")
+    write(engine, "resolved_subdomains.txt", "www.example.com")
+    write(engine, engine.sources[0].outputs[0], "www.example.com", "dev.example.com")
+    write(engine, "intelligence/asn_intel/asn_AS64500.txt", "192.0.2.0/24")
+    engine.manifest.start("aggregate_subdomains")
+    engine.manifest.finish("aggregate_subdomains", "", 0)
+
+    with open(write_report(engine, 1000, 1060), encoding="utf-8") as handle:
+        report = handle.read()
+    assert "Number of targets: 2\n" in report
+    assert "Duration: 60 seconds\n" in report
+    assert "Total Unique Subdomains: 3\n" in report and "Resolved Subdomains: 1\n" in report
+    # Names of the nested target are not counted for its parent
+    assert "- example.com: 1 subdomains\n- dev.example.com: 2 subdomains\n" in report
+    assert "RUN MANIFEST: 0 pending, 0 running, 1 done, 0 failed" in report
+    assert "run                                   300/s of 300/s" in report
+
+    with open(write_summary(engine), encoding="utf-8") as handle:
+        summary = handle.read()
+    assert f"- {tool_name(engine.sources[0].name)}: 2\n" in summary
+    assert "Total Subdomains: 3\n" in summary
+    assert "- ASN intel: 1 ASNs processed\n" in summary
@@ -0,0 +1,68 @@
+import asyncio
+import io
+
+from recon.resolve import ResolveStats, WildcardDetector, resolve_name, resolve_stream, resolver_workers
+
+from .stubs import StubPool
+
+RECORDS = {
+    "www.example.com": ["192.0.2.1"],
+    "shop.example.com": ["cname:shops.cdn.test", "203.0.113.5"],
+    "real.wild.example.com": ["192.0.2.9"],
+    "alias.wild.example.com": ["198.51.100.1"],
+}
+
+
+def pool() -> StubPool:
+    return StubPool(RECORDS, wildcards={"wild.example.com": "198.51.100.1"}, failing={"broken.example.com"})
+
+
+def test_resolve_name_follows_cnames():
+    resolution = asyncio.run(resolve_name(pool(), "shop.example.com"))
+    assert (resolution.addresses, resolution.cnames) == (["203.0.113.5"], ["shops.cdn.test"])
+    assert resolution.hosts_line() == "shop.example.com 203.0.113.5 shops.cdn.test\n"
+    assert asyncio.run(resolve_name(pool(), "missing.example.com")) is None
+
+
+def test_wildcard_detector_probes_each_parent_once():
+    async def run():
+        stub = pool()
+        detector = WildcardDetector(stub)
+        hits = [await detector.is_wildcard_hit(await resolve_name(stub, name))
+                for name in ("anything.wild.example.com", "real.wild.example.com", "alias.wild.example.com",
+                             "www.example.com")]
+        probes = sum(1 for name in stub.queries if len(name.partition(".")[0]) == 16)
+        return hits, probes, detector.wildcard_zones
+
+    hits, probes, zones = asyncio.run(run())
+    # Only answers among the wildcard's are hits, whatever the name
+    assert hits == [True, False, True, False]
+    assert probes == 2 * 3  # wild.example.com and example.com, three random labels each
+    assert zones == ["wild.example.com"]
+
+
+def test_resolve_stream():
+    async def run():
+        queue = asyncio.Queue()
+        for name in ("www.example.com", "shop.example.com", "missing.example.com", "broken.example.com",
+                     "anything.wild.example.com", "real.wild.example.com"):
+            queue.put_nowait(name)
+        for _ in range(3):
+            queue.put_nowait(None)
+        output, hosts, wildcards, stats, kept = io.StringIO(), io.StringIO(), io.StringIO(), ResolveStats(), []
+        await resolve_stream(pool(), queue, 3, output, hosts, wildcards, stats, kept.append)
+        return output, hosts, wildcards, stats, kept
+
+    output, hosts, wildcards, stats, kept = asyncio.run(run())
+    resolved = ["real.wild.example.com", "shop.example.com", "www.example.com"]
+    assert sorted(output.getvalue().split()) == resolved
+    assert sorted(resolution.name for resolution in kept) == resolved
+    assert "www.example.com 192.0.2.1 -" in hosts.getvalue().splitlines()
+    assert wildcards.getvalue().split() == ["anything.wild.example.com"]
+    assert (stats.resolved, stats.unresolved, stats.failed, stats.wildcard) == (3, 1, 1, 1)
+
+
+def test_resolver_workers():
+    assert resolver_workers({"concurrency": 1000}) == 500
+    assert resolver_workers({"concurrency": 1}) == 1
+    assert resolver_workers({}) == 500
@@ -0,0 +1,28 @@
+from ipaddress import IPv4Network
+
+from recon.reverse import extract_cidrs, iter_addresses, uncovered
+
+
+def test_extract_cidrs_in_order_without_duplicates():
+    lines = [
+        "AS64500 | 192.0.2.0/24 | EXAMPLE-NET",
+        "route: 198.51.100.0/22 origin AS64500, also 192.0.2.0/24",
+        "192.0.2.7/24 is 192.0.2.0/24 again, 300.1.1.0/24 is no address",
+        "no range here",
+    ]
+    assert extract_cidrs(lines) == [IPv4Network("192.0.2.0/24"), IPv4Network("198.51.100.0/22")]
+
+
+def test_uncovered_parts():
+    swept = [IPv4Network("10.0.0.0/25"), IPv4Network("10.0.1.0/24")]
+    assert uncovered(IPv4Network("10.0.0.0/23"), swept) == [IPv4Network("10.0.0.128/25")]
+    assert uncovered(IPv4Network("10.0.1.64/26"), swept) == []
+    assert uncovered(IPv4Network("10.0.2.0/24"), swept) == [IPv4Network("10.0.2.0/24")]
+    assert uncovered(IPv4Network("10.0.0.0/24"), []) == [IPv4Network("10.0.0.0/24")]
+
+
+def test_iter_addresses_collapses_ranges():
+    addresses = list(iter_addresses([IPv4Network("192.0.2.0/30"), IPv4Network("192.0.2.4/30"),
+                                     IPv4Network("192.0.2.8/31")]))
+    # 192.0.2.0/29 without network and broadcast addresses, then both addresses of the /31
+    assert addresses == [f"192.0.2.{host}" for host in (1, 2, 3, 4, 5, 6, 8, 9)]
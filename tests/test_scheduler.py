@@ -0,0 +1,126 @@
+import asyncio
+import sys
+
+import pytest
+
+from recon.scheduler import CPU, NETWORK, Node, Scheduler, SchedulerError
+
+
+class Tracker:
+    """Stub tools that log their start/finish order and peak concurrency."""
+
+    def __init__(self):
+        self.events = []
+        self.active = 0
+        self.peak = 0
+
+    def tool(self, name, returncode=0, delay=0.01):
+        async def run():
+            self.events.append(("start", name))
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+            await asyncio.sleep(delay)
+            self.active -= 1
+            self.events.append(("end", name))
+            return returncode
+
+        return run
+
+    def index(self, kind, name):
+        return self.events.index((kind, name))
+
+
+def run(scheduler):
+    return asyncio.run(scheduler.run())
+
+
+def test_dependencies_order_and_failures_do_not_cancel():
+    tracker = Tracker()
+    scheduler = Scheduler()
+    scheduler.add(Node("subfinder", tracker.tool("subfinder", returncode=2), [NETWORK]))
+    scheduler.add(Node("resolve", tracker.tool("resolve"), [NETWORK], deps=["subfinder"]))
+    scheduler.add(Node("report", tracker.tool("report"), [CPU], deps=["resolve"]))
+    results = run(scheduler)
+    assert tracker.index("end", "subfinder") < tracker.index("start", "resolve")
+    assert tracker.index("end", "resolve") < tracker.index("start", "report")
+    assert results["subfinder"].returncode == 2 and not results["subfinder"].ok
+    assert results["report"].ok
+
+
+def test_budget_and_job_cap_bound_concurrency():
+    tracker = Tracker()
+    scheduler = Scheduler(budgets={CPU: 4, NETWORK: 1})
+    for name in ("a", "b", "c"):
+        scheduler.add(Node(name, tracker.tool(name), [NETWORK]))
+    run(scheduler)
+    assert tracker.peak == 1
+
+    tracker = Tracker()
+    scheduler = Scheduler(budgets={CPU: 4}, max_jobs=2)
+    for name in ("a", "b", "c", "d"):
+        scheduler.add(Node(name, tracker.tool(name), [CPU]))
+    run(scheduler)
+    assert tracker.peak == 2
+
+
+def test_streaming_stage_runs_alongside_its_upstream():
+    seen = []
+
+    async def upstream():
+        await asyncio.sleep(0.02)
+        seen.append("upstream finished")
+        return 0
+
+    async def consumer():
+        node = scheduler.nodes["consumer"]
+        seen.append("consumer started")
+        await node.upstream_done.wait()
+        seen.append("consumer released")
+        return 0
+
+    scheduler = Scheduler(budgets={NETWORK: 1}, max_jobs=1)
+    scheduler.add(Node("upstream", upstream, [NETWORK]))
+    scheduler.add(Node("consumer", consumer, streams=["upstream"]))
+    results = run(scheduler)
+    assert seen == ["consumer started", "upstream finished", "consumer released"]
+    assert all(result.ok for result in results.values())
+
+
+def test_crashing_stage_and_subprocess_tool():
+    async def crash():
+        raise RuntimeError("boom")
+
+    async def tool():
+        process = await asyncio.create_subprocess_exec(sys.executable, "-c", "raise SystemExit(3)")
+        return await process.wait()
+
+    scheduler = Scheduler()
+    scheduler.add(Node("crash", crash, [CPU]))
+    scheduler.add(Node("tool", tool, [CPU], deps=["crash"]))
+    results = run(scheduler)
+    assert results["crash"].returncode == 1
+    assert results["tool"].returncode == 3
+
+
+@pytest.mark.parametrize("build, message", [
+    (lambda s: s.add(Node("a", None, deps=["missing"])), "unknown dependency"),
+    (lambda s: (s.add(Node("a", None, deps=["b"])), s.add(Node("b", None, deps=["a"]))), "cycle"),
+    (lambda s: s.add(Node("a", None, [NETWORK], streams=["a"])), "cannot hold resource"),
+    (lambda s: s.add(Node("a", None, ["gpu"])), "unknown resource class"),
+])
+def test_invalid_graphs(build, message):
+    scheduler = Scheduler()
+    build(scheduler)
+    with pytest.raises(SchedulerError, match=message):
+        scheduler.validate()
+
+
+def test_empty_budgets_and_job_caps_are_rejected():
+    scheduler = Scheduler(budgets={CPU: 0})
+    scheduler.add(Node("a", Tracker().tool("a"), [CPU]))
+    with pytest.raises(SchedulerError, match="no budget"):
+        run(scheduler)
+    scheduler = Scheduler(max_jobs=0)
+    scheduler.add(Node("a", Tracker().tool("a"), [CPU]))
+    with pytest.raises(SchedulerError, match="job cap"):
+        run(scheduler)
@@ -0,0 +1,56 @@
+import os
+
+from recon.state import StateStore, plan, record, tool_name
+
+ROOTS = ["example.com", "example.org"]
+STAGES = ["run_subfinder", "run_bbot"]
+
+
+def write(path, *names):
+    path.write_text("".join(f"{name}\n" for name in names))
+    return str(path)
+
+
+def read(plan_dir, filename):
+    with open(os.path.join(plan_dir, filename), encoding="utf-8") as handle:
+        return handle.read().split()
+
+
+def test_tool_name():
+    assert tool_name("run_amass_passive") == "amass_passive"
+    assert tool_name("harvest_certificates") == "harvest_certificates"
+
+
+def test_runs_skip_fresh_sources_and_diff_names(tmp_path):
+    plan_dir = str(tmp_path / "state")
+    store = StateStore(str(tmp_path / "db" / "state.db"))
+    try:
+        # First run: nothing is fresh, every name is new
+        assert plan(store, ROOTS, STAGES, plan_dir, 3600) == {stage: ROOTS for stage in STAGES}
+        outputs = {
+            "run_subfinder": write(tmp_path / "subfinder.txt", "a.example.com", "B.example.com.", "x.example.org",
+                                   "noise.other.net"),
+            "run_bbot": write(tmp_path / "bbot.txt", "c.example.com"),
+            "harvest_certificates": write(tmp_path / "certs.txt", "san.example.com"),
+        }
+        new, vanished = record(store, ROOTS, outputs, plan_dir)
+        assert new == ["a.example.com", "b.example.com", "c.example.com", "san.example.com", "x.example.org"]
+        assert vanished == []
+        assert read(plan_dir, "new_subdomains.txt") == new
+
+        # Second run within the TTL: the sources are replayed from the store
+        assert plan(store, ROOTS, STAGES, plan_dir, 3600) == {stage: [] for stage in STAGES}
+        assert read(plan_dir, "run_subfinder.targets") == []
+        assert read(plan_dir, "cached_subdomains.txt") == ["a.example.com", "b.example.com", "c.example.com",
+                                                           "x.example.org"]
+        outputs["harvest_certificates"] = write(tmp_path / "certs.txt", "new.example.org")
+        new, vanished = record(store, ROOTS, outputs, plan_dir)
+        assert new == ["new.example.org"]
+        assert vanished == ["san.example.com"]
+        assert read(plan_dir, "vanished_subdomains.txt") == ["san.example.com"]
+
+        # A zero TTL scans everything again
+        assert plan(store, ROOTS, STAGES, plan_dir, 0) == {stage: ROOTS for stage in STAGES}
+        assert sorted(store.cached_names("example.com", "subfinder")) == ["a.example.com", "b.example.com"]
+    finally:
+        store.close()